@@ -0,0 +1,379 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from backend.db_operations import DbOperations
+
+EVENT_COLUMNS = "profile, char, datetime, online"
+
+
+class ActivityEventEncoder:
+    """
+    Turns consecutive scrapes into login and logout events.
+
+    The online set of the last scrape is kept in memory; each new scrape is diffed against it,
+    and only characters that came online (login) or went offline (logout) produce an event.
+    A character is online from its login event until its logout event, so a player online for
+    an hour costs two rows of activity_events instead of sixty rows of activity_data.
+    If scrapes stop for longer than max_gap, everyone online is logged out one sample_interval
+    after the last scrape, as nothing is known about the gap.
+
+    Attributes
+    ----------
+    max_gap : timedelta
+        Longest time between two scrapes that keeps characters online.
+    sample_interval : timedelta
+        Time one scrape accounts for.
+    online : set
+        (profile, char) pairs online at the last scrape.
+    last_scrape : datetime or None
+        Time of the last scrape.
+
+    Methods
+    -------
+    encode(player_activity: list[dict]) -> list[tuple]
+        Diffs the scrapes of a batch against the online set.
+    close(at: datetime = None) -> list[tuple]
+        Logs out everyone online.
+    restore(db, db_connection, lookback=timedelta(days=1))
+        Restores the online set from the stored events after a restart.
+    """
+
+    def __init__(
+        self,
+        max_gap: timedelta = timedelta(minutes=5),
+        sample_interval: timedelta = timedelta(minutes=1),
+    ):
+        self.max_gap = max_gap
+        self.sample_interval = sample_interval
+        self.online: set = set()
+        self.last_scrape: datetime | None = None
+
+    def encode(self, player_activity: list[dict]) -> list[tuple]:
+        """
+        Diff the scrapes of a batch of activity against the online set.
+
+        Scrapes are told apart by their timestamp; scrapes not newer than the last one are skipped.
+        The placeholder with profile 0 marks a scrape with nobody online.
+
+        Parameters
+        ----------
+        player_activity : list[dict]
+            Activity dictionaries with 'profile', 'char' and 'datetime'
+            ('YYYY-MM-DD HH:MM:SS' string or datetime).
+
+        Returns
+        -------
+        list[tuple]
+            Events (profile, char, datetime, online) in time order.
+        """
+        scrapes: dict[datetime, set] = defaultdict(set)
+        for data in player_activity:
+            dt = data["datetime"]
+            if isinstance(dt, str):
+                dt = datetime.strptime(dt, "%Y-%m-%d %H:%M:%S")
+            key = (int(data["profile"]), int(data["char"]))
+            online = scrapes[dt]
+            if key[0]:
+                online.add(key)
+        events = []
+        for at in sorted(scrapes):
+            if self.last_scrape is not None and at <= self.last_scrape:
+                continue
+            if self.last_scrape is not None and at - self.last_scrape > self.max_gap:
+                events += self.close()
+            current = scrapes[at]
+            events += [(p, c, at, False) for p, c in sorted(self.online - current)]
+            events += [(p, c, at, True) for p, c in sorted(current - self.online)]
+            self.online = current
+            self.last_scrape = at
+        return events
+
+    def close(self, at: datetime = None) -> list[tuple]:
+        """
+        Log out everyone online, e.g. before a shutdown or after a gap in scraping.
+
+        Parameters
+        ----------
+        at : datetime, optional
+            Time of the logout (default: one sample_interval after the last scrape).
+
+        Returns
+        -------
+        list[tuple]
+            Logout events (profile, char, datetime, False).
+        """
+        if not self.online:
+            return []
+        at = at or self.last_scrape + self.sample_interval
+        events = [(p, c, at, False) for p, c in sorted(self.online)]
+        self.online = set()
+        return events
+
+    def restore(
+        self, db: DbOperations, db_connection, lookback: timedelta = timedelta(days=1)
+    ):
+        """
+        Restore the online set from the stored events after a restart.
+
+        Characters whose latest event within lookback is a login are online again, and the
+        latest stored event stands in for the last scrape; the next scrape logs them out
+        if it comes more than max_gap later.
+
+        Parameters
+        ----------
+        db : DbOperations
+            Instance for database operations.
+        db_connection : psycopg2 connection object
+        lookback : timedelta, optional
+            How far back to look for open logins (default: 1 day).
+        """
+        rows = db.select_data(
+            db_connection=db_connection,
+            **ActivityEventReader.state_query(datetime.now() + self.max_gap, lookback),
+        )
+        db_connection.rollback()
+        self.online = {(profile, char) for profile, char, _, online in rows if online}
+        self.last_scrape = max((row[2] for row in rows), default=None)
+
+
+class ActivityEventReader:
+    """
+    Reconstructs presence from the login and logout events of the activity_events table.
+
+    A window is read with two queries: the latest event of each character before the window
+    (its state at the start) and all events inside it.
+
+    Methods
+    -------
+    state_query(start_date, lookback, profile_chars=None) -> dict
+        Builds the select arguments for the last event of each character before start_date.
+    events_query(start_date, end_date, profile_chars=None) -> dict
+        Builds the select arguments for the events within a window.
+    intervals(rows, end_date, now=None) -> list[tuple]
+        Pairs logins with logouts.
+    timestamps(intervals, start_date, end_date, sample_interval) -> dict
+        Reconstructs per-minute activity timestamps, as stored in activity_data.
+    fetch_timestamps(db, db_connection, profile_chars, start_date, end_date) -> dict
+        Reads the activity timestamps of characters within a window.
+    select_chars(rows: list, profile_chars: list[tuple]) -> list
+        Keeps the rows of the requested characters only.
+    """
+
+    @staticmethod
+    def state_query(
+        start_date: datetime,
+        lookback: timedelta = timedelta(days=1),
+        profile_chars: list[tuple] | None = None,
+    ) -> dict:
+        """
+        Build select arguments for the last event of each character within lookback before start_date.
+
+        Parameters
+        ----------
+        start_date : datetime
+            Start of the window (exclusive bound of the events).
+        lookback : timedelta, optional
+            How far back to look (default: 1 day); characters online longer without any event are missed.
+        profile_chars : list[tuple], optional
+            (profile, char) pairs to read (default: all characters).
+
+        Returns
+        -------
+        dict
+            Keyword arguments of select_data.
+        """
+        where_clause = "datetime >= %s AND datetime < %s"
+        params: tuple = (start_date - lookback, start_date)
+        if profile_chars is not None:
+            where_clause += " AND profile = ANY(%s) AND char = ANY(%s)"
+            params += ActivityEventReader._char_params(profile_chars)
+        return {
+            "table": "activity_events",
+            "columns": f"DISTINCT ON (profile, char) {EVENT_COLUMNS}",
+            "where_clause": where_clause,
+            "params": params,
+            "order_by": "profile, char, datetime DESC",
+        }
+
+    @staticmethod
+    def events_query(
+        start_date: datetime,
+        end_date: datetime,
+        profile_chars: list[tuple] | None = None,
+    ) -> dict:
+        """
+        Build select arguments for the events within [start_date, end_date).
+
+        Parameters
+        ----------
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+        profile_chars : list[tuple], optional
+            (profile, char) pairs to read (default: all characters).
+
+        Returns
+        -------
+        dict
+            Keyword arguments of select_data.
+        """
+        where_clause = "datetime >= %s AND datetime < %s"
+        params: tuple = (start_date, end_date)
+        if profile_chars is not None:
+            where_clause += " AND profile = ANY(%s) AND char = ANY(%s)"
+            params += ActivityEventReader._char_params(profile_chars)
+        return {
+            "table": "activity_events",
+            "columns": EVENT_COLUMNS,
+            "where_clause": where_clause,
+            "params": params,
+            "order_by": "profile, char, datetime",
+        }
+
+    @staticmethod
+    def intervals(rows: list, end_date: datetime, now: datetime = None) -> list[tuple]:
+        """
+        Pair logins with the following logouts.
+
+        Repeated logins or logouts (e.g. after a restart) are ignored; a login without
+        a logout lasts until end_date, but not past now.
+
+        Parameters
+        ----------
+        rows : list
+            Events (profile, char, datetime, online), e.g. the results of state_query and events_query.
+        end_date : datetime
+            End of the window.
+        now : datetime, optional
+            Current time (default: datetime.now()).
+
+        Returns
+        -------
+        list[tuple]
+            Online intervals (profile, char, login, logout), sorted by character and login.
+        """
+        until = min(end_date, now or datetime.now())
+        intervals = []
+        login = None
+        current = None
+        for profile, char, dt, online in sorted(rows, key=lambda row: row[:3]):
+            if (profile, char) != current:
+                if login is not None and login < until:
+                    intervals.append((*current, login, until))
+                current, login = (profile, char), None
+            if online and login is None:
+                login = dt
+            elif not online and login is not None:
+                intervals.append((profile, char, login, dt))
+                login = None
+        if login is not None and login < until:
+            intervals.append((*current, login, until))
+        return intervals
+
+    @staticmethod
+    def timestamps(
+        intervals: list[tuple],
+        start_date: datetime,
+        end_date: datetime,
+        sample_interval: timedelta = timedelta(minutes=1),
+    ) -> dict:
+        """
+        Reconstruct the activity timestamps the scraper saw, one per sample_interval.
+
+        Parameters
+        ----------
+        intervals : list[tuple]
+            Online intervals (profile, char, login, logout).
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+        sample_interval : timedelta, optional
+            Time between scrapes (default: 1 minute).
+
+        Returns
+        -------
+        dict
+            (profile, char) -> sorted timestamps within the window, as read from activity_data.
+        """
+        timestamps: dict[tuple, list] = defaultdict(list)
+        for profile, char, login, logout in intervals:
+            skipped = max(0, -(-(start_date - login) // sample_interval))
+            dt = login + skipped * sample_interval
+            stop = min(logout, end_date)
+            while dt < stop:
+                timestamps[(profile, char)].append(dt)
+                dt += sample_interval
+        return dict(timestamps)
+
+    @classmethod
+    def fetch_timestamps(
+        cls,
+        db: DbOperations,
+        db_connection,
+        profile_chars: list[tuple],
+        start_date: datetime,
+        end_date: datetime,
+    ) -> dict:
+        """
+        Read the activity timestamps of characters within [start_date, end_date).
+
+        Parameters
+        ----------
+        db : DbOperations
+            Instance for database operations.
+        db_connection : psycopg2 connection object
+        profile_chars : list[tuple]
+            (profile, char) pairs to read.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        dict
+            (profile, char) -> sorted timestamps, as returned by timestamps.
+        """
+        rows = db.select_data(
+            db_connection=db_connection,
+            **cls.state_query(start_date, profile_chars=profile_chars),
+        )
+        rows += db.select_data(
+            db_connection=db_connection,
+            **cls.events_query(start_date, end_date, profile_chars),
+        )
+        return cls.timestamps(
+            cls.intervals(cls.select_chars(rows, profile_chars), end_date),
+            start_date,
+            end_date,
+        )
+
+    @staticmethod
+    def select_chars(rows: list, profile_chars: list[tuple]) -> list:
+        """
+        Keep the rows of the requested characters only.
+
+        The queries filter profiles and characters separately, so other combinations may be returned.
+
+        Parameters
+        ----------
+        rows : list
+            Rows starting with profile and char.
+        profile_chars : list[tuple]
+            Requested (profile, char) pairs.
+
+        Returns
+        -------
+        list
+        """
+        wanted = {(int(profile), int(char)) for profile, char in profile_chars}
+        return [row for row in rows if (int(row[0]), int(row[1])) in wanted]
+
+    @staticmethod
+    def _char_params(profile_chars: list[tuple]) -> tuple:
+        return (
+            sorted({int(profile) for profile, _ in profile_chars}),
+            sorted({int(char) for _, char in profile_chars}),
+        )
@@ -0,0 +1,294 @@
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backend.db_operations import DbOperations
+
+MINHASH_PRIME = (1 << 31) - 1
+ALT_COLUMNS = "profile, char, other_profile, other_char, similarity"
+
+
+class AltDetector:
+    """
+    Batch job finding characters of different profiles that are online at the same times.
+
+    Each character's presence over the window is a set of time buckets. MinHash signatures
+    of these sets are split into LSH bands, and only characters sharing a band become
+    candidate pairs, whose exact Jaccard similarity is then computed. This avoids comparing
+    all pairs, so tens of thousands of characters are handled on one machine.
+    Characters of the same profile are never paired, as they are already known to belong together.
+
+    Attributes
+    ----------
+    db_name : str
+        Name of the database.
+    window : timedelta
+        Length of the analysed window, ending now.
+    bucket_minutes : int
+        Minutes per presence bucket.
+    num_perm : int
+        Number of MinHash permutations.
+    bands : int
+        Number of LSH bands; num_perm must be divisible by it.
+    min_buckets : int
+        Characters with fewer presence buckets are skipped.
+    min_similarity : float
+        Candidate pairs below this Jaccard similarity are dropped.
+    top_k : int
+        Number of most similar characters kept per character.
+    max_bucket_size : int
+        LSH buckets with more characters than this are ignored as uninformative.
+    db : DbOperations
+        Instance for database operations.
+
+    Methods
+    -------
+    presence_sets(batches, start_date: datetime, end_date: datetime = None) -> dict
+        Builds the presence bucket set of every character.
+    signatures(sets: list[np.ndarray]) -> np.ndarray
+        Computes MinHash signatures.
+    candidate_pairs(signatures: np.ndarray, keys: list[tuple]) -> set[tuple[int, int]]
+        Finds candidate pairs with LSH banding.
+    jaccard(a: np.ndarray, b: np.ndarray) -> float
+        Computes the exact Jaccard similarity of two sorted sets.
+    top_pairs(presence: dict) -> list[tuple]
+        Finds the most similar pairs of characters.
+    run(end_date: datetime = None) -> list[tuple]
+        Runs the job over the window and stores the pairs.
+    """
+
+    def __init__(
+        self,
+        db_name: str = "mgspy",
+        window: timedelta = timedelta(days=14),
+        bucket_minutes: int = 5,
+        num_perm: int = 128,
+        bands: int = 32,
+        min_buckets: int = 12,
+        min_similarity: float = 0.3,
+        top_k: int = 10,
+        max_bucket_size: int = 500,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.db_name = db_name
+        self.window = window
+        self.bucket_minutes = bucket_minutes
+        self.num_perm = num_perm
+        self.bands = bands
+        self.min_buckets = min_buckets
+        self.min_similarity = min_similarity
+        self.top_k = top_k
+        self.max_bucket_size = max_bucket_size
+        self.db: DbOperations = DbOperations(db_name=db_name)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MINHASH_PRIME, size=num_perm, dtype=np.int64)
+        self._b = rng.integers(0, MINHASH_PRIME, size=num_perm, dtype=np.int64)
+
+    def presence_sets(
+        self, batches, start_date: datetime, end_date: datetime = None
+    ) -> dict:
+        """
+        Build the set of presence buckets of every character.
+
+        Rows are folded into one packed bitset per character as they stream in, so memory grows
+        with the number of characters and the window length, not with the number of rows.
+
+        Parameters
+        ----------
+        batches : iterable of list
+            Batches of rows (profile, char, datetime), e.g. from DbOperations.stream_data.
+        start_date : datetime
+            Start of the window; bucket 0 starts here.
+        end_date : datetime, optional
+            End of the window (default: start_date + window); rows outside the window are skipped.
+
+        Returns
+        -------
+        dict
+            (profile, char) -> sorted unique bucket indexes, for characters with at least min_buckets buckets.
+        """
+        end_date = end_date or start_date + self.window
+        bucket_seconds = self.bucket_minutes * 60
+        num_buckets = -(-int((end_date - start_date).total_seconds()) // bucket_seconds)
+        num_bytes = (num_buckets + 7) // 8
+        bitsets = {}
+        for rows in batches:
+            for profile, char, dt in rows:
+                offset = int((dt - start_date).total_seconds()) // bucket_seconds
+                if not 0 <= offset < num_buckets:
+                    continue
+                key = (int(profile), int(char))
+                bits = bitsets.get(key)
+                if bits is None:
+                    bits = bitsets[key] = np.zeros(num_bytes, dtype=np.uint8)
+                bits[offset >> 3] |= 0x80 >> (offset & 7)
+        presence = {}
+        for key, bits in bitsets.items():
+            unique = np.flatnonzero(np.unpackbits(bits)).astype(np.int64)
+            if len(unique) >= self.min_buckets:
+                presence[key] = unique
+        return presence
+
+    def signatures(self, sets: list[np.ndarray]) -> np.ndarray:
+        """
+        Compute a MinHash signature of each set.
+
+        Parameters
+        ----------
+        sets : list[np.ndarray]
+            Non-negative integer sets.
+
+        Returns
+        -------
+        np.ndarray
+            int64 array of shape (len(sets), num_perm).
+        """
+        signatures = np.empty((len(sets), self.num_perm), dtype=np.int64)
+        for i, values in enumerate(sets):
+            hashed = (self._a[:, None] * values[None, :] + self._b[:, None]) % (
+                MINHASH_PRIME
+            )
+            signatures[i] = hashed.min(axis=1)
+        return signatures
+
+    def candidate_pairs(
+        self, signatures: np.ndarray, keys: list[tuple]
+    ) -> set[tuple[int, int]]:
+        """
+        Find pairs of characters that share at least one LSH band.
+
+        Parameters
+        ----------
+        signatures : np.ndarray
+            MinHash signatures, one row per character.
+        keys : list[tuple]
+            (profile, char) of each signature row; rows of the same profile are not paired.
+
+        Returns
+        -------
+        set[tuple[int, int]]
+            Candidate pairs of row indexes (i < j).
+        """
+        rows_per_band = self.num_perm // self.bands
+        candidates = set()
+        for band in range(self.bands):
+            band_values = signatures[
+                :, band * rows_per_band : (band + 1) * rows_per_band
+            ]
+            buckets = defaultdict(list)
+            for i, row in enumerate(band_values):
+                buckets[row.tobytes()].append(i)
+            for members in buckets.values():
+                if len(members) < 2 or len(members) > self.max_bucket_size:
+                    continue
+                for x, i in enumerate(members):
+                    for j in members[x + 1 :]:
+                        if keys[i][0] != keys[j][0]:
+                            candidates.add((i, j))
+        return candidates
+
+    @staticmethod
+    def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+        """
+        Compute the exact Jaccard similarity of two sorted unique integer sets.
+
+        Parameters
+        ----------
+        a : np.ndarray
+            First set.
+        b : np.ndarray
+            Second set.
+
+        Returns
+        -------
+        float
+        """
+        intersection = len(np.intersect1d(a, b, assume_unique=True))
+        union = len(a) + len(b) - intersection
+        return intersection / union if union else 0.0
+
+    def top_pairs(self, presence: dict) -> list[tuple]:
+        """
+        Find the most similar pairs of characters.
+
+        A pair is kept if its similarity is at least min_similarity and it is among
+        the top_k pairs of either character.
+
+        Parameters
+        ----------
+        presence : dict
+            (profile, char) -> sorted unique presence buckets.
+
+        Returns
+        -------
+        list[tuple]
+            Pairs (profile, char, other_profile, other_char, similarity), most similar first,
+            with (profile, char) < (other_profile, other_char).
+        """
+        keys = sorted(presence)
+        if len(keys) < 2:
+            return []
+        sets = [presence[key] for key in keys]
+        candidates = self.candidate_pairs(self.signatures(sets), keys)
+        scored = []
+        for i, j in candidates:
+            similarity = self.jaccard(sets[i], sets[j])
+            if similarity >= self.min_similarity:
+                scored.append((similarity, i, j))
+        scored.sort(key=lambda pair: (-pair[0], pair[1], pair[2]))
+
+        kept_per_char: dict[int, int] = defaultdict(int)
+        pairs = []
+        for similarity, i, j in scored:
+            if kept_per_char[i] >= self.top_k and kept_per_char[j] >= self.top_k:
+                continue
+            kept_per_char[i] += 1
+            kept_per_char[j] += 1
+            pairs.append((*keys[i], *keys[j], round(similarity, 4)))
+        return pairs
+
+    def run(self, end_date: datetime = None) -> list[tuple]:
+        """
+        Find similar characters in the window ending at end_date and store them in alt_candidates.
+
+        Parameters
+        ----------
+        end_date : datetime, optional
+            End of the window (default: now).
+
+        Returns
+        -------
+        list[tuple]
+            Stored pairs, as returned by top_pairs.
+        """
+        end_date = end_date or datetime.now()
+        start_date = end_date - self.window
+        connection = self.db.connect_to_db()
+        try:
+            presence = self.presence_sets(
+                self.db.stream_data(
+                    connection,
+                    table="activity_data",
+                    columns="profile, char, datetime",
+                    where_clause="datetime >= %s AND datetime < %s",
+                    params=(start_date, end_date),
+                    batch_size=50000,
+                ),
+                start_date,
+                end_date,
+            )
+            connection.rollback()
+            pairs = self.top_pairs(presence)
+            self.db.replace_alt_candidates(connection, pairs)
+        finally:
+            connection.close()
+        print(f"Found {len(pairs)} similar pairs among {len(presence)} characters.")
+        return pairs
+
+
+if __name__ == "__main__":
+    AltDetector(db_name=os.environ.get("DB_NAME", "mgspy")).run()
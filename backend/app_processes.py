@@ -1,10 +1,18 @@
 import multiprocessing
+import os
 import time
 from multiprocessing import Event
 from typing import List, Dict, Any
+from backend.activity_events import ActivityEventEncoder
 from backend.db_operations import DbOperations
+from backend.metrics import FLUSH_SECONDS, QUEUE_DEPTH, mark_process_dead
+from backend.online_publisher import OnlinePublisher
+from backend.query_stats import QUERY_STATS
+from backend.session_stats import SessionEngine
 from backend.web_scrapper import WebScrapper
 
+ACTIVITY_STORAGES = ("rows", "bitmap", "both", "events")
+
 
 class AppProcesses:
     """
@@ -23,6 +31,15 @@ class AppProcesses:
         The interval (in seconds) between save operations.
     app_run_time : int
         The total run time (in seconds) for the application.
+    activity_storage : str
+        Where scraped activity is saved: 'rows' (activity_data), 'bitmap' (activity_bitmap), 'both'
+        (activity_data and activity_bitmap) or 'events' (login/logout transitions in activity_events).
+    event_encoder : ActivityEventEncoder
+        Online set of the last saved scrape, diffed against new scrapes in 'events' storage.
+    session_engine : SessionEngine or None
+        Engine merging each saved batch into the player_sessions table; None disables session tracking.
+    online_publisher : OnlinePublisher or None
+        Publisher of the characters online after each scrape; None disables publishing.
 
     Methods
     -------
@@ -32,6 +49,9 @@ class AppProcesses:
     save_player_activity(scrapped_player_activity: list[dict], control_event: Event)
         Save scraped player activity data into a database at specified intervals.
 
+    save_activity(db, connection, player_activity: list[dict])
+        Save one batch of player activity in the configured activity storage.
+
     scrap_and_save_profile_data()
         Scrapes profile data for unique profiles found in 'activity_data' table
         and saves them to the database.
@@ -46,7 +66,7 @@ class AppProcesses:
         Helper to get unique profile dicts from activity.
     """
 
-    def __init__(self, db_name):
+    def __init__(self, db_name, activity_storage=None):
         """
         Initialize the process manager.
 
@@ -54,11 +74,33 @@ class AppProcesses:
         ----------
         db_name : str
             Name of the database into which scraped activity data will be saved.
+        activity_storage : str, optional
+            'rows', 'bitmap', 'both' or 'events' (default: taken from environment variable
+            ACTIVITY_STORAGE or set to 'rows').
+
+        The scrape and save intervals and the run time default to 60, 600 and 187200 seconds
+        and can be shortened with environment variables SCRAPE_INTERVAL, SAVE_INTERVAL and
+        APP_RUN_TIME, e.g. for soak tests against the scrape stub.
+
+        Raises
+        ------
+        ValueError
+            If activity_storage is not one of ACTIVITY_STORAGES.
         """
         self.db_name = db_name
-        self.scrap_player_activity_interval = 60
-        self.save_player_activity_interval = 600
-        self.app_run_time = 3600 * 26 * 2
+        self.scrap_player_activity_interval = int(os.environ.get("SCRAPE_INTERVAL", 60))
+        self.save_player_activity_interval = int(os.environ.get("SAVE_INTERVAL", 600))
+        self.app_run_time = int(os.environ.get("APP_RUN_TIME", 3600 * 26 * 2))
+        self.activity_storage = activity_storage or os.environ.get(
+            "ACTIVITY_STORAGE", "rows"
+        )
+        if self.activity_storage not in ACTIVITY_STORAGES:
+            raise ValueError(
+                f"Unknown activity storage {self.activity_storage!r}, expected one of {ACTIVITY_STORAGES}"
+            )
+        self.event_encoder = ActivityEventEncoder()
+        self.session_engine = SessionEngine()
+        self.online_publisher = OnlinePublisher()
 
     def scrap_player_activity(
         self, scrapped_player_activity: list[dict], control_event: Event
@@ -66,6 +108,8 @@ class AppProcesses:
         """
         Scrape player activity data from the web scrapper and append it to the list.
 
+        After each successful scrape, the online set is published by the online_publisher.
+
         Parameters
         ----------
         scrapped_player_activity : list[dict]
@@ -79,10 +123,16 @@ class AppProcesses:
         """
         interval = self.scrap_player_activity_interval
         web_scrapper = WebScrapper()
+        publisher = self.online_publisher
+        if publisher is not None:
+            db = DbOperations(db_name=self.db_name)
+            connection = db.connect_to_db()
         while not control_event.is_set():
             timestamp = time.time()
             activity, elapsed_time = web_scrapper.scrap_character_activity()
             scrapped_player_activity += activity
+            if activity and publisher is not None:
+                publisher.publish(db, connection, activity)
             print(f"Scrapped data at {time.ctime(timestamp)}")
             remaining = interval - elapsed_time
             if remaining > 0:
@@ -94,6 +144,9 @@ class AppProcesses:
         """
         Save player activity data into a database from the list at specified intervals.
 
+        The length of the list and the time to save it are recorded in the metrics;
+        the query statistics of the process are printed when it stops.
+
         Parameters
         ----------
         scrapped_player_activity : list[dict]
@@ -108,13 +161,49 @@ class AppProcesses:
         interval = self.save_player_activity_interval
         db = DbOperations(db_name=self.db_name)
         connection = db.connect_to_db()
+        if self.activity_storage == "events":
+            self.event_encoder.restore(db, connection)
         while not control_event.is_set():
             self.smart_sleep(interval, control_event)
             print(f"Saved data at {time.ctime()}")
+            QUEUE_DEPTH.observe(len(scrapped_player_activity))
+            with FLUSH_SECONDS.labels(self.activity_storage).time():
+                self.save_activity(db, connection, scrapped_player_activity)
+            scrapped_player_activity[:] = []
+        if self.activity_storage == "events":
+            db.insert_activity_events(connection, self.event_encoder.close())
+        print(QUERY_STATS.report())
+
+    def save_activity(self, db: DbOperations, connection, player_activity: list[dict]):
+        """
+        Save one batch of player activity in the configured activity storage.
+
+        Parameters
+        ----------
+        db : DbOperations
+            Instance for database operations.
+        connection : psycopg2 connection object
+        player_activity : list[dict]
+            Player activity dictionaries with 'profile', 'char' and 'datetime'.
+
+        Returns
+        -------
+        None
+        """
+        if self.activity_storage in ("rows", "both"):
             db.insert_activity_data(
-                db_connection=connection, player_activity=scrapped_player_activity
+                db_connection=connection, player_activity=player_activity
             )
-            scrapped_player_activity[:] = []
+        if self.activity_storage in ("bitmap", "both"):
+            db.insert_activity_bitmaps(
+                db_connection=connection, player_activity=player_activity
+            )
+        if self.activity_storage == "events":
+            db.insert_activity_events(
+                connection, self.event_encoder.encode(player_activity)
+            )
+        if self.session_engine is not None:
+            self.session_engine.update_sessions(db, connection, list(player_activity))
 
     def scrap_and_save_profile_data(self):
         """
@@ -184,6 +273,8 @@ class AppProcesses:
             control_event.set()
             scrap_player_activity_process.join()
             save_player_activity_process.join()
+            mark_process_dead(scrap_player_activity_process.pid)
+            mark_process_dead(save_player_activity_process.pid)
             print("Processes terminated.")
 
     @staticmethod
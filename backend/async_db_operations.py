@@ -0,0 +1,209 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+from backend.db_operations import DbOperations
+from backend.query_stats import TimedCursor
+
+
+class AsyncDbOperations(DbOperations):
+    """
+    Awaitable PostgreSQL operations backed by a thread-safe connection pool shared per process.
+
+    Every query borrows a connection from the pool and runs in a worker thread via `asyncio.to_thread`,
+    so slow queries never block the event loop of the caller (e.g. NiceGUI handlers).
+    All instances connecting to the same database share one pool, and borrowers beyond
+    its size wait for a free connection instead of failing with PoolError.
+    Connection parameters are inherited from DbOperations.
+
+    Attributes
+    ----------
+    min_connections : int
+        Number of connections opened when the pool is created.
+    max_connections : int
+        Upper bound for concurrently borrowed connections, taken from the instance creating the pool.
+    pool_key : tuple
+        Host, port, database and user identifying the shared pool.
+    pool : ThreadedConnectionPool or None
+        Shared connection pool of this database, created lazily on first use.
+
+    Methods
+    -------
+    create_pool(max_retries=10, delay=2) -> ThreadedConnectionPool
+        Creates the shared connection pool with retries, if not created yet.
+    close_pool()
+        Closes all connections of the shared pool.
+    run_with_connection(operation, *args, **kwargs) -> Any
+        Runs a DbOperations method on a pooled connection in a worker thread.
+    select_data_async(table, columns='*', where_clause=None, params=None, **kwargs) -> list
+        Awaitable variant of DbOperations.select_data.
+    """
+
+    _pools: dict[tuple, tuple[ThreadedConnectionPool, threading.BoundedSemaphore]] = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(
+        self, db_name=None, min_connections: int = 1, max_connections: int = 10
+    ):
+        """
+        Create an async database operations instance; no connection is opened yet.
+
+        Parameters
+        ----------
+        db_name : str, optional
+            Database name (default: taken from environment variable DB_NAME or set to 'mgspy').
+        min_connections : int, optional
+            Number of connections opened when the pool is created (default: 1).
+        max_connections : int, optional
+            Maximum number of pooled connections (default: 10).
+        """
+        super().__init__(db_name=db_name)
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.pool_key = (self.host, self.port, self.db_name, self.user)
+
+    @property
+    def pool(self) -> ThreadedConnectionPool | None:
+        """
+        Shared connection pool of this database, or None if not created yet.
+        """
+        shared = self._pools.get(self.pool_key)
+        return shared[0] if shared else None
+
+    def create_pool(self, max_retries=10, delay=2) -> ThreadedConnectionPool:
+        """
+        Create the pool shared by all instances using this database, retrying if it is not ready.
+
+        Parameters
+        ----------
+        max_retries : int, optional
+            Number of retry attempts before failing (default: 10).
+        delay : int or float, optional
+            Number of seconds to wait between retries (default: 2).
+
+        Returns
+        -------
+        ThreadedConnectionPool
+            The (possibly already existing) connection pool.
+
+        Raises
+        ------
+        Exception
+            If the pool cannot be created after the given retries.
+        """
+        if self.pool is not None:
+            return self.pool
+        for i in range(max_retries):
+            try:
+                pool = ThreadedConnectionPool(
+                    self.min_connections,
+                    self.max_connections,
+                    dbname=self.db_name,
+                    user=self.user,
+                    password=self.password,
+                    host=self.host,
+                    port=self.port,
+                    cursor_factory=TimedCursor,
+                )
+            except psycopg2.OperationalError as e:
+                print(f"DB not ready (attempt {i + 1}/{max_retries}): {e}")
+                time.sleep(delay)
+                continue
+            # Connecting happens outside the lock; if another thread published a pool meanwhile, use that one.
+            with self._pools_lock:
+                shared = self._pools.setdefault(
+                    self.pool_key,
+                    (pool, threading.BoundedSemaphore(self.max_connections)),
+                )
+            if shared[0] is not pool:
+                pool.closeall()
+            return shared[0]
+        raise Exception("Database not available after retries!")
+
+    def close_pool(self):
+        """
+        Close all connections of the shared pool; the next query creates a new one.
+        """
+        with self._pools_lock:
+            shared = self._pools.pop(self.pool_key, None)
+            if shared is not None:
+                shared[0].closeall()
+
+    def run_with_connection(self, operation: Callable, *args, **kwargs) -> Any:
+        """
+        Run a DbOperations method with a connection borrowed from the pool.
+
+        Any transaction left open by the operation (e.g. by a SELECT) is rolled back
+        before the connection is returned, so pooled connections never sit idle in a transaction.
+        Connections that are closed or cannot be rolled back (e.g. after a database restart)
+        are discarded by the pool instead of being handed out again.
+        When all connections are borrowed, the call blocks until one is returned.
+
+        Parameters
+        ----------
+        operation : Callable
+            Method taking `db_connection` as its first argument, e.g. DbOperations.select_data.
+        *args, **kwargs
+            Remaining arguments for the operation.
+
+        Returns
+        -------
+        Any
+            Result of the operation.
+        """
+        self.create_pool()
+        pool, slots = self._pools[self.pool_key]
+        with slots:
+            conn = pool.getconn()
+            try:
+                return operation(conn, *args, **kwargs)
+            finally:
+                broken = bool(conn.closed)
+                if not broken:
+                    try:
+                        conn.rollback()
+                    except psycopg2.Error:
+                        broken = True
+                pool.putconn(conn, close=broken)
+
+    async def select_data_async(
+        self,
+        table: str,
+        columns: str = "*",
+        where_clause: str = None,
+        params: tuple = None,
+        **kwargs,
+    ) -> list:
+        """
+        Select data from a PostgreSQL table without blocking the event loop.
+
+        Parameters
+        ----------
+        table : str
+            Name of the table.
+        columns : str, optional
+            Columns to select, comma-separated, by default '*' (all).
+        where_clause : str, optional
+            WHERE clause, e.g., "profile = %s", by default None.
+        params : tuple or list, optional
+            Parameters to use in the WHERE clause, by default None.
+        **kwargs
+            Further arguments of DbOperations.select_data (order_by, limit, offset).
+
+        Returns
+        -------
+        list of tuple
+        """
+        return await asyncio.to_thread(
+            self.run_with_connection,
+            self.select_data,
+            table=table,
+            columns=columns,
+            where_clause=where_clause,
+            params=params,
+            **kwargs,
+        )
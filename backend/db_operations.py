@@ -1,8 +1,18 @@
 import os
 import time
+from datetime import date, datetime
 
 import psycopg2
 from psycopg2.extensions import connection
+from psycopg2.extras import execute_values
+
+from backend.metrics import DB_ROWS_WRITTEN, timed_write
+from backend.query_stats import TimedCursor
+
+PROFILE_CHANNEL = "profile_data_changed"
+ONLINE_CHANNEL = "online_players_changed"
+NOTIFY_PAYLOAD_LIMIT = 7900
+MINUTES_PER_DAY = 1440
 
 
 class DbOperations:
@@ -11,6 +21,9 @@ class DbOperations:
 
     This class provides methods for connecting to a PostgreSQL database, inserting activity and profile data,
     retrieving and deleting records from tables, with connection parameters controlled via environment variables.
+    Write durations, failures and written rows are recorded in the metrics (backend/metrics.py);
+    connections use TimedCursor, which records every statement in the query statistics and logs
+    slow ones with their plan (backend/query_stats.py).
 
     Attributes
     ----------
@@ -31,10 +44,28 @@ class DbOperations:
         Connects to the PostgreSQL database with retries.
     insert_activity_data(db_connection, player_activity)
         Inserts a list of activity dictionaries into the activity_data table.
+    fold_activity_bitmaps(player_activity) -> dict
+        Folds activity dictionaries into per-character, per-day presence bitmaps.
+    insert_activity_bitmaps(db_connection, player_activity)
+        Merges a list of activity dictionaries into the activity_bitmap table.
+    insert_activity_events(db_connection, events)
+        Inserts login and logout events into the activity_events table.
+    replace_sessions(db_connection, old_sessions, sessions)
+        Replaces stored play sessions in the player_sessions table.
+    replace_alt_candidates(db_connection, pairs)
+        Replaces the contents of the alt_candidates table.
     insert_profile_data(db_connection, player_data)
-        Inserts a list of profile dictionaries into the profile_data table.
-    select_data(db_connection, table, columns='*', where_clause=None, params=None)
+        Inserts a list of profile dictionaries into the profile_data table and notifies listeners.
+    notify_profiles_changed(cursor, profiles)
+        Sends a NOTIFY with the changed profile IDs on the PROFILE_CHANNEL channel.
+    publish_online_players(db_connection, online, payloads)
+        Replaces the online_players table and sends the payloads on the ONLINE_CHANNEL channel.
+    select_data(db_connection, table, columns='*', where_clause=None, params=None, order_by=None, limit=None, offset=None)
         Selects data from a table.
+    build_select_query(table, columns='*', where_clause=None, order_by=None, limit=None, offset=None) -> str
+        Builds a SELECT statement.
+    stream_data(db_connection, table, columns='*', where_clause=None, params=None, order_by=None, batch_size=10000)
+        Yields data from a table in batches, using a server-side cursor.
     delete_data(db_connection, table, where_clause=None, params=None)
         Deletes data from a table.
     """
@@ -91,6 +122,7 @@ class DbOperations:
                     password=self.password,
                     host=self.host,
                     port=self.port,
+                    cursor_factory=TimedCursor,
                 )
                 return conn
             except psycopg2.OperationalError as e:
@@ -99,6 +131,7 @@ class DbOperations:
         raise Exception("Database not available after retries!")
 
     @staticmethod
+    @timed_write("insert_activity_data")
     def insert_activity_data(db_connection, player_activity: list[dict]):
         """
         Insert activity data into the activity_data table.
@@ -119,9 +152,158 @@ class DbOperations:
                 cursor.execute(insert_query, values)
 
             db_connection.commit()
+            DB_ROWS_WRITTEN.labels("activity_data").inc(len(player_activity))
             print("Activity data inserted successfully.")
 
     @staticmethod
+    def fold_activity_bitmaps(player_activity: list[dict]) -> dict:
+        """
+        Fold activity data into one presence bitmap per character and day.
+
+        Parameters
+        ----------
+        player_activity : list of dict
+            Each dict should have keys 'profile', 'char', 'datetime'
+            ('YYYY-MM-DD HH:MM:SS' string or datetime).
+
+        Returns
+        -------
+        dict
+            (profile, char, day) -> bit string of MINUTES_PER_DAY '0'/'1' characters,
+            where character i is '1' if the character was online in minute i of the day.
+        """
+        bitmaps: dict[tuple[int, int, date], bytearray] = {}
+        for data in player_activity:
+            dt = data["datetime"]
+            if isinstance(dt, str):
+                dt = datetime.strptime(dt, "%Y-%m-%d %H:%M:%S")
+            key = (int(data["profile"]), int(data["char"]), dt.date())
+            bits = bitmaps.get(key)
+            if bits is None:
+                bits = bitmaps[key] = bytearray(b"0" * MINUTES_PER_DAY)
+            bits[dt.hour * 60 + dt.minute] = ord("1")
+        return {key: bits.decode("ascii") for key, bits in bitmaps.items()}
+
+    @staticmethod
+    @timed_write("insert_activity_bitmaps")
+    def insert_activity_bitmaps(db_connection, player_activity: list[dict]):
+        """
+        Merge activity data into the activity_bitmap table.
+
+        Activity is folded into per-day bitmaps first, so each character costs one
+        upsert per day, and existing bitmaps are OR-ed with the new ones in the database.
+
+        Parameters
+        ----------
+        db_connection : psycopg2 connection object
+        player_activity : list of dict
+            Each dict should have keys 'profile', 'char', 'datetime'
+        """
+        bitmaps = DbOperations.fold_activity_bitmaps(player_activity)
+        upsert_query = """
+        INSERT INTO activity_bitmap (profile, char, day, minutes)
+        VALUES %s
+        ON CONFLICT (profile, char, day)
+        DO UPDATE SET minutes = activity_bitmap.minutes | EXCLUDED.minutes;
+        """
+        values = [
+            (profile, char, day, bits) for (profile, char, day), bits in bitmaps.items()
+        ]
+        with db_connection.cursor() as cursor:
+            execute_values(
+                cursor,
+                upsert_query,
+                values,
+                template=f"(%s, %s, %s, %s::bit({MINUTES_PER_DAY}))",
+            )
+            db_connection.commit()
+            DB_ROWS_WRITTEN.labels("activity_bitmap").inc(len(values))
+            print(f"Activity bitmaps merged successfully ({len(values)} days).")
+
+    @staticmethod
+    @timed_write("insert_activity_events")
+    def insert_activity_events(db_connection, events: list):
+        """
+        Insert login and logout events into the activity_events table.
+
+        Parameters
+        ----------
+        db_connection : psycopg2 connection object
+        events : list of tuple
+            Events (profile, char, datetime, online), as built by ActivityEventEncoder.
+        """
+        with db_connection.cursor() as cursor:
+            if events:
+                execute_values(
+                    cursor,
+                    "INSERT INTO activity_events (profile, char, datetime, online) VALUES %s "
+                    "ON CONFLICT (profile, char, datetime) DO NOTHING;",
+                    events,
+                )
+            db_connection.commit()
+            DB_ROWS_WRITTEN.labels("activity_events").inc(len(events))
+            print(f"Activity events inserted successfully ({len(events)} events).")
+
+    @staticmethod
+    @timed_write("replace_sessions")
+    def replace_sessions(db_connection, old_sessions: list, sessions: list):
+        """
+        Replace play sessions in the player_sessions table in one transaction.
+
+        Parameters
+        ----------
+        db_connection : psycopg2 connection object
+        old_sessions : list of tuple
+            Stored sessions (profile, char, session_start, session_end) to remove.
+        sessions : list of tuple
+            Sessions (profile, char, session_start, session_end) to insert.
+        """
+        with db_connection.cursor() as cursor:
+            if old_sessions:
+                execute_values(
+                    cursor,
+                    "DELETE FROM player_sessions WHERE (profile, char, session_start) IN (VALUES %s);",
+                    [
+                        (profile, char, start)
+                        for profile, char, start, _ in old_sessions
+                    ],
+                )
+            if sessions:
+                execute_values(
+                    cursor,
+                    "INSERT INTO player_sessions (profile, char, session_start, session_end) VALUES %s;",
+                    sessions,
+                )
+            db_connection.commit()
+            DB_ROWS_WRITTEN.labels("player_sessions").inc(len(sessions))
+            print(f"Sessions updated ({len(sessions)} sessions).")
+
+    @staticmethod
+    @timed_write("replace_alt_candidates")
+    def replace_alt_candidates(db_connection, pairs: list):
+        """
+        Replace all similar character pairs in the alt_candidates table in one transaction.
+
+        Parameters
+        ----------
+        db_connection : psycopg2 connection object
+        pairs : list of tuple
+            Pairs (profile, char, other_profile, other_char, similarity).
+        """
+        with db_connection.cursor() as cursor:
+            cursor.execute("DELETE FROM alt_candidates;")
+            if pairs:
+                execute_values(
+                    cursor,
+                    "INSERT INTO alt_candidates (profile, char, other_profile, other_char, similarity) VALUES %s;",
+                    pairs,
+                )
+            db_connection.commit()
+            DB_ROWS_WRITTEN.labels("alt_candidates").inc(len(pairs))
+            print(f"Alt candidates replaced ({len(pairs)} pairs).")
+
+    @staticmethod
+    @timed_write("insert_profile_data")
     def insert_profile_data(db_connection, profile_data: list[dict]):
         """
         Insert player profile data into profile_data table.
@@ -148,9 +330,62 @@ class DbOperations:
                 )
                 cursor.execute(insert_query, values)
 
+            DbOperations.notify_profiles_changed(
+                cursor, [data["profile"] for data in profile_data]
+            )
             db_connection.commit()
+            DB_ROWS_WRITTEN.labels("profile_data").inc(len(profile_data))
             print("Profile data inserted successfully.")
 
+    @staticmethod
+    def notify_profiles_changed(cursor, profiles: list):
+        """
+        Notify listeners (e.g. the frontend profile snapshot) that profiles changed.
+
+        The notification is delivered when the surrounding transaction commits. Its payload
+        lists the changed profile IDs, or is empty (meaning "reload everything")
+        if the list does not fit into a NOTIFY payload.
+
+        Parameters
+        ----------
+        cursor : psycopg2 cursor object
+        profiles : list
+            Changed profile IDs.
+        """
+        payload = ",".join(dict.fromkeys(str(profile) for profile in profiles))
+        if len(payload) > NOTIFY_PAYLOAD_LIMIT:
+            payload = ""
+        cursor.execute("SELECT pg_notify(%s, %s);", (PROFILE_CHANNEL, payload))
+
+    @staticmethod
+    @timed_write("publish_online_players")
+    def publish_online_players(db_connection, online: dict, payloads: list):
+        """
+        Replace the characters online right now and notify listeners in one transaction.
+
+        Parameters
+        ----------
+        db_connection : psycopg2 connection object
+        online : dict
+            (profile, char) -> datetime the character came online.
+        payloads : list of str
+            Notification payloads sent on the ONLINE_CHANNEL channel, delivered on commit.
+        """
+        with db_connection.cursor() as cursor:
+            cursor.execute("DELETE FROM online_players;")
+            if online:
+                execute_values(
+                    cursor,
+                    "INSERT INTO online_players (profile, char, since) VALUES %s;",
+                    [
+                        (profile, char, since)
+                        for (profile, char), since in online.items()
+                    ],
+                )
+            for payload in payloads:
+                cursor.execute("SELECT pg_notify(%s, %s);", (ONLINE_CHANNEL, payload))
+            db_connection.commit()
+
     @staticmethod
     def select_data(
         db_connection,
@@ -158,6 +393,9 @@ class DbOperations:
         columns: str = "*",
         where_clause: str = None,
         params: tuple = None,
+        order_by: str = None,
+        limit: int = None,
+        offset: int = None,
     ):
         """
         Select data from a PostgreSQL table.
@@ -173,15 +411,20 @@ class DbOperations:
             WHERE clause, e.g., "profile = %s", by default None.
         params : tuple or list, optional
             Parameters to use in the WHERE clause, by default None.
+        order_by : str, optional
+            ORDER BY clause, e.g., "lvl DESC, profile", by default None.
+        limit : int, optional
+            Maximum number of rows to return, by default None (all).
+        offset : int, optional
+            Number of rows to skip, by default None.
 
         Returns
         -------
         list of tuple
         """
-        select_query = f"SELECT {columns} FROM {table}"
-        if where_clause:
-            select_query += f" WHERE {where_clause}"
-
+        select_query = DbOperations.build_select_query(
+            table, columns, where_clause, order_by, limit, offset
+        )
         with db_connection.cursor() as cursor:
             cursor.execute(select_query, params)
             results = cursor.fetchall()
@@ -189,6 +432,98 @@ class DbOperations:
             return results
 
     @staticmethod
+    def build_select_query(
+        table: str,
+        columns: str = "*",
+        where_clause: str = None,
+        order_by: str = None,
+        limit: int = None,
+        offset: int = None,
+    ) -> str:
+        """
+        Build a SELECT statement from its clauses.
+
+        Parameters
+        ----------
+        table : str
+            Name of the table.
+        columns : str, optional
+            Columns to select, comma-separated, by default '*' (all).
+        where_clause : str, optional
+            WHERE clause, by default None.
+        order_by : str, optional
+            ORDER BY clause, by default None.
+        limit : int, optional
+            Maximum number of rows to return, by default None (all).
+        offset : int, optional
+            Number of rows to skip, by default None.
+
+        Returns
+        -------
+        str
+        """
+        select_query = f"SELECT {columns} FROM {table}"
+        if where_clause:
+            select_query += f" WHERE {where_clause}"
+        if order_by:
+            select_query += f" ORDER BY {order_by}"
+        if limit is not None:
+            select_query += f" LIMIT {int(limit)}"
+        if offset:
+            select_query += f" OFFSET {int(offset)}"
+        return select_query
+
+    @staticmethod
+    def stream_data(
+        db_connection,
+        table: str,
+        columns: str = "*",
+        where_clause: str = None,
+        params: tuple = None,
+        order_by: str = None,
+        batch_size: int = 10000,
+    ):
+        """
+        Select data from a PostgreSQL table in batches, using a server-side cursor.
+
+        Unlike select_data, the result is never held in memory at once, so whole tables
+        can be exported. The cursor lives in the current transaction; the caller ends it.
+
+        Parameters
+        ----------
+        db_connection : psycopg2 connection object
+        table : str
+            Name of the table.
+        columns : str, optional
+            Columns to select, comma-separated, by default '*' (all).
+        where_clause : str, optional
+            WHERE clause, e.g., "datetime >= %s", by default None.
+        params : tuple or list, optional
+            Parameters to use in the WHERE clause, by default None.
+        order_by : str, optional
+            ORDER BY clause, by default None.
+        batch_size : int, optional
+            Number of rows per batch, by default 10000.
+
+        Yields
+        ------
+        list of tuple
+            Next batch of at most batch_size rows.
+        """
+        select_query = DbOperations.build_select_query(
+            table, columns, where_clause, order_by
+        )
+        with db_connection.cursor(name=f"stream_{table}") as cursor:
+            cursor.itersize = batch_size
+            cursor.execute(select_query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+
+    @staticmethod
+    @timed_write("delete_data")
     def delete_data(
         db_connection, table: str, where_clause: str = None, params: tuple = None
     ):
@@ -1,6 +1,15 @@
+import os
+
+# Scraper and saver processes share their metrics through files in this directory;
+# it has to be set before prometheus_client is imported.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/mgspy_metrics")
+
 from app_processes import AppProcesses
+from backend.metrics import prepare_multiprocess_dir, start_metrics_server
 
 if __name__ == "__main__":
+    prepare_multiprocess_dir()
+    start_metrics_server(addr=os.environ.get("METRICS_ADDR", "127.0.0.1"))
     app = AppProcesses(db_name="mgspy")
     app.process_app()
 
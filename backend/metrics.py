@@ -0,0 +1,203 @@
+import functools
+import os
+import shutil
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    multiprocess,
+    start_http_server,
+)
+
+METRICS_PORT = int(os.environ.get("METRICS_PORT", 9100))
+
+FETCH_SECONDS = Histogram(
+    "mgspy_fetch_seconds",
+    "Time to download a page from margonem.pl.",
+    ["page"],
+)
+PARSE_SECONDS = Histogram(
+    "mgspy_parse_seconds",
+    "Time to parse a downloaded page: 'html' builds the soup, 'extract' reads the data.",
+    ["page", "stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+FETCH_RETRIES = Counter(
+    "mgspy_fetch_retries",
+    "Page downloads retried after a timeout, connection error, throttled or 5xx response.",
+    ["page"],
+)
+FETCH_FAILURES = Counter(
+    "mgspy_fetch_failures",
+    "Page downloads given up on: 'error' (not retried), 'timeout' and 'throttled' (out of retries)"
+    " or 'circuit_open' (circuit breaker open).",
+    ["page", "reason"],
+)
+SCRAPE_RATE = Gauge(
+    "mgspy_scrape_rate",
+    "Requests per second currently allowed by the adaptive rate controller.",
+    multiprocess_mode="livemax",
+)
+CIRCUIT_OPENS = Counter(
+    "mgspy_circuit_opens",
+    "Times the scraper's circuit breaker opened after repeated failures.",
+)
+SCRAPE_FAILURES = Counter(
+    "mgspy_scrape_failures",
+    "Activity scrapes that returned no data.",
+)
+ROWS_PER_SCRAPE = Histogram(
+    "mgspy_scrape_rows",
+    "Characters online per activity scrape.",
+    buckets=(0, 50, 100, 250, 500, 1000, 2000, 3000, 5000, 10000),
+)
+QUEUE_DEPTH = Histogram(
+    "mgspy_queue_depth",
+    "Scraped rows waiting in the shared list when the saver flushes it.",
+    buckets=(0, 100, 1000, 5000, 10000, 25000, 50000, 100000, 250000),
+)
+FLUSH_SECONDS = Histogram(
+    "mgspy_flush_seconds",
+    "Time to save one batch of scraped activity, including session tracking.",
+    ["storage"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+DB_WRITE_SECONDS = Histogram(
+    "mgspy_db_write_seconds",
+    "Time of one DbOperations write, including the commit.",
+    ["operation"],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+DB_ROWS_WRITTEN = Counter(
+    "mgspy_db_rows_written",
+    "Rows written by DbOperations.",
+    ["table"],
+)
+DB_FAILURES = Counter(
+    "mgspy_db_failures",
+    "DbOperations writes that raised an error.",
+    ["operation"],
+)
+
+# Create the series of known pages up front, so they are exported as 0 before the first event.
+for _page in ("stats", "profile"):
+    FETCH_SECONDS.labels(_page)
+    FETCH_RETRIES.labels(_page)
+    for _stage in ("html", "extract"):
+        PARSE_SECONDS.labels(_page, _stage)
+    for _reason in ("error", "timeout", "throttled", "circuit_open"):
+        FETCH_FAILURES.labels(_page, _reason)
+
+
+def page_label(url: str) -> str:
+    """
+    Get the metrics label of a margonem.pl URL.
+
+    Parameters
+    ----------
+    url : str
+
+    Returns
+    -------
+    str
+        'stats', 'profile' or 'other'.
+    """
+    if "/stats" in url:
+        return "stats"
+    if "/profile" in url:
+        return "profile"
+    return "other"
+
+
+def timed_write(operation: str):
+    """
+    Decorate a DbOperations write to record its duration and failures.
+
+    Parameters
+    ----------
+    operation : str
+        Label of the operation, usually the method name.
+
+    Returns
+    -------
+    callable
+        Decorator.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with DB_WRITE_SECONDS.labels(operation).time():
+                try:
+                    return func(*args, **kwargs)
+                except Exception:
+                    DB_FAILURES.labels(operation).inc()
+                    raise
+
+        return wrapper
+
+    return decorator
+
+
+def prepare_multiprocess_dir(path: str | None = None) -> str | None:
+    """
+    Empty the directory shared by the metrics of all processes.
+
+    Must run before any child process starts, as files of a previous run would be added to
+    the new values. The directory comes from PROMETHEUS_MULTIPROC_DIR, which has to be set
+    before prometheus_client is first imported.
+
+    Parameters
+    ----------
+    path : str, optional
+        Directory (default: PROMETHEUS_MULTIPROC_DIR).
+
+    Returns
+    -------
+    str or None
+        The directory, or None if metrics are single-process.
+    """
+    path = path or os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        return None
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def start_metrics_server(port: int = METRICS_PORT, addr: str = "127.0.0.1"):
+    """
+    Serve the metrics of all processes over HTTP at http://addr:port/metrics.
+
+    With PROMETHEUS_MULTIPROC_DIR set, every process writes its values to files in that
+    directory and the endpoint aggregates them; otherwise only this process is reported.
+
+    Parameters
+    ----------
+    port : int, optional
+        Port of the endpoint (default: METRICS_PORT environment variable or 9100).
+    addr : str, optional
+        Address to listen on (default: '127.0.0.1').
+    """
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    start_http_server(port, addr=addr, registry=registry)
+    print(f"Metrics served at http://{addr}:{port}/metrics")
+
+
+def mark_process_dead(pid: int):
+    """
+    Drop the live values of a finished child process from the multi-process metrics.
+
+    Parameters
+    ----------
+    pid : int
+        Process ID of the child.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
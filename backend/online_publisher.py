@@ -0,0 +1,151 @@
+import json
+from datetime import datetime
+
+import psycopg2
+
+from backend.db_operations import DbOperations, NOTIFY_PAYLOAD_LIMIT
+
+
+class OnlinePublisher:
+    """
+    Keeps the set of characters online right now and publishes its changes.
+
+    After every scrape the new online set is diffed against the previous one. The full set is
+    stored in the online_players table, and the characters that joined and left are sent as
+    JSON deltas on the ONLINE_CHANNEL channel, in the same transaction. Listeners load the table
+    once and then apply the deltas. When a delta would be too large, or after a failed publish,
+    a "snapshot" message is sent instead, telling listeners to reload the table.
+
+    Message format: {"type": "delta" | "snapshot", "at": ISO time, "total": online count,
+    "joined": [[profile, char], ...], "left": [[profile, char], ...]}; snapshot messages
+    carry no pairs.
+
+    Attributes
+    ----------
+    online : dict
+        (profile, char) -> datetime the character was first seen online in its current session.
+    pairs_per_message : int
+        Maximum number of joined and left pairs in one notification.
+    max_messages : int
+        Deltas needing more notifications than this are replaced by a snapshot message.
+
+    Methods
+    -------
+    update(player_activity: list[dict]) -> tuple[list, list]
+        Replaces the online set and returns the characters that joined and left.
+    messages(joined: list, left: list, at: datetime, snapshot: bool = False) -> list[str]
+        Builds the notification payloads of one change.
+    publish(db, db_connection, player_activity: list[dict]) -> tuple[list, list] | None
+        Updates the online set and publishes it.
+    """
+
+    def __init__(self, pairs_per_message: int = 300, max_messages: int = 20):
+        self.online: dict = {}
+        self.pairs_per_message = pairs_per_message
+        self.max_messages = max_messages
+        self._published = False
+
+    def update(self, player_activity: list[dict]) -> tuple[list, list]:
+        """
+        Replace the online set with the characters of one scrape.
+
+        Parameters
+        ----------
+        player_activity : list[dict]
+            Activity dictionaries of one scrape with 'profile', 'char' and 'datetime';
+            the placeholder with profile 0 (nobody online) is ignored.
+
+        Returns
+        -------
+        tuple[list, list]
+            Sorted (profile, char) pairs that joined and that left.
+        """
+        current = {}
+        for data in player_activity:
+            key = (int(data["profile"]), int(data["char"]))
+            if key[0]:
+                current[key] = self.online.get(key) or datetime.strptime(
+                    data["datetime"], "%Y-%m-%d %H:%M:%S"
+                )
+        joined = sorted(current.keys() - self.online.keys())
+        left = sorted(self.online.keys() - current.keys())
+        self.online = current
+        return joined, left
+
+    def messages(
+        self, joined: list, left: list, at: datetime, snapshot: bool = False
+    ) -> list[str]:
+        """
+        Build the notification payloads announcing one change of the online set.
+
+        Parameters
+        ----------
+        joined : list
+            (profile, char) pairs that joined.
+        left : list
+            (profile, char) pairs that left.
+        at : datetime
+            Time of the change.
+        snapshot : bool, optional
+            Send a snapshot message instead of deltas (default: False).
+
+        Returns
+        -------
+        list[str]
+            JSON payloads, each within the NOTIFY payload limit.
+        """
+        header = {"at": at.isoformat(timespec="seconds"), "total": len(self.online)}
+        size = self.pairs_per_message
+        parts = max(-(-len(joined) // size), -(-len(left) // size), 1)
+        if not snapshot and parts <= self.max_messages:
+            payloads = [
+                json.dumps(
+                    {
+                        "type": "delta",
+                        **header,
+                        "joined": joined[i * size : (i + 1) * size],
+                        "left": left[i * size : (i + 1) * size],
+                    },
+                    separators=(",", ":"),
+                )
+                for i in range(parts)
+            ]
+            if all(len(payload) <= NOTIFY_PAYLOAD_LIMIT for payload in payloads):
+                return payloads
+        return [json.dumps({"type": "snapshot", **header}, separators=(",", ":"))]
+
+    def publish(
+        self, db: DbOperations, db_connection, player_activity: list[dict]
+    ) -> tuple[list, list] | None:
+        """
+        Update the online set with one scrape and publish it.
+
+        The first publish of a process, and the first after a database error, sends a
+        snapshot message, as listeners may have missed deltas.
+
+        Parameters
+        ----------
+        db : DbOperations
+            Instance for database operations.
+        db_connection : psycopg2 connection object
+        player_activity : list[dict]
+            Activity dictionaries of one scrape.
+
+        Returns
+        -------
+        tuple[list, list] or None
+            Pairs that joined and left, or None if publishing failed.
+        """
+        joined, left = self.update(player_activity)
+        payloads = self.messages(
+            joined, left, datetime.now(), snapshot=not self._published
+        )
+        try:
+            db.publish_online_players(db_connection, self.online, payloads)
+        except psycopg2.Error as e:
+            db_connection.rollback()
+            self._published = False
+            print(f"Publishing online players failed: {e}")
+            return None
+        self._published = True
+        return joined, left
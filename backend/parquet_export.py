@@ -0,0 +1,636 @@
+import glob
+import itertools
+import json
+import os
+from datetime import date, datetime, timedelta
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from backend.db_operations import DbOperations
+
+ACTIVITY_SCHEMA = pa.schema(
+    [
+        ("profile", pa.int32()),
+        ("char", pa.int32()),
+        ("datetime", pa.timestamp("us")),
+    ]
+)
+PROFILE_SCHEMA = pa.schema(
+    [
+        ("profile", pa.int32()),
+        ("char", pa.int32()),
+        ("nick", pa.string()),
+        ("lvl", pa.int32()),
+        ("clan", pa.string()),
+        ("world", pa.string()),
+    ]
+)
+DAY_PARTITIONING = ds.partitioning(pa.schema([("day", pa.date32())]), flavor="hive")
+
+
+class ParquetExporter:
+    """
+    Streaming export of the database into date-partitioned Parquet files for offline analysis.
+
+    activity_data is exported incrementally: each run streams the rows between the previous
+    watermark and `now - lag` with a server-side cursor, and appends one file per day to
+    `<export_dir>/activity_data/day=YYYY-MM-DD/`. The lag leaves room for rows the saver
+    writes late (it saves scraped activity in batches), so rows are never skipped.
+    profile_data is small and fully rewritten on each run.
+
+    Attributes
+    ----------
+    db_name : str
+        Name of the database.
+    export_dir : str
+        Root directory of the Parquet files.
+    batch_size : int
+        Number of rows fetched from the database at once.
+    lag : timedelta
+        How far behind the current time the activity export stops.
+    db : DbOperations
+        Instance for database operations.
+
+    Methods
+    -------
+    read_watermark() -> datetime | None
+        Returns the end of the last exported activity window.
+    write_watermark(watermark: datetime)
+        Stores the end of the exported activity window.
+    export_activity(until: datetime = None) -> int
+        Exports new activity_data rows, returning their number.
+    export_profiles() -> int
+        Exports the profile_data table, returning the number of rows.
+    temp_path(path: str) -> str
+        Returns the hidden path a file is written to before it is renamed into place.
+    remove_temp_files(table: str) -> int
+        Deletes temporary files left behind by interrupted runs.
+    export() -> dict
+        Runs both exports.
+    """
+
+    def __init__(
+        self,
+        db_name: str = "mgspy",
+        export_dir: str = "exports",
+        batch_size: int = 50000,
+        lag: timedelta = timedelta(hours=1),
+    ):
+        self.db_name = db_name
+        self.export_dir = export_dir
+        self.batch_size = batch_size
+        self.lag = lag
+        self.db: DbOperations = DbOperations(db_name=db_name)
+
+    @property
+    def watermark_path(self) -> str:
+        """
+        Path of the file storing the export watermark.
+
+        Returns
+        -------
+        str
+        """
+        return os.path.join(self.export_dir, "_watermark.json")
+
+    def read_watermark(self) -> datetime | None:
+        """
+        Get the end (exclusive) of the last exported activity window.
+
+        Returns
+        -------
+        datetime or None
+            Watermark, or None if nothing was exported yet.
+        """
+        if not os.path.exists(self.watermark_path):
+            return None
+        with open(self.watermark_path, encoding="utf-8") as f:
+            return datetime.fromisoformat(json.load(f)["activity_data"])
+
+    def write_watermark(self, watermark: datetime):
+        """
+        Store the end (exclusive) of the exported activity window, atomically.
+
+        Parameters
+        ----------
+        watermark : datetime
+            New watermark.
+        """
+        os.makedirs(self.export_dir, exist_ok=True)
+        tmp_path = f"{self.watermark_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"activity_data": watermark.isoformat()}, f)
+        os.replace(tmp_path, self.watermark_path)
+
+    def export_activity(self, until: datetime = None) -> int:
+        """
+        Export activity_data rows in [watermark, until) into day partitions.
+
+        Files are written under hidden temporary names, which dataset readers skip, and only
+        renamed, and the watermark moved, once the whole window is exported, so a failed run
+        is simply repeated. Temporary files of earlier failed runs are deleted first.
+        File names derive from the watermark the window starts at, so a run repeated after failing
+        between the renames and the watermark update replaces the files of the failed run
+        instead of adding duplicate rows.
+
+        Parameters
+        ----------
+        until : datetime, optional
+            End (exclusive) of the exported window (default: now - lag).
+
+        Returns
+        -------
+        int
+            Number of exported rows.
+        """
+        watermark = self.read_watermark()
+        until = until or datetime.now() - self.lag
+        if watermark is not None and watermark >= until:
+            return 0
+        where_clause = "datetime < %s"
+        params: tuple = (until,)
+        if watermark is not None:
+            where_clause = "datetime >= %s AND datetime < %s"
+            params = (watermark, until)
+
+        self.remove_temp_files("activity_data")
+        run_id = watermark.strftime("%Y%m%dT%H%M%S") if watermark else "initial"
+        written = []
+        writer = None
+        current_day = None
+        exported = 0
+        connection = self.db.connect_to_db()
+        try:
+            batches = self.db.stream_data(
+                connection,
+                table="activity_data",
+                columns="profile, char, datetime",
+                where_clause=where_clause,
+                params=params,
+                order_by="datetime",
+                batch_size=self.batch_size,
+            )
+            for rows in batches:
+                for day, day_rows in itertools.groupby(rows, key=lambda r: r[2].date()):
+                    if day != current_day:
+                        if writer is not None:
+                            writer.close()
+                        path = self.partition_path("activity_data", day, run_id)
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        writer = pq.ParquetWriter(self.temp_path(path), ACTIVITY_SCHEMA)
+                        written.append(path)
+                        current_day = day
+                    table = self.rows_to_table(list(day_rows), ACTIVITY_SCHEMA)
+                    writer.write_table(table)
+                    exported += table.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+            connection.rollback()
+            connection.close()
+
+        for path in written:
+            os.replace(self.temp_path(path), path)
+        # A failed run of the same window may have reached days this run did not.
+        for path in glob.glob(self.partition_path("activity_data", "*", run_id)):
+            if path not in written:
+                os.remove(path)
+        self.write_watermark(until)
+        print(f"Exported {exported} activity rows into {len(written)} day partitions.")
+        return exported
+
+    def export_profiles(self) -> int:
+        """
+        Export the whole profile_data table, replacing the previous export.
+
+        Returns
+        -------
+        int
+            Number of exported rows.
+        """
+        path = os.path.join(self.export_dir, "profile_data", "profile_data.parquet")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.remove_temp_files("profile_data")
+        exported = 0
+        connection = self.db.connect_to_db()
+        try:
+            with pq.ParquetWriter(self.temp_path(path), PROFILE_SCHEMA) as writer:
+                for rows in self.db.stream_data(
+                    connection,
+                    table="profile_data",
+                    columns="profile, char, nick, lvl, clan, world",
+                    batch_size=self.batch_size,
+                ):
+                    table = self.rows_to_table(rows, PROFILE_SCHEMA)
+                    writer.write_table(table)
+                    exported += table.num_rows
+        finally:
+            connection.rollback()
+            connection.close()
+        os.replace(self.temp_path(path), path)
+        print(f"Exported {exported} profile rows.")
+        return exported
+
+    def export(self) -> dict:
+        """
+        Export new activity and all profiles.
+
+        Returns
+        -------
+        dict
+            Table name -> number of exported rows.
+        """
+        return {
+            "activity_data": self.export_activity(),
+            "profile_data": self.export_profiles(),
+        }
+
+    @staticmethod
+    def temp_path(path: str) -> str:
+        """
+        Build the path a file is written to before it is renamed into place.
+
+        The name starts with a dot, so pyarrow.dataset skips files of a run in progress.
+
+        Parameters
+        ----------
+        path : str
+            Final path of the file.
+
+        Returns
+        -------
+        str
+        """
+        directory, name = os.path.split(path)
+        return os.path.join(directory, f".{name}")
+
+    def remove_temp_files(self, table: str) -> int:
+        """
+        Delete temporary files left behind by interrupted exports of a table.
+
+        Parameters
+        ----------
+        table : str
+            Name of the exported table.
+
+        Returns
+        -------
+        int
+            Number of deleted files.
+        """
+        removed = 0
+        for root, _, names in os.walk(os.path.join(self.export_dir, table)):
+            for name in names:
+                if name.startswith(".") or name.endswith(".tmp"):
+                    os.remove(os.path.join(root, name))
+                    removed += 1
+        if removed:
+            print(f"Removed {removed} stale temporary files of {table}.")
+        return removed
+
+    def partition_path(self, table: str, day: date | str, run_id: str) -> str:
+        """
+        Build the path of the file a run writes into a day partition.
+
+        Parameters
+        ----------
+        table : str
+            Name of the exported table.
+        day : date or str
+            Day of the partition, or a glob pattern of days.
+        run_id : str
+            Identifier of the export run: the start of its window.
+
+        Returns
+        -------
+        str
+        """
+        return os.path.join(
+            self.export_dir,
+            table,
+            f"day={day if isinstance(day, str) else day.isoformat()}",
+            f"part-{run_id}.parquet",
+        )
+
+    @staticmethod
+    def rows_to_table(rows: list, schema: pa.Schema) -> pa.Table:
+        """
+        Convert database rows into a columnar table.
+
+        Parameters
+        ----------
+        rows : list of tuple
+            Rows in schema column order.
+        schema : pa.Schema
+            Schema of the table.
+
+        Returns
+        -------
+        pa.Table
+        """
+        columns = list(zip(*rows)) if rows else [[] for _ in schema]
+        return pa.Table.from_arrays(
+            [
+                pa.array(column, type=field.type)
+                for column, field in zip(columns, schema)
+            ],
+            schema=schema,
+        )
+
+
+class ParquetAnalytics:
+    """
+    Per-player and per-bucket activity analyses over the Parquet export, using pyarrow.
+
+    Queries prune day partitions and filter columns inside the Parquet scan,
+    so historical analysis never touches the production database.
+
+    Attributes
+    ----------
+    export_dir : str
+        Root directory of the Parquet files written by ParquetExporter.
+
+    Methods
+    -------
+    activity(start_date, end_date, profile_chars=None) -> pa.Table
+        Returns activity rows within a time window.
+    player_activity(profile, char, start_date, end_date) -> list[datetime]
+        Returns the activity timestamps of one character.
+    player_presence(profile, char, start_date, end_date, bucket_minutes=1) -> list[int]
+        Returns the activity presence array of one character.
+    online_minutes(start_date, end_date) -> pa.Table
+        Returns the number of online minutes of each character.
+    bucket_counts(start_date, end_date, bucket_minutes=15, profile_chars=None) -> pa.Table
+        Returns the number of online characters per bucket.
+    profiles() -> pa.Table
+        Returns the exported profile_data table.
+    """
+
+    def __init__(self, export_dir: str = "exports"):
+        self.export_dir = export_dir
+
+    def activity(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        profile_chars: list[tuple] | None = None,
+    ) -> pa.Table:
+        """
+        Get activity rows within [start_date, end_date), optionally for some characters only.
+
+        Parameters
+        ----------
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+        profile_chars : list[tuple], optional
+            (profile, char) pairs to keep (default: None, all characters).
+
+        Returns
+        -------
+        pa.Table
+            Columns profile, char, datetime, sorted by datetime.
+        """
+        path = os.path.join(self.export_dir, "activity_data")
+        if not os.path.isdir(path):
+            return ACTIVITY_SCHEMA.empty_table()
+        dataset = ds.dataset(path, format="parquet", partitioning=DAY_PARTITIONING)
+        last_day = (end_date - timedelta(microseconds=1)).date()
+        expression = (
+            (ds.field("day") >= start_date.date())
+            & (ds.field("day") <= last_day)
+            & (ds.field("datetime") >= pa.scalar(start_date, pa.timestamp("us")))
+            & (ds.field("datetime") < pa.scalar(end_date, pa.timestamp("us")))
+        )
+        if profile_chars is not None:
+            expression &= ds.field("profile").isin(
+                [int(profile) for profile, _ in profile_chars]
+            ) & ds.field("char").isin([int(char) for _, char in profile_chars])
+        table = dataset.to_table(columns=ACTIVITY_SCHEMA.names, filter=expression)
+        if profile_chars is not None:
+            keys = pa.array(
+                [self.char_key(profile, char) for profile, char in profile_chars],
+                pa.int64(),
+            )
+            table = table.filter(pc.is_in(self.char_keys(table), value_set=keys))
+        return table.sort_by("datetime")
+
+    def player_activity(
+        self, profile, char, start_date: datetime, end_date: datetime
+    ) -> list[datetime]:
+        """
+        Get the activity timestamps of one character within [start_date, end_date).
+
+        Parameters
+        ----------
+        profile : Any
+            Profile ID of the player.
+        char : Any
+            Character ID of the player.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        list[datetime]
+            Activity datetimes of the character.
+        """
+        table = self.activity(start_date, end_date, [(profile, char)])
+        return table.column("datetime").to_pylist()
+
+    def player_presence(
+        self,
+        profile,
+        char,
+        start_date: datetime,
+        end_date: datetime,
+        bucket_minutes: int = 1,
+    ) -> list[int]:
+        """
+        Get the activity presence array of one character, bucketed like the Activity page.
+
+        Parameters
+        ----------
+        profile : Any
+            Profile ID of the player.
+        char : Any
+            Character ID of the player.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+        bucket_minutes : int, optional
+            Minutes per bucket (default: 1).
+
+        Returns
+        -------
+        list[int]
+            Binary array of activity presence per bucket (1 = present, 0 = absent).
+        """
+        table = self.activity(start_date, end_date, [(profile, char)])
+        buckets = -int(
+            -(end_date - start_date).total_seconds() // (60 * bucket_minutes)
+        )
+        presence = [0] * buckets
+        for index in self.bucket_index(table, start_date, bucket_minutes).to_pylist():
+            presence[index] = 1
+        return presence
+
+    def online_minutes(self, start_date: datetime, end_date: datetime) -> pa.Table:
+        """
+        Count the distinct minutes each character was online within [start_date, end_date).
+
+        Parameters
+        ----------
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        pa.Table
+            Columns profile, char, minutes, sorted by minutes in descending order.
+        """
+        table = self.activity(start_date, end_date)
+        table = table.append_column(
+            "minute", pc.floor_temporal(table.column("datetime"), unit="minute")
+        )
+        result = table.group_by(["profile", "char"]).aggregate(
+            [("minute", "count_distinct")]
+        )
+        result = result.rename_columns(["profile", "char", "minutes"])
+        return result.sort_by([("minutes", "descending"), ("profile", "ascending")])
+
+    def bucket_counts(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        bucket_minutes: int = 15,
+        profile_chars: list[tuple] | None = None,
+    ) -> pa.Table:
+        """
+        Count the distinct characters online in each bucket of [start_date, end_date).
+
+        Parameters
+        ----------
+        start_date : datetime
+            Start of the window (inclusive); buckets start here.
+        end_date : datetime
+            End of the window (exclusive).
+        bucket_minutes : int, optional
+            Minutes per bucket (default: 15).
+        profile_chars : list[tuple], optional
+            (profile, char) pairs to count (default: None, all characters).
+
+        Returns
+        -------
+        pa.Table
+            Columns bucket (bucket start) and online, for buckets with any activity, sorted by bucket.
+        """
+        table = self.activity(start_date, end_date, profile_chars)
+        index = self.bucket_index(table, start_date, bucket_minutes)
+        keyed = pa.table({"index": index, "key": self.char_keys(table)})
+        result = keyed.group_by("index").aggregate([("key", "count_distinct")])
+        result = result.sort_by("index")
+        starts = [
+            start_date + timedelta(minutes=bucket_minutes * i)
+            for i in result.column("index").to_pylist()
+        ]
+        return pa.table(
+            {
+                "bucket": pa.array(starts, pa.timestamp("us")),
+                "online": result.column("key_count_distinct"),
+            }
+        )
+
+    def profiles(self) -> pa.Table:
+        """
+        Get the exported profile_data table.
+
+        Returns
+        -------
+        pa.Table
+            Columns profile, char, nick, lvl, clan, world.
+        """
+        path = os.path.join(self.export_dir, "profile_data", "profile_data.parquet")
+        if not os.path.exists(path):
+            return PROFILE_SCHEMA.empty_table()
+        return pq.read_table(path)
+
+    @staticmethod
+    def char_key(profile, char) -> int:
+        """
+        Combine a profile and character ID into one integer key.
+
+        Parameters
+        ----------
+        profile : Any
+            Profile ID.
+        char : Any
+            Character ID.
+
+        Returns
+        -------
+        int
+        """
+        return (int(profile) << 32) | int(char)
+
+    @staticmethod
+    def char_keys(table: pa.Table) -> pa.Array:
+        """
+        Compute char_key for every row of an activity table.
+
+        Parameters
+        ----------
+        table : pa.Table
+            Table with profile and char columns.
+
+        Returns
+        -------
+        pa.Array
+            int64 keys.
+        """
+        profiles = pc.shift_left(table.column("profile").cast(pa.int64()), 32)
+        return pc.bit_wise_or(profiles, table.column("char").cast(pa.int64()))
+
+    @staticmethod
+    def bucket_index(
+        table: pa.Table, start_date: datetime, bucket_minutes: int
+    ) -> pa.Array:
+        """
+        Compute the index of the bucket each activity row falls into.
+
+        Parameters
+        ----------
+        table : pa.Table
+            Table with a datetime column.
+        start_date : datetime
+            Start of the first bucket.
+        bucket_minutes : int
+            Minutes per bucket.
+
+        Returns
+        -------
+        pa.Array
+            int64 bucket indexes.
+        """
+        offsets = pc.subtract(
+            table.column("datetime"), pa.scalar(start_date, pa.timestamp("us"))
+        )
+        micros = offsets.cast(pa.int64())
+        return pc.divide(micros, 60_000_000 * bucket_minutes)
+
+
+if __name__ == "__main__":
+    exporter = ParquetExporter(
+        db_name=os.environ.get("DB_NAME", "mgspy"),
+        export_dir=os.environ.get("PARQUET_EXPORT_DIR", "exports"),
+    )
+    print(exporter.export())
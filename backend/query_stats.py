@@ -0,0 +1,399 @@
+import heapq
+import itertools
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_INERROR
+from psycopg2.extensions import cursor as BaseCursor
+
+from backend.tracing import TRACER
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 500))
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "0") != "0"
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.environ.get("SLOW_QUERY_EXPLAIN_INTERVAL", 600))
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%\(\w+\)s|%s")
+_CAST = re.compile(r"\?::\w+(?:\[\])?")
+_ARRAY = re.compile(r"ARRAY\[[?,\s]*\]")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_LISTS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_sql(query) -> str:
+    """
+    Normalize an SQL statement so that executions differing only in their values group together.
+
+    Literals and parameters (with their casts) become '?', value lists (e.g. the VALUES of execute_values or
+    adapted Python lists) collapse to '(...)' and whitespace is collapsed.
+
+    Parameters
+    ----------
+    query : str or bytes
+        SQL statement, with placeholders or with values already merged in.
+
+    Returns
+    -------
+    str
+    """
+    if isinstance(query, bytes):
+        query = query.decode(errors="replace")
+    query = _STRING.sub("?", query)
+    query = _PARAM.sub("?", query)
+    query = _NUMBER.sub("?", query)
+    query = _CAST.sub("?", query)
+    query = _ARRAY.sub("ARRAY[...]", query)
+    query = _LIST.sub("(...)", query)
+    query = _LISTS.sub("(...), ...", query)
+    return _SPACE.sub(" ", query).strip().rstrip(";")
+
+
+class QueryStats:
+    """
+    Thread-safe statistics of the SQL statements executed by this process.
+
+    Every statement is recorded under its normalized text: number of calls, total and maximum
+    wall time and rows. Statements slower than slow_ms are printed and kept in a list of the top_n
+    slowest executions. With explain enabled, they are printed with their `EXPLAIN (ANALYZE, BUFFERS)`
+    plan, taken at most once per explain_interval for each statement, as it runs the statement again.
+
+    Attributes
+    ----------
+    slow_ms : float
+        Threshold of slow statements in milliseconds; 0 disables the slow query log.
+    explain : bool
+        Whether slow SELECT statements are logged with their plan (off by default).
+    explain_interval : float
+        Minimum seconds between two plans of the same normalized statement.
+    top_n : int
+        Number of slowest executions kept.
+
+    Methods
+    -------
+    record(query, seconds: float, rows: int) -> str
+        Adds one execution to the statistics.
+    is_slow(seconds: float) -> bool
+        Whether an execution is above the threshold.
+    should_explain(statement: str) -> bool
+        Whether a slow execution of a statement gets its plan taken now.
+    log_slow(statement: str, seconds: float, rows: int, plan: str = None)
+        Keeps a slow execution and prints it.
+    slowest(n: int = None) -> list[dict]
+        Slowest executions, slowest first.
+    statements(n: int = None) -> list[dict]
+        Statements by total time, most expensive first.
+    report(n: int = 10) -> str
+        Text report of both lists.
+    reset()
+        Clears the statistics.
+    """
+
+    def __init__(
+        self,
+        slow_ms: float = SLOW_QUERY_MS,
+        explain: bool = SLOW_QUERY_EXPLAIN,
+        top_n: int = 20,
+        explain_interval: float = SLOW_QUERY_EXPLAIN_INTERVAL,
+    ):
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.top_n = top_n
+        self.explain_interval = explain_interval
+        self._lock = threading.Lock()
+        self._statements: dict[str, dict] = {}
+        self._explained: dict[str, float] = {}
+        self._slowest: list[tuple] = []
+        self._counter = itertools.count()
+
+    def record(self, query, seconds: float, rows: int) -> str:
+        """
+        Add one execution to the statistics.
+
+        Parameters
+        ----------
+        query : str or bytes
+            Executed SQL statement.
+        seconds : float
+            Wall time of the execution.
+        rows : int
+            Rows returned or affected.
+
+        Returns
+        -------
+        str
+            The normalized statement.
+        """
+        statement = normalize_sql(query)
+        with self._lock:
+            stats = self._statements.setdefault(
+                statement, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0}
+            )
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            stats["rows"] += rows
+        return statement
+
+    def is_slow(self, seconds: float) -> bool:
+        """
+        Check whether an execution is above the slow query threshold.
+
+        Parameters
+        ----------
+        seconds : float
+
+        Returns
+        -------
+        bool
+        """
+        return 0 < self.slow_ms <= seconds * 1000
+
+    def should_explain(self, statement: str) -> bool:
+        """
+        Check whether a slow execution of a statement gets its plan taken now.
+
+        Plans are only taken with explain enabled, and at most once per explain_interval
+        for each normalized statement, so repeated slow queries are not run twice every time.
+
+        Parameters
+        ----------
+        statement : str
+            Normalized statement.
+
+        Returns
+        -------
+        bool
+        """
+        if not self.explain:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            last = self._explained.get(statement)
+            if last is not None and now - last < self.explain_interval:
+                return False
+            self._explained[statement] = now
+        return True
+
+    def log_slow(self, statement: str, seconds: float, rows: int, plan: str = None):
+        """
+        Keep a slow execution among the top_n slowest and print it with its plan.
+
+        Parameters
+        ----------
+        statement : str
+            Normalized statement.
+        seconds : float
+            Wall time of the execution.
+        rows : int
+            Rows returned or affected.
+        plan : str, optional
+            Output of EXPLAIN (ANALYZE, BUFFERS).
+        """
+        entry = {
+            "statement": statement,
+            "ms": round(seconds * 1000, 1),
+            "rows": rows,
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "plan": plan,
+        }
+        with self._lock:
+            item = (seconds, next(self._counter), entry)
+            if len(self._slowest) < self.top_n:
+                heapq.heappush(self._slowest, item)
+            else:
+                heapq.heappushpop(self._slowest, item)
+        print(f"Slow query ({entry['ms']} ms, {rows} rows): {statement}")
+        if plan:
+            print(plan)
+
+    def slowest(self, n: int = None) -> list[dict]:
+        """
+        Get the slowest executions seen since the last reset.
+
+        Parameters
+        ----------
+        n : int, optional
+            Number of executions (default: all kept).
+
+        Returns
+        -------
+        list[dict]
+            Executions with 'statement', 'ms', 'rows', 'at' and 'plan', slowest first.
+        """
+        with self._lock:
+            items = heapq.nlargest(n or self.top_n, self._slowest)
+        return [entry for _, _, entry in items]
+
+    def statements(self, n: int = None) -> list[dict]:
+        """
+        Get the statements by total wall time.
+
+        Parameters
+        ----------
+        n : int, optional
+            Number of statements (default: all).
+
+        Returns
+        -------
+        list[dict]
+            Statements with 'statement', 'calls', 'total_ms', 'mean_ms', 'max_ms' and 'rows',
+            most expensive first.
+        """
+        with self._lock:
+            items = sorted(
+                self._statements.items(),
+                key=lambda item: item[1]["seconds"],
+                reverse=True,
+            )
+        return [
+            {
+                "statement": statement,
+                "calls": stats["calls"],
+                "total_ms": round(stats["seconds"] * 1000, 1),
+                "mean_ms": round(stats["seconds"] * 1000 / stats["calls"], 1),
+                "max_ms": round(stats["max_seconds"] * 1000, 1),
+                "rows": stats["rows"],
+            }
+            for statement, stats in items[:n]
+        ]
+
+    def report(self, n: int = 10) -> str:
+        """
+        Build a text report of the slowest executions and the most expensive statements.
+
+        Parameters
+        ----------
+        n : int, optional
+            Number of entries of each list (default: 10).
+
+        Returns
+        -------
+        str
+        """
+        lines = [f"Slowest queries (over {self.slow_ms:g} ms):"]
+        for entry in self.slowest(n):
+            lines.append(
+                f"{entry['ms']:>10.1f} ms {entry['rows']:>8} rows  {entry['at']}  {entry['statement']}"
+            )
+        lines.append("Statements by total time:")
+        lines.append(
+            f"{'calls':>8} {'total ms':>10} {'mean ms':>9} {'max ms':>9} {'rows':>10}  statement"
+        )
+        for stats in self.statements(n):
+            lines.append(
+                f"{stats['calls']:>8} {stats['total_ms']:>10.1f} {stats['mean_ms']:>9.1f} "
+                f"{stats['max_ms']:>9.1f} {stats['rows']:>10}  {stats['statement']}"
+            )
+        return "\n".join(lines)
+
+    def reset(self):
+        """
+        Clear all statistics.
+        """
+        with self._lock:
+            self._statements.clear()
+            self._slowest.clear()
+            self._explained.clear()
+
+
+QUERY_STATS = QueryStats()
+
+
+class TimedCursor(BaseCursor):
+    """
+    psycopg2 cursor recording every execute in QUERY_STATS and in a 'db.query' span.
+
+    Used as the cursor_factory of all DbOperations connections. Server-side (named) cursors
+    are not timed, as their rows are only read by the following fetches.
+
+    Methods
+    -------
+    execute(query, vars=None)
+        Executes a statement and records its wall time and rows.
+    explain(query, vars=None) -> str or None
+        Gets the EXPLAIN (ANALYZE, BUFFERS) plan of a SELECT statement.
+    """
+
+    def execute(self, query, vars=None):
+        """
+        Execute a statement and record its wall time and rows; slow statements are logged.
+
+        The span carries the normalized statement and the row count.
+
+        Parameters
+        ----------
+        query : str or bytes
+            SQL statement.
+        vars : tuple or dict, optional
+            Parameters of the statement.
+        """
+        if self.name is not None:
+            return super().execute(query, vars)
+        with TRACER.start_as_current_span("db.query") as span:
+            started = time.perf_counter()
+            super().execute(query, vars)
+            seconds = time.perf_counter() - started
+            rows = max(self.rowcount, 0)
+            statement = QUERY_STATS.record(query, seconds, rows)
+            span.set_attribute("db.statement", statement)
+            span.set_attribute("db.rows", rows)
+        if QUERY_STATS.is_slow(seconds):
+            plan = (
+                self.explain(query, vars)
+                if QUERY_STATS.should_explain(statement)
+                else None
+            )
+            QUERY_STATS.log_slow(statement, seconds, rows, plan)
+
+    def explain(self, query, vars=None) -> str | None:
+        """
+        Get the EXPLAIN (ANALYZE, BUFFERS) plan of a SELECT statement.
+
+        EXPLAIN ANALYZE runs the statement again, so statements with side effects (anything
+        but a plain SELECT, or a SELECT sending notifications) are not explained. Inside a
+        transaction the plan is taken under a savepoint, so a failing EXPLAIN leaves the
+        caller's transaction usable; an already aborted transaction is not explained.
+
+        Parameters
+        ----------
+        query : str or bytes
+            SQL statement.
+        vars : tuple or dict, optional
+            Parameters of the statement.
+
+        Returns
+        -------
+        str or None
+            The plan, an error message, or None if the statement is not explained.
+        """
+        if isinstance(query, bytes):
+            query = query.decode()
+        if not query.lstrip().upper().startswith("SELECT") or "pg_notify" in query:
+            return None
+        in_transaction = not self.connection.autocommit
+        if (
+            in_transaction
+            and self.connection.info.transaction_status == TRANSACTION_STATUS_INERROR
+        ):
+            return None
+        with BaseCursor(self.connection) as cursor:
+            savepoint = False
+            try:
+                if in_transaction:
+                    cursor.execute("SAVEPOINT query_stats_explain;")
+                    savepoint = True
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {query}", vars)
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+                if in_transaction:
+                    cursor.execute("RELEASE SAVEPOINT query_stats_explain;")
+                return plan
+            except psycopg2.Error as e:
+                if savepoint:
+                    cursor.execute("ROLLBACK TO SAVEPOINT query_stats_explain;")
+                return f"EXPLAIN failed: {e}"
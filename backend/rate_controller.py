@@ -0,0 +1,255 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from backend.metrics import CIRCUIT_OPENS, SCRAPE_RATE
+
+SCRAPE_RATE_INITIAL = float(os.environ.get("SCRAPE_RATE", 1))
+SCRAPE_RATE_MIN = float(os.environ.get("SCRAPE_MIN_RATE", 0.05))
+SCRAPE_RATE_MAX = float(os.environ.get("SCRAPE_MAX_RATE", 5))
+
+
+class RateController:
+    """
+    Adaptive rate limiter with a circuit breaker, shared by all requests a process sends to the site.
+
+    Pacing:
+        - requests are spaced 1 / rate seconds apart
+        - rate grows by `increase` requests/s after each success and is multiplied by `decrease`
+          after each throttled (429/503), failed or slow response (AIMD), within [min_rate, max_rate]
+        - a Retry-After of a 429/503 response holds back every request until it has passed
+    Retries:
+        - the delay before a retry is the server's Retry-After or a full-jitter exponential backoff,
+          uniform in [0, min(max_backoff, base_backoff * 2 ** (failures - 1))]
+    Circuit breaker:
+        - after failure_threshold consecutive failures the circuit opens and no request is sent
+          for open_seconds; the next request is a single probe (half-open)
+        - a successful probe closes the circuit, a failed one opens it again for twice as long,
+          up to max_open_seconds
+
+    Attributes
+    ----------
+    rate : float
+        Current rate in requests per second.
+    initial_rate : float
+        Rate after a reset.
+    min_rate : float
+        Lowest rate.
+    max_rate : float
+        Highest rate.
+    increase : float
+        Additive increase of the rate per success, in requests per second.
+    decrease : float
+        Multiplicative decrease of the rate per failure.
+    slow_seconds : float
+        Response time above which a success counts as congestion and decreases the rate.
+    base_backoff : float
+        Backoff in seconds after the first failure.
+    max_backoff : float
+        Longest backoff in seconds.
+    failure_threshold : int
+        Consecutive failures opening the circuit.
+    open_seconds : float
+        First period the circuit stays open.
+    max_open_seconds : float
+        Longest period the circuit stays open.
+    state : str
+        Circuit state: 'closed', 'open' or 'half_open'.
+    consecutive_failures : int
+        Failures since the last success.
+
+    Methods
+    -------
+    acquire(max_wait: float = None) -> bool
+        Waits for the next request slot.
+    record_success(seconds: float = None)
+        Updates the rate and circuit after a response.
+    record_failure(retry_after: str = None) -> float
+        Updates the rate and circuit after a failure and returns the delay before a retry.
+    parse_retry_after(value: str) -> float or None
+        Parses a Retry-After header.
+    reset()
+        Restores the initial rate and closes the circuit.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = SCRAPE_RATE_INITIAL,
+        min_rate: float = SCRAPE_RATE_MIN,
+        max_rate: float = SCRAPE_RATE_MAX,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+        slow_seconds: float = 10,
+        base_backoff: float = 1,
+        max_backoff: float = 60,
+        failure_threshold: int = 5,
+        open_seconds: float = 60,
+        max_open_seconds: float = 900,
+        seed: int = None,
+    ):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_seconds = slow_seconds
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Restore the initial rate, close the circuit and forget all delays.
+        """
+        with self._lock:
+            self.rate = self.initial_rate
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._next_request = float("-inf")
+            self._blocked_until = float("-inf")
+            self._open_until = float("-inf")
+            self._open_period = self.open_seconds
+            self._probe_until = float("-inf")
+        SCRAPE_RATE.set(self.rate)
+
+    def acquire(self, max_wait: float = None) -> bool:
+        """
+        Wait until the next request may be sent: its pacing slot, any Retry-After, and a closed
+        or half-open circuit. In a half-open circuit only one probe is let through at a time.
+
+        Parameters
+        ----------
+        max_wait : float, optional
+            Longest wait in seconds (default: wait as long as needed).
+
+        Returns
+        -------
+        bool
+            True once the request may be sent, False if that would take longer than max_wait.
+        """
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        # time.sleep never returns early, so the time slept counts even if the clock lags.
+        slept_until = float("-inf")
+        while True:
+            with self._lock:
+                now = max(time.monotonic(), slept_until)
+                if self.state == "open" and now >= self._open_until:
+                    self.state = "half_open"
+                ready = max(self._next_request, self._blocked_until)
+                if self.state == "open":
+                    ready = max(ready, self._open_until)
+                elif self.state == "half_open":
+                    # A probe left unanswered for a whole open period is given up on.
+                    ready = max(ready, self._probe_until)
+                if ready <= now:
+                    self._next_request = now + 1 / self.rate
+                    if self.state == "half_open":
+                        self._probe_until = now + self._open_period
+                    return True
+            if deadline is not None and ready > deadline:
+                return False
+            time.sleep(ready - now)
+            slept_until = ready
+
+    def record_success(self, seconds: float = None):
+        """
+        Update the controller after a response from the site, closing the circuit.
+
+        Parameters
+        ----------
+        seconds : float, optional
+            Response time; above slow_seconds the rate is decreased instead of increased.
+        """
+        with self._lock:
+            if self.state != "closed":
+                print("Circuit closed, site responding again.")
+            self.state = "closed"
+            self._probe_until = float("-inf")
+            self._open_period = self.open_seconds
+            self.consecutive_failures = 0
+            if seconds is not None and seconds > self.slow_seconds:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+            SCRAPE_RATE.set(self.rate)
+
+    def record_failure(self, retry_after: str = None) -> float:
+        """
+        Update the controller after a timeout, connection error or throttled/5xx response.
+
+        The rate is decreased and the circuit opens once failure_threshold failures follow
+        each other, or when a half-open probe fails.
+
+        Parameters
+        ----------
+        retry_after : str, optional
+            Retry-After header of the response, in seconds or as an HTTP date.
+
+        Returns
+        -------
+        float
+            Seconds to wait before retrying; the controller holds back all requests until then.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.consecutive_failures += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            SCRAPE_RATE.set(self.rate)
+            delay = self.parse_retry_after(retry_after)
+            if delay is None:
+                ceiling = self.base_backoff * 2 ** (self.consecutive_failures - 1)
+                delay = self._rng.uniform(0, min(self.max_backoff, ceiling))
+            self._blocked_until = max(self._blocked_until, now + delay)
+            if (
+                self.state == "half_open"
+                or self.consecutive_failures >= self.failure_threshold
+            ):
+                if self.state == "half_open":
+                    self._open_period = min(
+                        self.max_open_seconds, self._open_period * 2
+                    )
+                self.state = "open"
+                self._probe_until = float("-inf")
+                self._open_until = now + self._open_period
+                CIRCUIT_OPENS.inc()
+                print(
+                    f"Circuit opened for {self._open_period:g} s after "
+                    f"{self.consecutive_failures} failures."
+                )
+            return delay
+
+    @staticmethod
+    def parse_retry_after(value: str) -> float | None:
+        """
+        Parse a Retry-After header.
+
+        Parameters
+        ----------
+        value : str or None
+            Delay in seconds, or an HTTP date.
+
+        Returns
+        -------
+        float or None
+            Seconds to wait (at least 0), or None if the header is missing or malformed.
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+RATE_CONTROLLER = RateController()
@@ -0,0 +1,592 @@
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Callable
+
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from backend.async_db_operations import AsyncDbOperations
+from backend.db_operations import DbOperations
+
+ROLLUP_COLUMNS = "profile, char, bucket_start, bucket_minutes, online_minutes"
+
+
+class RetentionJob:
+    """
+    Tiered retention of activity: recent data at full resolution, older data downsampled.
+
+    Tiers, each covering a disjoint, older time range:
+        - activity_data: one row per online minute, kept for raw_days
+        - activity_rollup with bucket_minutes = 15: online minutes per quarter hour, kept for quarter_hour_days
+        - activity_rollup with bucket_minutes = 60: online minutes per hour, kept for hourly_days
+        - activity_rollup with bucket_minutes = 1440: online minutes per day, kept forever
+
+    Each tier is rolled into the next one day at a time; the rollup of a day and the watermark of the
+    tier (retention_watermark table) are committed together, so a rerun never counts a day twice.
+    Rows below the watermark are then deleted in bounded batches, each in its own short transaction,
+    so deletes neither hold long locks nor leave one huge transaction of dead rows behind.
+
+    Attributes
+    ----------
+    db_name : str
+        Name of the database.
+    raw_days : int
+        Days of minute-level activity_data kept.
+    quarter_hour_days : int
+        Days of 15-minute buckets kept.
+    hourly_days : int
+        Days of hourly buckets kept.
+    batch_size : int
+        Rows deleted per transaction.
+    batch_pause : float
+        Seconds to sleep between delete batches, to leave room for other writers.
+    db : DbOperations
+        Instance for database operations.
+
+    Methods
+    -------
+    tiers(now: datetime) -> list[tuple]
+        Source, target and cutoff of each rollup step.
+    rollup_query(source: int, target: int) -> str
+        Builds the INSERT rolling one day of a tier into the next.
+    roll_up(db_connection, source: int, target: int, cutoff: datetime) -> int
+        Rolls all whole days before cutoff into the next tier.
+    delete_batches(db_connection, source: int, until: datetime) -> int
+        Deletes rolled-up rows of a tier in bounded batches.
+    run(now: datetime = None) -> dict
+        Runs all rollup and delete steps.
+    """
+
+    def __init__(
+        self,
+        db_name: str = None,
+        raw_days: int = 30,
+        quarter_hour_days: int = 90,
+        hourly_days: int = 365,
+        batch_size: int = 10000,
+        batch_pause: float = 0.1,
+    ):
+        self.db_name = db_name
+        self.raw_days = raw_days
+        self.quarter_hour_days = quarter_hour_days
+        self.hourly_days = hourly_days
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.db: DbOperations = DbOperations(db_name=db_name)
+
+    def tiers(self, now: datetime) -> list[tuple]:
+        """
+        Get the source resolution, target resolution and cutoff of each rollup step.
+
+        Cutoffs are midnights, so only whole days are rolled up.
+
+        Parameters
+        ----------
+        now : datetime
+            Current time.
+
+        Returns
+        -------
+        list[tuple]
+            (source bucket minutes, target bucket minutes, cutoff); source 1 is activity_data.
+        """
+        today = datetime.combine(now.date(), datetime.min.time())
+        return [
+            (1, 15, today - timedelta(days=self.raw_days)),
+            (15, 60, today - timedelta(days=self.quarter_hour_days)),
+            (60, 1440, today - timedelta(days=self.hourly_days)),
+        ]
+
+    @staticmethod
+    def rollup_query(source: int, target: int) -> str:
+        """
+        Build the INSERT rolling the rows of one day of a tier into the next tier.
+
+        The query takes the day's start and end as parameters. Minute-level rows are
+        counted as distinct minutes; rollup rows are summed.
+
+        Parameters
+        ----------
+        source : int
+            Bucket minutes of the source tier; 1 means activity_data.
+        target : int
+            Bucket minutes of the target tier.
+
+        Returns
+        -------
+        str
+        """
+        bucket = f"date_bin('{target} minutes', {{column}}, TIMESTAMP '2000-01-01')"
+        if source == 1:
+            select = f"""
+            SELECT profile, char, {bucket.format(column="datetime")}, {target},
+                   count(DISTINCT date_trunc('minute', datetime))
+            FROM activity_data
+            WHERE datetime >= %s AND datetime < %s AND profile <> 0
+            GROUP BY 1, 2, 3"""
+        else:
+            select = f"""
+            SELECT profile, char, {bucket.format(column="bucket_start")}, {target},
+                   sum(online_minutes)
+            FROM activity_rollup
+            WHERE bucket_minutes = {source} AND bucket_start >= %s AND bucket_start < %s
+            GROUP BY 1, 2, 3"""
+        return f"""
+        INSERT INTO activity_rollup ({ROLLUP_COLUMNS}){select}
+        ON CONFLICT (profile, char, bucket_minutes, bucket_start)
+        DO UPDATE SET online_minutes = activity_rollup.online_minutes + EXCLUDED.online_minutes;
+        """
+
+    def roll_up(self, db_connection, source: int, target: int, cutoff: datetime) -> int:
+        """
+        Roll all whole days of a tier before cutoff into the next tier, one transaction per day.
+
+        Starts at the tier's watermark, or at its oldest row on the first run.
+
+        Parameters
+        ----------
+        db_connection : psycopg2 connection object
+        source : int
+            Bucket minutes of the source tier; 1 means activity_data.
+        target : int
+            Bucket minutes of the target tier.
+        cutoff : datetime
+            Midnight before which days are rolled up.
+
+        Returns
+        -------
+        int
+            Number of days rolled up.
+        """
+        day = self._watermark(db_connection, source)
+        if day is None:
+            day = self._oldest(db_connection, source)
+            if day is None:
+                return 0
+            day = datetime.combine(day.date(), datetime.min.time())
+        query = self.rollup_query(source, target)
+        days = 0
+        while day < cutoff:
+            next_day = day + timedelta(days=1)
+            with db_connection.cursor() as cursor:
+                cursor.execute(query, (day, next_day))
+                cursor.execute(
+                    """
+                    INSERT INTO retention_watermark (bucket_minutes, rolled_until)
+                    VALUES (%s, %s)
+                    ON CONFLICT (bucket_minutes) DO UPDATE SET rolled_until = EXCLUDED.rolled_until;
+                    """,
+                    (source, next_day),
+                )
+            db_connection.commit()
+            day = next_day
+            days += 1
+        return days
+
+    def delete_batches(self, db_connection, source: int, until: datetime) -> int:
+        """
+        Delete the rows of a tier before until in bounded batches.
+
+        Each batch deletes at most batch_size rows, chosen by ctid, and commits.
+
+        Parameters
+        ----------
+        db_connection : psycopg2 connection object
+        source : int
+            Bucket minutes of the tier; 1 means activity_data.
+        until : datetime
+            Rows before this time are deleted; must not be past the tier's watermark.
+
+        Returns
+        -------
+        int
+            Number of deleted rows.
+        """
+        if source == 1:
+            table, where_clause, params = "activity_data", "datetime < %s", (until,)
+        else:
+            table = "activity_rollup"
+            where_clause = "bucket_minutes = %s AND bucket_start < %s"
+            params = (source, until)
+        delete_query = f"""
+        DELETE FROM {table} WHERE ctid = ANY(ARRAY(
+            SELECT ctid FROM {table} WHERE {where_clause} LIMIT {int(self.batch_size)}
+        ));
+        """
+        deleted = 0
+        while True:
+            with db_connection.cursor() as cursor:
+                cursor.execute(delete_query, params)
+                rowcount = cursor.rowcount
+            db_connection.commit()
+            deleted += rowcount
+            if rowcount < self.batch_size:
+                return deleted
+            time.sleep(self.batch_pause)
+
+    def run(self, now: datetime = None) -> dict:
+        """
+        Roll up every tier past its retention and delete the rolled-up rows.
+
+        Tables with deleted rows are vacuumed afterwards, so their space is reused by new
+        rows instead of growing the table.
+
+        Parameters
+        ----------
+        now : datetime, optional
+            Current time (default: datetime.now()).
+
+        Returns
+        -------
+        dict
+            Bucket minutes of each source tier -> (days rolled up, rows deleted).
+        """
+        now = now or datetime.now()
+        connection = self.db.connect_to_db()
+        summary = {}
+        try:
+            for source, target, cutoff in self.tiers(now):
+                days = self.roll_up(connection, source, target, cutoff)
+                watermark = self._watermark(connection, source)
+                deleted = 0
+                if watermark is not None:
+                    deleted = self.delete_batches(
+                        connection, source, min(watermark, cutoff)
+                    )
+                summary[source] = (days, deleted)
+                print(
+                    f"Retention {source} -> {target} min: {days} days rolled up, {deleted} rows deleted."
+                )
+            connection.rollback()
+            connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with connection.cursor() as cursor:
+                if summary[1][1]:
+                    cursor.execute("VACUUM (ANALYZE) activity_data;")
+                if summary[15][1] or summary[60][1]:
+                    cursor.execute("VACUUM (ANALYZE) activity_rollup;")
+        finally:
+            connection.close()
+        return summary
+
+    def _watermark(self, db_connection, source: int) -> datetime | None:
+        rows = self.db.select_data(
+            db_connection,
+            table="retention_watermark",
+            columns="rolled_until",
+            where_clause="bucket_minutes = %s",
+            params=(source,),
+        )
+        return rows[0][0] if rows else None
+
+    def _oldest(self, db_connection, source: int) -> datetime | None:
+        if source == 1:
+            rows = self.db.select_data(
+                db_connection, table="activity_data", columns="min(datetime)"
+            )
+        else:
+            rows = self.db.select_data(
+                db_connection,
+                table="activity_rollup",
+                columns="min(bucket_start)",
+                where_clause="bucket_minutes = %s",
+                params=(source,),
+            )
+        return rows[0][0] if rows else None
+
+
+class RollupReader:
+    """
+    Reads activity that retention already moved out of activity_data, as activity_data rows.
+
+    activity_data is complete from the watermark of the minute tier on; older activity lives in
+    activity_rollup. A window is split at that watermark: the newer part is read with the caller's
+    activity_data query, the older part from activity_rollup. Each bucket is expanded into its online
+    minutes spread evenly over the bucket, so online minute totals are preserved while the timing
+    within a bucket is approximate. Buckets already rolled into the next tier (before that tier's
+    watermark) are skipped, so minutes are never counted twice while the retention job runs.
+
+    Attributes
+    ----------
+    ttl : float
+        Seconds the retention watermarks are cached for.
+
+    Methods
+    -------
+    watermarks(db, db_connection) -> dict
+        Returns the cached watermark of each tier.
+    watermarks_async(async_db) -> dict
+        Awaitable variant of watermarks.
+    split(start_date, end_date, rolled_until) -> tuple
+        Splits a window into its rolled-up and raw parts.
+    rollup_query(profile_chars, start_date, end_date) -> dict
+        Builds the select arguments for the rollup buckets of a window.
+    activity_rows(rows, start_date, end_date, watermarks) -> list
+        Expands rollup buckets into per-minute activity rows.
+    read(db, db_connection, raw_query, profile_chars, start_date, end_date) -> list
+        Reads the activity rows of a window from activity_data and activity_rollup.
+    read_async(async_db, raw_query, profile_chars, start_date, end_date) -> list
+        Awaitable variant of read.
+    """
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self._watermarks: dict = {}
+        self._read_at: float | None = None
+
+    def watermarks(self, db: DbOperations, db_connection) -> dict:
+        """
+        Get the watermark of each tier, read from the database at most once per ttl.
+
+        Parameters
+        ----------
+        db : DbOperations
+            Instance for database operations.
+        db_connection : psycopg2 connection object
+
+        Returns
+        -------
+        dict
+            Bucket minutes of a source tier -> end (exclusive) of its rolled-up days.
+        """
+        if self._expired():
+            rows = db.select_data(db_connection, **self.watermark_query())
+            self._store(rows)
+        return self._watermarks
+
+    async def watermarks_async(self, async_db: AsyncDbOperations) -> dict:
+        """
+        Get the watermark of each tier without blocking the event loop.
+
+        Parameters
+        ----------
+        async_db : AsyncDbOperations
+            Pooled, awaitable database operations.
+
+        Returns
+        -------
+        dict
+            Bucket minutes of a source tier -> end (exclusive) of its rolled-up days.
+        """
+        if self._expired():
+            rows = await async_db.select_data_async(**self.watermark_query())
+            self._store(rows)
+        return self._watermarks
+
+    @staticmethod
+    def watermark_query() -> dict:
+        """
+        Build select arguments for the watermarks of all tiers.
+
+        Returns
+        -------
+        dict
+            Keyword arguments of select_data.
+        """
+        return {
+            "table": "retention_watermark",
+            "columns": "bucket_minutes, rolled_until",
+        }
+
+    @staticmethod
+    def split(
+        start_date: datetime, end_date: datetime, rolled_until: datetime | None
+    ) -> tuple:
+        """
+        Split [start_date, end_date) into the part before rolled_until and the part after it.
+
+        Parameters
+        ----------
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+        rolled_until : datetime or None
+            Watermark of the minute tier; None if nothing was rolled up yet.
+
+        Returns
+        -------
+        tuple
+            (rolled-up window, raw window), each a (start, end) pair or None if empty.
+        """
+        if rolled_until is None or start_date >= rolled_until:
+            return None, (start_date, end_date)
+        if end_date <= rolled_until:
+            return (start_date, end_date), None
+        return (start_date, rolled_until), (rolled_until, end_date)
+
+    @staticmethod
+    def rollup_query(
+        profile_chars: list[tuple], start_date: datetime, end_date: datetime
+    ) -> dict:
+        """
+        Build select arguments fetching the rollup buckets of characters that may overlap a window.
+
+        Buckets last at most a day, so buckets starting up to a day before the window are included;
+        activity_rows drops the parts outside the window.
+
+        Parameters
+        ----------
+        profile_chars : list[tuple]
+            (profile, char) pairs of the characters.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        dict
+            Keyword arguments of select_data.
+        """
+        return {
+            "table": "activity_rollup",
+            "columns": ROLLUP_COLUMNS,
+            "where_clause": "profile = ANY(%s) AND char = ANY(%s) AND bucket_start > %s AND bucket_start < %s",
+            "params": (
+                sorted({int(profile) for profile, _ in profile_chars}),
+                sorted({int(char) for _, char in profile_chars}),
+                start_date - timedelta(days=1),
+                end_date,
+            ),
+        }
+
+    @staticmethod
+    def activity_rows(
+        rows: list, start_date: datetime, end_date: datetime, watermarks: dict
+    ) -> list:
+        """
+        Expand rollup buckets into per-minute activity rows within [start_date, end_date).
+
+        A bucket of b minutes with n online minutes yields the minutes i * b // n for i < n.
+
+        Parameters
+        ----------
+        rows : list
+            Rows (profile, char, bucket_start, bucket_minutes, online_minutes) of activity_rollup.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+        watermarks : dict
+            Bucket minutes of a source tier -> its watermark; older buckets of that tier are skipped.
+
+        Returns
+        -------
+        list
+            Rows (profile, char, datetime), as read from activity_data.
+        """
+        activity = []
+        for profile, char, bucket_start, bucket_minutes, online_minutes in rows:
+            rolled_until = watermarks.get(bucket_minutes)
+            if rolled_until is not None and bucket_start < rolled_until:
+                continue
+            online_minutes = min(online_minutes, bucket_minutes)
+            for i in range(online_minutes):
+                dt = bucket_start + timedelta(
+                    minutes=i * bucket_minutes // online_minutes
+                )
+                if start_date <= dt < end_date:
+                    activity.append((profile, char, dt))
+        return activity
+
+    def read(
+        self,
+        db: DbOperations,
+        db_connection,
+        raw_query: Callable[[datetime, datetime], dict],
+        profile_chars: list[tuple],
+        start_date: datetime,
+        end_date: datetime,
+    ) -> list:
+        """
+        Read the activity rows of characters within [start_date, end_date).
+
+        Parameters
+        ----------
+        db : DbOperations
+            Instance for database operations.
+        db_connection : psycopg2 connection object
+        raw_query : Callable[[datetime, datetime], dict]
+            Builds the select arguments of the activity_data query for a window.
+        profile_chars : list[tuple]
+            (profile, char) pairs of the characters.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        list
+            Rows (profile, char, datetime); rolled-up rows first.
+        """
+        watermarks = self.watermarks(db, db_connection)
+        rolled, raw = self.split(start_date, end_date, watermarks.get(1))
+        rows = []
+        if rolled is not None:
+            buckets = db.select_data(
+                db_connection, **self.rollup_query(profile_chars, *rolled)
+            )
+            rows += self.activity_rows(buckets, *rolled, watermarks)
+        if raw is not None:
+            rows += db.select_data(db_connection, **raw_query(*raw))
+        return rows
+
+    async def read_async(
+        self,
+        async_db: AsyncDbOperations,
+        raw_query: Callable[[datetime, datetime], dict],
+        profile_chars: list[tuple],
+        start_date: datetime,
+        end_date: datetime,
+    ) -> list:
+        """
+        Read the activity rows of characters within [start_date, end_date) without blocking the event loop.
+
+        Parameters
+        ----------
+        async_db : AsyncDbOperations
+            Pooled, awaitable database operations.
+        raw_query : Callable[[datetime, datetime], dict]
+            Builds the select arguments of the activity_data query for a window.
+        profile_chars : list[tuple]
+            (profile, char) pairs of the characters.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        list
+            Rows (profile, char, datetime); rolled-up rows first.
+        """
+        watermarks = await self.watermarks_async(async_db)
+        rolled, raw = self.split(start_date, end_date, watermarks.get(1))
+        rows = []
+        if rolled is not None:
+            buckets = await async_db.select_data_async(
+                **self.rollup_query(profile_chars, *rolled)
+            )
+            rows += self.activity_rows(buckets, *rolled, watermarks)
+        if raw is not None:
+            rows += await async_db.select_data_async(**raw_query(*raw))
+        return rows
+
+    def _expired(self) -> bool:
+        return self._read_at is None or time.monotonic() - self._read_at > self.ttl
+
+    def _store(self, rows: list):
+        self._watermarks = {bucket_minutes: until for bucket_minutes, until in rows}
+        self._read_at = time.monotonic()
+
+
+ROLLUP_READER = RollupReader()
+
+
+if __name__ == "__main__":
+    RetentionJob(
+        raw_days=int(os.environ.get("RETENTION_RAW_DAYS", 30)),
+        quarter_hour_days=int(os.environ.get("RETENTION_QUARTER_HOUR_DAYS", 90)),
+        hourly_days=int(os.environ.get("RETENTION_HOURLY_DAYS", 365)),
+    ).run()
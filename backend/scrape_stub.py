@@ -0,0 +1,292 @@
+import html
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from backend.synthetic_data import SyntheticDataGenerator
+
+PROFILE_PATH = re.compile(r"^/profile/view,(\d+)")
+
+
+class ScrapeStub:
+    """
+    Local stand-in for www.margonem.pl serving stats and profile pages, for offline scraping.
+
+    Pages are generated from a synthetic population (backend/synthetic_data.py) in the markup
+    WebScrapper parses, or served from recorded HTML files. Latency, error responses and hanging
+    requests are injected at configurable rates, so the scraper can be load- and soak-tested
+    without touching the real site. Point WebScrapper at it with MARGONEM_URL=<url>.
+
+    Routes:
+        - /stats: the 'Zalogowani' popup with `online` characters, resampled every minute
+        - /profile/view,<profile>: the character list of a profile
+
+    Attributes
+    ----------
+    host : str
+        Address to listen on.
+    port : int
+        Port to listen on; 0 picks a free port.
+    online : int
+        Characters online on the generated stats page.
+    latency : float
+        Mean response delay in seconds.
+    jitter : float
+        Standard deviation of the response delay in seconds.
+    error_rate : float
+        Share of requests answered with one of error_statuses.
+    error_statuses : tuple[int]
+        Statuses of injected errors; 429 and 503 carry a Retry-After header.
+    retry_after : int
+        Seconds sent in Retry-After.
+    timeout_rate : float
+        Share of requests that hang for hang_seconds before responding.
+    hang_seconds : float
+        Delay of hanging requests, longer than the scraper's timeout.
+    padding_kb : int
+        Kilobytes of filler added to each page, to match the size of the real pages (~550 kB).
+    recorded_dir : str or None
+        Directory with recorded pages: stats.html and <profile>_profile.html.
+    requests : Counter
+        Number of served requests per route and status, e.g. ('stats', 200).
+
+    Methods
+    -------
+    start() -> str
+        Starts the server in a background thread and returns its base URL.
+    stop()
+        Stops the server.
+    respond(path: str) -> tuple[int, dict, bytes]
+        Builds the response to a request, with injected faults.
+    stats_page(now: datetime = None) -> str
+        Builds the stats page.
+    profile_page(profile: int) -> str
+        Builds the profile page of a profile.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        online: int = 500,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        error_rate: float = 0.0,
+        error_statuses: tuple = (500, 503, 429),
+        retry_after: int = 5,
+        timeout_rate: float = 0.0,
+        hang_seconds: float = 35,
+        padding_kb: int = 0,
+        recorded_dir: str = None,
+        profiles: int = 2000,
+        seed: int = 1,
+    ):
+        self.host = host
+        self.port = port
+        self.online = online
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.retry_after = retry_after
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.padding_kb = padding_kb
+        self.recorded_dir = recorded_dir
+        self.seed = seed
+        self.requests: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+        characters = SyntheticDataGenerator(profiles=profiles, seed=seed).characters()
+        self._characters = characters.to_pylist()
+        self._by_profile = defaultdict(list)
+        for character in self._characters:
+            self._by_profile[character["profile"]].append(character)
+
+    def start(self) -> str:
+        """
+        Start the server in a background thread.
+
+        Returns
+        -------
+        str
+            Base URL of the stub, e.g. 'http://127.0.0.1:8765'.
+        """
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, headers, body = stub.respond(self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="scrape-stub", daemon=True
+        )
+        self._thread.start()
+        return f"http://{self.host}:{self.port}"
+
+    def stop(self):
+        """
+        Stop the server.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread.join(timeout=5)
+
+    def respond(self, path: str) -> tuple[int, dict, bytes]:
+        """
+        Build the response to a GET request, after the injected delay.
+
+        Parameters
+        ----------
+        path : str
+            Request path.
+
+        Returns
+        -------
+        tuple[int, dict, bytes]
+            Status, headers and body.
+        """
+        with self._lock:
+            delay = max(0.0, self._rng.gauss(self.latency, self.jitter))
+            draw = self._rng.random()
+        if draw < self.timeout_rate:
+            delay = self.hang_seconds
+        time.sleep(delay)
+        route = "stats" if path.startswith("/stats") else "profile"
+        match = PROFILE_PATH.match(path)
+        if route == "profile" and match is None:
+            return self._count("other", 404, {}, b"Not found")
+        if self.timeout_rate <= draw < self.timeout_rate + self.error_rate:
+            with self._lock:
+                status = self._rng.choice(self.error_statuses)
+            headers = {}
+            if status in (429, 503):
+                headers["Retry-After"] = str(self.retry_after)
+            return self._count(route, status, headers, b"Injected error")
+        if route == "stats":
+            page = self._recorded("stats.html") or self.stats_page()
+        else:
+            profile = int(match.group(1))
+            page = self._recorded(f"{profile}_profile.html") or self.profile_page(
+                profile
+            )
+        body = page.encode("utf-8")
+        if self.padding_kb:
+            body += b"<!--" + b" " * (self.padding_kb * 1024) + b"-->"
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+        return self._count(route, 200, headers, body)
+
+    def stats_page(self, now: datetime = None) -> str:
+        """
+        Build the stats page listing the characters online.
+
+        The online characters are sampled from the population once per minute, so consecutive
+        scrapes within a minute see the same set.
+
+        Parameters
+        ----------
+        now : datetime, optional
+            Time of the request (default: datetime.now()).
+
+        Returns
+        -------
+        str
+            HTML page.
+        """
+        now = now or datetime.now()
+        rng = random.Random(f"{self.seed}-{now:%Y%m%d%H%M}")
+        online = rng.sample(self._characters, min(self.online, len(self._characters)))
+        links = ", ".join(
+            f'<a target="blank" class="statistics-rank" '
+            f'href="/profile/view,{c["profile"]}#char_{c["char"]},berufs">'
+            f'{html.escape(c["nick"])}</a>'
+            for c in online
+        )
+        return (
+            "<html><body>"
+            '<div class="light-brown-box news-container no-footer berufs-popup">'
+            '<div class="news-header short-header"><h2>Berufs: Zalogowani</h2></div>'
+            f'<div class="news-body">{links}</div>'
+            "</div></body></html>"
+        )
+
+    def profile_page(self, profile: int) -> str:
+        """
+        Build the profile page of a profile, with one row per character.
+
+        Parameters
+        ----------
+        profile : int
+            Profile ID; unknown profiles get a page without characters.
+
+        Returns
+        -------
+        str
+            HTML page.
+        """
+        rows = "".join(
+            f'<li data-nick="{html.escape(c["nick"])}" data-lvl="{c["lvl"]}" '
+            f'data-world="{c["world"]}" class="char-row " data-id="{c["char"]}">'
+            f'<span class="character-name">{html.escape(c["nick"])}</span></li>'
+            for c in self._by_profile.get(profile, [])
+        )
+        return (
+            "<html><body>"
+            f'<div class="character-list"><h3>Światy publiczne</h3><ul>{rows}</ul></div>'
+            "</body></html>"
+        )
+
+    def _recorded(self, filename: str) -> str | None:
+        if self.recorded_dir is None:
+            return None
+        path = os.path.join(self.recorded_dir, filename)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def _count(self, route: str, status: int, headers: dict, body: bytes) -> tuple:
+        with self._lock:
+            self.requests[(route, status)] += 1
+        return status, headers, body
+
+
+if __name__ == "__main__":
+    stub = ScrapeStub(
+        port=int(os.environ.get("STUB_PORT", 8765)),
+        online=int(os.environ.get("STUB_ONLINE", 500)),
+        latency=float(os.environ.get("STUB_LATENCY", 0.05)),
+        error_rate=float(os.environ.get("STUB_ERROR_RATE", 0)),
+        timeout_rate=float(os.environ.get("STUB_TIMEOUT_RATE", 0)),
+        padding_kb=int(os.environ.get("STUB_PADDING_KB", 0)),
+        recorded_dir=os.environ.get("STUB_RECORDED_DIR"),
+        profiles=int(os.environ.get("STUB_PROFILES", 2000)),
+    )
+    print(f"Serving margonem.pl stub at {stub.start()}")
+    try:
+        while True:
+            time.sleep(60)
+            print(dict(stub.requests))
+    except KeyboardInterrupt:
+        stub.stop()
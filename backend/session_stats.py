@@ -0,0 +1,344 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from backend.db_operations import DbOperations
+
+SESSION_COLUMNS = "profile, char, session_start, session_end"
+
+
+class SessionEngine:
+    """
+    Turns activity timestamps into play sessions and playtime statistics.
+
+    Every activity timestamp marks the character online for one sample_interval (one scrape).
+    Presence segments of a character are merged into one session while the gap between them
+    is at most gap_tolerance, so a missed scrape does not split a session.
+    Detection is a single vectorized pass over all characters at once, and runs incrementally
+    on each saved batch: open sessions of the batch's characters are re-read and merged with
+    the new activity, and stored in the player_sessions table.
+
+    Attributes
+    ----------
+    gap_tolerance : timedelta
+        Largest gap between presence segments that still continues a session.
+    sample_interval : timedelta
+        Time one activity timestamp accounts for.
+
+    Methods
+    -------
+    detect(profiles, chars, starts, ends) -> list[tuple]
+        Merges presence segments into sessions.
+    sessions_from_activity(player_activity: list[dict]) -> list[tuple]
+        Detects the sessions of a batch of scraped activity.
+    update_sessions(db, db_connection, player_activity: list[dict]) -> list[tuple]
+        Merges a saved batch of activity into the stored sessions.
+    daily_playtime(sessions) -> dict
+        Online minutes per day.
+    hourly_minutes(sessions) -> np.ndarray
+        Online minutes per hour of the day.
+    typical_hours(sessions, share=0.5) -> list[int]
+        Hours of the day the character is usually online.
+    streaks(days, today=None) -> tuple[int, int]
+        Current and longest run of consecutive days played.
+    stats(sessions, today=None) -> dict
+        All playtime statistics of a character.
+    """
+
+    def __init__(
+        self,
+        gap_tolerance: timedelta = timedelta(minutes=5),
+        sample_interval: timedelta = timedelta(minutes=1),
+    ):
+        self.gap_tolerance = gap_tolerance
+        self.sample_interval = sample_interval
+
+    def detect(self, profiles, chars, starts, ends) -> list[tuple]:
+        """
+        Merge presence segments of any number of characters into sessions.
+
+        Segments are sorted by character and start, then one pass computes the running end
+        of each character's current session and starts a new session wherever the next segment
+        begins more than gap_tolerance after it.
+
+        Parameters
+        ----------
+        profiles : array-like
+            Profile ID of each segment.
+        chars : array-like
+            Character ID of each segment.
+        starts : array-like
+            Start datetime of each segment.
+        ends : array-like
+            End datetime (exclusive) of each segment.
+
+        Returns
+        -------
+        list[tuple]
+            Sessions (profile, char, session_start, session_end), sorted by character and start.
+        """
+        profiles = np.asarray(profiles, dtype=np.int64)
+        chars = np.asarray(chars, dtype=np.int64)
+        starts = np.asarray(starts, dtype="datetime64[s]").astype(np.int64)
+        ends = np.asarray(ends, dtype="datetime64[s]").astype(np.int64)
+        if len(starts) == 0:
+            return []
+        order = np.lexsort((starts, chars, profiles))
+        profiles, chars = profiles[order], chars[order]
+        starts, ends = starts[order], ends[order]
+
+        new_char = np.ones(len(starts), dtype=bool)
+        new_char[1:] = (profiles[1:] != profiles[:-1]) | (chars[1:] != chars[:-1])
+        # Shift each character into its own value range, so one running maximum
+        # over all segments never carries a session end over to the next character.
+        origin = starts.min()
+        gap = int(self.gap_tolerance.total_seconds())
+        span = int(ends.max() - origin) + gap + 1
+        offsets = (np.cumsum(new_char) - 1) * span
+        running_end = np.maximum.accumulate(ends - origin + offsets)
+        new_session = new_char.copy()
+        new_session[1:] |= starts[1:] - origin + offsets[1:] > running_end[:-1] + gap
+
+        first = np.flatnonzero(new_session)
+        session_starts = starts[first].astype("datetime64[s]").tolist()
+        session_ends = np.maximum.reduceat(ends, first).astype("datetime64[s]").tolist()
+        return list(
+            zip(
+                profiles[first].tolist(),
+                chars[first].tolist(),
+                session_starts,
+                session_ends,
+            )
+        )
+
+    def sessions_from_activity(self, player_activity: list[dict]) -> list[tuple]:
+        """
+        Detect the sessions of a batch of scraped activity.
+
+        Parameters
+        ----------
+        player_activity : list[dict]
+            Activity dictionaries with 'profile', 'char' and 'datetime';
+            the placeholder with profile 0 (nobody online) is ignored.
+
+        Returns
+        -------
+        list[tuple]
+            Sessions (profile, char, session_start, session_end).
+        """
+        profiles, chars, starts = self._activity_arrays(player_activity)
+        return self.detect(profiles, chars, starts, starts + self._interval())
+
+    def update_sessions(
+        self, db: DbOperations, db_connection, player_activity: list[dict]
+    ) -> list[tuple]:
+        """
+        Merge a saved batch of activity into the player_sessions table.
+
+        Stored sessions of the batch's characters that end within gap_tolerance of the batch
+        are read back, merged with the new activity and replaced in one transaction.
+
+        Parameters
+        ----------
+        db : DbOperations
+            Instance for database operations.
+        db_connection : psycopg2 connection object
+        player_activity : list[dict]
+            Activity dictionaries with 'profile', 'char' and 'datetime';
+            the placeholder with profile 0 (nobody online) is ignored.
+
+        Returns
+        -------
+        list[tuple]
+            The stored sessions of the batch's characters that were written.
+        """
+        profiles, chars, starts = self._activity_arrays(player_activity)
+        if not len(profiles):
+            return []
+        earliest = starts.min().astype(datetime) - self.gap_tolerance
+        batch_chars = set(zip(profiles.tolist(), chars.tolist()))
+        stored = db.select_data(
+            db_connection=db_connection,
+            table="player_sessions",
+            columns=SESSION_COLUMNS,
+            where_clause="profile = ANY(%s) AND char = ANY(%s) AND session_end >= %s",
+            params=(
+                sorted({profile for profile, _ in batch_chars}),
+                sorted({char for _, char in batch_chars}),
+                earliest,
+            ),
+        )
+        open_sessions = [row for row in stored if (row[0], row[1]) in batch_chars]
+        sessions = self.detect(
+            np.concatenate(
+                [profiles, np.array([row[0] for row in open_sessions], np.int64)]
+            ),
+            np.concatenate(
+                [chars, np.array([row[1] for row in open_sessions], np.int64)]
+            ),
+            np.concatenate(
+                [starts, np.array([row[2] for row in open_sessions], "datetime64[s]")]
+            ),
+            np.concatenate(
+                [
+                    starts + self._interval(),
+                    np.array([row[3] for row in open_sessions], "datetime64[s]"),
+                ]
+            ),
+        )
+        db.replace_sessions(db_connection, open_sessions, sessions)
+        return sessions
+
+    @staticmethod
+    def daily_playtime(sessions: list[tuple]) -> dict:
+        """
+        Sum online minutes per day, splitting sessions at midnight.
+
+        Parameters
+        ----------
+        sessions : list[tuple]
+            Sessions whose last two fields are session_start and session_end.
+
+        Returns
+        -------
+        dict
+            date -> online minutes, in date order.
+        """
+        playtime: Counter = Counter()
+        for *_, start, end in sessions:
+            while start < end:
+                midnight = datetime.combine(
+                    start.date() + timedelta(days=1), datetime.min.time()
+                )
+                piece_end = min(end, midnight)
+                playtime[start.date()] += (piece_end - start).total_seconds() / 60
+                start = piece_end
+        return dict(sorted(playtime.items()))
+
+    @staticmethod
+    def hourly_minutes(sessions: list[tuple]) -> np.ndarray:
+        """
+        Sum online minutes per hour of the day over all sessions.
+
+        Parameters
+        ----------
+        sessions : list[tuple]
+            Sessions whose last two fields are session_start and session_end.
+
+        Returns
+        -------
+        np.ndarray
+            24 values, online minutes in hours 0-23.
+        """
+        hourly = np.zeros(24)
+        for *_, start, end in sessions:
+            while start < end:
+                next_hour = start.replace(
+                    minute=0, second=0, microsecond=0
+                ) + timedelta(hours=1)
+                piece_end = min(end, next_hour)
+                hourly[start.hour] += (piece_end - start).total_seconds() / 60
+                start = piece_end
+        return hourly
+
+    @classmethod
+    def typical_hours(cls, sessions: list[tuple], share: float = 0.5) -> list[int]:
+        """
+        Get the hours of the day the character is usually online.
+
+        Parameters
+        ----------
+        sessions : list[tuple]
+            Sessions whose last two fields are session_start and session_end.
+        share : float, optional
+            Minimum online minutes of an hour relative to the busiest hour (default: 0.5).
+
+        Returns
+        -------
+        list[int]
+            Typical hours (0-23) in ascending order; empty without sessions.
+        """
+        hourly = cls.hourly_minutes(sessions)
+        if not hourly.any():
+            return []
+        return np.flatnonzero(hourly >= hourly.max() * share).tolist()
+
+    @staticmethod
+    def streaks(days, today: date = None) -> tuple[int, int]:
+        """
+        Get the current and longest run of consecutive days played.
+
+        Parameters
+        ----------
+        days : iterable of date
+            Days with any playtime.
+        today : date, optional
+            Day the current streak ends on or the day after (default: today).
+
+        Returns
+        -------
+        tuple[int, int]
+            (current streak, longest streak) in days; the current streak is 0 if
+            the character played neither today nor yesterday.
+        """
+        ordinals = np.array(sorted({day.toordinal() for day in days}), dtype=np.int64)
+        if len(ordinals) == 0:
+            return 0, 0
+        breaks = np.flatnonzero(np.diff(ordinals) != 1) + 1
+        runs = np.diff(np.concatenate([[0], breaks, [len(ordinals)]]))
+        today = today or date.today()
+        current = int(runs[-1]) if today.toordinal() - ordinals[-1] <= 1 else 0
+        return current, int(runs.max())
+
+    @classmethod
+    def stats(cls, sessions: list[tuple], today: date = None) -> dict:
+        """
+        Compute all playtime statistics of a character.
+
+        Parameters
+        ----------
+        sessions : list[tuple]
+            Sessions whose last two fields are session_start and session_end.
+        today : date, optional
+            Reference day for the current streak (default: today).
+
+        Returns
+        -------
+        dict
+            'sessions', 'total_minutes', 'average_session_minutes', 'longest_session_minutes',
+            'daily_playtime', 'typical_hours', 'current_streak' and 'longest_streak'.
+        """
+        durations = [(end - start).total_seconds() / 60 for *_, start, end in sessions]
+        daily = cls.daily_playtime(sessions)
+        current, longest = cls.streaks(daily, today)
+        return {
+            "sessions": len(sessions),
+            "total_minutes": sum(durations),
+            "average_session_minutes": (
+                sum(durations) / len(durations) if durations else 0
+            ),
+            "longest_session_minutes": max(durations, default=0),
+            "daily_playtime": daily,
+            "typical_hours": cls.typical_hours(sessions),
+            "current_streak": current,
+            "longest_streak": longest,
+        }
+
+    def _interval(self) -> np.timedelta64:
+        return np.timedelta64(int(self.sample_interval.total_seconds()), "s")
+
+    @staticmethod
+    def _activity_arrays(player_activity: list[dict]):
+        # The placeholder with profile 0 marks a scrape with nobody online, not a session.
+        player_activity = [data for data in player_activity if int(data["profile"])]
+        profiles = np.array(
+            [int(data["profile"]) for data in player_activity], dtype=np.int64
+        )
+        chars = np.array(
+            [int(data["char"]) for data in player_activity], dtype=np.int64
+        )
+        starts = np.array(
+            [data["datetime"] for data in player_activity], dtype="datetime64[s]"
+        )
+        return profiles, chars, starts
@@ -0,0 +1,339 @@
+import io
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from backend.db_operations import DbOperations, MINUTES_PER_DAY
+from backend.parquet_export import PROFILE_SCHEMA
+
+# Relative share of logins starting in each hour of the day: quiet at night, peaking in the evening.
+DIURNAL_WEIGHTS = np.array(
+    [3, 2, 1.2, 0.8, 0.6, 0.6, 1, 2, 3, 4, 4.5, 5,
+     5.5, 5.5, 6, 6.5, 7.5, 9, 10, 11, 11, 10, 8, 5]
+)  # fmt: skip
+SYLLABLES = (
+    "ka", "ri", "mor", "del", "an", "tor", "vi", "sel", "gar", "ul",
+    "ne", "zor", "lin", "ba", "es", "dra", "kon", "mi", "rys", "wo",
+)  # fmt: skip
+
+
+class SyntheticDataGenerator:
+    """
+    Generator of realistic profile_data and activity_data at configurable scale, bulk-loaded with COPY.
+
+    Characters:
+        - profiles own a geometric number of characters (mean chars_per_profile); the first is the main
+        - main levels follow a long-tailed gamma distribution capped at 300; alts are lower
+        - clan sizes follow a Zipf law; alts often share the clan of their main
+    Activity, one row per online character per scrape minute:
+        - each character has a long-tailed activity propensity; alts play less than mains
+        - the number of sessions per day is Poisson, higher on weekends
+        - sessions start following DIURNAL_WEIGHTS and last a log-normal number of minutes
+        - characters join during the window and quit after an exponential lifetime (churn)
+
+    Generation is vectorised with numpy one day at a time, and each day is loaded with COPY in
+    batches of batch_rows, so hundreds of millions of rows take constant memory.
+    The same seed always produces the same data.
+
+    Attributes
+    ----------
+    profiles : int
+        Number of profiles.
+    start_date : date
+        First day of activity.
+    days : int
+        Number of days of activity.
+    seed : int
+        Seed of the random generator.
+    chars_per_profile : float
+        Mean number of characters per profile.
+    clans : int
+        Number of clans.
+    clan_share : float
+        Share of main characters belonging to a clan.
+    sessions_per_day : float
+        Mean number of sessions per day of a character with propensity 1.
+    session_minutes : float
+        Median session length in minutes.
+    churn_days : float
+        Mean lifetime of a character in days.
+    batch_rows : int
+        Rows per COPY.
+    db : DbOperations
+        Instance for database operations.
+
+    Methods
+    -------
+    characters() -> pa.Table
+        Builds the characters (profile_data rows); cached.
+    activity_day(day: int) -> pa.Table
+        Builds the activity of one day.
+    copy_table(db_connection, table: str, data: pa.Table) -> int
+        Bulk-loads a table with COPY.
+    load(db_connection, truncate=False) -> dict
+        Generates and loads all characters and activity.
+    run(truncate=False) -> dict
+        Connects to the database and loads the data.
+    """
+
+    def __init__(
+        self,
+        profiles: int = 10000,
+        start_date: date = date(2025, 1, 1),
+        days: int = 30,
+        seed: int = 1,
+        chars_per_profile: float = 2.5,
+        clans: int = 300,
+        clan_share: float = 0.6,
+        sessions_per_day: float = 1.5,
+        session_minutes: float = 40,
+        churn_days: float = 180,
+        batch_rows: int = 1_000_000,
+        db_name: str = None,
+    ):
+        self.profiles = profiles
+        self.start_date = start_date
+        self.days = days
+        self.seed = seed
+        self.chars_per_profile = chars_per_profile
+        self.clans = clans
+        self.clan_share = clan_share
+        self.sessions_per_day = sessions_per_day
+        self.session_minutes = session_minutes
+        self.churn_days = churn_days
+        self.batch_rows = batch_rows
+        self.db: DbOperations = DbOperations(db_name=db_name)
+        self._characters: pa.Table | None = None
+        self._traits: dict = {}
+
+    def characters(self) -> pa.Table:
+        """
+        Build the characters of all profiles, as rows of the profile_data table.
+
+        Returns
+        -------
+        pa.Table
+            Table with PROFILE_SCHEMA; built once and cached.
+        """
+        if self._characters is not None:
+            return self._characters
+        rng = np.random.default_rng(self.seed)
+        profile_ids = (
+            np.sort(
+                rng.choice(10 * self.profiles + 1_000_000, self.profiles, replace=False)
+            )
+            + 1_000_000
+        )
+        counts = np.minimum(
+            rng.geometric(1 / self.chars_per_profile, self.profiles), 10
+        )
+        total = int(counts.sum())
+        owner = np.repeat(np.arange(self.profiles), counts)
+        first = np.cumsum(counts) - counts
+        is_main = np.zeros(total, dtype=bool)
+        is_main[first] = True
+        char_ids = 100_000 + np.cumsum(rng.integers(1, 4, total))
+
+        main_lvl = np.clip(rng.gamma(1.6, 45, self.profiles), 1, 300)
+        lvl = main_lvl[owner] * np.where(is_main, 1, rng.uniform(0.1, 0.9, total))
+        lvl = np.maximum(lvl.astype(np.int32), 1)
+
+        clan_weights = 1 / np.arange(1, self.clans + 1) ** 1.1
+        clan_of = rng.choice(
+            self.clans, self.profiles, p=clan_weights / clan_weights.sum()
+        )
+        in_clan = rng.random(self.profiles) < self.clan_share
+        char_clan = np.where(
+            in_clan[owner] & (is_main | (rng.random(total) < 0.5)), clan_of[owner], -1
+        )
+        clan_names = [
+            self._name(rng, 2, 3).capitalize() + f" {i}" for i in range(self.clans)
+        ]
+
+        self._traits = {
+            "profile": profile_ids[owner].astype(np.int32),
+            "char": char_ids.astype(np.int32),
+            "propensity": rng.lognormal(0, 0.9, total) * np.where(is_main, 1, 0.35),
+            "join": np.where(
+                rng.random(total) < 0.7, -1, rng.integers(0, max(self.days, 1), total)
+            ),
+            "lifetime": rng.exponential(self.churn_days, total),
+        }
+        self._characters = pa.table(
+            {
+                "profile": self._traits["profile"],
+                "char": self._traits["char"],
+                "nick": self._nicks(rng, total),
+                "lvl": lvl,
+                "clan": [clan_names[c] if c >= 0 else "" for c in char_clan],
+                "world": ["#berufs"] * total,
+            },
+            schema=PROFILE_SCHEMA,
+        )
+        return self._characters
+
+    def activity_day(self, day: int) -> pa.Table:
+        """
+        Build the activity of one day: one row per online character per scrape minute.
+
+        Sessions running past midnight are cut at midnight.
+
+        Parameters
+        ----------
+        day : int
+            Index of the day, from 0 (start_date).
+
+        Returns
+        -------
+        pa.Table
+            Columns profile, char and datetime, sorted by datetime as the scraper writes them.
+        """
+        self.characters()
+        traits = self._traits
+        rng = np.random.default_rng([self.seed, day])
+        current = self.start_date + timedelta(days=day)
+        active = np.flatnonzero(
+            (traits["join"] <= day) & (day < traits["join"] + traits["lifetime"])
+        )
+        weekend = 1.3 if current.weekday() >= 5 else 1.0
+        sessions = rng.poisson(
+            self.sessions_per_day * weekend * traits["propensity"][active]
+        )
+        who = np.repeat(active, sessions)
+        minute_weights = np.repeat(DIURNAL_WEIGHTS, 60) / (60 * DIURNAL_WEIGHTS.sum())
+        starts = rng.choice(MINUTES_PER_DAY, len(who), p=minute_weights)
+        lengths = np.clip(
+            rng.lognormal(np.log(self.session_minutes), 0.8, len(who)), 1, 600
+        ).astype(np.int64)
+        offsets = np.arange(lengths.sum()) - np.repeat(
+            np.cumsum(lengths) - lengths, lengths
+        )
+        minutes = np.repeat(starts, lengths) + offsets
+        who = np.repeat(who, lengths)
+        keep = minutes < MINUTES_PER_DAY
+        # Overlapping sessions of one character count once per minute.
+        keys = np.unique(minutes[keep] * len(traits["char"]) + who[keep])
+        minutes, who = np.divmod(keys, len(traits["char"]))
+        # All characters of one scrape share its timestamp, a few seconds into the minute.
+        scrape_seconds = minutes * 60 + rng.integers(0, 10, MINUTES_PER_DAY)[minutes]
+        midnight = (current - date(1970, 1, 1)).days * 86400
+        return pa.table(
+            {
+                "profile": traits["profile"][who],
+                "char": traits["char"][who],
+                "datetime": pa.array(midnight + scrape_seconds, pa.timestamp("s")),
+            }
+        )
+
+    def copy_table(self, db_connection, table: str, data: pa.Table) -> int:
+        """
+        Bulk-load a table with COPY, in batches of batch_rows rows; does not commit.
+
+        Parameters
+        ----------
+        db_connection : psycopg2 connection object
+        table : str
+            Name of the target table; the columns are taken from data.
+        data : pa.Table
+            Rows to load.
+
+        Returns
+        -------
+        int
+            Number of loaded rows.
+        """
+        columns = ", ".join(data.column_names)
+        copy_query = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)"
+        options = pacsv.WriteOptions(include_header=False)
+        with db_connection.cursor() as cursor:
+            for batch in data.to_batches(max_chunksize=self.batch_rows):
+                buffer = io.BytesIO()
+                pacsv.write_csv(pa.Table.from_batches([batch]), buffer, options)
+                buffer.seek(0)
+                cursor.copy_expert(copy_query, buffer)
+        return data.num_rows
+
+    def load(self, db_connection, truncate: bool = False) -> dict:
+        """
+        Generate and load all characters and their activity, committing after each day.
+
+        Parameters
+        ----------
+        db_connection : psycopg2 connection object
+        truncate : bool, optional
+            Whether to empty profile_data and activity_data first (default: False).
+
+        Returns
+        -------
+        dict
+            Number of loaded rows per table.
+        """
+        if truncate:
+            with db_connection.cursor() as cursor:
+                cursor.execute("TRUNCATE profile_data, activity_data;")
+        loaded = {
+            "profile_data": self.copy_table(
+                db_connection, "profile_data", self.characters()
+            ),
+            "activity_data": 0,
+        }
+        db_connection.commit()
+        print(f"Loaded {loaded['profile_data']} characters.")
+        for day in range(self.days):
+            rows = self.copy_table(
+                db_connection, "activity_data", self.activity_day(day)
+            )
+            db_connection.commit()
+            loaded["activity_data"] += rows
+            print(
+                f"Loaded {rows} activity rows of {self.start_date + timedelta(days=day)}."
+            )
+        return loaded
+
+    def run(self, truncate: bool = False) -> dict:
+        """
+        Connect to the database and load the generated data.
+
+        Parameters
+        ----------
+        truncate : bool, optional
+            Whether to empty profile_data and activity_data first (default: False).
+
+        Returns
+        -------
+        dict
+            Number of loaded rows per table.
+        """
+        connection = self.db.connect_to_db()
+        try:
+            return self.load(connection, truncate=truncate)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _name(rng: np.random.Generator, low: int, high: int) -> str:
+        return "".join(rng.choice(SYLLABLES, rng.integers(low, high + 1)))
+
+    @classmethod
+    def _nicks(cls, rng: np.random.Generator, count: int) -> list[str]:
+        nicks, seen = [], set()
+        for _ in range(count):
+            nick = cls._name(rng, 2, 4).capitalize()
+            while nick in seen:
+                nick = f"{cls._name(rng, 2, 3).capitalize()}{rng.integers(1, 1000)}"
+            seen.add(nick)
+            nicks.append(nick)
+        return nicks
+
+
+if __name__ == "__main__":
+    generator = SyntheticDataGenerator(
+        profiles=int(os.environ.get("SYNTHETIC_PROFILES", 10000)),
+        start_date=date.fromisoformat(os.environ.get("SYNTHETIC_START", "2025-01-01")),
+        days=int(os.environ.get("SYNTHETIC_DAYS", 30)),
+        seed=int(os.environ.get("SYNTHETIC_SEED", 1)),
+    )
+    print(generator.run(truncate=os.environ.get("SYNTHETIC_TRUNCATE") == "1"))
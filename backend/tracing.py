@@ -0,0 +1,77 @@
+import os
+import sys
+
+from opentelemetry import trace
+
+TRACE_EXPORTER = os.environ.get("TRACE_EXPORTER", "")
+TRACE_FILE = os.environ.get("TRACE_FILE", "traces.jsonl")
+
+# Spans are no-ops until configure_tracing installs an SDK tracer provider.
+TRACER = trace.get_tracer("mgspy")
+
+
+def configure_tracing(
+    exporter: str = TRACE_EXPORTER,
+    path: str = TRACE_FILE,
+    service_name: str = "mgspy",
+):
+    """
+    Export the spans of this process as OpenTelemetry JSON, one span per line.
+
+    Tracing stays off (and spans cost next to nothing) unless an exporter is chosen.
+    The JSON lines can be read directly or forwarded to a collector by a file receiver.
+
+    Parameters
+    ----------
+    exporter : str, optional
+        '' (off), 'console' (stdout) or 'file' (default: TRACE_EXPORTER environment variable).
+    path : str, optional
+        File appended to by the 'file' exporter (default: TRACE_FILE environment variable or 'traces.jsonl').
+    service_name : str, optional
+        service.name resource attribute of the spans (default: 'mgspy').
+
+    Returns
+    -------
+    TracerProvider or None
+        The installed provider, to be shut down on exit so that buffered spans are written,
+        or None if tracing is off.
+
+    Raises
+    ------
+    ValueError
+        If the exporter is not known.
+    """
+    if not exporter:
+        return None
+    if exporter not in ("console", "file"):
+        raise ValueError(f"Unknown trace exporter: {exporter}")
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    out = sys.stdout if exporter == "console" else open(path, "a", encoding="utf-8")
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(
+        BatchSpanProcessor(
+            ConsoleSpanExporter(
+                out=out, formatter=lambda span: span.to_json(indent=None) + "\n"
+            )
+        )
+    )
+    trace.set_tracer_provider(provider)
+    return provider
+
+
+def set_span_attributes(**attributes):
+    """
+    Set attributes, e.g. row or bucket counts, on the current span.
+
+    Parameters
+    ----------
+    **attributes
+        Attribute names and values; None values are skipped.
+    """
+    span = trace.get_current_span()
+    for name, value in attributes.items():
+        if value is not None:
+            span.set_attribute(name, value)
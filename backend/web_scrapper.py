@@ -1,3 +1,4 @@
+import os
 import re
 import time
 from datetime import datetime
@@ -5,6 +6,20 @@ from typing import Tuple, List, Dict, Any, Optional
 import requests
 from bs4 import BeautifulSoup
 
+from backend.metrics import (
+    FETCH_FAILURES,
+    FETCH_RETRIES,
+    FETCH_SECONDS,
+    PARSE_SECONDS,
+    ROWS_PER_SCRAPE,
+    SCRAPE_FAILURES,
+    page_label,
+)
+from backend.rate_controller import RATE_CONTROLLER, RateController
+
+# Responses meaning the site is overloaded or briefly down: retried after a backoff.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
 
 class WebScrapper:
     """
@@ -14,17 +29,23 @@ class WebScrapper:
     and character profile information from the game's website, with support for
     network timeouts, retries, and HTML parsing.
 
+    All requests go through a shared RateController (backend/rate_controller.py), which paces
+    them as fast as the site tolerates, backs off on failures and stops sending while the site
+    is down. The site can be replaced by a local stub (backend/scrape_stub.py) through base_url.
+
     Attributes
     ----------
     stats_url : str
         URL for the player statistics page.
     profile_url : str
         URL for accessing individual player profiles.
+    controller : RateController
+        Rate controller pacing the requests of this scrapper.
 
     Methods
     -------
-    get_soup(url, max_retries=3, timeout=30) -> Optional[BeautifulSoup]
-        Fetches a web page and returns a BeautifulSoup object, with retries on failure.
+    get_soup(url, max_retries=3, timeout=30, controller=None, max_wait=60) -> Optional[BeautifulSoup]
+        Fetches a web page and returns a BeautifulSoup object, with paced requests and retries on failure.
     get_now() -> str
         Returns the current date and time as a formatted string.
     parse_profile_char_from_link(link) -> Optional[Tuple[str, str]]
@@ -44,45 +65,101 @@ class WebScrapper:
 
     """
 
-    def __init__(self):
+    def __init__(self, base_url: str = None, controller: RateController = None):
         """
-        Initialize the WebScrapper with default URLs.
+        Initialize the WebScrapper with the URLs of the site.
+
+        Parameters
+        ----------
+        base_url : str, optional
+            Address of the site (default: taken from environment variable MARGONEM_URL
+            or set to 'https://www.margonem.pl').
+        controller : RateController, optional
+            Rate controller (default: RATE_CONTROLLER, shared by the whole process).
         """
-        self.stats_url = "https://www.margonem.pl/stats"
-        self.profile_url = "https://www.margonem.pl/profile/view"
+        base_url = (
+            base_url or os.environ.get("MARGONEM_URL", "https://www.margonem.pl")
+        ).rstrip("/")
+        self.stats_url = f"{base_url}/stats"
+        self.profile_url = f"{base_url}/profile/view"
+        self.controller = controller or RATE_CONTROLLER
 
     @staticmethod
     def get_soup(
-        url: str, max_retries: int = 3, timeout: int = 30
+        url: str,
+        max_retries: int = 3,
+        timeout: int = 30,
+        controller: RateController = None,
+        max_wait: float | None = 60,
     ) -> Optional[BeautifulSoup]:
         """
         Attempt to fetch and parse a webpage into a BeautifulSoup object.
 
+        Each attempt waits for a slot of the rate controller. Timeouts, connection errors and
+        throttled or 5xx responses (RETRY_STATUSES) are retried after the server's Retry-After
+        or a jittered exponential backoff; other errors are not retried.
+        Download and parse times, retries and failures are recorded in the metrics.
+
         Parameters
         ----------
         url : str
             The URL to fetch and parse.
         max_retries : int, optional
-            The maximum number of retries for timeouts (default is 3).
+            The maximum number of attempts (default is 3).
         timeout : int, optional
             Timeout in seconds for the requests (default is 30).
+        controller : RateController, optional
+            Rate controller pacing the requests (default: RATE_CONTROLLER).
+        max_wait : float or None, optional
+            Longest wait in seconds for the controller, e.g. while its circuit breaker is open,
+            before giving up on the page; None waits as long as needed (default is 60).
 
         Returns
         -------
         BeautifulSoup or None
             Parsed BeautifulSoup object if successful, otherwise None.
         """
+        page = page_label(url)
+        controller = controller or RATE_CONTROLLER
+        reason = "timeout"
         for attempt in range(max_retries):
+            if not controller.acquire(max_wait=max_wait):
+                print(f"Circuit open, skipping {url}")
+                FETCH_FAILURES.labels(page, "circuit_open").inc()
+                return None
+            started = time.perf_counter()
             try:
-                response = requests.get(url, timeout=timeout)
-                response.raise_for_status()
-                return BeautifulSoup(response.content, "html.parser")
-            except requests.exceptions.ReadTimeout:
-                print(f"Attempt {attempt + 1}: Read timed out for {url}")
+                with FETCH_SECONDS.labels(page).time():
+                    response = requests.get(url, timeout=timeout)
+                    response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status not in RETRY_STATUSES:
+                    controller.record_success(time.perf_counter() - started)
+                    print(f"Attempt {attempt + 1}: Request failed: {e}")
+                    FETCH_FAILURES.labels(page, "error").inc()
+                    return None
+                print(f"Attempt {attempt + 1}: {status} for {url}")
+                controller.record_failure(e.response.headers.get("Retry-After"))
+                reason = "throttled"
+            except (
+                requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError,
+            ) as e:
+                print(f"Attempt {attempt + 1}: {type(e).__name__} for {url}")
+                controller.record_failure()
+                reason = "timeout"
             except requests.exceptions.RequestException as e:
                 print(f"Attempt {attempt + 1}: Request failed: {e}")
-                break  # Break for non-timeout errors
-            time.sleep(2)  # wait before retrying
+                FETCH_FAILURES.labels(page, "error").inc()
+                return None
+            else:
+                controller.record_success(time.perf_counter() - started)
+                with PARSE_SECONDS.labels(page, "html").time():
+                    return BeautifulSoup(response.content, "html.parser")
+            if attempt + 1 < max_retries:
+                FETCH_RETRIES.labels(page).inc()
+        FETCH_FAILURES.labels(page, reason).inc()
         print(f"Failed to fetch {url} after {max_retries} tries.")
         return None
 
@@ -203,13 +280,15 @@ class WebScrapper:
         player_activity = []
         start_time = time.time()
         try:
-            soup = self.get_soup(self.stats_url)
-            inner_div = self.get_stats_inner_div(soup)
-            if not inner_div:
-                raise Exception(
-                    "Could not find the required 'news-body' div on the page."
-                )
-            player_activity = self.extract_player_activity_from_inner_div(inner_div)
+            soup = self.get_soup(self.stats_url, controller=self.controller)
+            with PARSE_SECONDS.labels("stats", "extract").time():
+                inner_div = self.get_stats_inner_div(soup)
+                if not inner_div:
+                    raise Exception(
+                        "Could not find the required 'news-body' div on the page."
+                    )
+                player_activity = self.extract_player_activity_from_inner_div(inner_div)
+            ROWS_PER_SCRAPE.observe(len(player_activity))
             if not player_activity:
                 player_activity.append(
                     {"profile": 0, "char": 0, "datetime": self.get_now()}
@@ -217,6 +296,7 @@ class WebScrapper:
             elapsed_time = time.time() - start_time
         except Exception as e:
             elapsed_time = time.time() - start_time
+            SCRAPE_FAILURES.inc()
             print(str(e))
         return player_activity, elapsed_time
 
@@ -262,6 +342,9 @@ class WebScrapper:
         """
         For each player activity, scrape the corresponding profile and extract character information.
 
+        Profiles are fetched as fast as the rate controller allows, waiting out an open circuit
+        breaker instead of skipping profiles; profiles that still fail are left out.
+
         Parameters
         ----------
         player_activity : list of dict
@@ -274,11 +357,14 @@ class WebScrapper:
         """
         player_data = []
         for activity in player_activity:
-            time.sleep(5)
             profile = activity.get("profile")
             char = activity.get("char")
             if profile and char:
                 url = self.construct_profile_url(profile, char)
-                soup = self.get_soup(url)
-                player_data.extend(self.extract_characters_from_profile(soup, profile))
+                soup = self.get_soup(url, controller=self.controller, max_wait=None)
+                if soup is None:
+                    continue
+                with PARSE_SECONDS.labels("profile", "extract").time():
+                    characters = self.extract_characters_from_profile(soup, profile)
+                player_data.extend(characters)
         return player_data
@@ -30,6 +30,97 @@ CREATE TABLE public.activity_data (
     datetime timestamp without time zone NOT NULL
 );
 
+CREATE INDEX activity_data_datetime_brin_idx ON public.activity_data USING brin (datetime);
+
+--
+-- Name: activity_rollup; Type: TABLE; Schema: public; Owner: sold
+--
+
+CREATE TABLE public.activity_rollup (
+    profile integer NOT NULL,
+    "char" integer NOT NULL,
+    bucket_start timestamp without time zone NOT NULL,
+    bucket_minutes smallint NOT NULL,
+    online_minutes smallint NOT NULL,
+    CONSTRAINT activity_rollup_pkey PRIMARY KEY (profile, "char", bucket_minutes, bucket_start)
+);
+
+CREATE INDEX activity_rollup_bucket_idx ON public.activity_rollup USING btree (bucket_minutes, bucket_start);
+
+--
+-- Name: retention_watermark; Type: TABLE; Schema: public; Owner: sold
+--
+
+CREATE TABLE public.retention_watermark (
+    bucket_minutes smallint NOT NULL,
+    rolled_until timestamp without time zone NOT NULL,
+    CONSTRAINT retention_watermark_pkey PRIMARY KEY (bucket_minutes)
+);
+
+--
+-- Name: activity_bitmap; Type: TABLE; Schema: public; Owner: sold
+--
+
+CREATE TABLE public.activity_bitmap (
+    profile integer NOT NULL,
+    "char" integer NOT NULL,
+    day date NOT NULL,
+    minutes bit(1440) NOT NULL,
+    CONSTRAINT activity_bitmap_pkey PRIMARY KEY (profile, "char", day)
+);
+
+--
+-- Name: player_sessions; Type: TABLE; Schema: public; Owner: sold
+--
+
+CREATE TABLE public.player_sessions (
+    profile integer NOT NULL,
+    "char" integer NOT NULL,
+    session_start timestamp without time zone NOT NULL,
+    session_end timestamp without time zone NOT NULL,
+    CONSTRAINT player_sessions_pkey PRIMARY KEY (profile, "char", session_start)
+);
+
+--
+-- Name: alt_candidates; Type: TABLE; Schema: public; Owner: sold
+--
+
+CREATE TABLE public.alt_candidates (
+    profile integer NOT NULL,
+    "char" integer NOT NULL,
+    other_profile integer NOT NULL,
+    other_char integer NOT NULL,
+    similarity real NOT NULL,
+    CONSTRAINT alt_candidates_pkey PRIMARY KEY (profile, "char", other_profile, other_char)
+);
+
+CREATE INDEX alt_candidates_other_idx ON public.alt_candidates USING btree (other_profile, other_char);
+
+--
+-- Name: activity_events; Type: TABLE; Schema: public; Owner: sold
+--
+
+CREATE TABLE public.activity_events (
+    profile integer NOT NULL,
+    "char" integer NOT NULL,
+    datetime timestamp without time zone NOT NULL,
+    online boolean NOT NULL,
+    CONSTRAINT activity_events_pkey PRIMARY KEY (profile, "char", datetime)
+);
+
+CREATE INDEX activity_events_datetime_idx ON public.activity_events USING btree (datetime);
+
+--
+-- Name: online_players; Type: TABLE; Schema: public; Owner: sold
+--
+
+CREATE UNLOGGED TABLE public.online_players (
+    profile integer NOT NULL,
+    "char" integer NOT NULL,
+    since timestamp without time zone NOT NULL,
+    CONSTRAINT online_players_pkey PRIMARY KEY (profile, "char")
+);
+
 --
 -- Name: profile_data; Type: TABLE; Schema: public; Owner: sold
 --
@@ -2626,6 +2717,34 @@ COPY public.profile_data (profile, "char", nick, lvl, clan, world) FROM stdin;
 \.
 
 
+--
+-- Name: profile_data_lvl_idx; Type: INDEX; Schema: public; Owner: sold
+--
+
+CREATE INDEX profile_data_lvl_idx ON public.profile_data USING btree (lvl, profile, "char");
+
+
+--
+-- Name: profile_data_nick_idx; Type: INDEX; Schema: public; Owner: sold
+--
+
+CREATE INDEX profile_data_nick_idx ON public.profile_data USING btree (nick, profile, "char");
+
+
+--
+-- Name: profile_data_lower_nick_idx; Type: INDEX; Schema: public; Owner: sold
+--
+
+CREATE INDEX profile_data_lower_nick_idx ON public.profile_data USING btree (lower((nick)::text) text_pattern_ops);
+
+
+--
+-- Name: activity_data_profile_char_datetime_idx; Type: INDEX; Schema: public; Owner: sold
+--
+
+CREATE INDEX activity_data_profile_char_datetime_idx ON public.activity_data USING btree (profile, "char", datetime);
+
+
 --
 -- PostgreSQL database dump complete
 --
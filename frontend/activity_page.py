@@ -1,8 +1,10 @@
 from nicegui import ui
 import base64
-from datetime import datetime
+from datetime import datetime, timedelta
 from frontend.activity_page_helpers import ActivityPageHelpers
+from frontend.clan_analytics import ClanActivity, ClanAnalytics
 from frontend.gui import Gui
+from backend.tracing import TRACER, set_span_attributes
 
 
 class ActivityPage(Gui):
@@ -20,11 +22,19 @@ class ActivityPage(Gui):
     start_time_str : str
         Default value for the start time input widget.
     input_nick : ui.input
-        NiceGUI input widget for the player's nick.
+        NiceGUI input widget for the player's nick, or several comma-separated nicks.
+    input_clan : ui.input
+        NiceGUI input widget for a clan whose members are compared.
     plot_area : ui.image
         NiceGUI image widget for displaying the activity plot.
+    stats_label : ui.label
+        NiceGUI label showing the playtime statistics of a single player, or the summary of a clan.
     helpers : ActivityPageHelpers
         Helper class instance for business logic and plotting.
+    clan_analytics : ClanAnalytics
+        Computes the online counts and co-online pairs of a clan.
+    clan_days : int
+        Days before the end of the plotted window covered by the clan summary.
 
     Methods
     -------
@@ -33,7 +43,17 @@ class ActivityPage(Gui):
     convert_datetime() -> datetime
         Combine start date and time input fields into a `datetime` object.
     make_plot()
-        Triggered on button click; retrieves player activity, generates and displays the plot.
+        Async handler triggered on button click; retrieves player activity, generates and displays the plot.
+    parse_nicks() -> list[str]
+        Split the nick input into separate nicks.
+    show_stats(nick: str)
+        Show the playtime statistics of a player below the plot.
+    format_stats(stats: dict) -> str
+        Format playtime statistics for display.
+    show_clan_summary(clan: str, end_date: datetime)
+        Show the peak online time and the closest member pairs of a clan below the heatmap.
+    format_clan(activity: ClanActivity) -> str
+        Format a clan summary for display.
     """
 
     def __init__(self):
@@ -43,18 +63,24 @@ class ActivityPage(Gui):
         self.start_date_str = "2025-06-28"
         self.start_time_str = "11:00"
         self.input_nick = None
+        self.input_clan = None
         self.plot_area = None
+        self.stats_label = None
         self.helpers = ActivityPageHelpers()
+        self.clan_analytics = ClanAnalytics()
+        self.clan_days = 7
 
     def page(self):
         """
         Build the user interface for the Activity page.
 
         The page includes:
-            - Player nick input
+            - Player nick input (one nick, or several comma-separated nicks)
+            - Clan input, comparing all members of a clan
             - Date and time input fields
             - Button to fetch and plot activity
             - Output area for the plot image
+            - Playtime statistics of a single player, or a summary of the clan
 
         Returns
         -------
@@ -65,9 +91,12 @@ class ActivityPage(Gui):
             f"{self.background} w-full min-h-screen items-center justify-start"
         ):
             self.navbar()
-            self.input_nick = ui.input("Nick", placeholder="Enter player nick").classes(
-                "w-[400px] text-lg mt-14"
-            )
+            self.input_nick = ui.input(
+                "Nick", placeholder="Enter player nick(s), comma-separated"
+            ).classes("w-[400px] text-lg mt-14")
+            self.input_clan = ui.input(
+                "Clan", placeholder="Enter clan to compare its members"
+            ).classes("w-[400px] text-lg")
             with ui.column().classes("mt-5 items-start"):
                 with ui.row().classes("gap-1 items-center"):
                     self.start_date = (
@@ -90,6 +119,7 @@ class ActivityPage(Gui):
             self.plot_area = ui.image().classes(
                 "w-[900px] h-[400px] mt-10 bg-gray-50 border border-gray-300"
             )
+            self.stats_label = ui.label("").classes("text-lg mt-4")
 
     def convert_datetime(self):
         """
@@ -112,31 +142,178 @@ class ActivityPage(Gui):
         except Exception as e:
             raise ValueError(f"Invalid date or time: {e}")
 
-    def make_plot(self):
+    def parse_nicks(self) -> list[str]:
+        """
+        Split the nick input into separate, non-empty nicks.
+
+        Returns
+        -------
+        list[str]
+            Nicks in input order.
+        """
+        return [
+            nick.strip() for nick in self.input_nick.value.split(",") if nick.strip()
+        ]
+
+    @TRACER.start_as_current_span("ActivityPage.make_plot")
+    async def make_plot(self):
         """
         Handler for the "Show player activity" button.
 
-        Gets user input, validates it, fetches player activity data from the helpers,
-        and displays the plot image. Shows user notifications on errors or empty results.
+        Gets user input, validates it, fetches the activity plot from the helpers
+        (rendered off the event loop or served from the plot cache) and displays it.
+        A single nick is shown as a bar chart; several nicks or a clan are compared
+        in a heatmap with one row per player.
+        Shows user notifications on errors or empty results.
+        Each stage is traced (backend/tracing.py), with the number of nicks on the handler span.
 
         Returns
         -------
         None
         """
-        nick = self.input_nick.value.strip()
+        nicks = self.parse_nicks()
+        clan = self.input_clan.value.strip() if self.input_clan is not None else ""
         date = self.convert_datetime()
         self.plot_area.source = ""
+        if self.stats_label is not None:
+            self.stats_label.text = ""
+
+        if clan:
+            clan_nicks = await self.helpers.clan_nicks(clan)
+            if not clan_nicks:
+                ui.notify(f"No members found for clan {clan}", color="red")
+                return
+            nicks = list(dict.fromkeys(nicks + clan_nicks))
 
-        if not nick:
+        if not nicks:
             ui.notify("Please enter a nick!", color="red")
             return
+        set_span_attributes(nicks=len(nicks), clan=clan or None)
 
-        timestamps = self.helpers.get_player_activity(nick=nick, start_date=date)
-        if not timestamps:
-            ui.notify(f"No activity found for nick {nick}", color="red")
-            return
+        if len(nicks) == 1 and not clan:
+            nick = nicks[0]
+            img = await self.helpers.get_activity_plot(nick=nick, start_date=date)
+            if img is None:
+                ui.notify(f"No activity found for nick {nick}", color="red")
+                return
+            await self.show_stats(nick)
+        else:
+            img, missing = await self.helpers.get_activity_heatmap(
+                nicks=nicks, start_date=date
+            )
+            if missing:
+                ui.notify(f"Nicks not found: {', '.join(missing)}", color="orange")
+            if img is None:
+                ui.notify("No activity found for the given players", color="red")
+                return
+            if clan:
+                await self.show_clan_summary(
+                    clan, self.helpers.calculate_end_date(start_date=date)
+                )
 
-        img = self.helpers.gui_plot_player_activity(timestamps=timestamps)
-        img_b64 = base64.b64encode(img.read()).decode("ascii")
+        with TRACER.start_as_current_span("encode_base64") as span:
+            img_b64 = base64.b64encode(img.read()).decode("ascii")
+            span.set_attribute("base64_bytes", len(img_b64))
         data_url = f"data:image/png;base64,{img_b64}"
         self.plot_area.source = data_url
+
+    @TRACER.start_as_current_span("ActivityPage.show_stats")
+    async def show_stats(self, nick: str):
+        """
+        Show the playtime statistics of a player below the plot.
+
+        Parameters
+        ----------
+        nick : str
+            Nickname of the player.
+
+        Returns
+        -------
+        None
+        """
+        stats = await self.helpers.get_player_stats(nick=nick)
+        if self.stats_label is not None and stats:
+            self.stats_label.text = self.format_stats(stats)
+
+    @staticmethod
+    def format_stats(stats: dict) -> str:
+        """
+        Format playtime statistics for display.
+
+        Parameters
+        ----------
+        stats : dict
+            Statistics as returned by SessionEngine.stats.
+
+        Returns
+        -------
+        str
+            One-line summary of sessions, playtime, typical hours and streaks.
+        """
+        daily = stats["daily_playtime"]
+        hours = ", ".join(f"{hour}:00" for hour in stats["typical_hours"]) or "-"
+        return (
+            f"Sessions (30 days): {stats['sessions']}, "
+            f"avg {stats['average_session_minutes']:.0f} min, "
+            f"avg daily playtime {sum(daily.values()) / max(len(daily), 1):.0f} min | "
+            f"Typical hours: {hours} | "
+            f"Streak: {stats['current_streak']} days (longest {stats['longest_streak']})"
+        )
+
+    @TRACER.start_as_current_span("ActivityPage.show_clan_summary")
+    async def show_clan_summary(self, clan: str, end_date: datetime):
+        """
+        Show when a clan was most online and which members play together, over clan_days before end_date.
+
+        Parameters
+        ----------
+        clan : str
+            Name of the clan.
+        end_date : datetime
+            End of the summarized window.
+
+        Returns
+        -------
+        None
+        """
+        activity = await self.clan_analytics.analyze_async(
+            clan,
+            end_date - timedelta(days=self.clan_days),
+            end_date,
+            bucket_minutes=60,
+        )
+        if self.stats_label is not None and activity is not None:
+            self.stats_label.text = self.format_clan(activity)
+
+    @staticmethod
+    def format_clan(activity: ClanActivity) -> str:
+        """
+        Format a clan summary for display.
+
+        Parameters
+        ----------
+        activity : ClanActivity
+            Activity of the clan, as returned by ClanAnalytics.analyze.
+
+        Returns
+        -------
+        str
+            One-line summary of the peak online hour and the members most often online together.
+        """
+        days = (activity.end_date - activity.start_date).days
+        counts = activity.online_counts
+        if not len(counts) or not counts.max():
+            return f"Clan {activity.clan}: no activity in the last {days} days"
+        peak = int(counts.argmax())
+        pairs = (
+            ", ".join(
+                f"{first} & {second} ({score:.0%})"
+                for first, second, score in activity.top_pairs(3)
+            )
+            or "-"
+        )
+        return (
+            f"Clan {activity.clan} ({days} days): "
+            f"peak {counts[peak]} online at {activity.bucket_starts[peak]:%Y-%m-%d %H:%M} | "
+            f"Most often online together: {pairs}"
+        )
@@ -1,7 +1,19 @@
+import asyncio
+import os
 from datetime import datetime, timedelta
+from functools import partial
 from io import BytesIO
-import matplotlib.pyplot as plt
-from backend.db_operations import DbOperations
+from nicegui import run
+from backend.activity_events import ActivityEventReader
+from backend.async_db_operations import AsyncDbOperations
+from backend.db_operations import DbOperations, MINUTES_PER_DAY
+from backend.retention import ROLLUP_READER, RollupReader
+from backend.session_stats import SESSION_COLUMNS, SessionEngine
+from backend.tracing import TRACER, set_span_attributes
+from frontend.nick_resolver import NICK_RESOLVER, NickResolver
+from frontend.plot_cache import PLOT_CACHE, PlotCache
+from frontend.plot_renderer import PlotRenderer
+from frontend.profile_snapshot import PROFILE_SNAPSHOTS, ProfileSnapshotService
 from typing import Any
 
 
@@ -26,26 +38,85 @@ class ActivityPageHelpers:
     db : DbOperations
         Instance for database operations.
     connection : Any
-        Active database connection.
+        Database connection, opened on first use.
+    async_db : AsyncDbOperations
+        Pooled, awaitable database operations used by the async methods.
+    plot_cache : PlotCache
+        Process-wide cache of rendered activity plots.
+    nick_resolver : NickResolver
+        Shared nick -> (profile, char) resolver, consistent across pages.
+    snapshots : ProfileSnapshotService
+        Shared profile snapshot, used to list clan members.
+    activity_source : str
+        Table single-player plots are read from: 'rows' (activity_data), 'bitmap' (activity_bitmap)
+        or 'events' (activity_events), set with the ACTIVITY_SOURCE environment variable.
+    rollup : RollupReader
+        Reads the part of an activity_data window that retention already rolled up.
 
     Methods
     -------
     get_player_activity(nick: str, start_date: datetime) -> list[datetime] | None
         Retrieves activity timestamps for a player by nickname and date range.
+    resolve_profile_char(nick: str) -> tuple | None
+        Resolves a nickname to its (profile, char) pair.
+    activity_query(profile, char, start_date: datetime, end_date: datetime) -> dict
+        Builds the select arguments fetching the activity of one character.
+    fetch_activity(profile, char, start_date: datetime, end_date: datetime) -> list[datetime]
+        Retrieves activity timestamps for a character within a time window.
+    resolve_profile_char_async(nick: str) -> tuple | None
+        Awaitable variant of resolve_profile_char.
+    fetch_activity_async(profile, char, start_date: datetime, end_date: datetime) -> list[datetime]
+        Awaitable variant of fetch_activity.
+    get_activity_plot(nick: str, start_date: datetime) -> BytesIO | None
+        Returns the activity plot for a player, served from the plot cache when possible.
+    get_player_stats(nick: str, days: int = 30) -> dict | None
+        Returns the playtime statistics of a player from the stored sessions.
+    bitmap_query(profile, char, start_date: datetime, end_date: datetime) -> dict
+        Builds the select arguments fetching the daily presence bitmaps of a window.
+    decode_bitmaps(rows: list, start_date, end_date, interval_minutes) -> list[int]
+        Decodes daily presence bitmaps into the presence array of a window.
+    fetch_presence_bitmap(profile, char, start_date: datetime, end_date: datetime) -> list[int]
+        Reads the presence array of a character from the activity_bitmap table.
+    fetch_presence_bitmap_async(profile, char, start_date: datetime, end_date: datetime) -> list[int]
+        Awaitable variant of fetch_presence_bitmap.
+    fetch_activity_events_async(profile, char, start_date: datetime, end_date: datetime) -> list[datetime]
+        Reconstructs activity timestamps of a character from the activity_events table.
+    activity_query_many(profile_chars: list[tuple], start_date, end_date) -> dict
+        Builds the select arguments fetching the activity of many characters at once.
+    group_activity(profile_chars: list[tuple], rows: list) -> dict
+        Groups activity rows by character.
+    fetch_activity_many(profile_chars: list[tuple], start_date, end_date) -> dict
+        Retrieves activity timestamps of many characters with one query.
+    fetch_activity_many_async(profile_chars: list[tuple], start_date, end_date) -> dict
+        Awaitable variant of fetch_activity_many.
+    clan_nicks(clan: str) -> list[str]
+        Returns the nicks of all characters in a clan.
+    get_activity_heatmap(nicks: list[str], start_date: datetime) -> tuple[BytesIO | None, list[str]]
+        Returns a heatmap comparing the activity of many players, and the nicks not found.
+    gui_plot_heatmap_async(row_labels: list[str], timestamps_by_player: list[list[datetime]]) -> BytesIO
+        Renders the activity heatmap in a worker process off the event loop.
     plot_player_activity(timestamps: list[datetime])
         Plots a bar chart on the screen of activity presence per interval.
     gui_plot_player_activity(timestamps: list[datetime]) -> BytesIO
         Returns a PNG image of the player activity plot, for GUI or web use.
+    gui_plot_player_activity_async(timestamps: list[datetime]) -> BytesIO
+        Same as gui_plot_player_activity, but renders in a worker process off the event loop.
+    gui_plot_presence_async(activity_presence: list[int]) -> BytesIO
+        Renders a presence array in a worker process off the event loop.
     generate_intervals() -> list[datetime]
         Builds a list of interval boundaries over the selected time range.
     activity_presence_array(intervals: list[datetime], timestamps: list[datetime]) -> list[int]
         Computes array: 1 if player was active in interval, else 0.
+    activity_matrix(intervals: list[datetime], timestamps_by_player: list[list[datetime]]) -> list[list[int]]
+        Computes one activity presence row per player.
     render_bar_chart(interval_labels: list[str], activity_presence: list[int])
         Renders an on-screen bar chart of activity.
     render_bar_chart_to_bytesio(interval_labels: list[str], activity_presence: list[int]) -> BytesIO
         Exports activity bar chart to a BytesIO PNG image object.
     calculate_end_date(start_date: datetime) -> datetime
         Computes the default end of interval window (1 hour ahead).
+    chart_title() -> str
+        Returns the title of the activity chart for the selected time range.
     """
 
     def __init__(self):
@@ -60,7 +131,27 @@ class ActivityPageHelpers:
         self.end_date = None
         self.db_name = "mgspy"
         self.db: DbOperations = DbOperations(db_name=self.db_name)
-        self.connection: Any = self.db.connect_to_db()
+        self._connection: Any = None
+        self.async_db: AsyncDbOperations = AsyncDbOperations(db_name=self.db_name)
+        self.plot_cache: PlotCache = PLOT_CACHE
+        self.nick_resolver: NickResolver = NICK_RESOLVER
+        self.snapshots: ProfileSnapshotService = PROFILE_SNAPSHOTS
+        self.activity_source = os.environ.get("ACTIVITY_SOURCE", "rows")
+        self.rollup: RollupReader = ROLLUP_READER
+
+    @property
+    def connection(self) -> Any:
+        """
+        Database connection, opened on first use so the frontend can start before the database is ready.
+
+        Returns
+        -------
+        Any
+            Active database connection.
+        """
+        if self._connection is None:
+            self._connection = self.db.connect_to_db()
+        return self._connection
 
     def get_player_activity(
         self, nick: str, start_date: datetime
@@ -85,32 +176,658 @@ class ActivityPageHelpers:
         -----------
         Sets self.start_date and self.end_date for future plotting.
         """
-        profile_char_rows = self.db.select_data(
-            db_connection=self.connection,
-            table="profile_data",
-            columns="profile, char",
-            where_clause="nick = %s",
-            params=(nick,),
+        profile_char = self.resolve_profile_char(nick)
+        if profile_char is None:
+            return None
+        profile, char = profile_char
+        end_date = self.calculate_end_date(start_date=start_date)
+        timestamps = self.fetch_activity(profile, char, start_date, end_date)
+        self.start_date = start_date
+        self.end_date = end_date
+        return timestamps
+
+    def resolve_profile_char(self, nick: str) -> tuple | None:
+        """
+        Resolve a player nickname to its profile and character IDs (case-insensitive).
+
+        Parameters
+        ----------
+        nick : str
+            Nickname of the player.
+
+        Returns
+        -------
+        tuple or None
+            (profile, char) pair, or None if the nickname is not found.
+        """
+        profile_char = self.nick_resolver.resolve(nick)
+        if profile_char is None:
+            print(f"No profile/char found for nick: {nick}")
+        return profile_char
+
+    @staticmethod
+    def activity_query(
+        profile: Any, char: Any, start_date: datetime, end_date: datetime
+    ) -> dict:
+        """
+        Build select arguments fetching the activity of one character within [start_date, end_date).
+
+        Parameters
+        ----------
+        profile : Any
+            Profile ID of the player.
+        char : Any
+            Character ID of the player.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        dict
+            Keyword arguments of select_data.
+        """
+        return {
+            "table": "activity_data",
+            "columns": "profile, char, datetime",
+            "where_clause": "profile = %s AND char = %s AND datetime >= %s AND datetime < %s",
+            "params": (profile, char, start_date, end_date),
+        }
+
+    def fetch_activity(
+        self, profile: Any, char: Any, start_date: datetime, end_date: datetime
+    ) -> list[datetime]:
+        """
+        Retrieve activity timestamps of a character within [start_date, end_date).
+
+        Windows older than the retention watermark are read from activity_rollup.
+
+        Parameters
+        ----------
+        profile : Any
+            Profile ID of the player.
+        char : Any
+            Character ID of the player.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        list[datetime]
+            Activity datetimes of the character.
+        """
+        tuples = self.rollup.read(
+            self.db,
+            self.connection,
+            partial(self.activity_query, profile, char),
+            [(profile, char)],
+            start_date,
+            end_date,
         )
-        if not profile_char_rows:
+        return [dt for _, _, dt in tuples]
+
+    @TRACER.start_as_current_span("ActivityPageHelpers.resolve_profile_char_async")
+    async def resolve_profile_char_async(self, nick: str) -> tuple | None:
+        """
+        Resolve a player nickname to its profile and character IDs without blocking the event loop.
+
+        Parameters
+        ----------
+        nick : str
+            Nickname of the player.
+
+        Returns
+        -------
+        tuple or None
+            (profile, char) pair, or None if the nickname is not found.
+        """
+        profile_char = await self.nick_resolver.resolve_async(nick)
+        set_span_attributes(found=profile_char is not None)
+        if profile_char is None:
             print(f"No profile/char found for nick: {nick}")
-            return None
-        profile, char = profile_char_rows[0]
+        return profile_char
+
+    @TRACER.start_as_current_span("ActivityPageHelpers.fetch_activity_async")
+    async def fetch_activity_async(
+        self, profile: Any, char: Any, start_date: datetime, end_date: datetime
+    ) -> list[datetime]:
+        """
+        Retrieve activity timestamps of a character within [start_date, end_date)
+        without blocking the event loop.
+
+        Windows older than the retention watermark are read from activity_rollup.
+
+        Parameters
+        ----------
+        profile : Any
+            Profile ID of the player.
+        char : Any
+            Character ID of the player.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        list[datetime]
+            Activity datetimes of the character.
+        """
+        tuples = await self.rollup.read_async(
+            self.async_db,
+            partial(self.activity_query, profile, char),
+            [(profile, char)],
+            start_date,
+            end_date,
+        )
+        set_span_attributes(rows=len(tuples))
+        return [dt for _, _, dt in tuples]
+
+    @TRACER.start_as_current_span("ActivityPageHelpers.get_activity_plot")
+    async def get_activity_plot(
+        self, nick: str, start_date: datetime
+    ) -> BytesIO | None:
+        """
+        Get the activity plot of a player for a one-hour window starting at start_date.
+
+        Rendered plots are cached by (profile, char, start, end, resolution), so repeated
+        requests for the same player and window skip both the activity query and rendering.
+
+        Parameters
+        ----------
+        nick : str
+            Nickname of the player.
+        start_date : datetime
+            Start of the window.
 
-        where_clause = "profile = %s AND char = %s AND datetime >= %s AND datetime < %s"
+        Returns
+        -------
+        BytesIO or None
+            In-memory PNG chart, or None if the player or their activity is not found.
+        """
+        profile_char = await self.resolve_profile_char_async(nick)
+        if profile_char is None:
+            return None
+        profile, char = profile_char
         end_date = self.calculate_end_date(start_date=start_date)
-        params = (profile, char, start_date, end_date)
-        tuples = self.db.select_data(
+        key = self.plot_cache.make_key(
+            profile, char, start_date, end_date, self.interval_minutes
+        )
+        png = self.plot_cache.get(key)
+        set_span_attributes(cache_hit=png is not None, source=self.activity_source)
+        if png is not None:
+            return BytesIO(png)
+
+        if self.activity_source == "bitmap":
+            activity_presence = await self.fetch_presence_bitmap_async(
+                profile, char, start_date, end_date
+            )
+            if not any(activity_presence):
+                return None
+            self.start_date = start_date
+            self.end_date = end_date
+            img = await self.gui_plot_presence_async(activity_presence)
+        else:
+            if self.activity_source == "events":
+                timestamps = await self.fetch_activity_events_async(
+                    profile, char, start_date, end_date
+                )
+            else:
+                timestamps = await self.fetch_activity_async(
+                    profile, char, start_date, end_date
+                )
+            if not timestamps:
+                return None
+            self.start_date = start_date
+            self.end_date = end_date
+            img = await self.gui_plot_player_activity_async(timestamps=timestamps)
+        self.plot_cache.put(key, img.getvalue(), end_date)
+        return img
+
+    @TRACER.start_as_current_span("ActivityPageHelpers.get_player_stats")
+    async def get_player_stats(self, nick: str, days: int = 30) -> dict | None:
+        """
+        Get the playtime statistics of a player over the last days, from the player_sessions table.
+
+        Parameters
+        ----------
+        nick : str
+            Nickname of the player.
+        days : int, optional
+            Number of days to include (default: 30).
+
+        Returns
+        -------
+        dict or None
+            Statistics as returned by SessionEngine.stats, or None if the player is not found.
+        """
+        profile_char = await self.resolve_profile_char_async(nick)
+        if profile_char is None:
+            return None
+        profile, char = profile_char
+        since = datetime.now() - timedelta(days=days)
+        sessions = await self.async_db.select_data_async(
+            table="player_sessions",
+            columns=SESSION_COLUMNS,
+            where_clause="profile = %s AND char = %s AND session_end >= %s",
+            params=(profile, char, since),
+            order_by="session_start",
+        )
+        set_span_attributes(sessions=len(sessions))
+        return SessionEngine.stats(sessions)
+
+    @staticmethod
+    def bitmap_query(
+        profile: Any, char: Any, start_date: datetime, end_date: datetime
+    ) -> dict:
+        """
+        Build select arguments fetching the daily presence bitmaps covering [start_date, end_date).
+
+        Parameters
+        ----------
+        profile : Any
+            Profile ID of the player.
+        char : Any
+            Character ID of the player.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        dict
+            Keyword arguments of select_data.
+        """
+        last_day = (end_date - timedelta(microseconds=1)).date()
+        return {
+            "table": "activity_bitmap",
+            "columns": "day, minutes",
+            "where_clause": "profile = %s AND char = %s AND day >= %s AND day <= %s",
+            "params": (profile, char, start_date.date(), last_day),
+            "order_by": "day",
+        }
+
+    @staticmethod
+    def decode_bitmaps(
+        rows: list,
+        start_date: datetime,
+        end_date: datetime,
+        interval_minutes: int = 1,
+    ) -> list[int]:
+        """
+        Decode daily presence bitmaps into the activity presence array of a window.
+
+        Days without a bitmap count as absent. Presence is computed per started minute,
+        the same way as activity_presence_array buckets activity_data timestamps.
+
+        Parameters
+        ----------
+        rows : list
+            Rows (day, minutes) of the activity_bitmap table, minutes being a '0'/'1' string.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+        interval_minutes : int, optional
+            Minutes per interval of the presence array (default: 1).
+
+        Returns
+        -------
+        list[int]
+            Binary array of activity presence per interval (1 = present, 0 = absent).
+        """
+        bitmaps = {day: minutes for day, minutes in rows}
+        first_day = start_date.date()
+        day = first_day
+        bits = []
+        while datetime.combine(day, datetime.min.time()) < end_date:
+            bits.append(bitmaps.get(day) or "0" * MINUTES_PER_DAY)
+            day += timedelta(days=1)
+        day_start = datetime.combine(first_day, datetime.min.time())
+        first = int((start_date - day_start).total_seconds() // 60)
+        last = -int(-(end_date - day_start).total_seconds() // 60)
+        window = "".join(bits)[first:last]
+        return [
+            int("1" in window[i : i + interval_minutes])
+            for i in range(0, len(window), interval_minutes)
+        ]
+
+    def fetch_presence_bitmap(
+        self, profile: Any, char: Any, start_date: datetime, end_date: datetime
+    ) -> list[int]:
+        """
+        Read the activity presence array of a character from the activity_bitmap table.
+
+        Parameters
+        ----------
+        profile : Any
+            Profile ID of the player.
+        char : Any
+            Character ID of the player.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        list[int]
+            Binary array of activity presence per interval.
+        """
+        rows = self.db.select_data(
             db_connection=self.connection,
-            table="activity_data",
-            columns="profile, char, datetime",
-            where_clause=where_clause,
-            params=params,
+            **self.bitmap_query(profile, char, start_date, end_date),
+        )
+        return self.decode_bitmaps(rows, start_date, end_date, self.interval_minutes)
+
+    @TRACER.start_as_current_span("ActivityPageHelpers.fetch_presence_bitmap_async")
+    async def fetch_presence_bitmap_async(
+        self, profile: Any, char: Any, start_date: datetime, end_date: datetime
+    ) -> list[int]:
+        """
+        Read the activity presence array of a character without blocking the event loop.
+
+        Parameters
+        ----------
+        profile : Any
+            Profile ID of the player.
+        char : Any
+            Character ID of the player.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        list[int]
+            Binary array of activity presence per interval.
+        """
+        rows = await self.async_db.select_data_async(
+            **self.bitmap_query(profile, char, start_date, end_date)
         )
-        timestamps = [dt for _, _, dt in tuples]
+        set_span_attributes(rows=len(rows))
+        return self.decode_bitmaps(rows, start_date, end_date, self.interval_minutes)
+
+    @TRACER.start_as_current_span("ActivityPageHelpers.fetch_activity_events_async")
+    async def fetch_activity_events_async(
+        self, profile: Any, char: Any, start_date: datetime, end_date: datetime
+    ) -> list[datetime]:
+        """
+        Reconstruct the activity timestamps of a character from its login and logout events.
+
+        Parameters
+        ----------
+        profile : Any
+            Profile ID of the player.
+        char : Any
+            Character ID of the player.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        list[datetime]
+            Activity timestamps, as fetch_activity_async reads them from activity_data.
+        """
+        profile_chars = [(profile, char)]
+        rows = await self.async_db.select_data_async(
+            **ActivityEventReader.state_query(start_date, profile_chars=profile_chars)
+        )
+        rows += await self.async_db.select_data_async(
+            **ActivityEventReader.events_query(start_date, end_date, profile_chars)
+        )
+        intervals = ActivityEventReader.intervals(
+            ActivityEventReader.select_chars(rows, profile_chars), end_date
+        )
+        timestamps = ActivityEventReader.timestamps(intervals, start_date, end_date)
+        set_span_attributes(rows=len(rows), intervals=len(intervals))
+        return timestamps.get((int(profile), int(char)), [])
+
+    @staticmethod
+    def activity_query_many(
+        profile_chars: list[tuple], start_date: datetime, end_date: datetime
+    ) -> dict:
+        """
+        Build select arguments fetching the activity of many characters within [start_date, end_date).
+
+        The query matches the profiles and characters with `= ANY(%s)`, so it may return
+        rows of other characters of the same profiles; fetch_activity_many drops them.
+
+        Parameters
+        ----------
+        profile_chars : list[tuple]
+            (profile, char) pairs of the characters.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        dict
+            Keyword arguments of select_data.
+        """
+        profiles = sorted({int(profile) for profile, _ in profile_chars})
+        chars = sorted({int(char) for _, char in profile_chars})
+        return {
+            "table": "activity_data",
+            "columns": "profile, char, datetime",
+            "where_clause": "profile = ANY(%s) AND char = ANY(%s) AND datetime >= %s AND datetime < %s",
+            "params": (profiles, chars, start_date, end_date),
+        }
+
+    @staticmethod
+    def group_activity(profile_chars: list[tuple], rows: list) -> dict:
+        """
+        Group activity rows by character.
+
+        Parameters
+        ----------
+        profile_chars : list[tuple]
+            (profile, char) pairs of the requested characters.
+        rows : list
+            Rows (profile, char, datetime) of the activity_data table.
+
+        Returns
+        -------
+        dict
+            (profile, char) -> list of activity datetimes, for every requested character.
+        """
+        keys = {
+            (int(profile), int(char)): (profile, char)
+            for profile, char in profile_chars
+        }
+        activity: dict = {profile_char: [] for profile_char in profile_chars}
+        for profile, char, dt in rows:
+            profile_char = keys.get((int(profile), int(char)))
+            if profile_char is not None:
+                activity[profile_char].append(dt)
+        return activity
+
+    def fetch_activity_many(
+        self, profile_chars: list[tuple], start_date: datetime, end_date: datetime
+    ) -> dict:
+        """
+        Retrieve activity timestamps of many characters within [start_date, end_date) with one query.
+
+        Windows older than the retention watermark are read from activity_rollup instead.
+
+        Parameters
+        ----------
+        profile_chars : list[tuple]
+            (profile, char) pairs of the characters.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        dict
+            (profile, char) -> list of activity datetimes.
+        """
+        if not profile_chars:
+            return {}
+        rows = self.rollup.read(
+            self.db,
+            self.connection,
+            partial(self.activity_query_many, profile_chars),
+            profile_chars,
+            start_date,
+            end_date,
+        )
+        return self.group_activity(profile_chars, rows)
+
+    @TRACER.start_as_current_span("ActivityPageHelpers.fetch_activity_many_async")
+    async def fetch_activity_many_async(
+        self, profile_chars: list[tuple], start_date: datetime, end_date: datetime
+    ) -> dict:
+        """
+        Retrieve activity timestamps of many characters with one query, without blocking the event loop.
+
+        Windows older than the retention watermark are read from activity_rollup instead.
+
+        Parameters
+        ----------
+        profile_chars : list[tuple]
+            (profile, char) pairs of the characters.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        dict
+            (profile, char) -> list of activity datetimes.
+        """
+        if not profile_chars:
+            return {}
+        rows = await self.rollup.read_async(
+            self.async_db,
+            partial(self.activity_query_many, profile_chars),
+            profile_chars,
+            start_date,
+            end_date,
+        )
+        set_span_attributes(characters=len(profile_chars), rows=len(rows))
+        return self.group_activity(profile_chars, rows)
+
+    async def clan_nicks(self, clan: str) -> list[str]:
+        """
+        Get the nicks of all characters in a clan (case-insensitive), highest level first.
+
+        Parameters
+        ----------
+        clan : str
+            Name of the clan.
+
+        Returns
+        -------
+        list[str]
+            Nicks of the clan members, empty if the clan is not found.
+        """
+        snapshot = await asyncio.to_thread(lambda: self.snapshots.snapshot)
+        return [row[2] for row in snapshot.clan_index.get(clan.strip().lower(), [])]
+
+    @TRACER.start_as_current_span("ActivityPageHelpers.get_activity_heatmap")
+    async def get_activity_heatmap(
+        self, nicks: list[str], start_date: datetime
+    ) -> tuple[BytesIO | None, list[str]]:
+        """
+        Get a heatmap comparing the activity of many players in a one-hour window starting at start_date.
+
+        All nicks are resolved together (from the profile snapshot, or with one query) and
+        their activity is fetched with a single query, so N players cost one round trip
+        instead of 2N. Rendered heatmaps are cached like single-player plots.
+
+        Parameters
+        ----------
+        nicks : list[str]
+            Nicknames of the players, one heatmap row each.
+        start_date : datetime
+            Start of the window.
+
+        Returns
+        -------
+        tuple[BytesIO | None, list[str]]
+            In-memory PNG heatmap (None if no player or activity is found), and the nicks not found.
+        """
+        nicks = list(dict.fromkeys(nicks))
+        resolved = await self.nick_resolver.resolve_many_async(nicks)
+        missing = [nick for nick in nicks if nick not in resolved]
+        set_span_attributes(nicks=len(nicks), resolved=len(resolved))
+        if not resolved:
+            return None, missing
+        profile_chars = list(dict.fromkeys(resolved.values()))
+        end_date = self.calculate_end_date(start_date=start_date)
+        key = self.plot_cache.make_key(
+            ",".join(f"{nick}={profile}" for nick, (profile, _) in resolved.items()),
+            ",".join(str(char) for _, char in resolved.values()),
+            start_date,
+            end_date,
+            self.interval_minutes,
+        )
+        png = self.plot_cache.get(key)
+        set_span_attributes(cache_hit=png is not None)
+        if png is not None:
+            return BytesIO(png), missing
+
+        activity = await self.fetch_activity_many_async(
+            profile_chars, start_date, end_date
+        )
+        if not any(activity.values()):
+            return None, missing
         self.start_date = start_date
         self.end_date = end_date
-        return timestamps
+        img = await self.gui_plot_heatmap_async(
+            list(resolved),
+            [activity[profile_char] for profile_char in resolved.values()],
+        )
+        self.plot_cache.put(key, img.getvalue(), end_date)
+        return img, missing
+
+    @TRACER.start_as_current_span("ActivityPageHelpers.gui_plot_heatmap_async")
+    async def gui_plot_heatmap_async(
+        self, row_labels: list[str], timestamps_by_player: list[list[datetime]]
+    ) -> BytesIO:
+        """
+        Prepare the activity heatmap as a PNG image without blocking the event loop.
+
+        Parameters
+        ----------
+        row_labels : list[str]
+            Player labels, one per heatmap row.
+        timestamps_by_player : list[list[datetime]]
+            Activity event timestamps of each player, in row order.
+
+        Returns
+        -------
+        BytesIO
+            In-memory PNG heatmap, ready for embedding in GUI or web applications.
+        """
+        intervals = self.generate_intervals()
+        with TRACER.start_as_current_span("bucket_activity") as span:
+            matrix = self.activity_matrix(intervals, timestamps_by_player)
+            span.set_attribute("players", len(matrix))
+            span.set_attribute("buckets", len(intervals) - 1)
+        interval_labels = [dt.strftime("%H:%M") for dt in intervals[:-1]]
+        png = await run.cpu_bound(
+            PlotRenderer.render_heatmap_png,
+            interval_labels,
+            row_labels,
+            matrix,
+            self.chart_title(),
+        )
+        set_span_attributes(png_bytes=len(png))
+        return BytesIO(png)
 
     def plot_player_activity(self, timestamps: list[datetime]):
         """
@@ -149,6 +866,58 @@ class ActivityPageHelpers:
         interval_labels = [dt.strftime("%H:%M") for dt in intervals[:-1]]
         return self.render_bar_chart_to_bytesio(interval_labels, activity_presence)
 
+    async def gui_plot_player_activity_async(
+        self, timestamps: list[datetime]
+    ) -> BytesIO:
+        """
+        Prepare the activity plot as a PNG image without blocking the event loop.
+
+        The chart data is computed in the calling coroutine, while rendering runs
+        in NiceGUI's process pool, so concurrent plot requests scale across cores.
+
+        Parameters
+        ----------
+        timestamps : list[datetime]
+            Player activity event timestamps to visualize.
+
+        Returns
+        -------
+        BytesIO
+            In-memory PNG chart, ready for embedding in GUI or web applications.
+        """
+        intervals = self.generate_intervals()
+        with TRACER.start_as_current_span("bucket_activity") as span:
+            activity_presence = self.activity_presence_array(intervals, timestamps)
+            span.set_attribute("timestamps", len(timestamps))
+            span.set_attribute("buckets", len(activity_presence))
+        return await self.gui_plot_presence_async(activity_presence)
+
+    @TRACER.start_as_current_span("ActivityPageHelpers.gui_plot_presence_async")
+    async def gui_plot_presence_async(self, activity_presence: list[int]) -> BytesIO:
+        """
+        Render an activity presence array of the selected window as a PNG image without blocking the event loop.
+
+        Parameters
+        ----------
+        activity_presence : list[int]
+            Binary array of activity presence, one value per interval.
+
+        Returns
+        -------
+        BytesIO
+            In-memory PNG chart, ready for embedding in GUI or web applications.
+        """
+        intervals = self.generate_intervals()
+        interval_labels = [dt.strftime("%H:%M") for dt in intervals[:-1]]
+        png = await run.cpu_bound(
+            PlotRenderer.render_bar_chart_png,
+            interval_labels,
+            activity_presence,
+            self.chart_title(),
+        )
+        set_span_attributes(buckets=len(activity_presence), png_bytes=len(png))
+        return BytesIO(png)
+
     def generate_intervals(self) -> list[datetime]:
         """
         Generate boundary datetimes separating each aggregation interval between start_date and end_date.
@@ -200,6 +969,30 @@ class ActivityPageHelpers:
                 ts_idx += 1
         return activity_presence
 
+    @classmethod
+    def activity_matrix(
+        cls, intervals: list[datetime], timestamps_by_player: list[list[datetime]]
+    ) -> list[list[int]]:
+        """
+        Bucket the activity of many players into one presence row per player.
+
+        Parameters
+        ----------
+        intervals : list[datetime]
+            List of datetime interval boundaries.
+        timestamps_by_player : list[list[datetime]]
+            Activity event datetimes of each player.
+
+        Returns
+        -------
+        list[list[int]]
+            Matrix of shape (players, len(intervals) - 1); 1 = present, 0 = absent.
+        """
+        return [
+            cls.activity_presence_array(intervals, timestamps)
+            for timestamps in timestamps_by_player
+        ]
+
     def render_bar_chart(
         self, interval_labels: list[str], activity_presence: list[int]
     ):
@@ -217,13 +1010,15 @@ class ActivityPageHelpers:
         -------
         None
         """
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(12, 5))
         plt.bar(interval_labels, activity_presence, width=0.8, align="center")
         plt.xticks(rotation=45)
         plt.yticks([0, 1])
         plt.xlabel("Time interval (minutes)")
         plt.ylabel("Activity presence (0 or 1)")
-        plt.title(f"Activity from {self.start_date} to {self.end_date}")
+        plt.title(self.chart_title())
         plt.tight_layout()
         plt.show()
 
@@ -245,22 +1040,10 @@ class ActivityPageHelpers:
         BytesIO
             PNG image in a BytesIO (ready for GUI/HTML embedding).
         """
-        fig, ax = plt.subplots(figsize=(12, 5))
-        ax.bar(
-            range(len(interval_labels)), activity_presence, width=0.8, align="center"
+        png = PlotRenderer.render_bar_chart_png(
+            interval_labels, activity_presence, self.chart_title()
         )
-        ax.set_xticks(range(len(interval_labels)))
-        ax.set_xticklabels(interval_labels, rotation=45)
-        ax.set_yticks([0, 1])
-        ax.set_xlabel("Time interval (minutes)")
-        ax.set_ylabel("Activity presence (0 or 1)")
-        ax.set_title(f"Activity from {self.start_date} to {self.end_date}")
-        plt.tight_layout()
-        img = BytesIO()
-        plt.savefig(img, format="png", dpi=100)
-        plt.close(fig)
-        img.seek(0)
-        return img
+        return BytesIO(png)
 
     @staticmethod
     def calculate_end_date(start_date: datetime) -> datetime:
@@ -278,3 +1061,14 @@ class ActivityPageHelpers:
             End of analysis window (start_date + 1 hour).
         """
         return start_date + timedelta(hours=1)
+
+    def chart_title(self) -> str:
+        """
+        Build the activity chart title for the selected time range.
+
+        Returns
+        -------
+        str
+            Title describing the start and end of the analysis window.
+        """
+        return f"Activity from {self.start_date} to {self.end_date}"
@@ -0,0 +1,601 @@
+import asyncio
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any
+
+import numpy as np
+
+from backend.async_db_operations import AsyncDbOperations
+from backend.db_operations import DbOperations, MINUTES_PER_DAY
+from backend.retention import ROLLUP_READER, RollupReader
+from frontend.activity_page_helpers import ActivityPageHelpers
+from frontend.profile_snapshot import PROFILE_SNAPSHOTS, ProfileSnapshotService
+
+
+class ClanActivity:
+    """
+    Activity of a clan over a time window, computed by ClanAnalytics.
+
+    Attributes
+    ----------
+    clan : str
+        Name of the clan.
+    members : list[str]
+        Nicks of the clan members, in the row order of presence and jaccard.
+    start_date : datetime
+        Start of the window (inclusive).
+    end_date : datetime
+        End of the window (exclusive).
+    bucket_minutes : int
+        Minutes per bucket of online_counts.
+    bucket_starts : list[datetime]
+        Start of each bucket.
+    online_counts : np.ndarray
+        Number of members online at least once in each bucket.
+    presence : np.ndarray
+        Per-minute presence bitsets, one packed uint8 row per member.
+    online_minutes : np.ndarray
+        Minutes each member was online.
+    jaccard : np.ndarray
+        Jaccard similarity of the presence of each pair of members.
+
+    Methods
+    -------
+    top_pairs(k: int = 10) -> list[tuple[str, str, float]]
+        Returns the member pairs most often online together.
+    """
+
+    def __init__(
+        self,
+        clan: str,
+        members: list[str],
+        start_date: datetime,
+        end_date: datetime,
+        bucket_minutes: int,
+        online_counts: np.ndarray,
+        presence: np.ndarray,
+        online_minutes: np.ndarray,
+        jaccard: np.ndarray,
+    ):
+        self.clan = clan
+        self.members = members
+        self.start_date = start_date
+        self.end_date = end_date
+        self.bucket_minutes = bucket_minutes
+        self.bucket_starts = [
+            start_date + timedelta(minutes=bucket_minutes * i)
+            for i in range(len(online_counts))
+        ]
+        self.online_counts = online_counts
+        self.presence = presence
+        self.online_minutes = online_minutes
+        self.jaccard = jaccard
+
+    def top_pairs(self, k: int = 10) -> list[tuple[str, str, float]]:
+        """
+        Get the member pairs with the highest co-online overlap.
+
+        Parameters
+        ----------
+        k : int, optional
+            Maximum number of pairs (default: 10).
+
+        Returns
+        -------
+        list[tuple[str, str, float]]
+            (nick, nick, Jaccard similarity) triples in descending order of similarity;
+            pairs never online together are left out.
+        """
+        rows, cols = np.triu_indices(len(self.members), k=1)
+        scores = self.jaccard[rows, cols]
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [
+            (self.members[rows[i]], self.members[cols[i]], float(scores[i]))
+            for i in order
+            if scores[i] > 0
+        ]
+
+
+class ClanAnalytics:
+    """
+    Clan-level activity analytics built on compact per-minute presence bitsets.
+
+    The presence of every member is packed into one bit per minute (a 200-member clan over
+    a month takes about 1 MiB), fetched with a single query for the whole clan: daily bitmaps
+    from activity_bitmap when ACTIVITY_SOURCE is 'bitmap', activity_data rows otherwise. Bits are
+    set in the packed array directly, so the unpacked members x minutes matrix is never built.
+    Online counts per bucket and pairwise Jaccard similarities are computed with vectorized numpy
+    operations, processing the bitsets in chunks to keep memory bounded over large windows.
+
+    Attributes
+    ----------
+    db : DbOperations
+        Instance for database operations.
+    async_db : AsyncDbOperations
+        Pooled, awaitable database operations used by the async methods.
+    snapshots : ProfileSnapshotService
+        Shared profile snapshot, used to list clan members.
+    connection : Any
+        Database connection, opened on first use.
+    rollup : RollupReader
+        Reads the part of a window that retention already rolled up.
+    activity_source : str
+        Table presence is read from: 'bitmap' (activity_bitmap) or 'rows' (activity_data),
+        set with the ACTIVITY_SOURCE environment variable.
+
+    Methods
+    -------
+    members(clan: str) -> list[tuple]
+        Returns the profile rows of a clan's characters.
+    presence_bitsets(member_chars, rows, start_date, minutes) -> np.ndarray
+        Packs activity rows into per-minute presence bitsets.
+    bitmap_query_many(member_chars, start_date, end_date) -> dict
+        Builds the select arguments fetching the daily bitmaps of many characters.
+    presence_from_bitmaps(member_chars, rows, start_date, minutes) -> np.ndarray
+        Packs daily presence bitmaps into per-minute presence bitsets.
+    online_counts(presence, minutes, bucket_minutes) -> np.ndarray
+        Counts members online in each bucket.
+    online_minutes(presence, minutes) -> np.ndarray
+        Counts the minutes each member was online.
+    jaccard_matrix(presence, minutes) -> np.ndarray
+        Computes the Jaccard similarity of every pair of members.
+    analyze(clan, start_date, end_date, bucket_minutes) -> ClanActivity | None
+        Computes the activity of a clan over a time window.
+    analyze_async(clan, start_date, end_date, bucket_minutes) -> ClanActivity | None
+        Awaitable variant of analyze.
+    """
+
+    chunk_minutes = 8 * 4096
+
+    def __init__(
+        self,
+        db_name: str = "mgspy",
+        snapshots: ProfileSnapshotService = PROFILE_SNAPSHOTS,
+    ):
+        self.db: DbOperations = DbOperations(db_name=db_name)
+        self.async_db: AsyncDbOperations = AsyncDbOperations(db_name=db_name)
+        self.snapshots = snapshots
+        self.rollup: RollupReader = ROLLUP_READER
+        self.activity_source = os.environ.get("ACTIVITY_SOURCE", "rows")
+        self._connection: Any = None
+
+    @property
+    def connection(self) -> Any:
+        """
+        Database connection, opened on first use.
+
+        Returns
+        -------
+        Any
+            Active database connection.
+        """
+        if self._connection is None:
+            self._connection = self.db.connect_to_db()
+        return self._connection
+
+    def members(self, clan: str) -> list[tuple]:
+        """
+        Get the characters of a clan (case-insensitive), highest level first.
+
+        Parameters
+        ----------
+        clan : str
+            Name of the clan.
+
+        Returns
+        -------
+        list[tuple]
+            Rows (profile, char, nick, lvl, clan), empty if the clan is not found.
+        """
+        return list(self.snapshots.snapshot.clan_index.get(clan.strip().lower(), []))
+
+    @staticmethod
+    def presence_bitsets(
+        member_chars: list[tuple], rows: list, start_date: datetime, minutes: int
+    ) -> np.ndarray:
+        """
+        Pack activity rows into per-minute presence bitsets.
+
+        Parameters
+        ----------
+        member_chars : list[tuple]
+            (profile, char) pairs of the members, in row order.
+        rows : list
+            Rows (profile, char, datetime) of the activity_data table; rows of other
+            characters and outside the window are ignored.
+        start_date : datetime
+            Start of the window; bit 0 of each row is its first minute.
+        minutes : int
+            Length of the window in minutes.
+
+        Returns
+        -------
+        np.ndarray
+            uint8 array of shape (len(member_chars), ceil(minutes / 8)), bits packed big-endian.
+        """
+        row_of = {
+            (int(profile), int(char)): i
+            for i, (profile, char) in enumerate(member_chars)
+        }
+        presence = np.zeros((len(member_chars), -(-minutes // 8)), dtype=np.uint8)
+        member_rows = []
+        timestamps = []
+        for profile, char, dt in rows:
+            i = row_of.get((int(profile), int(char)))
+            if i is not None:
+                member_rows.append(i)
+                timestamps.append(dt)
+        if timestamps:
+            offsets = (
+                np.array(timestamps, dtype="datetime64[m]")
+                - np.datetime64(start_date, "m")
+            ).astype(np.int64)
+            inside = (offsets >= 0) & (offsets < minutes)
+            offsets = offsets[inside]
+            np.bitwise_or.at(
+                presence,
+                (np.array(member_rows)[inside], offsets // 8),
+                (0x80 >> (offsets % 8)).astype(np.uint8),
+            )
+        return presence
+
+    @staticmethod
+    def bitmap_query_many(
+        member_chars: list[tuple], start_date: datetime, end_date: datetime
+    ) -> dict:
+        """
+        Build select arguments fetching the daily presence bitmaps of many characters covering a window.
+
+        Like activity_query_many, the query may return rows of other characters of the same
+        profiles; presence_from_bitmaps drops them.
+
+        Parameters
+        ----------
+        member_chars : list[tuple]
+            (profile, char) pairs of the members.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+
+        Returns
+        -------
+        dict
+            Keyword arguments of select_data.
+        """
+        last_day = (end_date - timedelta(microseconds=1)).date()
+        return {
+            "table": "activity_bitmap",
+            "columns": "profile, char, day, minutes",
+            "where_clause": "profile = ANY(%s) AND char = ANY(%s) AND day >= %s AND day <= %s",
+            "params": (
+                sorted({int(profile) for profile, _ in member_chars}),
+                sorted({int(char) for _, char in member_chars}),
+                start_date.date(),
+                last_day,
+            ),
+        }
+
+    @staticmethod
+    def presence_from_bitmaps(
+        member_chars: list[tuple], rows: list, start_date: datetime, minutes: int
+    ) -> np.ndarray:
+        """
+        Pack daily presence bitmaps into per-minute presence bitsets, one member at a time.
+
+        Parameters
+        ----------
+        member_chars : list[tuple]
+            (profile, char) pairs of the members, in row order.
+        rows : list
+            Rows (profile, char, day, minutes) of the activity_bitmap table, minutes being a
+            '0'/'1' string; days without a bitmap count as absent.
+        start_date : datetime
+            Start of the window; bit 0 of each row is its first minute.
+        minutes : int
+            Length of the window in minutes.
+
+        Returns
+        -------
+        np.ndarray
+            uint8 array of shape (len(member_chars), ceil(minutes / 8)), bits packed big-endian.
+        """
+        row_of = {
+            (int(profile), int(char)): i
+            for i, (profile, char) in enumerate(member_chars)
+        }
+        bitmaps = defaultdict(dict)
+        for profile, char, day, bits in rows:
+            i = row_of.get((int(profile), int(char)))
+            if i is not None:
+                bitmaps[i][day] = bits
+        presence = np.zeros((len(member_chars), -(-minutes // 8)), dtype=np.uint8)
+        first_day = start_date.date()
+        first = int(
+            (
+                start_date - datetime.combine(first_day, datetime.min.time())
+            ).total_seconds()
+            // 60
+        )
+        days = -(-(first + minutes) // MINUTES_PER_DAY)
+        absent = "0" * MINUTES_PER_DAY
+        for i, by_day in bitmaps.items():
+            text = "".join(
+                by_day.get(first_day + timedelta(days=d)) or absent for d in range(days)
+            )
+            window = np.frombuffer(
+                text[first : first + minutes].encode("ascii"), dtype=np.uint8
+            )
+            presence[i] = np.packbits(window == ord("1"))
+        return presence
+
+    @classmethod
+    def online_counts(
+        cls, presence: np.ndarray, minutes: int, bucket_minutes: int
+    ) -> np.ndarray:
+        """
+        Count the members online at least once in each bucket.
+
+        Parameters
+        ----------
+        presence : np.ndarray
+            Packed presence bitsets, one row per member.
+        minutes : int
+            Length of the window in minutes.
+        bucket_minutes : int
+            Minutes per bucket; the last bucket may be shorter.
+
+        Returns
+        -------
+        np.ndarray
+            Number of online members per bucket.
+        """
+        buckets = -(-minutes // bucket_minutes)
+        counts = np.zeros(buckets, dtype=np.int64)
+        step = max(cls.chunk_minutes // bucket_minutes, 1) * bucket_minutes
+        for start in range(0, minutes, step):
+            stop = min(start + step, minutes)
+            chunk = cls._unpack(presence, start, stop)
+            padded = -(-(stop - start) // bucket_minutes) * bucket_minutes
+            chunk = np.pad(chunk, ((0, 0), (0, padded - (stop - start))))
+            online = chunk.reshape(len(presence), -1, bucket_minutes).any(axis=2)
+            first = start // bucket_minutes
+            counts[first : first + online.shape[1]] += online.sum(
+                axis=0, dtype=np.int64
+            )
+        return counts
+
+    @classmethod
+    def online_minutes(cls, presence: np.ndarray, minutes: int) -> np.ndarray:
+        """
+        Count the minutes each member was online.
+
+        Parameters
+        ----------
+        presence : np.ndarray
+            Packed presence bitsets, one row per member.
+        minutes : int
+            Length of the window in minutes.
+
+        Returns
+        -------
+        np.ndarray
+            Online minutes per member.
+        """
+        totals = np.zeros(len(presence), dtype=np.int64)
+        for start in range(0, minutes, cls.chunk_minutes):
+            stop = min(start + cls.chunk_minutes, minutes)
+            totals += cls._unpack(presence, start, stop).sum(axis=1, dtype=np.int64)
+        return totals
+
+    @classmethod
+    def jaccard_matrix(cls, presence: np.ndarray, minutes: int) -> np.ndarray:
+        """
+        Compute the Jaccard similarity |A & B| / |A | B| of the presence of every pair of members.
+
+        Intersections are counted with one matrix product per chunk of the window.
+
+        Parameters
+        ----------
+        presence : np.ndarray
+            Packed presence bitsets, one row per member.
+        minutes : int
+            Length of the window in minutes.
+
+        Returns
+        -------
+        np.ndarray
+            Symmetric float matrix; 0 for pairs where neither member was online.
+        """
+        intersections = np.zeros((len(presence), len(presence)), dtype=np.float64)
+        for start in range(0, minutes, cls.chunk_minutes):
+            stop = min(start + cls.chunk_minutes, minutes)
+            chunk = cls._unpack(presence, start, stop).astype(np.float32)
+            intersections += chunk @ chunk.T
+        totals = np.diag(intersections)
+        unions = totals[:, None] + totals[None, :] - intersections
+        return np.divide(
+            intersections,
+            unions,
+            out=np.zeros_like(intersections),
+            where=unions > 0,
+        )
+
+    def analyze(
+        self,
+        clan: str,
+        start_date: datetime,
+        end_date: datetime,
+        bucket_minutes: int = 15,
+    ) -> ClanActivity | None:
+        """
+        Compute online counts and co-online overlap of a clan within [start_date, end_date).
+
+        Presence is read from activity_bitmap or activity_data, per activity_source; with
+        activity_data, days already rolled up by retention are read from activity_rollup.
+
+        Parameters
+        ----------
+        clan : str
+            Name of the clan (case-insensitive).
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+        bucket_minutes : int, optional
+            Minutes per bucket of the online counts (default: 15).
+
+        Returns
+        -------
+        ClanActivity or None
+            Activity of the clan, or None if the clan is not found.
+        """
+        members = self.members(clan)
+        if not members:
+            return None
+        member_chars = [(profile, char) for profile, char, *_ in members]
+        if self.activity_source == "bitmap":
+            rows = self.db.select_data(
+                db_connection=self.connection,
+                **self.bitmap_query_many(member_chars, start_date, end_date),
+            )
+        else:
+            rows = self.rollup.read(
+                self.db,
+                self.connection,
+                partial(ActivityPageHelpers.activity_query_many, member_chars),
+                member_chars,
+                start_date,
+                end_date,
+            )
+        return self.build(
+            clan,
+            members,
+            rows,
+            start_date,
+            end_date,
+            bucket_minutes,
+            self.activity_source,
+        )
+
+    async def analyze_async(
+        self,
+        clan: str,
+        start_date: datetime,
+        end_date: datetime,
+        bucket_minutes: int = 15,
+    ) -> ClanActivity | None:
+        """
+        Compute the activity of a clan without blocking the event loop.
+
+        The activity is fetched from the connection pool and the bitset computations
+        run in a worker thread (numpy releases the GIL for the heavy parts).
+
+        Parameters
+        ----------
+        clan : str
+            Name of the clan (case-insensitive).
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+        bucket_minutes : int, optional
+            Minutes per bucket of the online counts (default: 15).
+
+        Returns
+        -------
+        ClanActivity or None
+            Activity of the clan, or None if the clan is not found.
+        """
+        members = await asyncio.to_thread(self.members, clan)
+        if not members:
+            return None
+        member_chars = [(profile, char) for profile, char, *_ in members]
+        if self.activity_source == "bitmap":
+            rows = await self.async_db.select_data_async(
+                **self.bitmap_query_many(member_chars, start_date, end_date)
+            )
+        else:
+            rows = await self.rollup.read_async(
+                self.async_db,
+                partial(ActivityPageHelpers.activity_query_many, member_chars),
+                member_chars,
+                start_date,
+                end_date,
+            )
+        return await asyncio.to_thread(
+            self.build,
+            clan,
+            members,
+            rows,
+            start_date,
+            end_date,
+            bucket_minutes,
+            self.activity_source,
+        )
+
+    @classmethod
+    def build(
+        cls,
+        clan: str,
+        members: list[tuple],
+        rows: list,
+        start_date: datetime,
+        end_date: datetime,
+        bucket_minutes: int = 15,
+        source: str = "rows",
+    ) -> ClanActivity:
+        """
+        Compute the activity of a clan from its members and their activity rows.
+
+        Parameters
+        ----------
+        clan : str
+            Name of the clan.
+        members : list[tuple]
+            Rows (profile, char, nick, ...) of the clan's characters.
+        rows : list
+            Rows (profile, char, datetime) of the activity_data table, or rows
+            (profile, char, day, minutes) of the activity_bitmap table.
+        start_date : datetime
+            Start of the window (inclusive).
+        end_date : datetime
+            End of the window (exclusive).
+        bucket_minutes : int, optional
+            Minutes per bucket of the online counts (default: 15).
+        source : str, optional
+            'bitmap' if rows come from activity_bitmap, else 'rows' (default: 'rows').
+
+        Returns
+        -------
+        ClanActivity
+            Activity of the clan.
+        """
+        minutes = max(int((end_date - start_date).total_seconds() // 60), 0)
+        member_chars = [(profile, char) for profile, char, *_ in members]
+        if source == "bitmap":
+            presence = cls.presence_from_bitmaps(
+                member_chars, rows, start_date, minutes
+            )
+        else:
+            presence = cls.presence_bitsets(member_chars, rows, start_date, minutes)
+        return ClanActivity(
+            clan=clan,
+            members=[nick for _, _, nick, *_ in members],
+            start_date=start_date,
+            end_date=end_date,
+            bucket_minutes=bucket_minutes,
+            online_counts=cls.online_counts(presence, minutes, bucket_minutes),
+            presence=presence,
+            online_minutes=cls.online_minutes(presence, minutes),
+            jaccard=cls.jaccard_matrix(presence, minutes),
+        )
+
+    @staticmethod
+    def _unpack(presence: np.ndarray, start: int, stop: int) -> np.ndarray:
+        first_byte = start // 8
+        last_byte = -(-stop // 8)
+        bits = np.unpackbits(presence[:, first_byte:last_byte], axis=1)
+        return bits[:, start - first_byte * 8 : stop - first_byte * 8]
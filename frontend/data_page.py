@@ -1,6 +1,7 @@
 from nicegui import ui
 from frontend.gui import Gui
 from frontend.data_page_helpers import DataPageHelpers
+from backend.tracing import TRACER
 
 
 class DataPage(Gui):
@@ -13,32 +14,55 @@ class DataPage(Gui):
         List of all player data to be displayed in the table.
     filtered_data : list[dict]
         List of filtered player data.
-    input_nick : ui.input
-        NiceGUI input widget for the player nickname filter.
     helpers : DataPageHelpers
         Helper class instance for table data and filtering.
+    server_side : bool
+        Whether the table is paginated, sorted and filtered by database queries
+        instead of shipping all rows to the browser.
+    rows_per_page : int
+        Number of rows per page in server-side mode.
+
+    The page object is shared by all clients, so the widgets and the nick filter of each client
+    live in page() and are passed to the handlers.
 
     Methods
     -------
     page()
         Build and render the data table UI, input, and filtering button.
+    load_table(table: ui.table)
+        Load all player rows into the client-side table.
+    load_table_page(table: ui.table, pagination: dict, nick_filter: str = "")
+        Fetch the requested page from the database and show it in the server-side table.
+    on_table_request(table: ui.table, view: dict, e)
+        Handler for page and sort changes of the server-side table.
+    filter_table(table: ui.table, input_nick: ui.input, view: dict)
+        Handler for the filter button of the server-side table.
+    show_alts(label: ui.label, nick: str)
+        Show the characters most often online together with the nick.
+    format_alts(alts: list[dict]) -> str
+        Format alt candidates for display.
     """
 
-    def __init__(self):
+    def __init__(self, server_side: bool = False, rows_per_page: int = 50):
         super().__init__()
         self.table_data = []
         self.filtered_data = []
-        self.input_nick = None
         self.helpers = DataPageHelpers()
+        self.server_side = server_side
+        self.rows_per_page = rows_per_page
 
     def page(self):
         """
         Build the user interface for the Data page.
 
         The page includes:
-            - A player nick input for filtering.
+            - A player nick input for filtering, with type-ahead nick suggestions.
             - A button for applying the filter.
             - A table to show player data (filterable by nick).
+              In server-side mode only the current page is loaded and sent to the browser;
+              in client-side mode all rows are loaded once the page is shown.
+            - Possible alts of the filtered nick: characters of other profiles
+              most often online at the same times, as found by the AltDetector batch job.
 
         Table columns include:
             - Nick: player nickname (sortable)
@@ -54,24 +78,41 @@ class DataPage(Gui):
             f"{self.background} w-full min-h-screen items-center justify-start"
         ):
             self.navbar()
-            self.table_data = self.helpers.fill_table()
-            self.input_nick = ui.input("Nick", placeholder="Enter player nick").classes(
-                "w-[400px] text-lg mt-14"
-            )
 
-            def update_table():
-                nick = self.input_nick.value.strip()
-                data = self.helpers.fill_table_input(nick)
+            async def suggest_nicks(e):
+                input_nick.set_autocomplete(
+                    await self.helpers.search_nicks_async(e.value or "")
+                )
+
+            input_nick = ui.input(
+                "Nick",
+                placeholder="Enter player nick",
+                on_change=suggest_nicks,
+            ).classes("w-[400px] text-lg mt-14")
+            # Nick filter and alts label of this client's server-side table.
+            view = {"nick_filter": "", "alts": None}
+
+            async def update_table():
+                nick = input_nick.value.strip()
+                data = await self.helpers.fill_table_input_async(nick)
                 if not data:
                     data = self.table_data
                 table.rows = data
+                await self.show_alts(alts_label, nick)
 
             ui.button(
                 "Show player data",
-                on_click=update_table,
+                on_click=(
+                    (lambda: self.filter_table(table, input_nick, view))
+                    if self.server_side
+                    else update_table
+                ),
             ).props("size=lg").classes(
                 "bg-blue-700 text-white text-xl font-bold px-8 py-2 mt-4 rounded-lg hover:bg-blue-800 transition"
             )
+            alts_label = ui.label("").classes("text-lg mt-4")
+            alts_label.visible = False
+            view["alts"] = alts_label
 
             columns = [
                 {
@@ -97,6 +138,166 @@ class DataPage(Gui):
                 },
             ]
 
-            table = ui.table(
-                columns=columns, rows=self.table_data, row_key="nick"
-            ).classes("text-lg w-[700px]")
+            if self.server_side:
+                table = ui.table(
+                    columns=columns,
+                    rows=[],
+                    row_key="id",
+                    pagination={
+                        "rowsPerPage": self.rows_per_page,
+                        "sortBy": "lvl",
+                        "descending": True,
+                        "page": 1,
+                        "rowsNumber": 0,
+                    },
+                ).classes("text-lg w-[700px]")
+                table.on("request", lambda e: self.on_table_request(table, view, e))
+                ui.timer(
+                    0, lambda: self.load_table_page(table, table.pagination), once=True
+                )
+            else:
+                table = ui.table(
+                    columns=columns, rows=self.table_data, row_key="nick"
+                ).classes("text-lg w-[700px]")
+                ui.timer(0, lambda: self.load_table(table), once=True)
+
+    async def load_table(self, table: ui.table):
+        """
+        Load all player rows into the client-side table.
+
+        The rows come from the profile snapshot, which is loaded in a worker thread on first use,
+        so the page renders while the database is still starting.
+
+        Parameters
+        ----------
+        table : ui.table
+            Client-side table of the client.
+
+        Returns
+        -------
+        None
+        """
+        self.table_data = await self.helpers.fill_table_async()
+        table.rows = self.table_data
+
+    @TRACER.start_as_current_span("DataPage.load_table_page")
+    async def load_table_page(
+        self, table: ui.table, pagination: dict, nick_filter: str = ""
+    ):
+        """
+        Fetch the requested page from the database and show it in the server-side table.
+
+        Parameters
+        ----------
+        table : ui.table
+            Server-side table of the client.
+        pagination : dict
+            Quasar pagination object with 'page', 'rowsPerPage', 'sortBy' and 'descending'.
+        nick_filter : str, optional
+            Nick prefix the table is filtered by (default: no filter).
+
+        Returns
+        -------
+        None
+        """
+        rows_per_page = pagination.get("rowsPerPage") or self.rows_per_page
+        rows, total = await self.helpers.fetch_page_async(
+            page=pagination.get("page", 1),
+            rows_per_page=rows_per_page,
+            sort_by=pagination.get("sortBy"),
+            descending=pagination.get("descending", False),
+            nick_prefix=nick_filter,
+        )
+        table.rows = rows
+        table.pagination = {
+            **pagination,
+            "rowsPerPage": rows_per_page,
+            "rowsNumber": total,
+        }
+
+    async def on_table_request(self, table: ui.table, view: dict, e):
+        """
+        Handler for page and sort changes of the server-side table.
+
+        Parameters
+        ----------
+        table : ui.table
+            Server-side table of the client.
+        view : dict
+            State of the client's table, with its 'nick_filter'.
+        e : GenericEventArguments
+            Quasar 'request' event carrying the requested pagination.
+
+        Returns
+        -------
+        None
+        """
+        await self.load_table_page(table, e.args["pagination"], view["nick_filter"])
+
+    async def filter_table(self, table: ui.table, input_nick: ui.input, view: dict):
+        """
+        Handler for the "Show player data" button in server-side mode.
+
+        Filters the table by the entered nick prefix and shows its first page.
+
+        Parameters
+        ----------
+        table : ui.table
+            Server-side table of the client.
+        input_nick : ui.input
+            Nick input of the client.
+        view : dict
+            State of the client's table; its 'nick_filter' is updated.
+
+        Returns
+        -------
+        None
+        """
+        view["nick_filter"] = input_nick.value.strip()
+        await self.load_table_page(
+            table, {**table.pagination, "page": 1}, view["nick_filter"]
+        )
+        await self.show_alts(view["alts"], view["nick_filter"])
+
+    async def show_alts(self, label: ui.label, nick: str):
+        """
+        Show the characters most often online together with the nick, hiding the label if there are none.
+
+        Parameters
+        ----------
+        label : ui.label
+            Alts label of the client.
+        nick : str
+            Filtered player nick; an empty nick hides the label.
+
+        Returns
+        -------
+        None
+        """
+        alts = await self.helpers.find_alts_async(nick) if nick else []
+        label.text = self.format_alts(alts)
+        label.visible = bool(alts)
+
+    @staticmethod
+    def format_alts(alts: list[dict]) -> str:
+        """
+        Format alt candidates for display.
+
+        Parameters
+        ----------
+        alts : list[dict]
+            Rows as returned by DataPageHelpers.find_alts, most similar first.
+
+        Returns
+        -------
+        str
+            One line listing each nick with its level (if known) and the share of time online together.
+        """
+        if not alts:
+            return ""
+        return "Possible alts: " + ", ".join(
+            f"{alt['nick']} ("
+            + (f"{alt['lvl']} lvl, " if alt["lvl"] is not None else "")
+            + f"{alt['similarity']:.0%})"
+            for alt in alts
+        )
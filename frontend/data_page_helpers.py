@@ -1,5 +1,20 @@
+import asyncio
+import difflib
+from bisect import bisect_left
 from typing import Any, List, Dict, Optional
+from backend.alt_detection import ALT_COLUMNS
+from backend.async_db_operations import AsyncDbOperations
 from backend.db_operations import DbOperations
+from backend.tracing import TRACER, set_span_attributes
+from frontend.nick_resolver import NICK_RESOLVER, NickResolver
+from frontend.profile_snapshot import (
+    PROFILE_COLUMNS,
+    PROFILE_SNAPSHOTS,
+    ProfileSnapshot,
+    ProfileSnapshotService,
+)
+
+SORTABLE_COLUMNS = {"nick": "nick", "lvl": "lvl"}
 
 
 class DataPageHelpers:
@@ -15,18 +30,58 @@ class DataPageHelpers:
     db : DbOperations
         Instance for database operations.
     connection : Any
-        Active database connection.
-    data : list
-        Cached player data from the database.
+        Database connection, opened on first use.
+    async_db : AsyncDbOperations
+        Pooled, awaitable database operations used by the async methods.
+    snapshots : ProfileSnapshotService
+        Process-wide service holding the shared, indexed profile snapshot.
+    snapshot : ProfileSnapshot
+        Current profile snapshot (loaded on first access).
+    nick_resolver : NickResolver
+        Shared nick -> (profile, char) resolver, consistent across pages.
+    data : tuple
+        Cached player data from the current snapshot.
 
     Methods
     -------
     get_data() -> list
         Fetch all profile data from the database.
+    get_data_async() -> list
+        Awaitable variant of get_data.
+    snapshot_async() -> ProfileSnapshot
+        Returns the profile snapshot, loading it in a worker thread if needed.
     fill_table() -> List[Dict[str, str | Any]]
         Returns sorted character data for table display.
+    fill_table_async() -> List[Dict[str, str | Any]]
+        Awaitable variant of fill_table.
     fill_table_input(nick: str) -> List[Dict[str, str | Any]]
         Returns all unique characters for a given nick.
+    fill_table_input_async(nick: str) -> List[Dict[str, str | Any]]
+        Awaitable variant of fill_table_input.
+    page_query(page, rows_per_page, sort_by, descending, nick_prefix) -> tuple[dict, dict]
+        Builds the select arguments for one table page and its total row count.
+    fetch_page(page, rows_per_page, sort_by, descending, nick_prefix) -> tuple[list, int]
+        Fetches one sorted, filtered table page from the snapshot or the database.
+    fetch_page_async(page, rows_per_page, sort_by, descending, nick_prefix) -> tuple[list, int]
+        Awaitable variant of fetch_page.
+    page_rows(rows: list) -> List[Dict[str, str | Any]]
+        Converts database rows of a table page into table rows.
+    search_nicks(prefix: str, limit: int = 10) -> List[str]
+        Returns nicks starting with the given prefix (case-insensitive).
+    search_nicks_async(prefix: str, limit: int = 10) -> List[str]
+        Awaitable variant of search_nicks.
+    prefix_matches(sorted_nicks, prefix: str, limit: int) -> List[str]
+        Finds nicks starting with a lowercase prefix in the sorted nick list.
+    fuzzy_search_nicks(query: str, limit: int = 10, cutoff: float = 0.6) -> List[str]
+        Returns nicks most similar to the given query.
+    alt_query(profile: int, char: int, limit: int = 10) -> dict
+        Builds the select arguments for the stored alt candidates of a character.
+    find_alts(nick: str, limit: int = 10) -> List[Dict[str, str | Any]]
+        Returns the characters of other profiles most often online together with the nick.
+    find_alts_async(nick: str, limit: int = 10) -> List[Dict[str, str | Any]]
+        Awaitable variant of find_alts.
+    alt_rows(profile: int, char: int, rows: list, snapshot: ProfileSnapshot = None) -> List[Dict[str, str | Any]]
+        Converts stored alt candidate pairs into table rows.
     construct_profile_url(profile: str, char: str) -> str
         Constructs a profile URL for a specific profile and character.
     find_profile_id_by_nick(rows: list, nick: str) -> Optional[str]
@@ -35,12 +90,59 @@ class DataPageHelpers:
         Returns all unique characters for a given profile with corresponding URLs.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        snapshots: ProfileSnapshotService | None = None,
+        nick_resolver: NickResolver | None = None,
+    ):
         self.profile_url: str = "https://www.margonem.pl/profile/view"
         self.db_name: str = "mgspy"
         self.db: DbOperations = DbOperations(db_name=self.db_name)
-        self.connection: Any = self.db.connect_to_db()
-        self.data: list = self.get_data()
+        self._connection: Any = None
+        self.async_db: AsyncDbOperations = AsyncDbOperations(db_name=self.db_name)
+        self.snapshots: ProfileSnapshotService = snapshots or PROFILE_SNAPSHOTS
+        if nick_resolver is None:
+            nick_resolver = (
+                NickResolver(snapshots=snapshots) if snapshots else NICK_RESOLVER
+            )
+        self.nick_resolver: NickResolver = nick_resolver
+
+    @property
+    def connection(self) -> Any:
+        """
+        Database connection, opened on first use so the frontend can start before the database is ready.
+
+        Returns
+        -------
+        Any
+            Active database connection.
+        """
+        if self._connection is None:
+            self._connection = self.db.connect_to_db()
+        return self._connection
+
+    @property
+    def snapshot(self) -> ProfileSnapshot:
+        return self.snapshots.snapshot
+
+    @property
+    def data(self) -> tuple:
+        return self.snapshot.rows
+
+    async def snapshot_async(self) -> ProfileSnapshot:
+        """
+        Current profile snapshot, loaded in a worker thread if it is not loaded yet.
+
+        Loading can wait for the whole connection retry cycle of a cold or unreachable
+        database, which must not block the event loop.
+
+        Returns
+        -------
+        ProfileSnapshot
+        """
+        if self.snapshots.is_loaded:
+            return self.snapshots.snapshot
+        return await asyncio.to_thread(lambda: self.snapshots.snapshot)
 
     def get_data(self) -> list:
         """
@@ -54,7 +156,21 @@ class DataPageHelpers:
         return self.db.select_data(
             db_connection=self.connection,
             table="profile_data",
-            columns="profile, char, nick, lvl, clan",
+            columns=PROFILE_COLUMNS,
+        )
+
+    async def get_data_async(self) -> list:
+        """
+        Fetch all rows from the database without blocking the event loop.
+
+        Returns
+        -------
+        list
+            List of tuples for player profile data.
+        """
+        return await self.async_db.select_data_async(
+            table="profile_data",
+            columns=PROFILE_COLUMNS,
         )
 
     def fill_table(self) -> List[Dict[str, str | Any]]:
@@ -65,18 +181,21 @@ class DataPageHelpers:
         -------
         List[Dict[str, str | Any]]
             List of players with 'nick', 'lvl', and 'guild', sorted by level in descending order.
+            The rows are built once per snapshot and shared between page visits.
         """
-        data: List[Dict[str, str | Any]] = []
-        for profile, char, nick, lvl, clan in self.data:
-            lvl = int(lvl)
-            data.append(
-                {
-                    "nick": nick,
-                    "lvl": lvl,
-                    "guild": clan,
-                }
-            )
-        return sorted(data, key=lambda x: x["lvl"], reverse=True)
+        return list(self.snapshot.table_rows)
+
+    async def fill_table_async(self) -> List[Dict[str, str | Any]]:
+        """
+        Construct the sorted list of players for table display without blocking the event loop.
+
+        Returns
+        -------
+        List[Dict[str, str | Any]]
+            Rows as returned by fill_table.
+        """
+        snapshot = await self.snapshot_async()
+        return list(snapshot.table_rows)
 
     def fill_table_input(self, nick: str) -> List[Dict[str, str | Any]]:
         """
@@ -92,10 +211,439 @@ class DataPageHelpers:
         List[Dict[str, str | Any]]
             List of unique characters for the player's profile, including the constructed profile URL.
         """
-        profile_id = self.find_profile_id_by_nick(self.data, nick)
-        if profile_id is None:
+        snapshot = self.snapshot
+        profile_char = self.nick_resolver.resolve(nick)
+        if profile_char is None:
+            return []
+        profile_id = profile_char[0]
+        return self.get_unique_chars_by_profile(
+            snapshot.profile_index.get(profile_id, []), profile_id
+        )
+
+    async def fill_table_input_async(self, nick: str) -> List[Dict[str, str | Any]]:
+        """
+        Given a nickname, return a list of unique characters for that profile without blocking the event loop.
+
+        Parameters
+        ----------
+        nick : str
+            Player nickname to search for.
+
+        Returns
+        -------
+        List[Dict[str, str | Any]]
+            List of unique characters for the player's profile, including the constructed profile URL.
+        """
+        snapshot = await self.snapshot_async()
+        profile_char = await self.nick_resolver.resolve_async(nick)
+        if profile_char is None:
+            return []
+        profile_id = profile_char[0]
+        return self.get_unique_chars_by_profile(
+            snapshot.profile_index.get(profile_id, []), profile_id
+        )
+
+    @staticmethod
+    def page_query(
+        page: int,
+        rows_per_page: int,
+        sort_by: str | None = "lvl",
+        descending: bool = True,
+        nick_prefix: str = "",
+    ) -> tuple[dict, dict]:
+        """
+        Build select arguments for one page of the profile table and for its total row count.
+
+        Sorting is restricted to SORTABLE_COLUMNS and always ends with (profile, char)
+        in the same direction, so pages are stable and served by the profile_data indexes.
+
+        Parameters
+        ----------
+        page : int
+            1-based page number.
+        rows_per_page : int
+            Number of rows per page.
+        sort_by : str or None, optional
+            Column to sort by, 'nick' or 'lvl' (default: 'lvl').
+        descending : bool, optional
+            Whether to sort in descending order (default: True).
+        nick_prefix : str, optional
+            Case-insensitive nick prefix to filter by (default: no filter).
+
+        Returns
+        -------
+        tuple[dict, dict]
+            Keyword arguments of select_data for the page rows and for the row count.
+        """
+        column = SORTABLE_COLUMNS.get(sort_by, "lvl")
+        direction = "DESC" if descending else "ASC"
+        where_clause = None
+        params = None
+        if nick_prefix:
+            escaped = (
+                nick_prefix.lower()
+                .replace("\\", "\\\\")
+                .replace("%", "\\%")
+                .replace("_", "\\_")
+            )
+            where_clause = "lower(nick) LIKE %s"
+            params = (f"{escaped}%",)
+        rows_query = {
+            "table": "profile_data",
+            "columns": "profile, char, nick, lvl, clan",
+            "where_clause": where_clause,
+            "params": params,
+            "order_by": f"{column} {direction}, profile {direction}, char {direction}",
+            "limit": rows_per_page,
+            "offset": (max(page, 1) - 1) * rows_per_page,
+        }
+        count_query = {
+            "table": "profile_data",
+            "columns": "COUNT(*)",
+            "where_clause": where_clause,
+            "params": params,
+        }
+        return rows_query, count_query
+
+    def fetch_page(
+        self,
+        page: int,
+        rows_per_page: int,
+        sort_by: str | None = "lvl",
+        descending: bool = True,
+        nick_prefix: str = "",
+    ) -> tuple[List[Dict[str, str | Any]], int]:
+        """
+        Fetch one sorted and filtered page of the profile table.
+
+        Unfiltered pages are sliced from the loaded profile snapshot;
+        filtered pages (or all pages before the snapshot is loaded) are queried from the database.
+
+        Parameters
+        ----------
+        page : int
+            1-based page number.
+        rows_per_page : int
+            Number of rows per page.
+        sort_by : str or None, optional
+            Column to sort by, 'nick' or 'lvl' (default: 'lvl').
+        descending : bool, optional
+            Whether to sort in descending order (default: True).
+        nick_prefix : str, optional
+            Case-insensitive nick prefix to filter by (default: no filter).
+
+        Returns
+        -------
+        tuple[List[Dict[str, str | Any]], int]
+            Table rows of the page and the total number of matching rows.
+        """
+        if not nick_prefix and self.snapshots.is_loaded:
+            rows, total = self.snapshot.page(page, rows_per_page, sort_by, descending)
+            return self.page_rows(rows), total
+        rows_query, count_query = self.page_query(
+            page, rows_per_page, sort_by, descending, nick_prefix
+        )
+        rows = self.db.select_data(db_connection=self.connection, **rows_query)
+        total = self.db.select_data(db_connection=self.connection, **count_query)
+        return self.page_rows(rows), total[0][0]
+
+    @TRACER.start_as_current_span("DataPageHelpers.fetch_page_async")
+    async def fetch_page_async(
+        self,
+        page: int,
+        rows_per_page: int,
+        sort_by: str | None = "lvl",
+        descending: bool = True,
+        nick_prefix: str = "",
+    ) -> tuple[List[Dict[str, str | Any]], int]:
+        """
+        Fetch one sorted and filtered page of the profile table without blocking the event loop.
+
+        Unfiltered pages are sliced from the loaded profile snapshot; other pages are queried
+        through the async connection pool.
+
+        Parameters
+        ----------
+        page : int
+            1-based page number.
+        rows_per_page : int
+            Number of rows per page.
+        sort_by : str or None, optional
+            Column to sort by, 'nick' or 'lvl' (default: 'lvl').
+        descending : bool, optional
+            Whether to sort in descending order (default: True).
+        nick_prefix : str, optional
+            Case-insensitive nick prefix to filter by (default: no filter).
+
+        Returns
+        -------
+        tuple[List[Dict[str, str | Any]], int]
+            Table rows of the page and the total number of matching rows.
+        """
+        if not nick_prefix and self.snapshots.is_loaded:
+            rows, total = self.snapshot.page(page, rows_per_page, sort_by, descending)
+            set_span_attributes(source="snapshot", rows=len(rows), total=total)
+            return self.page_rows(rows), total
+        rows_query, count_query = self.page_query(
+            page, rows_per_page, sort_by, descending, nick_prefix
+        )
+        rows = await self.async_db.select_data_async(**rows_query)
+        total = await self.async_db.select_data_async(**count_query)
+        set_span_attributes(source="query", rows=len(rows), total=total[0][0])
+        return self.page_rows(rows), total[0][0]
+
+    @staticmethod
+    def page_rows(rows: list) -> List[Dict[str, str | Any]]:
+        """
+        Convert database rows of a table page into table rows.
+
+        Parameters
+        ----------
+        rows : list
+            List of rows from the database (tuples with profile/char/nick/lvl/clan).
+
+        Returns
+        -------
+        List[Dict[str, str | Any]]
+            List of players with 'id', 'nick', 'lvl', and 'guild'.
+        """
+        return [
+            {
+                "id": f"{profile}_{char}",
+                "nick": nick,
+                "lvl": int(lvl) if lvl is not None else None,
+                "guild": clan,
+            }
+            for profile, char, nick, lvl, clan in rows
+        ]
+
+    def search_nicks(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Find nicks starting with a prefix, case-insensitively (for type-ahead search).
+
+        Parameters
+        ----------
+        prefix : str
+            Beginning of the nick.
+        limit : int, optional
+            Maximum number of returned nicks (default: 10).
+
+        Returns
+        -------
+        List[str]
+            Matching nicks in alphabetical order.
+        """
+        prefix = prefix.lower()
+        if not prefix:
+            return []
+        return self.prefix_matches(self.snapshot.sorted_nicks, prefix, limit)
+
+    async def search_nicks_async(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Find nicks starting with a prefix without blocking the event loop (for the nick input).
+
+        Parameters
+        ----------
+        prefix : str
+            Beginning of the nick.
+        limit : int, optional
+            Maximum number of returned nicks (default: 10).
+
+        Returns
+        -------
+        List[str]
+            Matching nicks in alphabetical order.
+        """
+        prefix = prefix.lower()
+        if not prefix:
+            return []
+        snapshot = await self.snapshot_async()
+        return self.prefix_matches(snapshot.sorted_nicks, prefix, limit)
+
+    @staticmethod
+    def prefix_matches(sorted_nicks, prefix: str, limit: int) -> List[str]:
+        """
+        Find nicks starting with a lowercase prefix.
+
+        Parameters
+        ----------
+        sorted_nicks : sequence of tuple
+            (lowercase nick, nick) pairs in sorted order, as in ProfileSnapshot.sorted_nicks.
+        prefix : str
+            Lowercase beginning of the nick.
+        limit : int
+            Maximum number of returned nicks.
+
+        Returns
+        -------
+        List[str]
+            Matching nicks in alphabetical order, without duplicates.
+        """
+        result: List[str] = []
+        i = bisect_left(sorted_nicks, (prefix, ""))
+        while i < len(sorted_nicks) and len(result) < limit:
+            nick_lower, nick_db = sorted_nicks[i]
+            if not nick_lower.startswith(prefix):
+                break
+            if nick_db not in result:
+                result.append(nick_db)
+            i += 1
+        return result
+
+    def fuzzy_search_nicks(
+        self, query: str, limit: int = 10, cutoff: float = 0.6
+    ) -> List[str]:
+        """
+        Find nicks similar to a (possibly misspelled) query.
+
+        Parameters
+        ----------
+        query : str
+            Approximate nick.
+        limit : int, optional
+            Maximum number of returned nicks (default: 10).
+        cutoff : float, optional
+            Minimum similarity ratio in [0, 1] (default: 0.6).
+
+        Returns
+        -------
+        List[str]
+            Matching nicks, most similar first.
+        """
+        snapshot = self.snapshot
+        matches = difflib.get_close_matches(
+            query.lower(), snapshot.nick_index.keys(), n=limit, cutoff=cutoff
+        )
+        return [
+            snapshot.sorted_nicks[bisect_left(snapshot.sorted_nicks, (match, ""))][1]
+            for match in matches
+        ]
+
+    @staticmethod
+    def alt_query(profile: int, char: int, limit: int = 10) -> dict:
+        """
+        Build the select arguments for the stored alt candidates of one character.
+
+        Pairs are stored once, so the character is matched on either side of the pair.
+
+        Parameters
+        ----------
+        profile : int
+            Profile ID of the character.
+        char : int
+            Character ID.
+        limit : int, optional
+            Maximum number of pairs (default: 10).
+
+        Returns
+        -------
+        dict
+            Keyword arguments for select_data / select_data_async.
+        """
+        return {
+            "table": "alt_candidates",
+            "columns": ALT_COLUMNS,
+            "where_clause": "(profile = %s AND char = %s) OR (other_profile = %s AND other_char = %s)",
+            "params": (profile, char, profile, char),
+            "order_by": "similarity DESC",
+            "limit": limit,
+        }
+
+    def find_alts(self, nick: str, limit: int = 10) -> List[Dict[str, str | Any]]:
+        """
+        Return characters of other profiles that are online at the same times as the given nick.
+
+        The pairs are computed offline by the AltDetector batch job (backend/alt_detection.py).
+
+        Parameters
+        ----------
+        nick : str
+            Player nickname.
+        limit : int, optional
+            Maximum number of characters (default: 10).
+
+        Returns
+        -------
+        List[Dict[str, str | Any]]
+            Rows with 'nick', 'lvl', 'guild', 'profile' URL and 'similarity', most similar first.
+        """
+        profile_char = self.nick_resolver.resolve(nick)
+        if profile_char is None:
+            return []
+        rows = self.db.select_data(
+            db_connection=self.connection, **self.alt_query(*profile_char, limit)
+        )
+        return self.alt_rows(*profile_char, rows)
+
+    async def find_alts_async(
+        self, nick: str, limit: int = 10
+    ) -> List[Dict[str, str | Any]]:
+        """
+        Return characters most often online together with the nick without blocking the event loop.
+
+        Parameters
+        ----------
+        nick : str
+            Player nickname.
+        limit : int, optional
+            Maximum number of characters (default: 10).
+
+        Returns
+        -------
+        List[Dict[str, str | Any]]
+            Rows as returned by find_alts.
+        """
+        profile_char = await self.nick_resolver.resolve_async(nick)
+        if profile_char is None:
             return []
-        return self.get_unique_chars_by_profile(self.data, profile_id)
+        rows = await self.async_db.select_data_async(
+            **self.alt_query(*profile_char, limit)
+        )
+        return self.alt_rows(*profile_char, rows, await self.snapshot_async())
+
+    def alt_rows(
+        self, profile: int, char: int, rows: list, snapshot: ProfileSnapshot = None
+    ) -> List[Dict[str, str | Any]]:
+        """
+        Convert stored alt candidate pairs of one character into table rows.
+
+        Parameters
+        ----------
+        profile : int
+            Profile ID of the character.
+        char : int
+            Character ID.
+        rows : list
+            Rows (profile, char, other_profile, other_char, similarity).
+        snapshot : ProfileSnapshot, optional
+            Profile snapshot to look the characters up in (default: the current one).
+
+        Returns
+        -------
+        List[Dict[str, str | Any]]
+            Rows with 'nick', 'lvl', 'guild', 'profile' URL and 'similarity' of the other character;
+            characters missing from the profile snapshot are skipped.
+        """
+        profile_index = (snapshot or self.snapshot).profile_index
+        result: List[Dict[str, str | Any]] = []
+        for first_profile, first_char, other_profile, other_char, similarity in rows:
+            if (first_profile, first_char) != (profile, char):
+                other_profile, other_char = first_profile, first_char
+            for _, char_db, nick_db, lvl, clan in profile_index.get(other_profile, []):
+                if char_db == other_char:
+                    result.append(
+                        {
+                            "nick": nick_db,
+                            "lvl": int(lvl) if lvl is not None else None,
+                            "guild": clan,
+                            "profile": self.construct_profile_url(
+                                other_profile, other_char
+                            ),
+                            "similarity": round(float(similarity), 2),
+                        }
+                    )
+                    break
+        return result
 
     def construct_profile_url(self, profile: str, char: str) -> str:
         """
@@ -19,3 +19,4 @@ class Gui:
             ui.link("Activity", "/activity").classes(
                 f"{TOOLBAR_TEXT} {TOOLBAR_TEXT_HOVER}"
             )
+            ui.link("Online", "/online").classes(f"{TOOLBAR_TEXT} {TOOLBAR_TEXT_HOVER}")
@@ -0,0 +1,536 @@
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from nicegui import run
+
+from backend.synthetic_data import DIURNAL_WEIGHTS
+from frontend.activity_page_helpers import ActivityPageHelpers
+from frontend.data_page_helpers import DataPageHelpers
+
+# Share of user actions per scenario, roughly what a visit to each page triggers.
+SCENARIOS = {
+    "data_page": 0.35,
+    "data_search": 0.15,
+    "activity_plot": 0.3,
+    "player_stats": 0.1,
+    "heatmap": 0.1,
+}
+PERCENTILES = (50, 95, 99)
+
+
+class ResourceSampler:
+    """
+    Periodic sampler of the CPU and resident memory of the frontend and the local Postgres server.
+
+    Processes are read from /proc, so on other systems no resources are reported:
+        - 'frontend': this process and its children (the NiceGUI render pool)
+        - 'postgres': all processes named 'postgres' visible to this process (none if the
+          database runs in another container or host)
+
+    Attributes
+    ----------
+    interval : float
+        Seconds between samples.
+
+    Methods
+    -------
+    groups() -> dict
+        Process IDs of each group.
+    read(pid: int) -> tuple[float, int] or None
+        CPU seconds and resident bytes of a process.
+    sample() -> dict
+        Reads all processes of all groups.
+    run(stop_event: asyncio.Event) -> dict
+        Samples until stopped and returns the mean CPU and the mean and peak memory of each group.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def groups(self) -> dict:
+        """
+        Get the process IDs of each sampled group.
+
+        Returns
+        -------
+        dict
+            'frontend' and 'postgres' -> list of process IDs.
+        """
+        own = os.getpid()
+        groups = {"frontend": [own], "postgres": []}
+        if not os.path.isdir("/proc"):
+            return groups
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            name = stat[stat.find("(") + 1 : stat.rfind(")")]
+            parent = int(stat[stat.rfind(")") + 2 :].split()[1])
+            if parent == own:
+                groups["frontend"].append(int(entry))
+            elif name == "postgres":
+                groups["postgres"].append(int(entry))
+        return groups
+
+    def read(self, pid: int) -> tuple[float, int] | None:
+        """
+        Read the CPU time and resident memory of a process.
+
+        Parameters
+        ----------
+        pid : int
+
+        Returns
+        -------
+        tuple[float, int] or None
+            User plus system CPU seconds and resident bytes, or None if the process is gone.
+        """
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{pid}/statm") as f:
+                resident = int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            return None
+        cpu = (int(fields[11]) + int(fields[12])) / self._ticks
+        return cpu, resident * self._page_size
+
+    def sample(self) -> dict:
+        """
+        Read all processes of all groups.
+
+        Returns
+        -------
+        dict
+            Group -> {pid: (cpu seconds, resident bytes)}.
+        """
+        samples = {}
+        for group, pids in self.groups().items():
+            samples[group] = {}
+            for pid in pids:
+                values = self.read(pid)
+                if values is not None:
+                    samples[group][pid] = values
+        return samples
+
+    async def run(self, stop_event: asyncio.Event) -> dict:
+        """
+        Sample every interval seconds until stop_event is set.
+
+        CPU is the share of one core used between two samples, summed over the processes of a
+        group (so 250 means two and a half cores busy).
+
+        Parameters
+        ----------
+        stop_event : asyncio.Event
+            Event ending the sampling.
+
+        Returns
+        -------
+        dict
+            Group -> {'cpu_percent': mean, 'rss_mb': mean, 'rss_mb_max': peak};
+            groups without processes are left out.
+        """
+        previous, previous_at = self.sample(), time.perf_counter()
+        cpu = {group: [] for group in previous}
+        rss = {group: [] for group in previous}
+        while not stop_event.is_set():
+            try:
+                await asyncio.wait_for(stop_event.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            current, current_at = self.sample(), time.perf_counter()
+            elapsed = current_at - previous_at
+            for group, processes in current.items():
+                if not processes:
+                    continue
+                used = sum(
+                    values[0] - previous[group][pid][0]
+                    for pid, values in processes.items()
+                    if pid in previous.get(group, {})
+                )
+                cpu.setdefault(group, []).append(100 * used / elapsed)
+                rss.setdefault(group, []).append(
+                    sum(values[1] for values in processes.values()) / 2**20
+                )
+            previous, previous_at = current, current_at
+        return {
+            group: {
+                "cpu_percent": round(float(np.mean(cpu[group])), 1),
+                "rss_mb": round(float(np.mean(rss[group])), 1),
+                "rss_mb_max": round(float(np.max(rss[group])), 1),
+            }
+            for group in cpu
+            if cpu[group]
+        }
+
+
+class LoadTest:
+    """
+    Headless load generator for the Data and Activity pages.
+
+    Virtual users call the same helper methods the page handlers await, sharing one set of
+    helpers like all clients of the running app do, so connection pools, the plot cache, the
+    nick resolver and the render process pool are exercised as in production. Each user repeats:
+    pick a scenario from the mix, run it, think for an exponential time.
+
+    Scenarios:
+        - data_page: a page of the Data table; early pages and level order are the most common
+        - data_search: the Data table filtered by a typed nick prefix
+        - activity_plot: the one-hour activity plot of a player
+        - player_stats: the playtime statistics shown below a plot
+        - heatmap: the activity of 2 to 8 players compared in a heatmap
+    Inputs:
+        - nicks follow a Zipf law over the players sorted by level (high levels are looked up most);
+          some are typed in lower case and miss_rate of them do not exist
+        - windows start on a day between start_date and start_date + days, recent days more
+          often, at a quarter hour drawn from the diurnal login curve of backend/synthetic_data.py
+
+    The load runs in stages of increasing concurrent users, each lasting duration seconds, to
+    find where latency collapses; it is meant to run against a local Postgres seeded with
+    backend/synthetic_data.py over the same dates.
+
+    Attributes
+    ----------
+    users : tuple[int]
+        Concurrent users of each stage.
+    duration : float
+        Seconds per stage.
+    think_seconds : float
+        Mean pause of a user between two actions.
+    start_date : date
+        First day with activity.
+    days : int
+        Number of days with activity.
+    seed : int
+        Seed of the random inputs.
+    mix : dict
+        Scenario -> share of actions.
+    zipf : float
+        Exponent of the nick popularity law.
+    miss_rate : float
+        Share of looked up nicks that do not exist.
+    slo_ms : float
+        p95 latency above which a stage counts as overloaded.
+    data_helpers : DataPageHelpers
+        Helpers of the Data page.
+    activity_helpers : ActivityPageHelpers
+        Helpers of the Activity page.
+    sampler : ResourceSampler
+        Sampler of CPU and memory.
+
+    Methods
+    -------
+    pick_nick(rng: random.Random) -> str
+        Draws a nick.
+    pick_start(rng: random.Random) -> datetime
+        Draws the start of an activity window.
+    data_page(rng), data_search(rng), activity_plot(rng), player_stats(rng), heatmap(rng)
+        Scenarios, one user action each.
+    run_stage(users: int) -> dict
+        Runs one stage and summarizes it.
+    run() -> list[dict]
+        Runs all stages.
+    summarize(users, seconds, latencies, errors, resources) -> dict
+        Builds the statistics of a stage.
+    report(stages: list[dict]) -> str
+        Text report of all stages.
+    """
+
+    def __init__(
+        self,
+        users: tuple = (1, 5, 10, 25, 50),
+        duration: float = 60,
+        think_seconds: float = 1.0,
+        start_date: date = date(2025, 1, 1),
+        days: int = 30,
+        seed: int = 1,
+        mix: dict = None,
+        zipf: float = 1.1,
+        miss_rate: float = 0.03,
+        slo_ms: float = 1000,
+        data_helpers: DataPageHelpers = None,
+        activity_helpers: ActivityPageHelpers = None,
+        sampler: ResourceSampler = None,
+    ):
+        self.users = tuple(users)
+        self.duration = duration
+        self.think_seconds = think_seconds
+        self.start_date = start_date
+        self.days = days
+        self.seed = seed
+        self.mix = mix or SCENARIOS
+        self.zipf = zipf
+        self.miss_rate = miss_rate
+        self.slo_ms = slo_ms
+        self.data_helpers = data_helpers or DataPageHelpers()
+        self.activity_helpers = activity_helpers or ActivityPageHelpers()
+        self.sampler = sampler or ResourceSampler()
+        self._nicks: list[str] | None = None
+        self._cumulative: list[float] | None = None
+
+    def pick_nick(self, rng: random.Random) -> str:
+        """
+        Draw a looked up nick.
+
+        Parameters
+        ----------
+        rng : random.Random
+
+        Returns
+        -------
+        str
+        """
+        if self._nicks is None:
+            rows = self.data_helpers.snapshot.table_rows
+            self._nicks = [row["nick"] for row in rows]
+            weights = 1 / np.arange(1, len(self._nicks) + 1) ** self.zipf
+            self._cumulative = np.cumsum(weights).tolist()
+        if not self._nicks or rng.random() < self.miss_rate:
+            return f"missing{rng.randrange(10**6)}"
+        nick = rng.choices(self._nicks, cum_weights=self._cumulative)[0]
+        return nick.lower() if rng.random() < 0.3 else nick
+
+    def pick_start(self, rng: random.Random) -> datetime:
+        """
+        Draw the start of a one-hour activity window.
+
+        Parameters
+        ----------
+        rng : random.Random
+
+        Returns
+        -------
+        datetime
+        """
+        days_ago = min(int(rng.expovariate(1 / 3)), self.days - 1)
+        day = self.start_date + timedelta(days=self.days - 1 - days_ago)
+        hour = rng.choices(range(24), weights=DIURNAL_WEIGHTS)[0]
+        return datetime(day.year, day.month, day.day, hour, 15 * rng.randrange(4))
+
+    async def data_page(self, rng: random.Random):
+        """
+        Open a page of the Data table, sorted as users usually sort it.
+        """
+        page = min(int(rng.expovariate(1 / 3)) + 1, 200)
+        sort_by = "lvl" if rng.random() < 0.7 else "nick"
+        await self.data_helpers.fetch_page_async(
+            page, 50, sort_by=sort_by, descending=rng.random() < 0.8
+        )
+
+    async def data_search(self, rng: random.Random):
+        """
+        Filter the Data table by the first letters of a nick.
+        """
+        nick = self.pick_nick(rng)
+        await self.data_helpers.fetch_page_async(
+            1, 50, nick_prefix=nick[: rng.randint(1, 4)]
+        )
+
+    async def activity_plot(self, rng: random.Random):
+        """
+        Show the activity plot of one player.
+        """
+        await self.activity_helpers.get_activity_plot(
+            nick=self.pick_nick(rng), start_date=self.pick_start(rng)
+        )
+
+    async def player_stats(self, rng: random.Random):
+        """
+        Show the playtime statistics of one player.
+        """
+        await self.activity_helpers.get_player_stats(nick=self.pick_nick(rng))
+
+    async def heatmap(self, rng: random.Random):
+        """
+        Compare the activity of several players in a heatmap.
+        """
+        nicks = [self.pick_nick(rng) for _ in range(rng.randint(2, 8))]
+        await self.activity_helpers.get_activity_heatmap(
+            nicks=nicks, start_date=self.pick_start(rng)
+        )
+
+    async def run_stage(self, users: int) -> dict:
+        """
+        Run one stage: users concurrent virtual users for duration seconds.
+
+        Parameters
+        ----------
+        users : int
+            Number of concurrent users.
+
+        Returns
+        -------
+        dict
+            Statistics of the stage, see summarize.
+        """
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        latencies = {name: [] for name in names}
+        errors = {name: 0 for name in names}
+        deadline = time.perf_counter() + self.duration
+
+        async def user(index: int):
+            rng = random.Random(f"{self.seed}-{users}-{index}")
+            await asyncio.sleep(rng.uniform(0, self.think_seconds))
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights=weights)[0]
+                started = time.perf_counter()
+                try:
+                    await getattr(self, name)(rng)
+                    latencies[name].append(time.perf_counter() - started)
+                except Exception as e:
+                    errors[name] += 1
+                    print(f"{name} failed: {e!r}")
+                if self.think_seconds:
+                    await asyncio.sleep(rng.expovariate(1 / self.think_seconds))
+
+        stop_event = asyncio.Event()
+        sampling = asyncio.create_task(self.sampler.run(stop_event))
+        started = time.perf_counter()
+        await asyncio.gather(*(user(index) for index in range(users)))
+        seconds = time.perf_counter() - started
+        stop_event.set()
+        return self.summarize(users, seconds, latencies, errors, await sampling)
+
+    async def run(self) -> list[dict]:
+        """
+        Run all stages, printing each summary as it completes.
+
+        Sets up NiceGUI's render process pool when running outside the app.
+
+        Returns
+        -------
+        list[dict]
+            Statistics of each stage.
+        """
+        if run.process_pool is None:
+            run.setup()
+        stages = []
+        for users in self.users:
+            stage = await self.run_stage(users)
+            stages.append(stage)
+            print(self.report([stage]).splitlines()[-1])
+        return stages
+
+    def summarize(
+        self,
+        users: int,
+        seconds: float,
+        latencies: dict,
+        errors: dict,
+        resources: dict,
+    ) -> dict:
+        """
+        Build the statistics of a stage.
+
+        Parameters
+        ----------
+        users : int
+            Concurrent users.
+        seconds : float
+            Wall time of the stage.
+        latencies : dict
+            Scenario -> latencies in seconds of its successful actions.
+        errors : dict
+            Scenario -> number of failed actions.
+        resources : dict
+            Output of ResourceSampler.run.
+
+        Returns
+        -------
+        dict
+            'users', 'seconds', 'requests', 'errors', 'throughput' (successful actions per second),
+            'p50_ms'/'p95_ms'/'p99_ms', 'overloaded' (p95 above slo_ms or any error),
+            'scenarios' (the same per scenario) and 'resources'.
+        """
+
+        def stats(values: list, failed: int) -> dict:
+            result = {
+                "requests": len(values),
+                "errors": failed,
+                "throughput": round(len(values) / seconds, 2),
+            }
+            for p in PERCENTILES:
+                result[f"p{p}_ms"] = (
+                    round(float(np.percentile(values, p)) * 1000, 1) if values else None
+                )
+            return result
+
+        everything = [value for values in latencies.values() for value in values]
+        summary = {"users": users, "seconds": round(seconds, 2)}
+        summary.update(stats(everything, sum(errors.values())))
+        p95 = summary["p95_ms"]
+        summary["overloaded"] = bool(
+            summary["errors"] or (p95 is not None and p95 > self.slo_ms)
+        )
+        summary["scenarios"] = {
+            name: stats(latencies[name], errors[name]) for name in latencies
+        }
+        summary["resources"] = resources
+        return summary
+
+    def report(self, stages: list[dict]) -> str:
+        """
+        Build a text report of the stages, one line each.
+
+        Parameters
+        ----------
+        stages : list[dict]
+            Outputs of run_stage.
+
+        Returns
+        -------
+        str
+        """
+        lines = [
+            f"{'users':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+            f"{'errors':>7} {'fe cpu%':>8} {'fe MB':>7} {'pg cpu%':>8} {'pg MB':>7}"
+        ]
+        for stage in stages:
+            frontend = stage["resources"].get("frontend", {})
+            postgres = stage["resources"].get("postgres", {})
+            latency = " ".join(f"{stage[f'p{p}_ms'] or 0:>9.1f}" for p in PERCENTILES)
+            lines.append(
+                f"{stage['users']:>6} {stage['throughput']:>8.2f} {latency} "
+                f"{stage['errors']:>7} {frontend.get('cpu_percent', 0):>8.1f} "
+                f"{frontend.get('rss_mb_max', 0):>7.0f} {postgres.get('cpu_percent', 0):>8.1f} "
+                f"{postgres.get('rss_mb_max', 0):>7.0f}"
+                + ("  overloaded" if stage["overloaded"] else "")
+            )
+        within = [stage["users"] for stage in stages if not stage["overloaded"]]
+        if len(stages) > 1:
+            lines.append(
+                f"Highest load within p95 < {self.slo_ms:g} ms: "
+                + (f"{max(within)} users" if within else "none")
+            )
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    load_test = LoadTest(
+        users=[int(u) for u in os.environ.get("LOAD_USERS", "1,5,10,25,50").split(",")],
+        duration=float(os.environ.get("LOAD_DURATION", 60)),
+        think_seconds=float(os.environ.get("LOAD_THINK", 1)),
+        start_date=date.fromisoformat(os.environ.get("LOAD_START", "2025-01-01")),
+        days=int(os.environ.get("LOAD_DAYS", 30)),
+        seed=int(os.environ.get("LOAD_SEED", 1)),
+        slo_ms=float(os.environ.get("LOAD_SLO_MS", 1000)),
+    )
+    results = asyncio.run(load_test.run())
+    print(load_test.report(results))
+    if os.environ.get("LOAD_OUTPUT"):
+        with open(os.environ["LOAD_OUTPUT"], "w") as f:
+            json.dump(results, f, indent=2)
+    run.tear_down()
@@ -1,16 +1,109 @@
-from nicegui import ui
+import os
+import time
+
+STARTED_AT = time.perf_counter()
+# NiceGUI imports matplotlib for ui.pyplot unless disabled; the app renders plots itself.
+os.environ.setdefault("MATPLOTLIB", "false")
+
+from nicegui import app, ui
 from gui import Gui
 from data_page import DataPage
 from activity_page import ActivityPage
+from online_page import OnlinePage
+from frontend.online_feed import ONLINE_FEED
+from frontend.profile_snapshot import PROFILE_SNAPSHOTS
+from backend.query_stats import QUERY_STATS
+from backend.tracing import configure_tracing
 
 
 class App(Gui):
+    """
+    The NiceGUI application: registers pages and background services.
+
+    Pages connect to the database lazily on first use, so the UI comes up even while
+    the database is still starting.
+
+    Attributes
+    ----------
+    table_page : DataPage
+        The Data page.
+    activity_page : ActivityPage
+        The Activity page.
+    online_page : OnlinePage
+        The live Online page.
+    startup_seconds : float or None
+        Seconds from process start until the app was ready to serve requests.
+
+    Methods
+    -------
+    record_startup_time()
+        Startup handler measuring the time it took to start the app.
+    startup_time() -> dict
+        Endpoint `/startup` returning the measured startup time.
+    query_stats(n=10) -> dict
+        Endpoint `/queries` returning the slowest queries and most expensive statements.
+    """
+
     def __init__(self):
         super().__init__()
-        self.table_page = DataPage()
+        self.startup_seconds = None
+        self.table_page = DataPage(server_side=True)
         self.activity_page = ActivityPage()
+        self.online_page = OnlinePage()
         ui.page("/")(self.table_page.page)
         ui.page("/activity")(self.activity_page.page)
+        ui.page("/online")(self.online_page.page)
+        app.get("/startup")(self.startup_time)
+        app.get("/queries")(self.query_stats)
+        app.on_startup(self.record_startup_time)
+        app.on_startup(PROFILE_SNAPSHOTS.start)
+        app.on_shutdown(PROFILE_SNAPSHOTS.stop)
+        app.on_startup(ONLINE_FEED.start)
+        app.on_shutdown(ONLINE_FEED.stop)
+        tracer_provider = configure_tracing(service_name="mgspy-frontend")
+        if tracer_provider is not None:
+            app.on_shutdown(tracer_provider.shutdown)
+
+    def record_startup_time(self):
+        """
+        Measure and print the time from process start until the app is ready.
+
+        Returns
+        -------
+        None
+        """
+        self.startup_seconds = time.perf_counter() - STARTED_AT
+        print(f"Frontend started in {self.startup_seconds:.3f} s")
+
+    def startup_time(self) -> dict:
+        """
+        Return the measured startup time.
+
+        Returns
+        -------
+        dict
+            {"startup_seconds": float or None}
+        """
+        return {"startup_seconds": self.startup_seconds}
+
+    def query_stats(self, n: int = 10) -> dict:
+        """
+        Return the query statistics of the frontend process.
+
+        Parameters
+        ----------
+        n : int, optional
+            Number of entries of each list (default: 10).
+
+        Returns
+        -------
+        dict
+            {"slowest": slowest executions with their plans, "statements": statements by total time}
+        """
+        return {
+            "slowest": QUERY_STATS.slowest(n),
+            "statements": QUERY_STATS.statements(n),
+        }
 
 
 if __name__ in {"__main__", "__mp_main__"}:
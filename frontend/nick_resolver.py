@@ -0,0 +1,294 @@
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from backend.async_db_operations import AsyncDbOperations
+from backend.db_operations import DbOperations
+from backend.tracing import TRACER, set_span_attributes
+from frontend.profile_snapshot import PROFILE_SNAPSHOTS, ProfileSnapshotService
+
+
+class NickResolver:
+    """
+    Shared nick -> (profile, char) resolver used by every page.
+
+    Nicks are matched case-insensitively, and when several characters share a nick
+    the smallest (profile, char) pair wins, both in memory and in SQL. Lookups are served
+    from the shared profile snapshot once it is loaded; before that they query the
+    `lower(nick)` functional index and keep the results in an LRU cache.
+
+    Attributes
+    ----------
+    snapshots : ProfileSnapshotService
+        Service holding the shared profile snapshot.
+    max_entries : int
+        Maximum number of nicks kept in the LRU cache.
+    db : DbOperations
+        Instance for database operations.
+    async_db : AsyncDbOperations
+        Pooled, awaitable database operations.
+    connection : Any
+        Database connection, opened on first use.
+
+    Methods
+    -------
+    normalize(nick: str) -> str
+        Returns the lookup key of a nick.
+    query(key: str) -> dict
+        Builds the select arguments resolving a normalized nick.
+    resolve(nick: str) -> tuple | None
+        Resolves a nick to its (profile, char) pair.
+    resolve_async(nick: str) -> tuple | None
+        Awaitable variant of resolve.
+    query_many(keys: list[str]) -> dict
+        Builds the select arguments resolving many normalized nicks at once.
+    resolve_many(nicks: list[str]) -> dict
+        Resolves many nicks with at most one query.
+    resolve_many_async(nicks: list[str]) -> dict
+        Awaitable variant of resolve_many.
+    clear()
+        Empties the LRU cache.
+    """
+
+    def __init__(
+        self,
+        db_name: str = "mgspy",
+        snapshots: ProfileSnapshotService = PROFILE_SNAPSHOTS,
+        max_entries: int = 10000,
+    ):
+        self.snapshots = snapshots
+        self.max_entries = max_entries
+        self.db: DbOperations = DbOperations(db_name=db_name)
+        self.async_db: AsyncDbOperations = AsyncDbOperations(db_name=db_name)
+        self._connection: Any = None
+        self._cache: OrderedDict[str, tuple | None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> Any:
+        """
+        Database connection, opened on first use.
+
+        Returns
+        -------
+        Any
+            Active database connection.
+        """
+        if self._connection is None:
+            self._connection = self.db.connect_to_db()
+        return self._connection
+
+    @staticmethod
+    def normalize(nick: str) -> str:
+        """
+        Build the lookup key of a nick.
+
+        Parameters
+        ----------
+        nick : str
+            Nick as entered by the user.
+
+        Returns
+        -------
+        str
+            Stripped, lower-cased nick.
+        """
+        return nick.strip().lower()
+
+    @staticmethod
+    def query(key: str) -> dict:
+        """
+        Build select arguments resolving a normalized nick with the `lower(nick)` index.
+
+        Parameters
+        ----------
+        key : str
+            Normalized nick.
+
+        Returns
+        -------
+        dict
+            Keyword arguments of select_data.
+        """
+        return {
+            "table": "profile_data",
+            "columns": "profile, char",
+            "where_clause": "lower(nick) = %s",
+            "params": (key,),
+            "order_by": "profile, char",
+            "limit": 1,
+        }
+
+    def resolve(self, nick: str) -> tuple | None:
+        """
+        Resolve a nick to its profile and character IDs.
+
+        Parameters
+        ----------
+        nick : str
+            Nick of the character (case-insensitive).
+
+        Returns
+        -------
+        tuple or None
+            (profile, char) pair, or None if the nick is not found.
+        """
+        key = self.normalize(nick)
+        if self.snapshots.is_loaded:
+            return self.snapshots.snapshot.nick_index.get(key)
+        found, profile_char = self._get_cached(key)
+        if found:
+            return profile_char
+        rows = self.db.select_data(db_connection=self.connection, **self.query(key))
+        return self._store(key, rows)
+
+    @TRACER.start_as_current_span("NickResolver.resolve_async")
+    async def resolve_async(self, nick: str) -> tuple | None:
+        """
+        Resolve a nick to its profile and character IDs without blocking the event loop.
+
+        Parameters
+        ----------
+        nick : str
+            Nick of the character (case-insensitive).
+
+        Returns
+        -------
+        tuple or None
+            (profile, char) pair, or None if the nick is not found.
+        """
+        key = self.normalize(nick)
+        if self.snapshots.is_loaded:
+            set_span_attributes(source="snapshot")
+            return self.snapshots.snapshot.nick_index.get(key)
+        found, profile_char = self._get_cached(key)
+        if found:
+            set_span_attributes(source="cache")
+            return profile_char
+        set_span_attributes(source="query")
+        rows = await self.async_db.select_data_async(**self.query(key))
+        return self._store(key, rows)
+
+    @staticmethod
+    def query_many(keys: list[str]) -> dict:
+        """
+        Build select arguments resolving many normalized nicks in one query.
+
+        Rows are ordered so that the first row of every nick holds its smallest (profile, char) pair.
+
+        Parameters
+        ----------
+        keys : list[str]
+            Normalized nicks.
+
+        Returns
+        -------
+        dict
+            Keyword arguments of select_data.
+        """
+        return {
+            "table": "profile_data",
+            "columns": "lower(nick), profile, char",
+            "where_clause": "lower(nick) = ANY(%s)",
+            "params": (list(keys),),
+            "order_by": "lower(nick), profile, char",
+        }
+
+    def resolve_many(self, nicks: list[str]) -> dict:
+        """
+        Resolve many nicks to their profile and character IDs with at most one query.
+
+        Parameters
+        ----------
+        nicks : list[str]
+            Nicks of the characters (case-insensitive).
+
+        Returns
+        -------
+        dict
+            Nick (as given) -> (profile, char) pair, in input order; unknown nicks are left out.
+        """
+        resolved, missing = self._resolve_known(nicks)
+        if missing:
+            rows = self.db.select_data(
+                db_connection=self.connection, **self.query_many(missing)
+            )
+            resolved.update(self._store_many(missing, rows))
+        return self._by_nick(nicks, resolved)
+
+    @TRACER.start_as_current_span("NickResolver.resolve_many_async")
+    async def resolve_many_async(self, nicks: list[str]) -> dict:
+        """
+        Resolve many nicks with at most one query, without blocking the event loop.
+
+        Parameters
+        ----------
+        nicks : list[str]
+            Nicks of the characters (case-insensitive).
+
+        Returns
+        -------
+        dict
+            Nick (as given) -> (profile, char) pair, in input order; unknown nicks are left out.
+        """
+        resolved, missing = self._resolve_known(nicks)
+        set_span_attributes(nicks=len(nicks), queried=len(missing))
+        if missing:
+            rows = await self.async_db.select_data_async(**self.query_many(missing))
+            resolved.update(self._store_many(missing, rows))
+        return self._by_nick(nicks, resolved)
+
+    def clear(self):
+        """
+        Empty the LRU cache.
+        """
+        with self._lock:
+            self._cache.clear()
+
+    def _get_cached(self, key: str) -> tuple[bool, tuple | None]:
+        with self._lock:
+            if key not in self._cache:
+                return False, None
+            self._cache.move_to_end(key)
+            return True, self._cache[key]
+
+    def _resolve_known(self, nicks: list[str]) -> tuple[dict, list[str]]:
+        keys = list(dict.fromkeys(self.normalize(nick) for nick in nicks))
+        if self.snapshots.is_loaded:
+            nick_index = self.snapshots.snapshot.nick_index
+            return {key: nick_index.get(key) for key in keys}, []
+        resolved: dict = {}
+        missing = []
+        for key in keys:
+            found, profile_char = self._get_cached(key)
+            if found:
+                resolved[key] = profile_char
+            else:
+                missing.append(key)
+        return resolved, missing
+
+    def _store_many(self, keys: list[str], rows: list) -> dict:
+        first_rows: dict = {}
+        for key, profile, char in rows:
+            first_rows.setdefault(key, [(profile, char)])
+        return {key: self._store(key, first_rows.get(key, [])) for key in keys}
+
+    def _by_nick(self, nicks: list[str], resolved: dict) -> dict:
+        by_nick = {}
+        for nick in nicks:
+            profile_char = resolved.get(self.normalize(nick))
+            if profile_char is not None:
+                by_nick[nick] = profile_char
+        return by_nick
+
+    def _store(self, key: str, rows: list) -> tuple | None:
+        profile_char = tuple(rows[0]) if rows else None
+        with self._lock:
+            self._cache[key] = profile_char
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return profile_char
+
+
+NICK_RESOLVER = NickResolver()
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import select
+import threading
+from datetime import datetime
+from typing import Any, Callable
+
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from backend.db_operations import DbOperations, ONLINE_CHANNEL
+
+
+class OnlineFeed:
+    """
+    Process-wide, in-memory copy of the characters online right now.
+
+    A background thread LISTENs on the ONLINE_CHANNEL channel published by the scraper
+    (backend/online_publisher.py): it loads the online_players table once, then applies the
+    joined/left deltas of each notification, and reloads the table on snapshot messages and
+    after reconnecting. Every change is pushed to the subscribed callbacks on the event loop,
+    so pages update without polling the database.
+
+    Attributes
+    ----------
+    db_name : str
+        Name of the database.
+    channel : str
+        Postgres NOTIFY channel announcing changes of the online set.
+    db : DbOperations
+        Instance for database operations.
+    online : dict
+        (profile, char) -> datetime the character came online.
+    updated_at : datetime or None
+        Time of the last applied change.
+
+    Methods
+    -------
+    load(connection) -> dict
+        Reloads the online set from the online_players table.
+    apply(payload: str, connection=None) -> dict
+        Applies one notification to the online set.
+    subscribe(callback)
+        Registers a callback receiving every applied change.
+    unsubscribe(callback)
+        Removes a callback.
+    start()
+        Starts the background listener thread.
+    stop()
+        Stops the background listener thread.
+    listen(retry_delay=5)
+        Body of the background listener thread.
+    """
+
+    def __init__(self, db_name: str = "mgspy", channel: str = ONLINE_CHANNEL):
+        self.db_name = db_name
+        self.channel = channel
+        self.db: DbOperations = DbOperations(db_name=self.db_name)
+        self.online: dict = {}
+        self.updated_at: datetime | None = None
+        self._subscribers: list[Callable[[dict], Any]] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def load(self, connection) -> dict:
+        """
+        Reload the online set from the online_players table.
+
+        Parameters
+        ----------
+        connection : psycopg2 connection object
+
+        Returns
+        -------
+        dict
+            The change, {"type": "snapshot", "total": online count}.
+        """
+        rows = self.db.select_data(
+            db_connection=connection,
+            table="online_players",
+            columns="profile, char, since",
+        )
+        self.online = {(profile, char): since for profile, char, since in rows}
+        self.updated_at = datetime.now()
+        return {"type": "snapshot", "total": len(self.online)}
+
+    def apply(self, payload: str, connection=None) -> dict:
+        """
+        Apply one notification to the online set.
+
+        Parameters
+        ----------
+        payload : str
+            JSON message as built by OnlinePublisher.messages.
+        connection : psycopg2 connection object, optional
+            Connection used to reload the table on snapshot messages.
+
+        Returns
+        -------
+        dict
+            The change: the message itself for deltas, with 'joined' and 'left' as
+            (profile, char) tuples, or the result of load for snapshots.
+        """
+        message = json.loads(payload)
+        if message["type"] != "delta":
+            return self.load(connection)
+        at = datetime.fromisoformat(message["at"])
+        joined = [tuple(pair) for pair in message["joined"]]
+        left = [tuple(pair) for pair in message["left"]]
+        for key in left:
+            self.online.pop(key, None)
+        for key in joined:
+            self.online.setdefault(key, at)
+        self.updated_at = at
+        return {**message, "joined": joined, "left": left}
+
+    def subscribe(self, callback: Callable[[dict], Any]):
+        """
+        Register a callback called on the event loop with every applied change.
+
+        Parameters
+        ----------
+        callback : callable
+            Function taking the change dictionary.
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[dict], Any]):
+        """
+        Remove a registered callback (no-op if it is not registered).
+
+        Parameters
+        ----------
+        callback : callable
+        """
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def start(self):
+        """
+        Start the background listener thread (no-op if already running).
+
+        Called from the event loop, whose loop then runs the subscribed callbacks.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self.listen, name="online-feed", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background listener thread.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def listen(self, retry_delay: float = 5):
+        """
+        Listen for notifications and apply them until stopped.
+
+        Errors, including the database being unreachable, are logged and the listener
+        reconnects after retry_delay seconds, reloading the whole table as deltas may have
+        been missed meanwhile.
+
+        Parameters
+        ----------
+        retry_delay : float, optional
+            Seconds to wait before reconnecting after an error (default: 5).
+        """
+        while not self._stop_event.is_set():
+            try:
+                self._listen_once()
+            except Exception as e:
+                print(f"Online feed failed: {e}")
+                self._stop_event.wait(retry_delay)
+
+    def _listen_once(self):
+        conn = self.db.connect_to_db()
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel};")
+        try:
+            self._dispatch(self.load(conn))
+            while not self._stop_event.is_set():
+                ready, _, _ = select.select([conn], [], [], 1)
+                if not ready:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    payload = conn.notifies.pop(0).payload
+                    self._dispatch(self.apply(payload, conn))
+        finally:
+            conn.close()
+
+    def _dispatch(self, change: dict):
+        for callback in list(self._subscribers):
+            if self._loop is None:
+                callback(change)
+            else:
+                self._loop.call_soon_threadsafe(callback, change)
+
+
+ONLINE_FEED = OnlineFeed()
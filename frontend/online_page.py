@@ -0,0 +1,182 @@
+from nicegui import ui
+from frontend.gui import Gui
+from frontend.online_feed import ONLINE_FEED, OnlineFeed
+from frontend.profile_snapshot import PROFILE_SNAPSHOTS, ProfileSnapshotService
+
+
+class OnlinePage(Gui):
+    """
+    A GUI page showing the characters online right now, updated live.
+
+    Each visit subscribes to the shared OnlineFeed; changes announced by the scraper are
+    pushed to the browser as they arrive, without polling the database.
+
+    Attributes
+    ----------
+    feed : OnlineFeed
+        Process-wide in-memory copy of the online set.
+    snapshots : ProfileSnapshotService
+        Profile snapshot used to show nicks, levels and guilds.
+    rows_per_page : int
+        Number of rows per table page.
+    max_logged : int
+        Changes with more characters than this are logged as one summary line.
+
+    Methods
+    -------
+    page()
+        Build the live table, online counter and change log.
+    count_text() -> str
+        Text of the online counter.
+    online_rows() -> list[dict]
+        Table rows of all characters online, sorted by level in descending order.
+    describe(change: dict) -> list[str]
+        Log lines describing one change of the online set.
+    character(profile, char) -> tuple
+        Nick, level and guild of a character.
+    """
+
+    def __init__(
+        self,
+        feed: OnlineFeed | None = None,
+        snapshots: ProfileSnapshotService | None = None,
+        rows_per_page: int = 50,
+        max_logged: int = 20,
+    ):
+        super().__init__()
+        self.feed: OnlineFeed = feed or ONLINE_FEED
+        self.snapshots: ProfileSnapshotService = snapshots or PROFILE_SNAPSHOTS
+        self.rows_per_page = rows_per_page
+        self.max_logged = max_logged
+
+    def page(self):
+        """
+        Build the user interface for the Online page.
+
+        The page includes:
+            - The number of characters online and the time of the last change
+            - A table of characters online (nick, level, guild, online since)
+            - A log of characters joining and leaving
+
+        Returns
+        -------
+        None
+        """
+        ui.page_title("Online")
+        with ui.column().classes(
+            f"{self.background} w-full min-h-screen items-center justify-start"
+        ):
+            self.navbar()
+            count_label = ui.label(self.count_text()).classes("text-xl mt-14")
+            columns = [
+                {"name": "nick", "label": "Nick", "field": "nick", "sortable": True},
+                {"name": "lvl", "label": "Lvl", "field": "lvl", "sortable": True},
+                {"name": "guild", "label": "Guild", "field": "guild"},
+                {"name": "since", "label": "Online since", "field": "since"},
+            ]
+            table = ui.table(
+                columns=columns,
+                rows=self.online_rows(),
+                row_key="id",
+                pagination={
+                    "rowsPerPage": self.rows_per_page,
+                    "sortBy": "lvl",
+                    "descending": True,
+                },
+            ).classes("text-lg w-[700px]")
+            log = ui.log(max_lines=200).classes("w-[700px] h-48 mt-4")
+
+            def on_change(change: dict):
+                count_label.set_text(self.count_text())
+                table.rows = self.online_rows()
+                for line in self.describe(change):
+                    log.push(line)
+
+            self.feed.subscribe(on_change)
+            ui.context.client.on_disconnect(lambda: self.feed.unsubscribe(on_change))
+
+    def count_text(self) -> str:
+        """
+        Text of the online counter.
+
+        Returns
+        -------
+        str
+        """
+        updated_at = self.feed.updated_at
+        if updated_at is None:
+            return "Waiting for the first scrape..."
+        return f"Online now: {len(self.feed.online)} (updated {updated_at:%H:%M})"
+
+    def online_rows(self) -> list[dict]:
+        """
+        Build table rows of all characters online.
+
+        Returns
+        -------
+        list[dict]
+            Rows with 'id', 'nick', 'lvl', 'guild' and 'since', sorted by level in descending order.
+        """
+        rows = []
+        for (profile, char), since in list(self.feed.online.items()):
+            nick, lvl, guild = self.character(profile, char)
+            rows.append(
+                {
+                    "id": f"{profile}_{char}",
+                    "nick": nick,
+                    "lvl": lvl,
+                    "guild": guild,
+                    "since": f"{since:%H:%M}",
+                }
+            )
+        rows.sort(key=lambda row: row["lvl"], reverse=True)
+        return rows
+
+    def describe(self, change: dict) -> list[str]:
+        """
+        Build log lines describing one change of the online set.
+
+        Parameters
+        ----------
+        change : dict
+            Change as returned by OnlineFeed.apply.
+
+        Returns
+        -------
+        list[str]
+            One line per character joining or leaving, or a single summary line.
+        """
+        at = change.get("at", "")[11:16]
+        if change["type"] != "delta":
+            return [f"Reloaded: {change['total']} online"]
+        joined, left = change["joined"], change["left"]
+        if len(joined) + len(left) > self.max_logged:
+            return [f"{at} {len(joined)} joined, {len(left)} left"]
+        return [f"{at} + {self.character(*key)[0]}" for key in joined] + [
+            f"{at} - {self.character(*key)[0]}" for key in left
+        ]
+
+    def character(self, profile, char) -> tuple:
+        """
+        Get the nick, level and guild of a character from the profile snapshot.
+
+        The snapshot is only used once loaded, so callbacks never wait for the database.
+
+        Parameters
+        ----------
+        profile : int
+            Profile ID.
+        char : int
+            Character ID.
+
+        Returns
+        -------
+        tuple
+            (nick, lvl, guild); unknown characters are shown as "profile/char" with level 0.
+        """
+        if self.snapshots.is_loaded:
+            rows = self.snapshots.snapshot.profile_index.get(profile, [])
+            for _, char_db, nick, lvl, clan in rows:
+                if char_db == char:
+                    return nick, int(lvl or 0), clan
+        return f"{profile}/{char}", 0, ""
@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any
+
+
+class PlotCache:
+    """
+    Process-wide LRU cache of rendered plot images, bounded by total size in bytes.
+
+    Entries are keyed by `(profile, char, start, end, resolution)`. Windows that ended more than one
+    save interval ago are immutable and stay cached until evicted, while more recent windows expire after
+    a short TTL, because the scraper saves activity only every save interval and new rows can still arrive for them.
+
+    Attributes
+    ----------
+    max_bytes : int
+        Upper bound for the total size of cached values.
+    live_ttl : float
+        Time to live (in seconds) of entries whose window may still receive activity.
+    save_interval : float
+        Seconds between saves of scraped activity (SAVE_INTERVAL); windows ending within it are live.
+    current_bytes : int
+        Total size of currently cached values.
+
+    Methods
+    -------
+    make_key(profile, char, start_date, end_date, resolution) -> tuple
+        Builds a cache key for a player and time window.
+    get(key) -> bytes | None
+        Returns a cached value, or None if missing or expired.
+    put(key, value, end_date)
+        Stores a value, evicting the least recently used entries if needed.
+    clear()
+        Removes all entries.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        live_ttl: float = 60,
+        save_interval: float = None,
+    ):
+        """
+        Initialize an empty cache.
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            Upper bound for the total size of cached values (default: 64 MiB).
+        live_ttl : float, optional
+            TTL in seconds for windows that may still receive activity (default: 60).
+        save_interval : float, optional
+            Seconds between activity saves (default: SAVE_INTERVAL environment variable, or 600).
+        """
+        self.max_bytes = max_bytes
+        self.live_ttl = live_ttl
+        if save_interval is None:
+            save_interval = float(os.environ.get("SAVE_INTERVAL", 600))
+        self.save_interval = save_interval
+        self.current_bytes = 0
+        self._entries: OrderedDict[tuple, tuple[bytes, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        profile: Any,
+        char: Any,
+        start_date: datetime,
+        end_date: datetime,
+        resolution: int,
+    ) -> tuple:
+        """
+        Build a cache key for a player and time window.
+
+        Parameters
+        ----------
+        profile : Any
+            Profile ID of the player.
+        char : Any
+            Character ID of the player.
+        start_date : datetime
+            Start of the window.
+        end_date : datetime
+            End of the window.
+        resolution : int
+            Aggregation interval in minutes.
+
+        Returns
+        -------
+        tuple
+            Hashable cache key.
+        """
+        return str(profile), str(char), start_date, end_date, resolution
+
+    def get(self, key: tuple) -> bytes | None:
+        """
+        Get a cached value and mark it as recently used.
+
+        Parameters
+        ----------
+        key : tuple
+            Cache key built with make_key.
+
+        Returns
+        -------
+        bytes or None
+            Cached value, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: tuple, value: bytes, end_date: datetime):
+        """
+        Store a value, evicting least recently used entries to stay within max_bytes.
+
+        Values larger than max_bytes are not cached.
+
+        Parameters
+        ----------
+        key : tuple
+            Cache key built with make_key.
+        value : bytes
+            Value to cache (e.g. PNG image).
+        end_date : datetime
+            End of the window; windows ending less than save_interval ago, or in the future,
+            get a TTL of live_ttl.
+        """
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        expires_at = None
+        if end_date > datetime.now() - timedelta(seconds=self.save_interval):
+            expires_at = time.monotonic() + self.live_ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        """
+        Remove all cached entries.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove(self, key: tuple):
+        value, _ = self._entries.pop(key)
+        self.current_bytes -= len(value)
+
+
+PLOT_CACHE = PlotCache()
@@ -0,0 +1,215 @@
+import threading
+from io import BytesIO
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+
+class ChartTemplate:
+    """
+    Reusable layout settings for a rendered chart.
+
+    Attributes
+    ----------
+    name : str
+        Unique template name, used to cache one figure per template.
+    figsize : tuple[float, float]
+        Figure size in inches.
+    dpi : int
+        Resolution of the exported PNG.
+    xlabel : str
+        Label of the x-axis.
+    ylabel : str
+        Label of the y-axis.
+    yticks : list[int]
+        Fixed y-axis ticks.
+    label_rotation : int
+        Rotation (in degrees) of the x-axis tick labels.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        figsize: tuple[float, float] = (12, 5),
+        dpi: int = 100,
+        xlabel: str = "",
+        ylabel: str = "",
+        yticks: list[int] | None = None,
+        label_rotation: int = 45,
+    ):
+        self.name = name
+        self.figsize = figsize
+        self.dpi = dpi
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.yticks = yticks
+        self.label_rotation = label_rotation
+
+
+ACTIVITY_BAR_TEMPLATE = ChartTemplate(
+    name="activity_bar",
+    xlabel="Time interval (minutes)",
+    ylabel="Activity presence (0 or 1)",
+    yticks=[0, 1],
+)
+
+ACTIVITY_HEATMAP_TEMPLATE = ChartTemplate(
+    name="activity_heatmap",
+    xlabel="Time interval (minutes)",
+    ylabel="Player",
+)
+
+
+class PlotRenderer:
+    """
+    Thread-safe PNG chart renderer built on the object-oriented matplotlib API.
+
+    Unlike `matplotlib.pyplot`, the `Figure`/Agg API keeps no global state, so charts
+    can be rendered concurrently from worker threads or processes (e.g. `nicegui.run.cpu_bound`).
+    One figure per template is kept per thread and cleared between renders,
+    avoiding the cost of building a new figure and canvas for every request.
+    matplotlib itself is only imported when the first figure is created.
+
+    Methods
+    -------
+    get_figure(template: ChartTemplate) -> Figure
+        Returns a cleared, reusable figure for the given template.
+    render_bar_chart_png(interval_labels, activity_presence, title, template) -> bytes
+        Renders a bar chart and returns it as PNG bytes.
+    render_heatmap_png(interval_labels, row_labels, matrix, title, template) -> bytes
+        Renders a heatmap (one row per player) and returns it as PNG bytes.
+    """
+
+    _local = threading.local()
+
+    @classmethod
+    def get_figure(cls, template: ChartTemplate) -> "Figure":
+        """
+        Get the figure cached for a template in the current thread, cleared for reuse.
+
+        Parameters
+        ----------
+        template : ChartTemplate
+            Layout settings of the chart.
+
+        Returns
+        -------
+        Figure
+            Empty figure with an Agg canvas attached.
+        """
+        figures = getattr(cls._local, "figures", None)
+        if figures is None:
+            figures = cls._local.figures = {}
+        fig = figures.get(template.name)
+        if fig is None:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            fig = Figure(figsize=template.figsize, dpi=template.dpi)
+            FigureCanvasAgg(fig)
+            figures[template.name] = fig
+        fig.clear()
+        return fig
+
+    @classmethod
+    def render_bar_chart_png(
+        cls,
+        interval_labels: list[str],
+        activity_presence: list[int],
+        title: str,
+        template: ChartTemplate = ACTIVITY_BAR_TEMPLATE,
+    ) -> bytes:
+        """
+        Render a bar chart of activity presence per interval to PNG bytes.
+
+        Parameters
+        ----------
+        interval_labels : list[str]
+            Interval string labels.
+        activity_presence : list[int]
+            Activity binary presence array.
+        title : str
+            Chart title.
+        template : ChartTemplate, optional
+            Layout settings of the chart (default: ACTIVITY_BAR_TEMPLATE).
+
+        Returns
+        -------
+        bytes
+            Encoded PNG image.
+        """
+        fig = cls.get_figure(template)
+        ax = fig.add_subplot()
+        positions = range(len(interval_labels))
+        ax.bar(positions, activity_presence, width=0.8, align="center")
+        ax.set_xticks(positions)
+        ax.set_xticklabels(interval_labels, rotation=template.label_rotation)
+        if template.yticks is not None:
+            ax.set_yticks(template.yticks)
+        ax.set_xlabel(template.xlabel)
+        ax.set_ylabel(template.ylabel)
+        ax.set_title(title)
+        fig.tight_layout()
+        img = BytesIO()
+        fig.savefig(img, format="png", dpi=template.dpi)
+        return img.getvalue()
+
+    @classmethod
+    def render_heatmap_png(
+        cls,
+        interval_labels: list[str],
+        row_labels: list[str],
+        matrix: list[list[int]],
+        title: str,
+        template: ChartTemplate = ACTIVITY_HEATMAP_TEMPLATE,
+        row_height: float = 0.3,
+    ) -> bytes:
+        """
+        Render a heatmap of activity presence, one row per player, to PNG bytes.
+
+        The figure grows with the number of rows, so every row label stays readable.
+
+        Parameters
+        ----------
+        interval_labels : list[str]
+            Interval string labels (columns).
+        row_labels : list[str]
+            Player labels (rows).
+        matrix : list[list[int]]
+            Activity presence matrix of shape (len(row_labels), len(interval_labels)).
+        title : str
+            Chart title.
+        template : ChartTemplate, optional
+            Layout settings of the chart (default: ACTIVITY_HEATMAP_TEMPLATE).
+        row_height : float, optional
+            Height of one row in inches (default: 0.3).
+
+        Returns
+        -------
+        bytes
+            Encoded PNG image.
+        """
+        fig = cls.get_figure(template)
+        width, height = template.figsize
+        fig.set_size_inches(width, max(height, 1.5 + row_height * len(row_labels)))
+        ax = fig.add_subplot()
+        ax.imshow(
+            matrix,
+            aspect="auto",
+            cmap="Greens",
+            vmin=0,
+            vmax=1,
+            interpolation="nearest",
+        )
+        ax.set_xticks(range(len(interval_labels)))
+        ax.set_xticklabels(interval_labels, rotation=template.label_rotation)
+        ax.set_yticks(range(len(row_labels)))
+        ax.set_yticklabels(row_labels)
+        ax.set_xlabel(template.xlabel)
+        ax.set_ylabel(template.ylabel)
+        ax.set_title(title)
+        fig.tight_layout()
+        img = BytesIO()
+        fig.savefig(img, format="png", dpi=template.dpi)
+        return img.getvalue()
@@ -0,0 +1,584 @@
+import select
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from functools import cached_property
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Dict, List
+
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from backend.db_operations import DbOperations, PROFILE_CHANNEL
+
+PROFILE_COLUMNS = "profile, char, nick, lvl, clan"
+
+
+def _lvl_order_key(row: tuple) -> tuple:
+    return int(row[3] or 0), row[0], row[1]
+
+
+def _nick_order_key(row: tuple) -> tuple:
+    return row[2] or "", row[0], row[1]
+
+
+ORDER_KEYS = {"lvl": _lvl_order_key, "nick": _nick_order_key}
+
+
+def _table_row(row: tuple) -> dict:
+    _, _, nick_db, lvl, clan = row
+    return {"nick": nick_db, "lvl": int(lvl or 0), "guild": clan}
+
+
+def _splice(items, removed: set[int], inserted: list[tuple[int, Any]]) -> list:
+    # Copies the slices between changed positions: one C-level copy plus work per changed entry.
+    # Inserted entries are (p, item), placed before items[p], in their given order.
+    events = sorted(
+        [(i, 1, n) for n, i in enumerate(removed)]
+        + [(position, 0, n) for n, (position, _) in enumerate(inserted)]
+    )
+    result = []
+    start = 0
+    for position, is_removal, n in events:
+        result.extend(items[start:position])
+        if is_removal:
+            start = position + 1
+        else:
+            result.append(inserted[n][1])
+            start = position
+    result.extend(items[start:])
+    return result
+
+
+def _sorted_inserts(items, new_items: list, key=None) -> list[tuple[int, Any]]:
+    # Positions after equal entries, as a stable sort of items + new_items would place them.
+    return [
+        (bisect_right(items, key(item) if key else item, key=key), item)
+        for item in sorted(new_items, key=key)
+    ]
+
+
+class ProfileSnapshot:
+    """
+    Immutable, pre-indexed view of the profile_data table shared by all sessions.
+
+    Everything a page visit needs (sorted orders, nick and profile indexes, table rows) is built
+    once per snapshot, so serving a page only touches the rows on that page.
+
+    Attributes
+    ----------
+    rows : tuple
+        Rows (profile, char, nick, lvl, clan), grouped by profile.
+    version : int
+        Sequence number, increased with each refresh.
+    loaded_at : datetime
+        Time the snapshot was built.
+    nick_index : dict
+        Lower-cased nick -> (profile, char); the smallest pair wins, as in NickResolver.query.
+    profile_index : dict
+        Profile ID -> list of unique character rows.
+    clan_index : dict
+        Lower-cased clan name -> rows of its unique characters, sorted by level in descending order.
+    sorted_nicks : list[tuple[str, str]]
+        Sorted (lower-cased nick, nick) pairs used for prefix search.
+    table_rows : tuple[dict]
+        Rows for table display ('nick', 'lvl', 'guild'), in the reversed 'lvl' order,
+        i.e. sorted by (level, profile, char) in descending order.
+    orders : dict
+        Column name -> rows sorted ascending by (column, profile, char).
+
+    Methods
+    -------
+    replace_profiles(profiles: list, rows: list) -> ProfileSnapshot
+        Returns a new snapshot with all rows of the given profiles replaced.
+    page(page, rows_per_page, sort_by, descending) -> tuple[list, int]
+        Returns the raw rows of one sorted page and the total number of rows.
+    """
+
+    def __init__(self, rows: list, version: int = 0):
+        """
+        Build a snapshot and all its indexes.
+
+        Parameters
+        ----------
+        rows : list
+            Rows (profile, char, nick, lvl, clan) from the profile_data table.
+        version : int, optional
+            Sequence number of the snapshot (default: 0).
+        """
+        self.version = version
+        self.loaded_at = datetime.now()
+
+        nick_index: Dict[str, Any] = {}
+        profile_index: Dict[Any, list] = {}
+        profile_rows: Dict[Any, list] = {}
+        clan_rows: Dict[str, list] = {}
+        seen_chars = set()
+        for row in rows:
+            profile, char, nick_db, lvl, clan = row
+            profile_rows.setdefault(profile, []).append(row)
+            if nick_db is not None:
+                key = nick_db.lower()
+                if key not in nick_index or (profile, char) < nick_index[key]:
+                    nick_index[key] = (profile, char)
+            if (profile, char) not in seen_chars:
+                seen_chars.add((profile, char))
+                profile_index.setdefault(profile, []).append(row)
+                if clan and nick_db is not None:
+                    clan_rows.setdefault(clan.lower(), []).append(row)
+        self._profile_rows = profile_rows
+        self.nick_index = nick_index
+        self.profile_index = profile_index
+        self.clan_index = {
+            clan: sorted(rows, key=lambda r: -int(r[3] or 0))
+            for clan, rows in clan_rows.items()
+        }
+        self.sorted_nicks: List[tuple[str, str]] = sorted(
+            (nick_db.lower(), nick_db)
+            for _, _, nick_db, _, _ in rows
+            if nick_db is not None
+        )
+        self.orders = {
+            name: tuple(sorted(rows, key=key)) for name, key in ORDER_KEYS.items()
+        }
+        self.table_rows = tuple(_table_row(row) for row in reversed(self.orders["lvl"]))
+
+    @cached_property
+    def rows(self) -> tuple:
+        return tuple(chain.from_iterable(self._profile_rows.values()))
+
+    def replace_profiles(self, profiles: list, rows: list) -> "ProfileSnapshot":
+        """
+        Build the next snapshot with all rows of the given profiles replaced.
+
+        Only the changed rows are touched: indexes are copied and updated per changed key,
+        and the sorted orders are spliced at binary-searched positions. The result equals
+        a snapshot built from the remaining rows followed by the new rows. Full rebuilds
+        only happen on a reload of the whole table.
+
+        Parameters
+        ----------
+        profiles : list
+            Profile IDs that changed.
+        rows : list
+            Current rows of these profiles in the database.
+
+        Returns
+        -------
+        ProfileSnapshot
+            New snapshot; this one is left untouched.
+        """
+        changed = set()
+        for profile in profiles:
+            candidates = [profile, str(profile)]
+            if str(profile).isdigit():
+                candidates.append(int(profile))
+            changed.update(c for c in candidates if c in self._profile_rows)
+        old_rows = [row for key in changed for row in self._profile_rows[key]]
+        new_rows = list(rows)
+
+        snapshot = ProfileSnapshot.__new__(ProfileSnapshot)
+        snapshot.version = self.version + 1
+        snapshot.loaded_at = datetime.now()
+
+        profile_rows = dict(self._profile_rows)
+        profile_index = dict(self.profile_index)
+        for key in changed:
+            del profile_rows[key]
+            profile_index.pop(key, None)
+        kept_groups = list(profile_rows.values())
+        clan_changes: Dict[str, list] = {}
+        seen_chars = set()
+        copied = set()
+        for row in new_rows:
+            profile, char, nick_db, _, clan = row
+            if profile not in copied:
+                # Lists of the old snapshot are shared, so they are copied before appending.
+                copied.add(profile)
+                profile_rows[profile] = list(profile_rows.get(profile, []))
+                profile_index[profile] = list(profile_index.get(profile, []))
+            profile_rows[profile].append(row)
+            if (profile, char) not in seen_chars:
+                seen_chars.add((profile, char))
+                profile_index[profile].append(row)
+                if clan and nick_db is not None:
+                    clan_changes.setdefault(clan.lower(), []).append(row)
+        snapshot._profile_rows = profile_rows
+        snapshot.profile_index = profile_index
+
+        for row in old_rows:
+            if row[4] and row[2] is not None:
+                clan_changes.setdefault(row[4].lower(), [])
+        clan_index = dict(self.clan_index)
+        for clan, added in clan_changes.items():
+            members = [
+                row for row in clan_index.get(clan, []) if row[0] not in changed
+            ] + added
+            if members:
+                clan_index[clan] = sorted(members, key=lambda r: -int(r[3] or 0))
+            else:
+                clan_index.pop(clan, None)
+        snapshot.clan_index = clan_index
+
+        removed = set()
+        for row in old_rows:
+            if row[2] is None:
+                continue
+            i = bisect_left(self.sorted_nicks, (row[2].lower(), row[2]))
+            while i in removed:
+                i += 1
+            removed.add(i)
+        new_nicks = [(row[2].lower(), row[2]) for row in new_rows if row[2] is not None]
+        snapshot.sorted_nicks = _splice(
+            self.sorted_nicks, removed, _sorted_inserts(self.sorted_nicks, new_nicks)
+        )
+
+        snapshot.orders = {}
+        for name, key in ORDER_KEYS.items():
+            order = self.orders[name]
+            removed = set()
+            for row in old_rows:
+                i = bisect_left(order, key(row), key=key)
+                while order[i] is not row or i in removed:
+                    i += 1
+                removed.add(i)
+            inserted = _sorted_inserts(order, new_rows, key)
+            snapshot.orders[name] = tuple(_splice(order, removed, inserted))
+            if name == "lvl":
+                # table_rows is the 'lvl' order reversed, so it changes at the mirrored positions.
+                last = len(order) - 1
+                snapshot.table_rows = tuple(
+                    _splice(
+                        self.table_rows,
+                        {last - i for i in removed},
+                        [
+                            (last + 1 - position, _table_row(row))
+                            for position, row in reversed(inserted)
+                        ],
+                    )
+                )
+
+        snapshot.nick_index = self._replace_nicks(
+            snapshot.sorted_nicks, changed, kept_groups, old_rows, new_rows
+        )
+        return snapshot
+
+    def _replace_nicks(
+        self,
+        sorted_nicks: list,
+        changed: set,
+        kept_groups: list,
+        old_rows: list,
+        new_rows: list,
+    ) -> dict:
+        nick_index = dict(self.nick_index)
+        orphaned = set()
+        for row in old_rows:
+            if row[2] is None:
+                continue
+            key = row[2].lower()
+            owner = nick_index.get(key)
+            if owner is not None and owner[0] in changed:
+                del nick_index[key]
+                orphaned.add(key)
+        # Nicks shared with unchanged profiles need their smallest remaining pair,
+        # found with one pass over the kept rows (only when such a nick changed).
+        new_counts: Dict[str, int] = {}
+        for row in new_rows:
+            if row[2] is not None:
+                key = row[2].lower()
+                new_counts[key] = new_counts.get(key, 0) + 1
+        shared = {
+            key
+            for key in orphaned
+            if bisect_right(sorted_nicks, key, key=itemgetter(0))
+            - bisect_left(sorted_nicks, key, key=itemgetter(0))
+            > new_counts.get(key, 0)
+        }
+        if shared:
+            for row in chain.from_iterable(kept_groups):
+                if row[2] is not None and row[2].lower() in shared:
+                    self._index_nick(nick_index, row)
+        for row in new_rows:
+            if row[2] is not None:
+                self._index_nick(nick_index, row)
+        return nick_index
+
+    @staticmethod
+    def _index_nick(nick_index: dict, row: tuple):
+        profile, char, nick_db, _, _ = row
+        key = nick_db.lower()
+        if key not in nick_index or (profile, char) < nick_index[key]:
+            nick_index[key] = (profile, char)
+
+    def page(
+        self,
+        page: int,
+        rows_per_page: int,
+        sort_by: str | None = "lvl",
+        descending: bool = True,
+    ) -> tuple[list, int]:
+        """
+        Get one sorted page of raw rows.
+
+        Rows are ordered by the same columns and (profile, char) tie-breakers as the database
+        pagination. Nicks are compared by code point, which matches the database order only
+        under the C collation, so nick-sorted pages may differ from database pages.
+
+        Parameters
+        ----------
+        page : int
+            1-based page number.
+        rows_per_page : int
+            Number of rows per page.
+        sort_by : str or None, optional
+            Column to sort by, 'nick' or 'lvl' (default: 'lvl').
+        descending : bool, optional
+            Whether to sort in descending order (default: True).
+
+        Returns
+        -------
+        tuple[list, int]
+            Rows (profile, char, nick, lvl, clan) of the page and the total number of rows.
+        """
+        order = self.orders.get(sort_by, self.orders["lvl"])
+        total = len(order)
+        start = (max(page, 1) - 1) * rows_per_page
+        if not descending:
+            return list(order[start : start + rows_per_page]), total
+        stop = max(total - start, 0)
+        first = max(stop - rows_per_page, 0)
+        return list(reversed(order[first:stop])), total
+
+
+class ProfileSnapshotService:
+    """
+    Process-wide owner of the current ProfileSnapshot.
+
+    The snapshot is loaded once on first use and shared by all sessions. A background thread keeps it fresh:
+    it LISTENs on the PROFILE_CHANNEL channel, reloading only the profiles named in each notification,
+    and falls back to a full reload every refresh_interval seconds.
+    Readers always see a complete snapshot; refreshes swap in a new one.
+
+    Attributes
+    ----------
+    db_name : str
+        Name of the database.
+    refresh_interval : float
+        Seconds between scheduled full reloads.
+    channel : str
+        Postgres NOTIFY channel announcing profile_data changes.
+    db : DbOperations
+        Instance for database operations.
+    connection : Any
+        Database connection used for loading, opened on first use.
+
+    Methods
+    -------
+    snapshot -> ProfileSnapshot
+        Current snapshot, loaded on first access.
+    is_loaded -> bool
+        Whether a snapshot has been loaded already.
+    load() -> ProfileSnapshot
+        Fully reloads the snapshot from the database.
+    refresh(profiles=None) -> ProfileSnapshot
+        Reloads the given profiles only, or everything if none are given.
+    start()
+        Starts the background refresh thread.
+    stop()
+        Stops the background refresh thread.
+    listen(retry_delay=5)
+        Body of the background refresh thread.
+    parse_notify_payload(payload: str) -> list[str] | None
+        Parses profile IDs from a notification payload.
+    """
+
+    def __init__(
+        self,
+        db_name: str = "mgspy",
+        refresh_interval: float = 600,
+        channel: str = PROFILE_CHANNEL,
+    ):
+        self.db_name = db_name
+        self.refresh_interval = refresh_interval
+        self.channel = channel
+        self.db: DbOperations = DbOperations(db_name=self.db_name)
+        self.connection: Any = None
+        self._snapshot: ProfileSnapshot | None = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def snapshot(self) -> ProfileSnapshot:
+        """
+        Current snapshot, loaded from the database on first access.
+
+        Returns
+        -------
+        ProfileSnapshot
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._load()
+                snapshot = self._snapshot
+        return snapshot
+
+    @property
+    def is_loaded(self) -> bool:
+        """
+        Whether a snapshot has been loaded already.
+
+        Returns
+        -------
+        bool
+        """
+        return self._snapshot is not None
+
+    def load(self) -> ProfileSnapshot:
+        """
+        Fully reload the snapshot from the database.
+
+        Returns
+        -------
+        ProfileSnapshot
+            The new snapshot.
+        """
+        with self._lock:
+            return self._load()
+
+    def refresh(self, profiles: list | None = None) -> ProfileSnapshot:
+        """
+        Reload the rows of the given profiles, or the whole table if no profiles are given.
+
+        Parameters
+        ----------
+        profiles : list, optional
+            Profile IDs that changed (default: None, full reload).
+
+        Returns
+        -------
+        ProfileSnapshot
+            The new snapshot.
+        """
+        with self._lock:
+            if not profiles or self._snapshot is None:
+                return self._load()
+            rows = self.db.select_data(
+                db_connection=self._get_connection(),
+                table="profile_data",
+                columns=PROFILE_COLUMNS,
+                where_clause="profile = ANY(%s)",
+                params=([int(profile) for profile in profiles],),
+            )
+            self._get_connection().rollback()
+            self._snapshot = self._snapshot.replace_profiles(profiles, rows)
+            return self._snapshot
+
+    def start(self):
+        """
+        Start the background refresh thread (no-op if already running).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self.listen, name="profile-snapshot", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background refresh thread.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def listen(self, retry_delay: float = 5):
+        """
+        Load the snapshot, then wait for notifications and refresh it until stopped.
+
+        Notified profiles are reloaded incrementally; a full reload runs whenever
+        refresh_interval passes without notifications. Errors, including the database
+        being unreachable, are logged and the listener reconnects after retry_delay seconds.
+
+        Parameters
+        ----------
+        retry_delay : float, optional
+            Seconds to wait before reconnecting after an error (default: 5).
+        """
+        while not self._stop_event.is_set():
+            try:
+                self.snapshot
+                self._listen_once()
+            except Exception as e:
+                print(f"Profile snapshot refresh failed: {e}")
+                self.connection = None
+                self._stop_event.wait(retry_delay)
+
+    @staticmethod
+    def parse_notify_payload(payload: str) -> list[str] | None:
+        """
+        Parse the profile IDs sent with a notification.
+
+        Parameters
+        ----------
+        payload : str
+            Comma-separated profile IDs; empty for "reload everything".
+
+        Returns
+        -------
+        list[str] or None
+            Profile IDs, or None if a full reload is requested.
+        """
+        profiles = [profile for profile in payload.split(",") if profile.strip()]
+        return profiles or None
+
+    def _listen_once(self):
+        conn = self.db.connect_to_db()
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel};")
+        try:
+            while not self._stop_event.is_set():
+                ready, _, _ = select.select([conn], [], [], self.refresh_interval)
+                if self._stop_event.is_set():
+                    break
+                if not ready:
+                    self.refresh()
+                    continue
+                conn.poll()
+                profiles: list = []
+                full_reload = False
+                while conn.notifies:
+                    parsed = self.parse_notify_payload(conn.notifies.pop(0).payload)
+                    if parsed is None:
+                        full_reload = True
+                    else:
+                        profiles.extend(parsed)
+                self.refresh(None if full_reload else profiles)
+        finally:
+            conn.close()
+
+    def _get_connection(self) -> Any:
+        if self.connection is None:
+            self.connection = self.db.connect_to_db()
+        return self.connection
+
+    def _load(self) -> ProfileSnapshot:
+        rows = self.db.select_data(
+            db_connection=self._get_connection(),
+            table="profile_data",
+            columns=PROFILE_COLUMNS,
+        )
+        self._get_connection().rollback()
+        version = self._snapshot.version + 1 if self._snapshot is not None else 0
+        self._snapshot = ProfileSnapshot(rows, version=version)
+        return self._snapshot
+
+
+PROFILE_SNAPSHOTS = ProfileSnapshotService()
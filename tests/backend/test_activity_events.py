@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.activity_events import ActivityEventEncoder, ActivityEventReader
+
+BASE = datetime(2025, 1, 1, 12, 0)
+
+
+def scrape(minute, *pairs):
+    at = (BASE + timedelta(minutes=minute)).strftime("%Y-%m-%d %H:%M:%S")
+    if not pairs:
+        pairs = ((0, 0),)
+    return [{"profile": str(p), "char": str(c), "datetime": at} for p, c in pairs]
+
+
+def at(minute):
+    return BASE + timedelta(minutes=minute)
+
+
+@pytest.fixture
+def encoder():
+    return ActivityEventEncoder(max_gap=timedelta(minutes=5))
+
+
+def test_encode_logins_and_logouts(encoder):
+    batch = scrape(0, (1, 10)) + scrape(1, (1, 10), (2, 20)) + scrape(2, (2, 20))
+    assert encoder.encode(batch) == [
+        (1, 10, at(0), True),
+        (2, 20, at(1), True),
+        (1, 10, at(2), False),
+    ]
+    assert encoder.encode(scrape(3)) == [(2, 20, at(3), False)]
+    assert encoder.online == set()
+
+
+def test_encode_continues_across_batches(encoder):
+    encoder.encode(scrape(0, (1, 10)))
+    assert encoder.encode(scrape(1, (1, 10))) == []
+    assert encoder.encode(scrape(1, (2, 20))) == []
+
+
+def test_encode_closes_after_gap(encoder):
+    encoder.encode(scrape(0, (1, 10)))
+    assert encoder.encode(scrape(10, (1, 10))) == [
+        (1, 10, at(1), False),
+        (1, 10, at(10), True),
+    ]
+
+
+def test_restore(mocker, encoder):
+    db = mocker.MagicMock()
+    db.select_data.return_value = [(1, 10, at(0), True), (2, 20, at(3), False)]
+    encoder.restore(db, mocker.MagicMock())
+    assert encoder.online == {(1, 10)}
+    assert encoder.last_scrape == at(3)
+    assert db.select_data.call_args.kwargs["columns"].startswith("DISTINCT ON")
+
+
+def test_intervals_and_state_before_window():
+    rows = [
+        (1, 10, at(-30), True),
+        (1, 10, at(5), False),
+        (1, 10, at(8), True),
+        (2, 20, at(-10), False),
+        (3, 30, at(20), True),
+        (3, 30, at(25), True),
+    ]
+    assert ActivityEventReader.intervals(rows, at(60), now=at(40)) == [
+        (1, 10, at(-30), at(5)),
+        (1, 10, at(8), at(40)),
+        (3, 30, at(20), at(40)),
+    ]
+
+
+def test_timestamps_keep_scrape_alignment():
+    login = BASE - timedelta(seconds=90)
+    timestamps = ActivityEventReader.timestamps([(1, 10, login, at(3))], BASE, at(60))
+    assert timestamps[(1, 10)] == [login + timedelta(minutes=m) for m in range(2, 5)]
+
+
+def test_queries_filter_characters():
+    query = ActivityEventReader.events_query(at(0), at(60), [(2, 20), (1, 10)])
+    assert query["params"] == (at(0), at(60), [1, 2], [10, 20])
+    state = ActivityEventReader.state_query(at(0), timedelta(hours=1))
+    assert state["params"] == (at(-60), at(0))
+    assert state["order_by"] == "profile, char, datetime DESC"
+
+
+def test_round_trip_reconstructs_activity_with_few_rows(encoder):
+    rng = np.random.default_rng(0)
+    chars = [(p, 1) for p in range(1, 51)]
+    online = {key: rng.random() < 0.5 for key in chars}
+    batch, expected = [], {key: [] for key in chars}
+    for minute in range(600):
+        for key in chars:
+            if rng.random() < 0.02:
+                online[key] = not online[key]
+        present = [key for key in chars if online[key]]
+        batch += scrape(minute, *present)
+        for key in present:
+            expected[key].append(at(minute))
+    middle = next(
+        i for i, row in enumerate(batch) if row["datetime"] >= "2025-01-01 17"
+    )
+    events = encoder.encode(batch[:middle])
+    events += encoder.encode(batch[middle:]) + encoder.close()
+
+    rows = [row for row in batch if row["profile"] != "0"]
+    assert len(events) < 0.1 * len(rows)
+    start, end = at(100), at(400)
+    state = [
+        max((e for e in events if e[:2] == key and e[2] < start), key=lambda e: e[2])
+        for key in chars
+        if any(e[:2] == key and e[2] < start for e in events)
+    ]
+    inside = [e for e in events if start <= e[2] < end]
+    intervals = ActivityEventReader.intervals(state + inside, end, now=end)
+    timestamps = ActivityEventReader.timestamps(intervals, start, end)
+    for key in chars:
+        window = [dt for dt in expected[key] if start <= dt < end]
+        assert timestamps.get(key, []) == window
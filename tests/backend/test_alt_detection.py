@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.alt_detection import AltDetector
+
+START = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+def detector():
+    return AltDetector(min_buckets=1, min_similarity=0.3, top_k=2)
+
+
+def test_presence_sets_buckets_and_filters():
+    detector = AltDetector(bucket_minutes=5, min_buckets=2)
+    rows = [
+        (1, 10, START),
+        (1, 10, START + timedelta(minutes=4)),
+        (1, 10, START + timedelta(minutes=12)),
+        (2, 20, START + timedelta(minutes=1)),
+    ]
+    presence = detector.presence_sets([rows[:2], rows[2:]], START)
+    assert list(presence) == [(1, 10)]
+    np.testing.assert_array_equal(presence[(1, 10)], [0, 2])
+
+
+def test_presence_sets_skip_rows_outside_the_window():
+    detector = AltDetector(bucket_minutes=5, min_buckets=1)
+    end = START + timedelta(hours=1)
+    rows = [
+        (1, 10, START - timedelta(minutes=1)),
+        (1, 10, START + timedelta(minutes=7)),
+        (1, 10, START + timedelta(minutes=59)),
+        (1, 10, end),
+    ]
+    presence = detector.presence_sets([rows], START, end)
+    np.testing.assert_array_equal(presence[(1, 10)], [1, 11])
+    assert presence[(1, 10)].dtype == np.int64
+
+
+def test_signatures_estimate_jaccard(detector):
+    a = np.arange(0, 1000, dtype=np.int64)
+    b = np.arange(500, 1500, dtype=np.int64)
+    signatures = detector.signatures([a, a.copy(), b])
+    assert (signatures[0] == signatures[1]).all()
+    estimate = (signatures[0] == signatures[2]).mean()
+    assert abs(estimate - 1 / 3) < 0.15
+
+
+def test_jaccard():
+    assert AltDetector.jaccard(np.array([1, 2, 3]), np.array([2, 3, 4])) == 0.5
+    assert AltDetector.jaccard(np.array([], np.int64), np.array([], np.int64)) == 0
+
+
+def test_top_pairs_finds_co_online_characters(detector):
+    rng = np.random.default_rng(0)
+    shared = np.sort(rng.choice(4000, 300, replace=False))
+    presence = {
+        (1, 10): shared,
+        (2, 20): np.union1d(shared, [4001, 4002]),
+        (1, 11): shared,
+    }
+    for profile in range(3, 40):
+        presence[(profile, 1)] = np.sort(rng.choice(4000, 300, replace=False))
+    pairs = detector.top_pairs(presence)
+    assert pairs[0][:4] == (1, 10, 2, 20) or pairs[0][:4] == (1, 11, 2, 20)
+    found = {pair[:4] for pair in pairs}
+    assert (1, 10, 2, 20) in found and (1, 11, 2, 20) in found
+    assert (1, 10, 1, 11) not in found
+    assert all(pair[4] >= 0.3 for pair in pairs)
+
+
+def test_top_pairs_keeps_top_k_per_character():
+    detector = AltDetector(min_buckets=1, min_similarity=0.1, top_k=1)
+    base = np.arange(100, dtype=np.int64)
+    presence = {
+        (1, 1): base,
+        (2, 1): base[:90],
+        (3, 1): base[:80],
+    }
+    pairs = detector.top_pairs(presence)
+    assert [pair[:4] for pair in pairs] == [(1, 1, 2, 1), (2, 1, 3, 1)]
+
+
+def test_rejects_uneven_bands():
+    with pytest.raises(ValueError):
+        AltDetector(num_perm=100, bands=32)
@@ -144,3 +144,32 @@ def test_smart_sleep_full_wait(mocker):
 
     AppProcesses.smart_sleep(3, event)
     assert slept == [1, 1, 1]
+
+
+def test_invalid_activity_storage():
+    with pytest.raises(ValueError):
+        AppProcesses(db_name="mgspy_test", activity_storage="files")
+
+
+def test_save_activity_bitmap_storage(mocker):
+    app = AppProcesses(db_name="mgspy_test", activity_storage="bitmap")
+    app.session_engine = None
+    db = mocker.MagicMock()
+    app.save_activity(db, "conn", [{"profile": "1"}])
+    db.insert_activity_bitmaps.assert_called_once_with(
+        db_connection="conn", player_activity=[{"profile": "1"}]
+    )
+    db.insert_activity_data.assert_not_called()
+
+
+def test_save_activity_events_storage(mocker):
+    app = AppProcesses(db_name="mgspy_test", activity_storage="events")
+    app.session_engine = None
+    db = mocker.MagicMock()
+    activity = [{"profile": "1", "char": "2", "datetime": "2025-01-01 12:00:00"}]
+    app.save_activity(db, "conn", activity)
+    app.save_activity(db, "conn", activity)
+    first, second = db.insert_activity_events.call_args_list
+    assert [event[3] for event in first.args[1]] == [True]
+    assert second.args[1] == []
+    db.insert_activity_data.assert_not_called()
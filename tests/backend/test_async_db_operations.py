@@ -0,0 +1,173 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import psycopg2
+import pytest
+
+from backend.async_db_operations import AsyncDbOperations
+
+
+@pytest.fixture
+def pool_cls(mocker):
+    pool_cls = mocker.patch("backend.async_db_operations.ThreadedConnectionPool")
+    pool_cls.return_value.getconn.return_value = mocker.MagicMock(closed=0)
+    yield pool_cls
+    AsyncDbOperations._pools.clear()
+
+
+def test_pool_created_lazily_once(pool_cls):
+    db = AsyncDbOperations(db_name="mgspy_test", max_connections=4)
+    pool_cls.assert_not_called()
+    assert db.create_pool() is db.create_pool()
+    pool_cls.assert_called_once()
+    assert pool_cls.call_args[0] == (1, 4)
+    assert pool_cls.call_args[1]["dbname"] == "mgspy_test"
+
+
+def test_instances_share_one_pool(pool_cls):
+    first = AsyncDbOperations(db_name="mgspy_test")
+    second = AsyncDbOperations(db_name="mgspy_test")
+    assert first.create_pool() is second.create_pool()
+    pool_cls.assert_called_once()
+    AsyncDbOperations(db_name="other").create_pool()
+    assert pool_cls.call_count == 2
+
+
+def test_run_with_connection_waits_for_a_free_connection(pool_cls):
+    db = AsyncDbOperations(db_name="mgspy_test", max_connections=2)
+    borrowed = []
+    active = []
+    lock = threading.Lock()
+
+    def getconn():
+        with lock:
+            if len(borrowed) == 2:
+                raise AssertionError("pool exhausted")
+            borrowed.append(MagicMock(closed=0))
+            return borrowed[-1]
+
+    def putconn(conn, close=False):
+        with lock:
+            borrowed.remove(conn)
+
+    pool_cls.return_value.getconn.side_effect = getconn
+    pool_cls.return_value.putconn.side_effect = putconn
+
+    def query(db_connection):
+        active.append(len(borrowed))
+        time.sleep(0.02)
+
+    threads = [
+        threading.Thread(target=db.run_with_connection, args=(query,)) for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(active) == 6
+    assert max(active) <= 2
+    assert borrowed == []
+
+
+def test_create_pool_retries(mocker, pool_cls):
+    mocker.patch("time.sleep")
+    pool_cls.side_effect = psycopg2.OperationalError("not ready")
+    db = AsyncDbOperations(db_name="mgspy_test")
+    with pytest.raises(Exception, match="not available"):
+        db.create_pool(max_retries=3, delay=0)
+    assert pool_cls.call_count == 3
+
+
+def test_create_pool_retries_without_holding_the_registry_lock(mocker, pool_cls):
+    locked = []
+    mocker.patch(
+        "time.sleep",
+        side_effect=lambda _: locked.append(AsyncDbOperations._pools_lock.locked()),
+    )
+    pool_cls.side_effect = [psycopg2.OperationalError("not ready"), MagicMock()]
+    db = AsyncDbOperations(db_name="mgspy_test")
+    assert db.create_pool(max_retries=2, delay=0) is db.pool
+    assert locked == [False]
+
+
+def test_create_pool_keeps_the_pool_published_first(mocker, pool_cls):
+    db = AsyncDbOperations(db_name="mgspy_test")
+    first = MagicMock()
+    # Another thread publishes its pool while this one is still connecting.
+    mocker.patch.object(
+        AsyncDbOperations, "pool", new_callable=mocker.PropertyMock, return_value=None
+    )
+    AsyncDbOperations._pools[db.pool_key] = (first, threading.BoundedSemaphore(1))
+    assert db.create_pool() is first
+    pool_cls.return_value.closeall.assert_called_once()
+
+
+def test_select_data_async_uses_pooled_connection(mocker, pool_cls):
+    db = AsyncDbOperations(db_name="mgspy_test")
+    conn = pool_cls.return_value.getconn.return_value
+    select = mocker.patch.object(db, "select_data", return_value=[(1, 2)])
+    rows = asyncio.run(
+        db.select_data_async(
+            table="profile_data", where_clause="nick = %s", params=("Sold",)
+        )
+    )
+    assert rows == [(1, 2)]
+    select.assert_called_once_with(
+        conn,
+        table="profile_data",
+        columns="*",
+        where_clause="nick = %s",
+        params=("Sold",),
+    )
+    conn.rollback.assert_called_once()
+    pool_cls.return_value.putconn.assert_called_once_with(conn, close=False)
+
+
+def test_run_with_connection_returns_connection_on_error(pool_cls):
+    db = AsyncDbOperations(db_name="mgspy_test")
+    conn = pool_cls.return_value.getconn.return_value
+
+    def failing(db_connection):
+        raise psycopg2.Error("boom")
+
+    with pytest.raises(psycopg2.Error):
+        db.run_with_connection(failing)
+    pool_cls.return_value.putconn.assert_called_once_with(conn, close=False)
+
+
+def test_run_with_connection_discards_dead_connections(pool_cls):
+    db = AsyncDbOperations(db_name="mgspy_test")
+    conn = pool_cls.return_value.getconn.return_value
+    conn.closed = 2
+
+    def failing(db_connection):
+        raise psycopg2.OperationalError("server closed the connection")
+
+    with pytest.raises(psycopg2.OperationalError, match="server closed"):
+        db.run_with_connection(failing)
+    conn.rollback.assert_not_called()
+    pool_cls.return_value.putconn.assert_called_once_with(conn, close=True)
+
+
+def test_run_with_connection_discards_connections_failing_rollback(pool_cls):
+    db = AsyncDbOperations(db_name="mgspy_test")
+    conn = pool_cls.return_value.getconn.return_value
+    conn.rollback.side_effect = psycopg2.InterfaceError("connection already closed")
+
+    def failing(db_connection):
+        raise psycopg2.OperationalError("terminating connection")
+
+    with pytest.raises(psycopg2.OperationalError, match="terminating"):
+        db.run_with_connection(failing)
+    pool_cls.return_value.putconn.assert_called_once_with(conn, close=True)
+
+
+def test_close_pool(pool_cls):
+    db = AsyncDbOperations(db_name="mgspy_test")
+    db.create_pool()
+    db.close_pool()
+    pool_cls.return_value.closeall.assert_called_once()
+    assert db.pool is None
@@ -2,7 +2,8 @@ import datetime
 
 import pytest
 
-from backend.db_operations import DbOperations
+from backend.db_operations import DbOperations, MINUTES_PER_DAY, PROFILE_CHANNEL
+from backend.query_stats import QueryStats
 
 DB_NAME_TEST = "mgspy_test"
 
@@ -19,6 +20,7 @@ def db():
 def cleanup_tables(db):
     db_ops, conn = db
     db_ops.delete_data(conn, "activity_data")
+    db_ops.delete_data(conn, "activity_bitmap")
     db_ops.delete_data(conn, "profile_data")
     yield
 
@@ -89,3 +91,98 @@ def test_select_data_with_where_clause(db, player_profiles_test_db):
         where_clause="profile = 5111553",
     )
     assert rows[0][:6] == (5111553, 155755, "Charmed", 129, "None", "#berufs")
+
+
+def test_select_data_with_order_limit_offset(db, player_profiles_test_db):
+    db_ops, conn = db
+    db_ops.insert_profile_data(conn, player_profiles_test_db)
+    rows = db_ops.select_data(
+        conn,
+        table="profile_data",
+        columns="profile, char, lvl",
+        order_by="lvl DESC, profile DESC, char DESC",
+        limit=2,
+        offset=1,
+    )
+    levels = sorted((int(p["lvl"]) for p in player_profiles_test_db), reverse=True)
+    assert len(rows) == 2
+    assert [row[2] for row in rows] == levels[1:3]
+
+
+def test_insert_profile_data_notifies_listeners(db, player_profiles_test_db):
+    db_ops, conn = db
+    listener = db_ops.connect_to_db()
+    listener.autocommit = True
+    with listener.cursor() as cursor:
+        cursor.execute(f"LISTEN {PROFILE_CHANNEL};")
+    db_ops.insert_profile_data(conn, player_profiles_test_db)
+    listener.poll()
+    payloads = [notify.payload for notify in listener.notifies]
+    listener.close()
+    assert len(payloads) == 1
+    assert set(payloads[0].split(",")) == {
+        p["profile"] for p in player_profiles_test_db
+    }
+
+
+def test_fold_activity_bitmaps():
+    bitmaps = DbOperations.fold_activity_bitmaps(
+        [
+            {"profile": "1", "char": "2", "datetime": "2025-01-01 00:00:58"},
+            {"profile": "1", "char": "2", "datetime": "2025-01-01 00:00:59"},
+            {
+                "profile": 1,
+                "char": 2,
+                "datetime": datetime.datetime(2025, 1, 1, 23, 59, 1),
+            },
+            {"profile": "1", "char": "2", "datetime": "2025-01-02 01:30:00"},
+        ]
+    )
+    day = bitmaps[(1, 2, datetime.date(2025, 1, 1))]
+    assert len(day) == MINUTES_PER_DAY
+    assert [i for i, bit in enumerate(day) if bit == "1"] == [0, 1439]
+    assert bitmaps[(1, 2, datetime.date(2025, 1, 2))].index("1") == 90
+
+
+def test_insert_activity_bitmaps_merges_days(db):
+    db_ops, conn = db
+    db_ops.insert_activity_bitmaps(
+        conn, [{"profile": "1", "char": "2", "datetime": "2025-01-01 12:00:00"}]
+    )
+    db_ops.insert_activity_bitmaps(
+        conn, [{"profile": "1", "char": "2", "datetime": "2025-01-01 12:05:00"}]
+    )
+    rows = db_ops.select_data(conn, "activity_bitmap", "day, minutes")
+    assert len(rows) == 1
+    day, minutes = rows[0]
+    assert day == datetime.date(2025, 1, 1)
+    assert [i for i, bit in enumerate(minutes) if bit == "1"] == [720, 725]
+
+
+def test_stream_data_in_batches(db, player_activity_test_db):
+    db_ops, conn = db
+    db_ops.insert_activity_data(conn, player_activity_test_db)
+    batches = list(
+        db_ops.stream_data(
+            conn, "activity_data", "profile, char", order_by="profile", batch_size=2
+        )
+    )
+    conn.rollback()
+    assert all(len(batch) <= 2 for batch in batches)
+    assert sum(len(batch) for batch in batches) == len(player_activity_test_db)
+
+
+def test_slow_select_is_logged_with_plan(db, player_activity_test_db, monkeypatch):
+    db_ops, conn = db
+    stats = QueryStats(slow_ms=1e-6, explain=True)
+    monkeypatch.setattr("backend.query_stats.QUERY_STATS", stats)
+    db_ops.insert_activity_data(conn, player_activity_test_db)
+    rows = db_ops.select_data(
+        conn, "activity_data", where_clause="profile = %s", params=(7667949,)
+    )
+    conn.commit()
+    statements = {entry["statement"]: entry for entry in stats.statements()}
+    select = statements["SELECT * FROM activity_data WHERE profile = ?"]
+    assert select["calls"] == 1 and select["rows"] == len(rows)
+    plans = [entry["plan"] for entry in stats.slowest() if entry["plan"]]
+    assert any("Buffers" in plan or "Seq Scan" in plan for plan in plans)
@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+
+import pytest
+import requests
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess
+
+from backend.metrics import page_label, timed_write
+from backend.web_scrapper import WebScrapper
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_page_label():
+    assert page_label("https://www.margonem.pl/stats") == "stats"
+    assert page_label("https://www.margonem.pl/profile/view,1#char_2") == "profile"
+    assert page_label("http://localhost/x") == "other"
+
+
+def test_timed_write_records_duration_and_failures():
+    before = sample("mgspy_db_write_seconds_count", operation="test_write")
+    failures = sample("mgspy_db_failures_total", operation="test_write")
+
+    @timed_write("test_write")
+    def write(fail):
+        if fail:
+            raise ValueError("boom")
+        return "ok"
+
+    assert write(False) == "ok"
+    with pytest.raises(ValueError):
+        write(True)
+    assert sample("mgspy_db_write_seconds_count", operation="test_write") == before + 2
+    assert sample("mgspy_db_failures_total", operation="test_write") == failures + 1
+
+
+def test_get_soup_counts_retries_and_failures(mocker):
+    mocker.patch("time.sleep", return_value=None)
+    mocker.patch("requests.get", side_effect=requests.exceptions.ReadTimeout)
+    retries = sample("mgspy_fetch_retries_total", page="stats")
+    failures = sample("mgspy_fetch_failures_total", page="stats", reason="timeout")
+    assert WebScrapper.get_soup("https://www.margonem.pl/stats", max_retries=3) is None
+    assert sample("mgspy_fetch_retries_total", page="stats") == retries + 2
+    assert (
+        sample("mgspy_fetch_failures_total", page="stats", reason="timeout")
+        == failures + 1
+    )
+
+
+def test_get_soup_records_fetch_and_parse(mocker):
+    response = mocker.MagicMock()
+    response.content = b"<html><body></body></html>"
+    mocker.patch("requests.get", return_value=response)
+    fetches = sample("mgspy_fetch_seconds_count", page="profile")
+    parses = sample("mgspy_parse_seconds_count", page="profile", stage="html")
+    assert WebScrapper.get_soup("https://www.margonem.pl/profile/view,1") is not None
+    assert sample("mgspy_fetch_seconds_count", page="profile") == fetches + 1
+    assert (
+        sample("mgspy_parse_seconds_count", page="profile", stage="html") == parses + 1
+    )
+
+
+def test_metrics_are_aggregated_across_processes(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    code = (
+        "from backend.metrics import QUEUE_DEPTH, SCRAPE_FAILURES;"
+        "SCRAPE_FAILURES.inc(); QUEUE_DEPTH.observe(10)"
+    )
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+    assert registry.get_sample_value("mgspy_scrape_failures_total") == 2
+    assert registry.get_sample_value("mgspy_queue_depth_count") == 2
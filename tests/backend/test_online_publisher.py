@@ -0,0 +1,80 @@
+import json
+from datetime import datetime
+
+import psycopg2
+import pytest
+
+from backend.online_publisher import OnlinePublisher
+
+
+def scrape(*pairs, at="2025-01-01 12:00:00"):
+    return [{"profile": str(p), "char": str(c), "datetime": at} for p, c in pairs]
+
+
+@pytest.fixture
+def publisher():
+    return OnlinePublisher(pairs_per_message=2, max_messages=2)
+
+
+def test_update_diffs_online_set(publisher):
+    assert publisher.update(scrape((1, 10), (2, 20))) == ([(1, 10), (2, 20)], [])
+    joined, left = publisher.update(scrape((2, 20), (3, 30), at="2025-01-01 12:01:00"))
+    assert joined == [(3, 30)]
+    assert left == [(1, 10)]
+    assert publisher.online[(2, 20)] == datetime(2025, 1, 1, 12, 0)
+    assert publisher.online[(3, 30)] == datetime(2025, 1, 1, 12, 1)
+
+
+def test_update_ignores_nobody_online_placeholder(publisher):
+    publisher.update(scrape((1, 10)))
+    joined, left = publisher.update(scrape((0, 0)))
+    assert joined == []
+    assert left == [(1, 10)]
+    assert publisher.online == {}
+
+
+def test_messages_split_deltas(publisher):
+    publisher.update(scrape((1, 1), (2, 2), (3, 3)))
+    payloads = publisher.messages(
+        [(1, 1), (2, 2), (3, 3)], [(9, 9)], datetime(2025, 1, 1, 12, 0)
+    )
+    messages = [json.loads(payload) for payload in payloads]
+    assert [m["joined"] for m in messages] == [[[1, 1], [2, 2]], [[3, 3]]]
+    assert [m["left"] for m in messages] == [[[9, 9]], []]
+    assert all(m["type"] == "delta" and m["total"] == 3 for m in messages)
+    assert messages[0]["at"] == "2025-01-01T12:00:00"
+
+
+def test_messages_fall_back_to_snapshot(publisher):
+    joined = [(i, i) for i in range(5)]
+    payloads = publisher.messages(joined, [], datetime(2025, 1, 1))
+    assert [json.loads(payload)["type"] for payload in payloads] == ["snapshot"]
+    payloads = publisher.messages([], [], datetime(2025, 1, 1), snapshot=True)
+    assert json.loads(payloads[0]) == {
+        "type": "snapshot",
+        "at": "2025-01-01T00:00:00",
+        "total": 0,
+    }
+
+
+def test_publish_sends_snapshot_first_then_deltas(mocker, publisher):
+    db = mocker.MagicMock()
+    publisher.publish(db, "conn", scrape((1, 10)))
+    publisher.publish(db, "conn", scrape((1, 10), (2, 20)))
+    first, second = db.publish_online_players.call_args_list
+    assert json.loads(first.args[2][0])["type"] == "snapshot"
+    assert json.loads(second.args[2][0])["joined"] == [[2, 20]]
+    assert set(second.args[1]) == {(1, 10), (2, 20)}
+
+
+def test_publish_failure_resends_snapshot(mocker, publisher):
+    db = mocker.MagicMock()
+    connection = mocker.MagicMock()
+    publisher.publish(db, connection, scrape((1, 10)))
+    db.publish_online_players.side_effect = psycopg2.OperationalError("down")
+    assert publisher.publish(db, connection, scrape((2, 20))) is None
+    connection.rollback.assert_called_once()
+    db.publish_online_players.side_effect = None
+    publisher.publish(db, connection, scrape((2, 20)))
+    payloads = db.publish_online_players.call_args.args[2]
+    assert json.loads(payloads[0])["type"] == "snapshot"
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.parquet_export import ParquetAnalytics, ParquetExporter
+
+BASE = datetime(2025, 1, 1, 23, 50)
+
+
+@pytest.fixture
+def activity_rows():
+    return [
+        (1, 10, BASE),
+        (1, 10, BASE + timedelta(seconds=30)),
+        (2, 20, BASE + timedelta(minutes=5)),
+        (1, 11, BASE + timedelta(minutes=12)),
+        (1, 10, BASE + timedelta(minutes=20)),
+    ]
+
+
+@pytest.fixture
+def exporter(mocker, tmp_path, activity_rows):
+    mock_db_cls = mocker.patch("backend.parquet_export.DbOperations", autospec=True)
+    db = mock_db_cls.return_value
+
+    def stream_data(connection, table, where_clause=None, params=None, **kwargs):
+        if table == "profile_data":
+            return iter([[(1, 10, "Sold", 53, None, "#berufs")]])
+        start, end = (params[0], params[1]) if len(params) == 2 else (None, params[0])
+        rows = [
+            row
+            for row in activity_rows
+            if (start is None or row[2] >= start) and row[2] < end
+        ]
+        return iter([rows[:2], rows[2:]])
+
+    db.stream_data.side_effect = stream_data
+    return ParquetExporter(export_dir=str(tmp_path), batch_size=2), db
+
+
+def test_export_activity_partitions_by_day(exporter, tmp_path):
+    exporter, _ = exporter
+    until = BASE + timedelta(minutes=15)
+    assert exporter.export_activity(until=until) == 4
+    assert exporter.read_watermark() == until
+    assert sorted(p.name for p in (tmp_path / "activity_data").iterdir()) == [
+        "day=2025-01-01",
+        "day=2025-01-02",
+    ]
+    assert not list(tmp_path.rglob(".*.parquet"))
+
+
+def test_failed_run_leaves_no_readable_temp_files(exporter, tmp_path):
+    exporter, db = exporter
+    exporter.export_activity(until=BASE + timedelta(minutes=15))
+    stream_data = db.stream_data.side_effect
+
+    def failing(*args, **kwargs):
+        yield next(stream_data(*args, **kwargs))
+        raise RuntimeError("connection lost")
+
+    db.stream_data.side_effect = failing
+    with pytest.raises(RuntimeError):
+        exporter.export_activity(until=BASE + timedelta(hours=1))
+    assert list(tmp_path.rglob(".part-*.parquet"))
+    table = ParquetAnalytics(exporter.export_dir).activity(
+        BASE, BASE + timedelta(hours=1)
+    )
+    assert table.num_rows == 4
+
+    db.stream_data.side_effect = stream_data
+    assert exporter.export_activity(until=BASE + timedelta(hours=1)) == 1
+    assert not list(tmp_path.rglob(".*"))
+
+
+def test_run_failed_before_watermark_is_replaced(exporter, mocker):
+    exporter, _ = exporter
+    failing = mocker.patch.object(
+        exporter, "write_watermark", side_effect=OSError("disk full")
+    )
+    with pytest.raises(OSError):
+        exporter.export_activity(until=BASE + timedelta(hours=1))
+    mocker.stop(failing)
+
+    assert exporter.export_activity(until=BASE + timedelta(minutes=5)) == 2
+    analytics = ParquetAnalytics(exporter.export_dir)
+    assert analytics.activity(BASE, BASE + timedelta(hours=1)).num_rows == 2
+    assert exporter.export_activity(until=BASE + timedelta(hours=1)) == 3
+    assert analytics.activity(BASE, BASE + timedelta(hours=1)).num_rows == 5
+
+
+def test_export_activity_incremental(exporter):
+    exporter, db = exporter
+    exporter.export_activity(until=BASE + timedelta(minutes=15))
+    assert exporter.export_activity(until=BASE + timedelta(minutes=15)) == 0
+    assert exporter.export_activity(until=BASE + timedelta(hours=1)) == 1
+    last_call = db.stream_data.call_args.kwargs
+    assert last_call["where_clause"] == "datetime >= %s AND datetime < %s"
+    analytics = ParquetAnalytics(exporter.export_dir)
+    table = analytics.activity(BASE, BASE + timedelta(hours=1))
+    assert table.num_rows == 5
+
+
+def test_analytics_queries(exporter):
+    exporter, _ = exporter
+    exporter.export_activity(until=BASE + timedelta(hours=1))
+    exporter.export_profiles()
+    analytics = ParquetAnalytics(exporter.export_dir)
+    end = BASE + timedelta(minutes=30)
+
+    assert analytics.player_activity(1, 10, BASE, end) == [
+        BASE,
+        BASE + timedelta(seconds=30),
+        BASE + timedelta(minutes=20),
+    ]
+    presence = analytics.player_presence(1, 10, BASE, end, bucket_minutes=10)
+    assert presence == [1, 0, 1]
+
+    minutes = analytics.online_minutes(BASE, end).to_pylist()
+    assert minutes[0] == {"profile": 1, "char": 10, "minutes": 2}
+    assert len(minutes) == 3
+
+    counts = analytics.bucket_counts(BASE, end, bucket_minutes=10).to_pylist()
+    assert counts == [
+        {"bucket": BASE, "online": 2},
+        {"bucket": BASE + timedelta(minutes=10), "online": 1},
+        {"bucket": BASE + timedelta(minutes=20), "online": 1},
+    ]
+    assert analytics.profiles().column("nick").to_pylist() == ["Sold"]
+
+
+def test_analytics_without_export(tmp_path):
+    analytics = ParquetAnalytics(str(tmp_path))
+    assert analytics.activity(BASE, BASE + timedelta(hours=1)).num_rows == 0
+    assert analytics.profiles().num_rows == 0
@@ -0,0 +1,123 @@
+from unittest.mock import MagicMock
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_INERROR, TRANSACTION_STATUS_INTRANS
+
+from backend.query_stats import QueryStats, TimedCursor, normalize_sql
+
+
+def test_normalize_sql_replaces_values():
+    assert (
+        normalize_sql(
+            "SELECT * FROM profile_data\n  WHERE nick = 'Abc''d' AND lvl > 10;"
+        )
+        == "SELECT * FROM profile_data WHERE nick = ? AND lvl > ?"
+    )
+    assert (
+        normalize_sql("SELECT 1 FROM activity_data WHERE profile = %s LIMIT 20")
+        == "SELECT ? FROM activity_data WHERE profile = ? LIMIT ?"
+    )
+
+
+def test_normalize_sql_collapses_value_lists():
+    query = (
+        b"INSERT INTO activity_data (profile, char, datetime) VALUES "
+        b"(1,2,'2025-01-01 12:00:00'::timestamp),(3,4,'2025-01-01 12:00:00'::timestamp)"
+    )
+    assert normalize_sql(query) == (
+        "INSERT INTO activity_data (profile, char, datetime) VALUES (...), ..."
+    )
+    assert normalize_sql("SELECT a1 FROM t WHERE profile = ANY(ARRAY[1, 2, 3])") == (
+        "SELECT a1 FROM t WHERE profile = ANY(ARRAY[...])"
+    )
+
+
+def test_record_groups_by_statement():
+    stats = QueryStats()
+    stats.record("SELECT * FROM t WHERE a = 1", 0.2, 3)
+    stats.record("SELECT * FROM t WHERE a = 2", 0.4, 5)
+    stats.record("DELETE FROM t", 0.1, 8)
+    statements = stats.statements()
+    assert [s["statement"] for s in statements] == [
+        "SELECT * FROM t WHERE a = ?",
+        "DELETE FROM t",
+    ]
+    assert statements[0] == {
+        "statement": "SELECT * FROM t WHERE a = ?",
+        "calls": 2,
+        "total_ms": 600.0,
+        "mean_ms": 300.0,
+        "max_ms": 400.0,
+        "rows": 8,
+    }
+    stats.reset()
+    assert stats.statements() == []
+
+
+def test_slow_threshold():
+    assert QueryStats(slow_ms=500).is_slow(0.5)
+    assert not QueryStats(slow_ms=500).is_slow(0.499)
+    assert not QueryStats(slow_ms=0).is_slow(10)
+
+
+def test_log_slow_keeps_top_n(capsys):
+    stats = QueryStats(slow_ms=100, top_n=3)
+    for ms in (150, 900, 300, 120, 600):
+        stats.log_slow(f"SELECT {ms}", ms / 1000, 1, plan="Seq Scan on t")
+    assert [entry["ms"] for entry in stats.slowest()] == [900.0, 600.0, 300.0]
+    assert [entry["ms"] for entry in stats.slowest(2)] == [900.0, 600.0]
+    out = capsys.readouterr().out
+    assert "Slow query (900.0 ms, 1 rows): SELECT 900" in out
+    assert "Seq Scan on t" in out
+
+
+def test_report_lists_both_tables():
+    stats = QueryStats(slow_ms=100)
+    stats.record("SELECT * FROM t", 0.25, 2)
+    stats.log_slow("SELECT * FROM t", 0.25, 2)
+    report = stats.report()
+    assert report.startswith("Slowest queries (over 100 ms):")
+    assert "Statements by total time:" in report
+    assert report.count("SELECT * FROM t") == 2
+
+
+def test_explain_is_opt_in_and_rate_limited_per_statement(mocker):
+    assert not QueryStats(explain=False).should_explain("SELECT ?")
+    monotonic = mocker.patch("backend.query_stats.time.monotonic", return_value=0)
+    stats = QueryStats(explain=True, explain_interval=60)
+    assert stats.should_explain("SELECT ?")
+    assert not stats.should_explain("SELECT ?")
+    assert stats.should_explain("SELECT * FROM t")
+    monotonic.return_value = 61
+    assert stats.should_explain("SELECT ?")
+
+
+def explaining_cursor(mocker, status=TRANSACTION_STATUS_INTRANS):
+    connection = MagicMock(autocommit=False)
+    connection.info.transaction_status = status
+    cursor = MagicMock()
+    cursor.__enter__.return_value = cursor
+    mocker.patch("backend.query_stats.BaseCursor", return_value=cursor)
+    return MagicMock(connection=connection), cursor
+
+
+def test_explain_skips_aborted_transactions(mocker):
+    timed, cursor = explaining_cursor(mocker, TRANSACTION_STATUS_INERROR)
+    assert TimedCursor.explain(timed, "SELECT 1") is None
+    cursor.execute.assert_not_called()
+
+
+def test_explain_does_not_roll_back_a_savepoint_it_never_made(mocker):
+    timed, cursor = explaining_cursor(mocker)
+    cursor.execute.side_effect = psycopg2.Error("connection lost")
+    assert TimedCursor.explain(timed, "SELECT 1") == "EXPLAIN failed: connection lost"
+    assert cursor.execute.call_count == 1
+
+
+def test_explain_rolls_back_to_its_savepoint(mocker):
+    timed, cursor = explaining_cursor(mocker)
+    cursor.execute.side_effect = [None, psycopg2.Error("canceled"), None]
+    assert TimedCursor.explain(timed, "SELECT 1") == "EXPLAIN failed: canceled"
+    assert cursor.execute.call_args.args == (
+        "ROLLBACK TO SAVEPOINT query_stats_explain;",
+    )
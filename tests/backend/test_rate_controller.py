@@ -0,0 +1,188 @@
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+from prometheus_client import REGISTRY
+
+from backend.rate_controller import RateController
+from backend.web_scrapper import WebScrapper
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def time(self):
+        return 1_700_000_000 + self.now
+
+
+@pytest.fixture
+def clock(mocker):
+    clock = FakeClock()
+    mocker.patch("backend.rate_controller.time", clock)
+    return clock
+
+
+@pytest.fixture
+def controller(clock):
+    return RateController(
+        initial_rate=2,
+        min_rate=0.5,
+        max_rate=2.2,
+        increase=0.1,
+        base_backoff=1,
+        max_backoff=4,
+        failure_threshold=3,
+        open_seconds=60,
+        max_open_seconds=100,
+        seed=1,
+    )
+
+
+def response(status, headers=None):
+    mock = MagicMock()
+    mock.status_code = status
+    mock.headers = headers or {}
+    mock.content = b"<html><body><p>ok</p></body></html>"
+    if status >= 400:
+        mock.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            f"{status} Error", response=mock
+        )
+    return mock
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_rate_increases_additively_and_decreases_multiplicatively(controller):
+    controller.record_success(0.1)
+    assert controller.rate == pytest.approx(2.1)
+    controller.record_success(0.1)
+    controller.record_success(0.1)
+    assert controller.rate == 2.2
+    controller.record_success(30)
+    assert controller.rate == 1.1
+    controller.record_failure()
+    controller.record_failure()
+    assert controller.rate == 0.5
+
+
+def test_requests_are_paced_by_the_rate(controller, clock):
+    for _ in range(3):
+        assert controller.acquire()
+    assert clock.sleeps == [0.5, 0.5]
+    controller.rate = 1
+    controller.acquire()
+    controller.acquire()
+    assert clock.sleeps[-1] == 1
+
+
+def test_retry_after_holds_back_all_requests(controller, clock):
+    controller.acquire()
+    assert controller.record_failure("7") == 7
+    controller.acquire()
+    assert clock.sleeps == [7]
+
+    date = datetime.fromtimestamp(clock.time(), timezone.utc) + timedelta(seconds=30)
+    assert controller.parse_retry_after(format_datetime(date, usegmt=True)) == (
+        pytest.approx(30, abs=1)
+    )
+    assert controller.parse_retry_after("soon") is None
+    assert controller.parse_retry_after(None) is None
+
+
+def test_backoff_is_jittered_and_capped(controller):
+    controller.failure_threshold = 100
+    delays = [controller.record_failure() for _ in range(8)]
+    assert 0 <= delays[0] <= 1
+    assert 0 <= delays[1] <= 2
+    assert all(0 <= delay <= 4 for delay in delays)
+    assert len(set(delays)) == len(delays)
+
+
+def test_circuit_opens_probes_and_closes(controller, clock):
+    for _ in range(3):
+        controller.record_failure("1")
+    assert controller.state == "open"
+    assert not controller.acquire(max_wait=10)
+
+    assert controller.acquire()
+    assert controller.state == "half_open"
+    assert clock.now == pytest.approx(1060)
+    controller.record_failure("1")
+    assert controller.state == "open"
+    assert not controller.acquire(max_wait=99)
+    assert controller.acquire()
+    assert clock.now == pytest.approx(1060 + 100)
+
+    controller.record_success(0.1)
+    assert controller.state == "closed"
+    assert controller.consecutive_failures == 0
+    controller.record_failure("1")
+    assert controller.state == "closed"
+
+
+def test_get_soup_retries_throttled_responses(mocker, controller, clock):
+    get = mocker.patch(
+        "requests.get",
+        side_effect=[response(503, {"Retry-After": "20"}), response(200)],
+    )
+    retries = sample("mgspy_fetch_retries_total", page="stats")
+
+    soup = WebScrapper.get_soup("http://stub/stats", controller=controller)
+
+    assert soup.p.text == "ok"
+    assert get.call_count == 2
+    assert clock.sleeps == [20]
+    assert controller.rate == pytest.approx(1.1)
+    assert sample("mgspy_fetch_retries_total", page="stats") == retries + 1
+
+
+def test_get_soup_does_not_retry_client_errors(mocker, controller):
+    get = mocker.patch("requests.get", return_value=response(404))
+    errors = sample("mgspy_fetch_failures_total", page="profile", reason="error")
+
+    assert (
+        WebScrapper.get_soup("http://stub/profile/view,1", controller=controller)
+        is None
+    )
+    assert get.call_count == 1
+    assert controller.consecutive_failures == 0
+    assert (
+        sample("mgspy_fetch_failures_total", page="profile", reason="error")
+        == errors + 1
+    )
+
+
+def test_get_soup_skips_pages_while_the_circuit_is_open(mocker, controller):
+    get = mocker.patch("requests.get", return_value=response(500))
+    throttled = sample("mgspy_fetch_failures_total", page="stats", reason="throttled")
+    skipped = sample("mgspy_fetch_failures_total", page="stats", reason="circuit_open")
+
+    assert WebScrapper.get_soup("http://stub/stats", controller=controller) is None
+    assert controller.state == "open"
+    assert (
+        WebScrapper.get_soup("http://stub/stats", controller=controller, max_wait=30)
+        is None
+    )
+
+    assert get.call_count == 3
+    assert (
+        sample("mgspy_fetch_failures_total", page="stats", reason="throttled")
+        == throttled + 1
+    )
+    assert (
+        sample("mgspy_fetch_failures_total", page="stats", reason="circuit_open")
+        == skipped + 1
+    )
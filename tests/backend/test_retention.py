@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.retention import RetentionJob, RollupReader
+
+NOW = datetime(2025, 6, 1, 3, 30)
+
+
+@pytest.fixture
+def job():
+    return RetentionJob(raw_days=30, batch_size=100, batch_pause=0)
+
+
+@pytest.fixture
+def connection(mocker):
+    connection = mocker.MagicMock()
+    cursor = connection.cursor.return_value.__enter__.return_value
+    return connection, cursor
+
+
+def test_tiers_cut_at_midnight(job):
+    assert job.tiers(NOW) == [
+        (1, 15, datetime(2025, 5, 2)),
+        (15, 60, datetime(2025, 3, 3)),
+        (60, 1440, datetime(2024, 6, 1)),
+    ]
+
+
+def test_rollup_query():
+    raw = RetentionJob.rollup_query(1, 15)
+    assert "FROM activity_data" in raw
+    assert "date_bin('15 minutes', datetime" in raw
+    assert "count(DISTINCT date_trunc('minute', datetime))" in raw
+    hourly = RetentionJob.rollup_query(15, 60)
+    assert "bucket_minutes = 15" in hourly
+    assert "sum(online_minutes)" in hourly
+    assert "ON CONFLICT (profile, char, bucket_minutes, bucket_start)" in hourly
+
+
+def test_roll_up_from_watermark(mocker, job, connection):
+    connection, cursor = connection
+    mocker.patch.object(job, "_watermark", return_value=datetime(2025, 4, 29))
+    assert job.roll_up(connection, 1, 15, datetime(2025, 5, 2)) == 3
+    watermarks = [
+        call.args[1]
+        for call in cursor.execute.call_args_list
+        if "retention" in call.args[0]
+    ]
+    assert watermarks == [
+        (1, datetime(2025, 4, 30)),
+        (1, datetime(2025, 5, 1)),
+        (1, datetime(2025, 5, 2)),
+    ]
+    assert connection.commit.call_count == 3
+
+
+def test_roll_up_starts_at_oldest_row(mocker, job, connection):
+    connection, cursor = connection
+    mocker.patch.object(job, "_watermark", return_value=None)
+    mocker.patch.object(job, "_oldest", return_value=datetime(2025, 5, 1, 17, 3))
+    assert job.roll_up(connection, 1, 15, datetime(2025, 5, 2)) == 1
+    assert cursor.execute.call_args_list[0].args[1] == (
+        datetime(2025, 5, 1),
+        datetime(2025, 5, 2),
+    )
+
+
+def test_roll_up_empty_tier(mocker, job, connection):
+    connection, cursor = connection
+    mocker.patch.object(job, "_watermark", return_value=None)
+    mocker.patch.object(job, "_oldest", return_value=None)
+    assert job.roll_up(connection, 15, 60, datetime(2025, 3, 3)) == 0
+    cursor.execute.assert_not_called()
+
+
+def test_delete_batches_until_short_batch(job, connection):
+    connection, cursor = connection
+    rowcounts = iter([100, 100, 7])
+
+    def execute(query, params):
+        cursor.rowcount = next(rowcounts)
+
+    cursor.execute.side_effect = execute
+    assert job.delete_batches(connection, 15, datetime(2025, 3, 3)) == 207
+    assert connection.commit.call_count == 3
+    query, params = cursor.execute.call_args.args
+    assert "LIMIT 100" in query and "activity_rollup" in query
+    assert params == (15, datetime(2025, 3, 3))
+
+
+def test_run_deletes_up_to_watermark(mocker, job):
+    connection = mocker.MagicMock()
+    job.db = mocker.MagicMock()
+    job.db.connect_to_db.return_value = connection
+    mocker.patch.object(job, "roll_up", return_value=1)
+    mocker.patch.object(
+        job, "_watermark", side_effect=[datetime(2025, 4, 1), None, None]
+    )
+    delete = mocker.patch.object(job, "delete_batches", return_value=5)
+    summary = job.run(NOW)
+    assert summary == {1: (1, 5), 15: (1, 0), 60: (1, 0)}
+    delete.assert_called_once_with(connection, 1, datetime(2025, 4, 1))
+    vacuum = connection.cursor.return_value.__enter__.return_value.execute
+    vacuum.assert_called_once_with("VACUUM (ANALYZE) activity_data;")
+    connection.close.assert_called_once()
+
+
+def test_rollup_reader_split():
+    start, end = datetime(2025, 5, 1, 23, 30), datetime(2025, 5, 2, 0, 30)
+    midnight = datetime(2025, 5, 2)
+    assert RollupReader.split(start, end, None) == (None, (start, end))
+    assert RollupReader.split(start, end, start) == (None, (start, end))
+    assert RollupReader.split(start, end, end) == ((start, end), None)
+    assert RollupReader.split(start, end, midnight) == (
+        (start, midnight),
+        (midnight, end),
+    )
+
+
+def test_rollup_reader_spreads_online_minutes():
+    bucket = datetime(2025, 5, 1, 12, 0)
+    rows = [
+        (1, 10, bucket, 15, 3),
+        (1, 10, bucket + timedelta(minutes=15), 15, 15),
+        (2, 20, bucket - timedelta(hours=1), 60, 60),
+        (3, 30, bucket, 60, 60),
+    ]
+    watermarks = {15: bucket - timedelta(hours=12), 60: bucket + timedelta(hours=1)}
+    activity = RollupReader.activity_rows(
+        rows, bucket, bucket + timedelta(minutes=20), watermarks
+    )
+    assert [dt.minute for profile, _, dt in activity if profile == 1] == [
+        0,
+        5,
+        10,
+        15,
+        16,
+        17,
+        18,
+        19,
+    ]
+    assert not [row for row in activity if row[0] in (2, 3)]
+
+
+def test_rollup_reader_reads_both_sides_of_the_watermark(mocker):
+    db = mocker.MagicMock()
+    midnight = datetime(2025, 5, 2)
+    db.select_data.side_effect = [
+        [(1, midnight), (15, datetime(2025, 3, 3))],
+        [(1, 10, midnight - timedelta(minutes=15), 15, 1)],
+        [(1, 10, midnight + timedelta(minutes=5))],
+        [(1, 10, midnight + timedelta(minutes=6))],
+    ]
+    reader = RollupReader(ttl=60)
+
+    def raw_query(start, end):
+        return {"table": "activity_data", "params": (start, end)}
+
+    start, end = midnight - timedelta(minutes=30), midnight + timedelta(minutes=30)
+    rows = reader.read(db, "conn", raw_query, [(1, 10)], start, end)
+
+    assert rows == [
+        (1, 10, midnight - timedelta(minutes=15)),
+        (1, 10, midnight + timedelta(minutes=5)),
+    ]
+    rollup_call, raw_call = db.select_data.call_args_list[1:3]
+    assert rollup_call.kwargs["table"] == "activity_rollup"
+    assert rollup_call.kwargs["params"][3] == midnight
+    assert raw_call.kwargs["params"] == (midnight, end)
+
+    reader.read(db, "conn", raw_query, [(1, 10)], midnight, end)
+    assert db.select_data.call_count == 4
@@ -0,0 +1,107 @@
+import os
+import shutil
+from datetime import datetime
+
+import pytest
+import requests
+
+from backend.rate_controller import RateController
+from backend.scrape_stub import ScrapeStub
+from backend.web_scrapper import WebScrapper
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+def unpaced():
+    return RateController(initial_rate=1000, max_rate=1000)
+
+
+@pytest.fixture
+def stub():
+    stub = ScrapeStub(port=0, online=120, latency=0, jitter=0, profiles=300)
+    yield stub
+    stub.stop()
+
+
+def test_scrapper_reads_generated_stats_page(stub):
+    scrapper = WebScrapper(base_url=stub.start(), controller=unpaced())
+
+    activity, _ = scrapper.scrap_character_activity()
+
+    assert len(activity) == 120
+    assert len({(a["profile"], a["char"]) for a in activity}) == 120
+    assert stub.requests[("stats", 200)] == 1
+
+
+def test_stats_page_is_stable_within_a_minute(stub):
+    first = stub.stats_page(datetime(2025, 1, 1, 12, 0, 5))
+    assert stub.stats_page(datetime(2025, 1, 1, 12, 0, 55)) == first
+    assert stub.stats_page(datetime(2025, 1, 1, 12, 1, 5)) != first
+
+
+def test_scrapper_reads_generated_profile_pages(stub):
+    scrapper = WebScrapper(base_url=stub.start(), controller=unpaced())
+    activity, _ = scrapper.scrap_character_activity()
+    one_per_profile = list({a["profile"]: a for a in activity}.values())[:5]
+
+    characters = scrapper.scrap_profile_data(one_per_profile)
+
+    profiles = {a["profile"] for a in one_per_profile}
+    assert {c["profile"] for c in characters} == profiles
+    owned = [c for c in stub._characters if str(c["profile"]) in profiles]
+    assert sorted(c["nick"] for c in characters) == sorted(c["nick"] for c in owned)
+
+
+def test_injected_errors_carry_retry_after():
+    stub = ScrapeStub(
+        port=0, latency=0, jitter=0, error_rate=1, error_statuses=(503,), profiles=50
+    )
+    url = stub.start()
+    try:
+        response = requests.get(f"{url}/stats", timeout=5)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+        assert requests.get(f"{url}/missing", timeout=5).status_code == 404
+    finally:
+        stub.stop()
+
+
+def test_padding_and_recorded_pages(tmp_path, player_activity_test):
+    shutil.copy(os.path.join(DATA_PATH, "activity.html"), tmp_path / "stats.html")
+    stub = ScrapeStub(
+        port=0, latency=0, jitter=0, padding_kb=64, recorded_dir=tmp_path, profiles=50
+    )
+    url = stub.start()
+    try:
+        response = requests.get(f"{url}/stats", timeout=5)
+        assert len(response.content) > 64 * 1024
+        activity, _ = WebScrapper(base_url=url).scrap_character_activity()
+        assert len(activity) == len(player_activity_test)
+    finally:
+        stub.stop()
+
+
+def test_scrapper_backs_off_and_recovers_from_injected_errors():
+    stub = ScrapeStub(
+        port=0,
+        online=40,
+        latency=0,
+        jitter=0,
+        error_rate=0.3,
+        error_statuses=(503,),
+        retry_after=0,
+        profiles=100,
+    )
+    controller = RateController(initial_rate=1000, max_rate=1000, increase=0)
+    scrapper = WebScrapper(base_url=stub.start(), controller=controller)
+    try:
+        activity = []
+        while not activity:
+            activity, _ = scrapper.scrap_character_activity()
+        characters = scrapper.scrap_profile_data(activity[:20])
+    finally:
+        stub.stop()
+
+    assert stub.requests[("profile", 503)] > 0
+    assert controller.rate < 1000
+    assert {c["profile"] for c in characters} == {a["profile"] for a in activity[:20]}
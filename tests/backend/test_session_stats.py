@@ -0,0 +1,116 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.session_stats import SessionEngine
+
+BASE = datetime(2025, 1, 1, 12, 0)
+
+
+def activity(profile, char, minutes):
+    return [
+        {
+            "profile": str(profile),
+            "char": str(char),
+            "datetime": (BASE + timedelta(minutes=m)).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        for m in minutes
+    ]
+
+
+@pytest.fixture
+def engine():
+    return SessionEngine(gap_tolerance=timedelta(minutes=5))
+
+
+def test_sessions_from_activity_gap_tolerance(engine):
+    rows = activity(1, 10, [0, 1, 2, 6, 20, 21]) + activity(2, 20, [3, 4])
+    sessions = engine.sessions_from_activity(rows)
+    assert sessions == [
+        (1, 10, BASE, BASE + timedelta(minutes=7)),
+        (1, 10, BASE + timedelta(minutes=20), BASE + timedelta(minutes=22)),
+        (2, 20, BASE + timedelta(minutes=3), BASE + timedelta(minutes=5)),
+    ]
+
+
+def test_detect_does_not_merge_across_characters(engine):
+    sessions = engine.detect(
+        [1, 1, 1],
+        [10, 11, 11],
+        np.array([BASE, BASE, BASE + timedelta(hours=2)], "datetime64[s]"),
+        np.array(
+            [
+                BASE + timedelta(hours=3),
+                BASE + timedelta(minutes=1),
+                BASE + timedelta(hours=2, minutes=1),
+            ],
+            "datetime64[s]",
+        ),
+    )
+    assert len(sessions) == 3
+    assert engine.detect([], [], [], []) == []
+
+
+def test_update_sessions_merges_open_session(engine, mocker):
+    db = mocker.MagicMock()
+    open_session = (1, 10, BASE - timedelta(minutes=30), BASE - timedelta(minutes=2))
+    closed_other = (1, 11, BASE - timedelta(minutes=30), BASE)
+    db.select_data.return_value = [open_session, closed_other]
+    sessions = engine.update_sessions(db, "conn", activity(1, 10, [0, 1]))
+    assert sessions == [(1, 10, open_session[2], BASE + timedelta(minutes=2))]
+    db.replace_sessions.assert_called_once_with("conn", [open_session], sessions)
+    params = db.select_data.call_args.kwargs["params"]
+    assert params == ([1], [10], BASE - timedelta(minutes=5))
+
+
+def test_update_sessions_empty_batch(engine, mocker):
+    db = mocker.MagicMock()
+    assert engine.update_sessions(db, "conn", []) == []
+    db.select_data.assert_not_called()
+
+
+def test_nobody_online_placeholder_is_not_a_session(engine, mocker):
+    placeholder = activity(0, 0, [0, 1, 2])
+    assert engine.sessions_from_activity(placeholder + activity(1, 10, [1])) == [
+        (1, 10, BASE + timedelta(minutes=1), BASE + timedelta(minutes=2))
+    ]
+    db = mocker.MagicMock()
+    assert engine.update_sessions(db, "conn", placeholder) == []
+    db.select_data.assert_not_called()
+    db.replace_sessions.assert_not_called()
+
+
+def test_daily_playtime_and_hours():
+    sessions = [
+        (1, 10, datetime(2025, 1, 1, 23, 30), datetime(2025, 1, 2, 0, 30)),
+        (1, 10, datetime(2025, 1, 2, 23, 0), datetime(2025, 1, 2, 23, 15)),
+    ]
+    assert SessionEngine.daily_playtime(sessions) == {
+        date(2025, 1, 1): 30,
+        date(2025, 1, 2): 45,
+    }
+    hourly = SessionEngine.hourly_minutes(sessions)
+    assert hourly[23] == 45 and hourly[0] == 30 and hourly.sum() == 75
+    assert SessionEngine.typical_hours(sessions) == [0, 23]
+
+
+def test_streaks():
+    days = [date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3), date(2025, 1, 6)]
+    assert SessionEngine.streaks(days, today=date(2025, 1, 7)) == (1, 3)
+    assert SessionEngine.streaks(days, today=date(2025, 1, 9)) == (0, 3)
+    assert SessionEngine.streaks([], today=date(2025, 1, 9)) == (0, 0)
+
+
+def test_stats():
+    sessions = [
+        (1, 10, BASE, BASE + timedelta(minutes=30)),
+        (1, 10, BASE + timedelta(days=1), BASE + timedelta(days=1, minutes=10)),
+    ]
+    stats = SessionEngine.stats(sessions, today=date(2025, 1, 2))
+    assert stats["sessions"] == 2
+    assert stats["total_minutes"] == 40
+    assert stats["average_session_minutes"] == 20
+    assert stats["longest_session_minutes"] == 30
+    assert stats["typical_hours"] == [12]
+    assert (stats["current_streak"], stats["longest_streak"]) == (2, 2)
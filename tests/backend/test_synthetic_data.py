@@ -0,0 +1,86 @@
+from collections import Counter
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from backend.synthetic_data import SyntheticDataGenerator
+
+
+@pytest.fixture(scope="module")
+def generator():
+    return SyntheticDataGenerator(profiles=500, start_date=date(2025, 1, 1), days=3)
+
+
+def test_characters(generator):
+    chars = generator.characters()
+    assert chars.column_names == ["profile", "char", "nick", "lvl", "clan", "world"]
+    assert chars.num_rows >= 500
+    pairs = set(
+        zip(chars.column("profile").to_pylist(), chars.column("char").to_pylist())
+    )
+    assert len(pairs) == chars.num_rows
+    assert len(set(chars.column("nick").to_pylist())) == chars.num_rows
+    levels = chars.column("lvl").to_numpy()
+    assert levels.min() >= 1 and levels.max() <= 300
+    clans = Counter(clan for clan in chars.column("clan").to_pylist() if clan)
+    sizes = [size for _, size in clans.most_common()]
+    assert sizes[0] > 5 * sizes[len(sizes) // 2]
+    assert generator.characters() is chars
+
+
+def test_activity_day(generator):
+    activity = generator.activity_day(0)
+    rows = activity.to_pylist()
+    assert rows
+    assert all(row["datetime"].date() == date(2025, 1, 1) for row in rows)
+    minutes = [
+        (row["profile"], row["char"], row["datetime"].replace(second=0)) for row in rows
+    ]
+    assert len(set(minutes)) == len(minutes)
+    datetimes = activity.column("datetime").to_pylist()
+    assert datetimes == sorted(datetimes)
+    hours = Counter(dt.hour for dt in datetimes)
+    assert hours[20] > 3 * hours[4]
+
+
+def test_activity_is_deterministic(generator):
+    other = SyntheticDataGenerator(profiles=500, start_date=date(2025, 1, 1), days=3)
+    assert other.activity_day(1).equals(generator.activity_day(1))
+    assert not generator.activity_day(1).equals(generator.activity_day(2))
+
+
+def test_churned_characters_stop_playing():
+    generator = SyntheticDataGenerator(profiles=300, days=40, churn_days=5)
+    generator.characters()
+    traits = generator._traits
+    quit_early = np.flatnonzero(traits["join"] + traits["lifetime"] < 10)
+    gone = set(traits["char"][quit_early].tolist())
+    assert gone
+    assert not gone & set(generator.activity_day(20).column("char").to_pylist())
+
+
+def test_load_copies_in_batches(mocker):
+    generator = SyntheticDataGenerator(profiles=50, days=2, batch_rows=1000)
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    loaded = generator.load(conn, truncate=True)
+    assert loaded["profile_data"] == generator.characters().num_rows
+    assert loaded["activity_data"] == sum(
+        generator.activity_day(day).num_rows for day in range(2)
+    )
+    cursor.execute.assert_called_once_with("TRUNCATE profile_data, activity_data;")
+    queries = [call.args[0] for call in cursor.copy_expert.call_args_list]
+    assert queries[0] == (
+        "COPY profile_data (profile, char, nick, lvl, clan, world) FROM STDIN WITH (FORMAT csv)"
+    )
+    assert (
+        queries.count(
+            "COPY activity_data (profile, char, datetime) FROM STDIN WITH (FORMAT csv)"
+        )
+        >= loaded["activity_data"] // 1000
+    )
+    first_row = cursor.copy_expert.call_args_list[1].args[1].getvalue().split(b"\n")[0]
+    profile, char, at = first_row.decode().split(",")
+    assert datetime.fromisoformat(at).date() == date(2025, 1, 1)
+    assert conn.commit.call_count == 3
@@ -0,0 +1,42 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from backend.tracing import configure_tracing
+
+
+def test_configure_tracing_off_by_default():
+    assert configure_tracing(exporter="") is None
+
+
+def test_configure_tracing_rejects_unknown_exporter():
+    with pytest.raises(ValueError):
+        configure_tracing(exporter="jaeger")
+
+
+def test_file_exporter_writes_nested_spans(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    code = f"""
+from backend.tracing import TRACER, configure_tracing, set_span_attributes
+
+provider = configure_tracing(exporter="file", path={str(path)!r}, service_name="test")
+
+@TRACER.start_as_current_span("handler")
+def handler():
+    with TRACER.start_as_current_span("query"):
+        set_span_attributes(rows=3, skipped=None)
+
+handler()
+provider.shutdown()
+"""
+    subprocess.run([sys.executable, "-c", code], check=True)
+    spans = {
+        span["name"]: span for span in map(json.loads, path.read_text().splitlines())
+    }
+    handler, query = spans["handler"], spans["query"]
+    assert query["attributes"] == {"rows": 3}
+    assert query["parent_id"] == handler["context"]["span_id"]
+    assert query["context"]["trace_id"] == handler["context"]["trace_id"]
+    assert handler["resource"]["attributes"]["service.name"] == "test"
@@ -0,0 +1,119 @@
+import os
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from backend.db_operations import DbOperations
+
+ACTIVITY_DDL = """
+CREATE TABLE activity_data (
+    profile integer NOT NULL,
+    "char" integer NOT NULL,
+    datetime timestamp without time zone NOT NULL
+);
+CREATE INDEX activity_data_datetime_brin_idx ON activity_data USING brin (datetime);
+CREATE INDEX activity_data_profile_char_datetime_idx ON activity_data USING btree (profile, "char", datetime);
+"""
+
+
+def pytest_sessionstart(session):
+    """
+    Fail a regression-gated run (--benchmark-compare-fail) that has no baseline to compare with,
+    unless the run records one.
+    """
+    benchmarks = session.config._benchmarksession
+    gated = benchmarks.compare_fail and benchmarks.compare
+    recording = benchmarks.save or benchmarks.autosave
+    if gated and not recording and not benchmarks.compared_mapping:
+        raise pytest.UsageError(
+            f"No benchmark baseline in {benchmarks.storage}; record one with --benchmark-autosave"
+        )
+
+
+def activity_rows(rows: int, seed: int = 1) -> list[dict]:
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, 12, 0)
+    return [
+        {
+            "profile": str(rng.randrange(1, 10_000_000)),
+            "char": str(rng.randrange(1, 300_000)),
+            "datetime": (start + timedelta(minutes=i // 1000)).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+        }
+        for i in range(rows)
+    ]
+
+
+def profile_rows(rows: int, seed: int = 1) -> list[tuple]:
+    rng = random.Random(seed)
+    clans = [""] + [f"Clan {i}" for i in range(500)]
+    return [
+        (
+            str(1_000_000 + i // 5),
+            str(100_000 + i),
+            f"Nick{i:07d}",
+            str(rng.randint(1, 300)),
+            rng.choice(clans),
+        )
+        for i in range(rows)
+    ]
+
+
+@pytest.fixture
+def scale(benchmark):
+    """
+    Skip all but the smallest size of a benchmark when benchmarks are disabled (the regular test run).
+    """
+
+    def check(size: int, smallest: int):
+        if benchmark.disabled and size > smallest:
+            pytest.skip("larger sizes only run with --benchmark-enable")
+
+    return check
+
+
+@pytest.fixture
+def make_activity():
+    """
+    Factory of scraped activity dictionaries, ~1000 characters online per minute.
+    """
+    return activity_rows
+
+
+@pytest.fixture
+def make_profiles():
+    """
+    Factory of profile_data rows (profile, char, nick, lvl, clan), five characters per profile.
+    """
+    return profile_rows
+
+
+@pytest.fixture(scope="session")
+def bench_db():
+    """
+    Throwaway database on the local Postgres (DB_HOST, DB_USER, ...), dropped afterwards.
+
+    Benchmarks using it are skipped when no server is reachable.
+    """
+    admin = DbOperations(db_name=os.environ.get("BENCH_ADMIN_DB", "postgres"))
+    try:
+        admin_conn = admin.connect_to_db(max_retries=1, delay=0)
+    except Exception as e:
+        pytest.skip(f"No local Postgres: {e}")
+    admin_conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    db_name = f"mgspy_bench_{os.getpid()}"
+    with admin_conn.cursor() as cursor:
+        cursor.execute(f"CREATE DATABASE {db_name};")
+    db = DbOperations(db_name=db_name)
+    conn = db.connect_to_db()
+    with conn.cursor() as cursor:
+        cursor.execute(ACTIVITY_DDL)
+    conn.commit()
+    yield db, conn
+    conn.close()
+    with admin_conn.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS {db_name};")
+    admin_conn.close()
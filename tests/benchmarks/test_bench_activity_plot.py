@@ -0,0 +1,48 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from frontend.activity_page_helpers import ActivityPageHelpers
+
+
+def window(days: int) -> tuple[list[datetime], list[datetime]]:
+    """
+    Minute intervals of a window and the timestamps of a player online ~40% of the time.
+    """
+    start = datetime(2025, 1, 1)
+    minutes = days * 1440
+    intervals = [start + timedelta(minutes=i) for i in range(minutes + 1)]
+    rng = random.Random(1)
+    timestamps, online = [], False
+    for i in range(minutes):
+        if rng.random() < 0.02:
+            online = not online if rng.random() < 0.5 else online
+        if online:
+            timestamps.append(start + timedelta(minutes=i, seconds=rng.randrange(60)))
+    return intervals, timestamps
+
+
+@pytest.mark.benchmark(group="plotting")
+@pytest.mark.parametrize("days", [1, 7, 30])
+def test_bench_activity_presence_array(benchmark, scale, days):
+    scale(days, smallest=1)
+    intervals, timestamps = window(days)
+    presence = benchmark(
+        ActivityPageHelpers.activity_presence_array, intervals, timestamps
+    )
+    assert len(presence) == len(intervals) - 1
+
+
+@pytest.mark.benchmark(group="plotting")
+@pytest.mark.parametrize("buckets", [60, 1440])
+def test_bench_render_bar_chart_to_bytesio(benchmark, scale, buckets):
+    scale(buckets, smallest=60)
+    helpers = ActivityPageHelpers()
+    helpers.start_date = datetime(2025, 1, 1)
+    helpers.end_date = helpers.start_date + timedelta(minutes=buckets)
+    intervals = helpers.generate_intervals()
+    labels = [dt.strftime("%H:%M") for dt in intervals[:-1]]
+    presence = [i % 3 != 0 for i in range(buckets)]
+    img = benchmark(helpers.render_bar_chart_to_bytesio, labels, presence)
+    assert img.getvalue().startswith(b"\x89PNG")
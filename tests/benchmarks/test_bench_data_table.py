@@ -0,0 +1,41 @@
+import pytest
+
+from frontend.data_page_helpers import DataPageHelpers
+from frontend.profile_snapshot import ProfileSnapshot
+
+
+@pytest.mark.benchmark(group="data-table")
+@pytest.mark.parametrize("profiles", [10_000, 100_000, 500_000])
+def test_bench_fill_table(benchmark, mocker, scale, make_profiles, profiles):
+    scale(profiles, smallest=10_000)
+    snapshots = mocker.MagicMock(
+        snapshot=ProfileSnapshot(make_profiles(profiles)), is_loaded=True
+    )
+    helpers = DataPageHelpers(snapshots=snapshots)
+    rows = benchmark(helpers.fill_table)
+    assert len(rows) == profiles
+
+
+@pytest.mark.benchmark(group="data-table")
+@pytest.mark.parametrize("profiles", [10_000, 100_000])
+def test_bench_build_profile_snapshot(benchmark, scale, make_profiles, profiles):
+    scale(profiles, smallest=10_000)
+    rows = make_profiles(profiles)
+    snapshot = benchmark.pedantic(ProfileSnapshot, args=(rows,), rounds=3)
+    assert len(snapshot.table_rows) == profiles
+
+
+@pytest.mark.benchmark(group="data-table")
+@pytest.mark.parametrize("profiles", [10_000, 100_000, 500_000])
+def test_bench_replace_one_profile(benchmark, scale, make_profiles, profiles):
+    scale(profiles, smallest=10_000)
+    rows = make_profiles(profiles)
+    snapshot = ProfileSnapshot(rows)
+    profile = rows[profiles // 2][0]
+    changed = [
+        (p, char, nick, str(int(lvl) + 1), clan)
+        for p, char, nick, lvl, clan in rows
+        if p == profile
+    ]
+    updated = benchmark(snapshot.replace_profiles, [profile], changed)
+    assert len(updated.table_rows) == profiles
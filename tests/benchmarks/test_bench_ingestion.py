@@ -0,0 +1,24 @@
+import pytest
+
+
+@pytest.mark.benchmark(group="ingestion")
+@pytest.mark.parametrize("rows", [1_000, 10_000, 100_000])
+def test_bench_insert_activity_data(benchmark, bench_db, scale, make_activity, rows):
+    scale(rows, smallest=1_000)
+    db, conn = bench_db
+    activity = make_activity(rows)
+
+    def truncate():
+        with conn.cursor() as cursor:
+            cursor.execute("TRUNCATE activity_data;")
+        conn.commit()
+
+    benchmark.pedantic(
+        db.insert_activity_data,
+        args=(conn, activity),
+        setup=truncate,
+        rounds=3 if rows <= 10_000 else 1,
+    )
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM activity_data;")
+        assert cursor.fetchone()[0] == rows
@@ -0,0 +1,36 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from backend.web_scrapper import WebScrapper
+
+
+@pytest.fixture
+def webscraper():
+    return WebScrapper()
+
+
+@pytest.mark.benchmark(group="scraping")
+def test_bench_extract_player_activity(benchmark, webscraper, activity_html):
+    inner_div = webscraper.get_stats_inner_div(
+        BeautifulSoup(activity_html, "html.parser")
+    )
+    activity = benchmark(webscraper.extract_player_activity_from_inner_div, inner_div)
+    assert activity
+
+
+@pytest.mark.benchmark(group="scraping")
+def test_bench_parse_stats_page(benchmark, webscraper, activity_html):
+    def parse():
+        soup = BeautifulSoup(activity_html, "html.parser")
+        return webscraper.extract_player_activity_from_inner_div(
+            webscraper.get_stats_inner_div(soup)
+        )
+
+    assert benchmark(parse)
+
+
+@pytest.mark.benchmark(group="scraping")
+def test_bench_extract_characters_from_profile(benchmark, profile_5111553):
+    soup = BeautifulSoup(profile_5111553, "html.parser")
+    characters = benchmark(WebScrapper.extract_characters_from_profile, soup, "5111553")
+    assert characters
@@ -4,9 +4,17 @@ import os
 from io import BytesIO
 from selenium import webdriver
 
+from backend.rate_controller import RATE_CONTROLLER
+
 DATA_PATH = os.path.join(os.path.dirname(__file__), "data")
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_controller():
+    # The shared controller would carry backoffs and an open circuit from test to test.
+    RATE_CONTROLLER.reset()
+
+
 def load_json(filename):
     with open(os.path.join(DATA_PATH, filename), encoding="utf-8") as f:
         return json.load(f)
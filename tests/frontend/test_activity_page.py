@@ -1,6 +1,9 @@
+import asyncio
+import io
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 from frontend.activity_page import ActivityPage
+from frontend.clan_analytics import ClanAnalytics
 
 
 @pytest.fixture
@@ -11,9 +14,12 @@ def page(mocker):
     instance = ActivityPage()
     instance.helpers = mock_helpers.return_value
     instance.input_nick = mocker.MagicMock()
+    instance.input_clan = mocker.MagicMock()
+    instance.input_clan.value = ""
     instance.start_date = mocker.MagicMock()
     instance.start_time = mocker.MagicMock()
     instance.plot_area = mocker.MagicMock()
+    instance.stats_label = mocker.MagicMock()
     instance.input_nick.value = ""
     instance.start_date.value = "2025-06-28"
     instance.start_time.value = "11:00"
@@ -37,7 +43,7 @@ def test_convert_datetime_invalid_date(page):
 def test_make_plot_nick_required(page, mocker):
     notify_mock = mocker.patch("frontend.activity_page.ui.notify")
     page.input_nick.value = ""
-    page.make_plot()
+    asyncio.run(page.make_plot())
     notify_mock.assert_called_once()
     assert "please" in notify_mock.call_args[0][0].lower()
 
@@ -46,20 +52,104 @@ def test_make_plot_no_activity(page, mocker):
     page.input_nick.value = "TEST"
     page.start_date.value = "2025-06-28"
     page.start_time.value = "11:00"
-    page.helpers.get_player_activity.return_value = None
+    page.helpers.get_activity_plot = mocker.AsyncMock(return_value=None)
     notify_mock = mocker.patch("frontend.activity_page.ui.notify")
-    page.make_plot()
+    asyncio.run(page.make_plot())
     notify_mock.assert_called_once()
     assert "no activity" in notify_mock.call_args[0][0].lower()
 
 
 def test_make_plot_success(page, mocker):
     page.input_nick.value = "Sold"
-    page.helpers.get_player_activity.return_value = [datetime(2025, 6, 28, 11, 5)]
     fake_img_bytes = b"PNG bytes"
     mock_img = mocker.MagicMock()
     mock_img.read.return_value = fake_img_bytes
-    page.helpers.gui_plot_player_activity.return_value = mock_img
+    page.helpers.get_activity_plot = mocker.AsyncMock(return_value=mock_img)
+    page.helpers.get_player_stats = mocker.AsyncMock(return_value=None)
     mocker.patch("frontend.activity_page.ui.notify")
-    page.make_plot()
+    asyncio.run(page.make_plot())
     assert page.plot_area.source.startswith("data:image/png;base64,")
+    page.helpers.get_player_stats.assert_awaited_once_with(nick="Sold")
+
+
+def test_make_plot_many_nicks_shows_heatmap(page, mocker):
+    page.input_nick.value = "Sold, Charmed, Nobody"
+    mock_img = mocker.MagicMock()
+    mock_img.read.return_value = b"PNG bytes"
+    page.helpers.get_activity_heatmap = mocker.AsyncMock(
+        return_value=(mock_img, ["Nobody"])
+    )
+    notify_mock = mocker.patch("frontend.activity_page.ui.notify")
+    asyncio.run(page.make_plot())
+    page.helpers.get_activity_heatmap.assert_awaited_once_with(
+        nicks=["Sold", "Charmed", "Nobody"], start_date=datetime(2025, 6, 28, 11, 0)
+    )
+    assert "nobody" in notify_mock.call_args[0][0].lower()
+    assert page.plot_area.source.startswith("data:image/png;base64,")
+
+
+def test_make_plot_clan_members(page, mocker):
+    page.input_clan.value = "Clan"
+    page.helpers.clan_nicks = mocker.AsyncMock(return_value=["Sold", "Charmed"])
+    page.helpers.get_activity_heatmap = mocker.AsyncMock(return_value=(None, []))
+    notify_mock = mocker.patch("frontend.activity_page.ui.notify")
+    asyncio.run(page.make_plot())
+    assert page.helpers.get_activity_heatmap.call_args.kwargs["nicks"] == [
+        "Sold",
+        "Charmed",
+    ]
+    assert "no activity" in notify_mock.call_args[0][0].lower()
+
+
+def test_make_plot_clan_shows_summary(page, mocker):
+    page.input_clan.value = "Clan"
+    page.helpers.clan_nicks = mocker.AsyncMock(return_value=["Sold", "Charmed"])
+    page.helpers.get_activity_heatmap = mocker.AsyncMock(
+        return_value=(io.BytesIO(b"png"), [])
+    )
+    page.helpers.calculate_end_date.return_value = datetime(2025, 6, 28, 12)
+    page.clan_analytics = mocker.MagicMock()
+    page.clan_analytics.analyze_async = mocker.AsyncMock(return_value="activity")
+    mocker.patch.object(ActivityPage, "format_clan", return_value="summary")
+    asyncio.run(page.make_plot())
+    args = page.clan_analytics.analyze_async.call_args
+    assert args.args == ("Clan", datetime(2025, 6, 21, 12), datetime(2025, 6, 28, 12))
+    assert page.stats_label.text == "summary"
+
+
+def test_format_clan():
+    start = datetime(2025, 6, 21, 12)
+    members = [(1, 10, "Sold", 53, "Clan"), (2, 20, "Charmed", 135, "Clan")]
+    rows = [(1, 10, start + timedelta(hours=5, minutes=m)) for m in range(30)]
+    rows += [(2, 20, start + timedelta(hours=5, minutes=m)) for m in range(10, 40)]
+    activity = ClanAnalytics.build(
+        "Clan", members, rows, start, start + timedelta(days=7), 60
+    )
+    text = ActivityPage.format_clan(activity)
+    assert text == (
+        "Clan Clan (7 days): peak 2 online at 2025-06-21 17:00 | "
+        "Most often online together: Sold & Charmed (50%)"
+    )
+    empty = ClanAnalytics.build("Clan", members, [], start, start + timedelta(days=7))
+    assert (
+        ActivityPage.format_clan(empty) == "Clan Clan: no activity in the last 7 days"
+    )
+
+
+def test_format_stats():
+    from datetime import date
+
+    text = ActivityPage.format_stats(
+        {
+            "sessions": 3,
+            "average_session_minutes": 40,
+            "daily_playtime": {date(2025, 1, 1): 60, date(2025, 1, 2): 60},
+            "typical_hours": [20, 21],
+            "current_streak": 2,
+            "longest_streak": 5,
+        }
+    )
+    assert "Sessions (30 days): 3" in text
+    assert "avg daily playtime 60 min" in text
+    assert "20:00, 21:00" in text
+    assert "longest 5" in text
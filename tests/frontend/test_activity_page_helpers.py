@@ -1,9 +1,13 @@
+import asyncio
 import pytest
 from datetime import datetime, timedelta
 import io
 import matplotlib.pyplot as plt
 
+from backend.retention import RollupReader
 from frontend.activity_page_helpers import ActivityPageHelpers
+from frontend.nick_resolver import NickResolver
+from frontend.plot_cache import PlotCache
 
 
 @pytest.fixture
@@ -30,6 +34,13 @@ def helpers_and_db(mocker):
     )
     mock_db_instance = mock_db_cls.return_value
     mock_db_instance.connect_to_db.return_value = "mock_conn"
+    mocker.patch("frontend.activity_page_helpers.AsyncDbOperations", autospec=True)
+    mocker.patch.object(RollupReader, "watermarks", return_value={})
+    mocker.patch.object(RollupReader, "watermarks_async", return_value={})
+    mocker.patch(
+        "frontend.activity_page_helpers.NICK_RESOLVER",
+        mocker.MagicMock(spec=NickResolver),
+    )
     helpers = ActivityPageHelpers()
     mock_db_instance.select_data.reset_mock()
     return helpers, mock_db_instance
@@ -37,21 +48,24 @@ def helpers_and_db(mocker):
 
 def test_get_player_activity_found(helpers_and_db, profile_char, activity_data):
     helpers, db = helpers_and_db
-    db.select_data.side_effect = [profile_char, activity_data]
+    helpers.nick_resolver.resolve.return_value = profile_char[0]
+    db.select_data.side_effect = [activity_data]
     nick = "Sold"
     start_date = datetime(2023, 1, 1, 12, 0, 0)
     result = helpers.get_player_activity(nick, start_date)
     assert result == [dt for _, _, dt in activity_data]
     assert helpers.start_date == start_date
     assert helpers.end_date == start_date + timedelta(hours=1)
-    assert db.select_data.call_count == 2
+    helpers.nick_resolver.resolve.assert_called_once_with(nick)
+    assert db.select_data.call_count == 1
 
 
 def test_get_player_activity_not_found(helpers_and_db):
     helpers, db = helpers_and_db
-    db.select_data.side_effect = [None]
+    helpers.nick_resolver.resolve.return_value = None
     result = helpers.get_player_activity("TEST", datetime.now())
     assert result is None
+    db.select_data.assert_not_called()
 
 
 def test_generate_intervals(helpers_and_db):
@@ -133,3 +147,264 @@ def test_render_bar_chart_to_bytesio_returns_bytesio(helpers_and_db):
     helpers.end_date = datetime(2025, 1, 1, 13, 0)
     img = helpers.render_bar_chart_to_bytesio(["12:00", "12:10"], [1, 0])
     assert isinstance(img, io.BytesIO)
+
+
+def test_gui_plot_player_activity_async_renders_in_worker(helpers_and_db, mocker):
+    helpers, db = helpers_and_db
+    helpers.start_date = datetime(2025, 1, 1, 12, 0)
+    helpers.end_date = datetime(2025, 1, 1, 12, 3)
+    cpu_bound = mocker.patch(
+        "frontend.activity_page_helpers.run.cpu_bound",
+        new=mocker.AsyncMock(return_value=b"png"),
+    )
+    img = asyncio.run(
+        helpers.gui_plot_player_activity_async([datetime(2025, 1, 1, 12, 1)])
+    )
+    assert img.read() == b"png"
+    args = cpu_bound.call_args[0]
+    assert args[1] == ["12:00", "12:01", "12:02"]
+    assert args[2] == [0, 1, 0]
+
+
+def test_get_activity_plot_uses_cache(helpers_and_db, mocker, profile_char):
+    helpers, _ = helpers_and_db
+    db = helpers.async_db
+    helpers.plot_cache = PlotCache()
+    helpers.nick_resolver.resolve_async.return_value = profile_char[0]
+    db.select_data_async.side_effect = [
+        [("5111553", "155755", datetime(2025, 1, 1, 12, 5))],
+    ]
+    render = mocker.patch.object(
+        helpers,
+        "gui_plot_player_activity_async",
+        new=mocker.AsyncMock(return_value=io.BytesIO(b"png")),
+    )
+    start_date = datetime(2025, 1, 1, 12, 0)
+    first = asyncio.run(helpers.get_activity_plot("Sold", start_date))
+    second = asyncio.run(helpers.get_activity_plot("Sold", start_date))
+    assert first.getvalue() == second.getvalue() == b"png"
+    assert render.await_count == 1
+    assert helpers.nick_resolver.resolve_async.await_count == 2
+    assert db.select_data_async.await_count == 1
+
+
+def test_get_activity_plot_traces_cache_hits(helpers_and_db, mocker, profile_char):
+    helpers, _ = helpers_and_db
+    helpers.plot_cache = PlotCache()
+    helpers.nick_resolver.resolve_async.return_value = profile_char[0]
+    helpers.async_db.select_data_async.return_value = [
+        ("5111553", "155755", datetime(2025, 1, 1, 12, 5))
+    ]
+    mocker.patch.object(
+        helpers,
+        "gui_plot_player_activity_async",
+        new=mocker.AsyncMock(return_value=io.BytesIO(b"png")),
+    )
+    attributes = mocker.patch("frontend.activity_page_helpers.set_span_attributes")
+    start_date = datetime(2025, 1, 1, 12, 0)
+    asyncio.run(helpers.get_activity_plot("Sold", start_date))
+    asyncio.run(helpers.get_activity_plot("Sold", start_date))
+    cache_hits = [
+        call.kwargs["cache_hit"]
+        for call in attributes.call_args_list
+        if "cache_hit" in call.kwargs
+    ]
+    assert cache_hits == [False, True]
+    assert mocker.call(rows=1) in attributes.call_args_list
+
+
+def test_get_activity_plot_no_activity(helpers_and_db, profile_char):
+    helpers, _ = helpers_and_db
+    db = helpers.async_db
+    helpers.plot_cache = PlotCache()
+    helpers.nick_resolver.resolve_async.return_value = profile_char[0]
+    db.select_data_async.side_effect = [[]]
+    assert asyncio.run(helpers.get_activity_plot("Sold", datetime(2025, 1, 1))) is None
+
+
+def test_fetch_activity_reads_rolled_up_windows(helpers_and_db, profile_char):
+    helpers, _ = helpers_and_db
+    db = helpers.async_db
+    RollupReader.watermarks_async.return_value = {1: datetime(2025, 1, 2)}
+    db.select_data_async.side_effect = [
+        [(5111553, 155755, datetime(2025, 1, 1, 12, 0), 15, 5)],
+    ]
+    timestamps = asyncio.run(
+        helpers.fetch_activity_async(
+            *profile_char[0], datetime(2025, 1, 1, 12), datetime(2025, 1, 1, 13)
+        )
+    )
+    assert [dt.minute for dt in timestamps] == [0, 3, 6, 9, 12]
+    assert db.select_data_async.call_args.kwargs["table"] == "activity_rollup"
+
+
+def test_connection_opened_lazily(mocker):
+    mock_db_cls = mocker.patch(
+        "frontend.activity_page_helpers.DbOperations", autospec=True
+    )
+    mock_db_instance = mock_db_cls.return_value
+    mock_db_instance.connect_to_db.return_value = "mock_conn"
+    helpers = ActivityPageHelpers()
+    mock_db_instance.connect_to_db.assert_not_called()
+    assert helpers.connection == "mock_conn"
+    assert helpers.connection == "mock_conn"
+    mock_db_instance.connect_to_db.assert_called_once()
+
+
+def test_activity_matrix():
+    base = datetime(2025, 1, 1, 12, 0)
+    intervals = [base + timedelta(minutes=i) for i in range(4)]
+    matrix = ActivityPageHelpers.activity_matrix(
+        intervals, [[base + timedelta(minutes=1)], [], [base, base]]
+    )
+    assert matrix == [[0, 1, 0], [0, 0, 0], [1, 0, 0]]
+
+
+def test_fetch_activity_many_single_query(helpers_and_db):
+    helpers, db = helpers_and_db
+    base = datetime(2025, 1, 1, 12, 0)
+    db.select_data.return_value = [
+        (5111553, 155755, base),
+        (5111553, 142716, base),
+        (973998, 116256, base),
+        (973998, 155755, base),
+    ]
+    activity = helpers.fetch_activity_many(
+        [(5111553, 142716), (973998, 116256)], base, base + timedelta(hours=1)
+    )
+    assert activity == {(5111553, 142716): [base], (973998, 116256): [base]}
+    db.select_data.assert_called_once()
+    params = db.select_data.call_args.kwargs["params"]
+    assert params[:2] == ([973998, 5111553], [116256, 142716])
+
+
+def test_get_activity_heatmap_batches_queries(helpers_and_db, mocker):
+    helpers, _ = helpers_and_db
+    db = helpers.async_db
+    helpers.plot_cache = PlotCache()
+    base = datetime(2025, 1, 1, 12, 0)
+    helpers.nick_resolver.resolve_many_async.return_value = {
+        "Sold": (5111553, 142716),
+        "Charmed": (5111553, 155755),
+    }
+    db.select_data_async.return_value = [(5111553, 142716, base)]
+    render = mocker.patch.object(
+        helpers,
+        "gui_plot_heatmap_async",
+        new=mocker.AsyncMock(return_value=io.BytesIO(b"png")),
+    )
+    img, missing = asyncio.run(
+        helpers.get_activity_heatmap(["Sold", "Charmed", "Nobody"], base)
+    )
+    assert img.getvalue() == b"png"
+    assert missing == ["Nobody"]
+    assert db.select_data_async.await_count == 1
+    assert render.call_args[0] == (["Sold", "Charmed"], [[base], []])
+    asyncio.run(helpers.get_activity_heatmap(["Sold", "Charmed"], base))
+    assert db.select_data_async.await_count == 1
+
+
+def test_get_activity_heatmap_nobody_found(helpers_and_db):
+    helpers, _ = helpers_and_db
+    helpers.nick_resolver.resolve_many_async.return_value = {}
+    img, missing = asyncio.run(
+        helpers.get_activity_heatmap(["Nobody"], datetime(2025, 1, 1))
+    )
+    assert img is None
+    assert missing == ["Nobody"]
+    helpers.async_db.select_data_async.assert_not_called()
+
+
+def test_decode_bitmaps_spans_days():
+    day1 = datetime(2025, 1, 1).date()
+    day2 = datetime(2025, 1, 2).date()
+    bits1 = ["0"] * 1440
+    bits1[1438] = "1"
+    bits2 = ["0"] * 1440
+    bits2[1] = "1"
+    rows = [(day1, "".join(bits1)), (day2, "".join(bits2))]
+    start = datetime(2025, 1, 1, 23, 57)
+    end = datetime(2025, 1, 2, 0, 3)
+    assert ActivityPageHelpers.decode_bitmaps(rows, start, end) == [0, 1, 0, 0, 1, 0]
+    assert ActivityPageHelpers.decode_bitmaps(rows, start, end, 4) == [1, 1]
+    assert ActivityPageHelpers.decode_bitmaps([], start, end) == [0] * 6
+
+
+def test_bitmap_query_covers_window():
+    query = ActivityPageHelpers.bitmap_query(
+        1, 2, datetime(2025, 1, 1, 23, 0), datetime(2025, 1, 2, 0, 0)
+    )
+    assert query["params"] == (
+        1,
+        2,
+        datetime(2025, 1, 1).date(),
+        datetime(2025, 1, 1).date(),
+    )
+
+
+def test_get_activity_plot_from_bitmap(helpers_and_db, mocker, profile_char):
+    helpers, _ = helpers_and_db
+    helpers.activity_source = "bitmap"
+    helpers.plot_cache = PlotCache()
+    helpers.nick_resolver.resolve_async.return_value = profile_char[0]
+    bits = ["0"] * 1440
+    bits[12 * 60 + 5] = "1"
+    helpers.async_db.select_data_async.return_value = [
+        (datetime(2025, 1, 1).date(), "".join(bits))
+    ]
+    render = mocker.patch.object(
+        helpers,
+        "gui_plot_presence_async",
+        new=mocker.AsyncMock(return_value=io.BytesIO(b"png")),
+    )
+    img = asyncio.run(helpers.get_activity_plot("Sold", datetime(2025, 1, 1, 12, 0)))
+    assert img.getvalue() == b"png"
+    presence = render.call_args[0][0]
+    assert len(presence) == 60
+    assert presence.index(1) == 5
+    assert helpers.async_db.select_data_async.call_args.kwargs["table"] == (
+        "activity_bitmap"
+    )
+
+
+def test_fetch_activity_events_async(helpers_and_db):
+    helpers, _ = helpers_and_db
+    start = datetime(2020, 1, 1, 12, 0)
+    helpers.async_db.select_data_async.side_effect = [
+        [(5111553, 155755, start - timedelta(minutes=10), True)],
+        [
+            (5111553, 155755, start + timedelta(minutes=3), False),
+            (5111553, 999, start + timedelta(minutes=1), True),
+        ],
+    ]
+    timestamps = asyncio.run(
+        helpers.fetch_activity_events_async(
+            "5111553", "155755", start, start + timedelta(hours=1)
+        )
+    )
+    assert timestamps == [start + timedelta(minutes=m) for m in range(3)]
+    tables = [
+        call.kwargs["table"]
+        for call in helpers.async_db.select_data_async.call_args_list
+    ]
+    assert tables == ["activity_events", "activity_events"]
+
+
+def test_get_player_stats_from_sessions(helpers_and_db, profile_char):
+    helpers, _ = helpers_and_db
+    helpers.nick_resolver.resolve_async.return_value = profile_char[0]
+    start = datetime(2025, 1, 1, 12, 0)
+    helpers.async_db.select_data_async.return_value = [
+        ("5111553", "155755", start, start + timedelta(minutes=30))
+    ]
+    stats = asyncio.run(helpers.get_player_stats("Sold"))
+    assert stats["sessions"] == 1
+    assert stats["total_minutes"] == 30
+    kwargs = helpers.async_db.select_data_async.call_args.kwargs
+    assert kwargs["table"] == "player_sessions"
+
+
+def test_get_player_stats_unknown_nick(helpers_and_db):
+    helpers, _ = helpers_and_db
+    helpers.nick_resolver.resolve_async.return_value = None
+    assert asyncio.run(helpers.get_player_stats("Nobody")) is None
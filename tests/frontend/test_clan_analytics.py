@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.retention import RollupReader
+from frontend.clan_analytics import ClanAnalytics
+
+START = datetime(2025, 1, 1, 12, 0)
+
+
+@pytest.fixture
+def members():
+    return [
+        (1, 10, "Alpha", 90, "Clan"),
+        (2, 20, "Beta", 80, "Clan"),
+        (3, 30, "Gamma", 70, "Clan"),
+    ]
+
+
+@pytest.fixture
+def rows():
+    def minute(m):
+        return START + timedelta(minutes=m, seconds=30)
+
+    return (
+        [(1, 10, minute(m)) for m in range(0, 10)]
+        + [(2, 20, minute(m)) for m in range(5, 15)]
+        + [(3, 30, minute(40))]
+        + [(1, 11, minute(50)), (2, 20, minute(120))]
+    )
+
+
+@pytest.fixture
+def analytics(mocker, members):
+    mock_db_cls = mocker.patch("frontend.clan_analytics.DbOperations", autospec=True)
+    mock_db_cls.return_value.connect_to_db.return_value = "mock_conn"
+    mocker.patch("frontend.clan_analytics.AsyncDbOperations", autospec=True)
+    mocker.patch.object(RollupReader, "watermarks", return_value={})
+    mocker.patch.object(RollupReader, "watermarks_async", return_value={})
+    snapshots = mocker.MagicMock()
+    snapshots.snapshot.clan_index = {"clan": members}
+    return ClanAnalytics(snapshots=snapshots), mock_db_cls.return_value
+
+
+def test_presence_bitsets_packs_minutes(rows):
+    presence = ClanAnalytics.presence_bitsets([(1, 10), (3, 30)], rows, START, 60)
+    assert presence.shape == (2, 8)
+    bits = np.unpackbits(presence, axis=1)[:, :60]
+    assert bits[0].nonzero()[0].tolist() == list(range(10))
+    assert bits[1].nonzero()[0].tolist() == [40]
+
+
+def test_online_counts_and_minutes(rows):
+    presence = ClanAnalytics.presence_bitsets(
+        [(1, 10), (2, 20), (3, 30)], rows, START, 60
+    )
+    assert ClanAnalytics.online_counts(presence, 60, 15).tolist() == [2, 0, 1, 0]
+    assert ClanAnalytics.online_counts(presence, 60, 25).tolist() == [2, 1, 0]
+    assert ClanAnalytics.online_minutes(presence, 60).tolist() == [10, 10, 1]
+
+
+def test_jaccard_matrix(rows):
+    presence = ClanAnalytics.presence_bitsets(
+        [(1, 10), (2, 20), (3, 30), (4, 40)], rows, START, 60
+    )
+    jaccard = ClanAnalytics.jaccard_matrix(presence, 60)
+    assert jaccard[0, 1] == jaccard[1, 0] == pytest.approx(5 / 15)
+    assert jaccard[0, 2] == 0
+    assert jaccard[2, 2] == 1
+    assert jaccard[3, 3] == 0
+
+
+def test_chunked_results_match(rows, mocker):
+    member_chars = [(1, 10), (2, 20), (3, 30)]
+    presence = ClanAnalytics.presence_bitsets(member_chars, rows, START, 180)
+    counts = ClanAnalytics.online_counts(presence, 180, 15)
+    jaccard = ClanAnalytics.jaccard_matrix(presence, 180)
+    mocker.patch.object(ClanAnalytics, "chunk_minutes", 16)
+    assert ClanAnalytics.online_counts(presence, 180, 15).tolist() == counts.tolist()
+    assert np.allclose(ClanAnalytics.jaccard_matrix(presence, 180), jaccard)
+
+
+def test_analyze_single_query(analytics, rows):
+    analytics, db = analytics
+    db.select_data.return_value = rows
+    activity = analytics.analyze("CLAN", START, START + timedelta(hours=1))
+    db.select_data.assert_called_once()
+    assert activity.members == ["Alpha", "Beta", "Gamma"]
+    assert activity.online_counts.tolist() == [2, 0, 1, 0]
+    assert activity.bucket_starts[1] == START + timedelta(minutes=15)
+    assert activity.top_pairs() == [("Alpha", "Beta", pytest.approx(5 / 15))]
+
+
+def test_presence_from_bitmaps_matches_rows():
+    start = datetime(2025, 1, 1, 23, 30)
+    member_chars = [(1, 10), (2, 20), (3, 30)]
+    minutes_online = {(1, 10): [0, 5, 29, 30, 31, 89], (2, 20): [12, 60]}
+    rows = [
+        (profile, char, start + timedelta(minutes=m))
+        for (profile, char), online in minutes_online.items()
+        for m in online
+    ]
+    bitmaps = []
+    for (profile, char), online in minutes_online.items():
+        for day in (start.date(), start.date() + timedelta(days=1)):
+            day_start = datetime.combine(day, datetime.min.time())
+            bits = ["0"] * 1440
+            for m in online:
+                dt = start + timedelta(minutes=m)
+                if dt.date() == day:
+                    bits[int((dt - day_start).total_seconds() // 60)] = "1"
+            bitmaps.append((profile, char, day, "".join(bits)))
+    bitmaps.append((1, 11, start.date(), "1" * 1440))
+
+    from_bitmaps = ClanAnalytics.presence_from_bitmaps(member_chars, bitmaps, start, 75)
+    from_rows = ClanAnalytics.presence_bitsets(member_chars, rows, start, 75)
+    assert from_bitmaps.shape == (3, 10)
+    assert from_bitmaps.tolist() == from_rows.tolist()
+    assert ClanAnalytics.online_minutes(from_bitmaps, 75).tolist() == [5, 2, 0]
+
+
+def test_analyze_reads_bitmaps(analytics):
+    analytics, db = analytics
+    analytics.activity_source = "bitmap"
+    db.select_data.return_value = [(1, 10, START.date(), "1" * 1440)]
+    activity = analytics.analyze("Clan", START, START + timedelta(hours=1))
+    kwargs = db.select_data.call_args.kwargs
+    assert kwargs["table"] == "activity_bitmap"
+    assert kwargs["params"] == ([1, 2, 3], [10, 20, 30], START.date(), START.date())
+    assert activity.online_minutes.tolist() == [60, 0, 0]
+
+
+def test_analyze_unknown_clan(analytics):
+    analytics, db = analytics
+    assert analytics.analyze("Nobody", START, START + timedelta(hours=1)) is None
+    db.select_data.assert_not_called()
+
+
+def test_analyze_async(analytics, rows):
+    analytics, _ = analytics
+    analytics.async_db.select_data_async.return_value = rows
+    activity = asyncio.run(
+        analytics.analyze_async("Clan", START, START + timedelta(hours=1), 30)
+    )
+    assert activity.online_counts.tolist() == [2, 1]
+    analytics.async_db.select_data_async.assert_awaited_once()
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from frontend.data_page_helpers import DataPageHelpers
 from frontend.data_page import DataPage
@@ -30,21 +31,51 @@ def mock_fill_table(mocker):
     return mocker.patch.object(DataPageHelpers, "fill_table", return_value=fill_table)
 
 
-def test_page_calls_helpers_and_sets_values(mocker, mock_fill_table):
+def test_page_calls_helpers_and_sets_values(mocker, fill_table):
+    fill_table_async = mocker.patch.object(
+        DataPageHelpers, "fill_table_async", return_value=fill_table
+    )
     dp = DataPage()
 
     navbar_mock = mocker.patch.object(dp, "navbar")
     mocker.patch("nicegui.ui.column", mocker.MagicMock())
     mocker.patch("nicegui.ui.button", mocker.MagicMock())
-    mocker.patch("nicegui.ui.table", mocker.MagicMock())
+    table = mocker.patch("nicegui.ui.table", mocker.MagicMock())
+    timer = mocker.patch("nicegui.ui.timer")
     mock_input = mocker.patch("nicegui.ui.input", autospec=True)
     dp.page()
 
-    mock_fill_table.assert_called_once()
+    fill_table_async.assert_not_called()
+    asyncio.run(timer.call_args.args[1]())
+    fill_table_async.assert_awaited_once()
+    assert table.return_value.classes.return_value.rows == fill_table
+    assert dp.table_data == fill_table
     navbar_mock.assert_called()
     mock_input.assert_called()
 
 
+def test_nick_input_suggests_without_blocking(mocker):
+    dp = DataPage(server_side=True)
+    mocker.patch.object(dp, "navbar")
+    mocker.patch("nicegui.ui.column", mocker.MagicMock())
+    mocker.patch("nicegui.ui.button")
+    mocker.patch("nicegui.ui.table")
+    mocker.patch("nicegui.ui.timer")
+    mocker.patch("nicegui.ui.label")
+    input_nick = mocker.MagicMock()
+    input_nick.classes.return_value = input_nick
+    ui_input = mocker.patch("nicegui.ui.input", return_value=input_nick)
+    search = mocker.patch.object(
+        DataPageHelpers, "search_nicks_async", return_value=["Sold"]
+    )
+    dp.page()
+
+    asyncio.run(ui_input.call_args.kwargs["on_change"](mocker.Mock(value="so")))
+
+    search.assert_awaited_once_with("so")
+    input_nick.set_autocomplete.assert_called_once_with(["Sold"])
+
+
 def test_update_table_button_triggers_fill_table_input(
     mocker, mock_fill_table, mock_fill_table_input, fill_table, table_input
 ):
@@ -71,6 +102,41 @@ def test_update_table_button_triggers_fill_table_input(
     assert table_mock.rows == table_input
 
 
+def test_update_table_button_awaits_async_lookup(mocker, fill_table, table_input):
+    mocker.patch.object(DataPageHelpers, "fill_table", return_value=fill_table)
+    lookup = mocker.patch.object(
+        DataPageHelpers, "fill_table_input_async", return_value=table_input
+    )
+    dp = DataPage()
+    input_nick = mocker.MagicMock()
+    input_nick.classes.return_value = input_nick
+    input_nick.value = " Sold "
+    alts = [{"nick": "Charmed", "lvl": 135, "guild": "", "similarity": 0.8}]
+    find_alts = mocker.patch.object(
+        DataPageHelpers, "find_alts_async", return_value=alts
+    )
+    table = mocker.MagicMock()
+    table.classes.return_value = table
+    label = mocker.MagicMock()
+    label.classes.return_value = label
+    mocker.patch("nicegui.ui.column", mocker.MagicMock())
+    mocker.patch("nicegui.ui.input", return_value=input_nick)
+    mocker.patch("nicegui.ui.table", return_value=table)
+    mocker.patch("nicegui.ui.timer")
+    mocker.patch("nicegui.ui.label", return_value=label)
+    button = mocker.patch("nicegui.ui.button")
+    mocker.patch.object(dp, "navbar")
+
+    dp.page()
+    asyncio.run(button.call_args.kwargs["on_click"]())
+
+    lookup.assert_awaited_once_with("Sold")
+    find_alts.assert_awaited_once_with("Sold")
+    assert table.rows == table_input
+    assert label.text == "Possible alts: Charmed (135 lvl, 80%)"
+    assert label.visible
+
+
 def test_update_table_defaults_on_empty(mocker, mock_fill_table, table_input):
     dp = DataPage()
     dp.input_nick = mocker.Mock()
@@ -82,3 +148,89 @@ def test_update_table_defaults_on_empty(mocker, mock_fill_table, table_input):
     table_mock.rows = dp.table_data
 
     assert table_mock.rows == dp.table_data
+
+
+def test_server_side_page_loads_requested_page(mocker):
+    dp = DataPage(server_side=True, rows_per_page=2)
+    table = mocker.MagicMock()
+    dp.helpers.fetch_page_async = mocker.AsyncMock(
+        return_value=([{"id": "1_2", "nick": "Sold", "lvl": 53, "guild": ""}], 1)
+    )
+    asyncio.run(
+        dp.load_table_page(
+            table, {"page": 1, "sortBy": "nick", "descending": True}, "so"
+        )
+    )
+    dp.helpers.fetch_page_async.assert_awaited_once_with(
+        page=1, rows_per_page=2, sort_by="nick", descending=True, nick_prefix="so"
+    )
+    assert table.rows[0]["nick"] == "Sold"
+    assert table.pagination["rowsNumber"] == 1
+
+
+def test_server_side_filter_resets_to_first_page(mocker):
+    dp = DataPage(server_side=True)
+    table = mocker.MagicMock()
+    table.pagination = {"page": 4, "rowsPerPage": 50}
+    input_nick = mocker.Mock()
+    input_nick.value = " Sold "
+    view = {"nick_filter": "", "alts": mocker.Mock()}
+    load = mocker.patch.object(dp, "load_table_page", new=mocker.AsyncMock())
+    dp.helpers.find_alts_async = mocker.AsyncMock(return_value=[])
+    asyncio.run(dp.filter_table(table, input_nick, view))
+    assert view["nick_filter"] == "Sold"
+    load.assert_awaited_once_with(table, {"page": 1, "rowsPerPage": 50}, "Sold")
+    dp.helpers.find_alts_async.assert_awaited_once_with("Sold")
+    assert not view["alts"].visible
+
+
+def test_show_alts_hides_label_without_nick(mocker):
+    dp = DataPage()
+    label = mocker.Mock()
+    dp.helpers.find_alts_async = mocker.AsyncMock()
+    asyncio.run(dp.show_alts(label, ""))
+    dp.helpers.find_alts_async.assert_not_awaited()
+    assert label.text == ""
+    assert not label.visible
+
+
+def test_format_alts():
+    alts = [
+        {"nick": "Sold", "lvl": 53, "guild": "", "similarity": 0.91},
+        {"nick": "Charmed", "lvl": 135, "guild": "X", "similarity": 0.456},
+        {"nick": "Fresh", "lvl": None, "guild": None, "similarity": 0.3},
+    ]
+    assert DataPage.format_alts(alts) == (
+        "Possible alts: Sold (53 lvl, 91%), Charmed (135 lvl, 46%), Fresh (30%)"
+    )
+    assert DataPage.format_alts([]) == ""
+
+
+def test_server_side_clients_keep_their_own_table_and_filter(mocker):
+    dp = DataPage(server_side=True)
+    mocker.patch.object(dp, "navbar")
+    mocker.patch("nicegui.ui.column", mocker.MagicMock())
+    mocker.patch("nicegui.ui.timer")
+    mocker.patch("nicegui.ui.label")
+    buttons = mocker.patch("nicegui.ui.button")
+    inputs = [mocker.MagicMock(), mocker.MagicMock()]
+    tables = [mocker.MagicMock(), mocker.MagicMock()]
+    for widget in inputs + tables:
+        widget.classes.return_value = widget
+    mocker.patch("nicegui.ui.input", side_effect=inputs)
+    mocker.patch("nicegui.ui.table", side_effect=tables)
+    load = mocker.patch.object(dp, "load_table_page", new=mocker.AsyncMock())
+    dp.helpers.find_alts_async = mocker.AsyncMock(return_value=[])
+    dp.page()
+    dp.page()
+    filter_first = buttons.call_args_list[0].kwargs["on_click"]
+    request_second = tables[1].on.call_args.args[1]
+
+    inputs[0].value = "So"
+    tables[0].pagination = {"page": 3}
+    asyncio.run(filter_first())
+    tables[1].pagination = {"page": 2}
+    asyncio.run(request_second(mocker.Mock(args={"pagination": {"page": 2}})))
+
+    assert load.await_args_list[0].args == (tables[0], {"page": 1}, "So")
+    assert load.await_args_list[1].args == (tables[1], {"page": 2}, "")
@@ -1,6 +1,10 @@
+import asyncio
+import threading
+
 import pytest
 
 from frontend.data_page_helpers import DataPageHelpers
+from frontend.profile_snapshot import ProfileSnapshot, ProfileSnapshotService
 
 
 @pytest.fixture
@@ -19,7 +23,10 @@ def helpers_and_db(mocker, test_rows):
     mock_db_instance = mock_db_cls.return_value
     mock_db_instance.connect_to_db.return_value = "mock_conn"
     mock_db_instance.select_data.return_value = test_rows
-    helpers = DataPageHelpers()
+    mocker.patch("frontend.profile_snapshot.DbOperations", mock_db_cls)
+    snapshots = ProfileSnapshotService()
+    snapshots.connection = mocker.MagicMock()
+    helpers = DataPageHelpers(snapshots=snapshots)
     mock_db_instance.select_data.reset_mock()
     return helpers, mock_db_instance
 
@@ -58,6 +65,14 @@ def test_fill_table_input_found(helpers_and_db):
     )
 
 
+def test_fill_table_input_async_matches_sync(helpers_and_db):
+    helpers, db = helpers_and_db
+    assert asyncio.run(helpers.fill_table_input_async("sOLD")) == (
+        helpers.fill_table_input("Sold")
+    )
+    assert asyncio.run(helpers.fill_table_input_async("TEST")) == []
+
+
 def test_fill_table_input_not_found(helpers_and_db):
     helpers, db = helpers_and_db
     result = helpers.fill_table_input("TEST")
@@ -92,3 +107,203 @@ def test_get_unique_chars_by_profile(helpers_and_db, test_rows):
         assert item["profile"].startswith(
             "https://www.margonem.pl/profile/view,5111553#char_"
         )
+
+
+def test_get_data_async(mocker, helpers_and_db, test_rows):
+    helpers, db = helpers_and_db
+    helpers.async_db = mocker.MagicMock()
+    helpers.async_db.select_data_async = mocker.AsyncMock(return_value=test_rows)
+    assert asyncio.run(helpers.get_data_async()) == test_rows
+    helpers.async_db.select_data_async.assert_awaited_once_with(
+        table="profile_data",
+        columns="profile, char, nick, lvl, clan",
+    )
+
+
+def test_fill_table_input_case_insensitive(helpers_and_db):
+    helpers, db = helpers_and_db
+    result = helpers.fill_table_input("sOLD")
+    assert [row["nick"] for row in result] == ["Charmed", "Sold"]
+
+
+def test_search_nicks_prefix(helpers_and_db):
+    helpers, db = helpers_and_db
+    assert helpers.search_nicks("ch") == ["Charmed"]
+    assert helpers.search_nicks("B") == ["Brovvar"]
+    assert helpers.search_nicks("x") == []
+    assert helpers.search_nicks("") == []
+
+
+def test_async_lookups_load_snapshot_off_the_event_loop(helpers_and_db, test_rows):
+    helpers, db = helpers_and_db
+    loaded_in = []
+
+    def select_data(**kwargs):
+        loaded_in.append(threading.current_thread())
+        return test_rows
+
+    db.select_data.side_effect = select_data
+
+    async def lookups():
+        return (
+            await helpers.search_nicks_async("ch"),
+            await helpers.fill_table_async(),
+            await helpers.search_nicks_async(""),
+        )
+
+    nicks, table, empty = asyncio.run(lookups())
+    assert nicks == ["Charmed"]
+    assert table == helpers.fill_table()
+    assert empty == []
+    assert len(loaded_in) == 1
+    assert loaded_in[0] is not threading.main_thread()
+
+
+def test_fuzzy_search_nicks(helpers_and_db):
+    helpers, db = helpers_and_db
+    assert helpers.fuzzy_search_nicks("Brovar") == ["Brovvar"]
+    assert helpers.fuzzy_search_nicks("zzzz") == []
+
+
+def test_page_query_sort_and_filter():
+    rows_query, count_query = DataPageHelpers.page_query(
+        page=3, rows_per_page=20, sort_by="nick", descending=False, nick_prefix="S_o"
+    )
+    assert rows_query["order_by"] == "nick ASC, profile ASC, char ASC"
+    assert rows_query["limit"] == 20
+    assert rows_query["offset"] == 40
+    assert rows_query["where_clause"] == "lower(nick) LIKE %s"
+    assert rows_query["params"] == ("s\\_o%",)
+    assert count_query["columns"] == "COUNT(*)"
+    assert count_query["params"] == rows_query["params"]
+
+
+def test_page_query_rejects_unknown_sort_column():
+    rows_query, count_query = DataPageHelpers.page_query(
+        page=1, rows_per_page=10, sort_by="1; DROP TABLE profile_data"
+    )
+    assert rows_query["order_by"] == "lvl DESC, profile DESC, char DESC"
+    assert rows_query["offset"] == 0
+    assert rows_query["where_clause"] is None
+
+
+def test_fetch_page(helpers_and_db, test_rows):
+    helpers, db = helpers_and_db
+    db.select_data.side_effect = [test_rows[:2], [(3,)]]
+    rows, total = helpers.fetch_page(page=1, rows_per_page=2, nick_prefix="s")
+    assert total == 3
+    assert rows == [
+        {"id": "5111553_155755", "nick": "Charmed", "lvl": 135, "guild": ""},
+        {"id": "5111553_142716", "nick": "Sold", "lvl": 53, "guild": ""},
+    ]
+    assert db.select_data.call_args_list[0].kwargs["limit"] == 2
+
+
+def test_fetch_page_async(mocker, helpers_and_db, test_rows):
+    helpers, db = helpers_and_db
+    helpers.async_db = mocker.MagicMock()
+    helpers.async_db.select_data_async = mocker.AsyncMock(
+        side_effect=[test_rows[2:], [(1,)]]
+    )
+    rows, total = asyncio.run(
+        helpers.fetch_page_async(page=1, rows_per_page=2, nick_prefix="b")
+    )
+    assert total == 1
+    assert rows[0]["nick"] == "Brovvar"
+
+
+def test_fetch_page_from_loaded_snapshot(helpers_and_db):
+    helpers, db = helpers_and_db
+    helpers.snapshots.load()
+    db.select_data.reset_mock()
+    rows, total = helpers.fetch_page(page=2, rows_per_page=2)
+    assert total == 3
+    assert rows == [{"id": "5111553_142716", "nick": "Sold", "lvl": 53, "guild": ""}]
+    db.select_data.assert_not_called()
+
+
+def test_fill_table_loads_snapshot_once(helpers_and_db):
+    helpers, db = helpers_and_db
+    helpers.fill_table()
+    helpers.fill_table()
+    helpers.fill_table_input("Sold")
+    assert db.select_data.call_count == 1
+
+
+def test_init_does_not_touch_database(mocker):
+    mock_db_cls = mocker.patch("frontend.data_page_helpers.DbOperations", autospec=True)
+    snapshots = mocker.MagicMock()
+    DataPageHelpers(snapshots=snapshots)
+    mock_db_cls.return_value.connect_to_db.assert_not_called()
+    mock_db_cls.return_value.select_data.assert_not_called()
+    assert not snapshots.load.called
+
+
+def test_alt_query_matches_both_sides():
+    query = DataPageHelpers.alt_query(5, 7, limit=3)
+    assert query["table"] == "alt_candidates"
+    assert query["params"] == (5, 7, 5, 7)
+    assert query["order_by"] == "similarity DESC"
+    assert query["limit"] == 3
+
+
+def test_find_alts(helpers_and_db):
+    helpers, db = helpers_and_db
+    helpers.snapshots.load()
+    db.select_data.reset_mock()
+    db.select_data.return_value = [
+        ("5111553", "142716", "973998", "116256", 0.8123),
+        ("1", "2", "5111553", "142716", 0.5),
+    ]
+    result = helpers.find_alts("sold")
+    assert result == [
+        {
+            "nick": "Brovvar",
+            "lvl": 64,
+            "guild": "",
+            "profile": "https://www.margonem.pl/profile/view,973998#char_116256,berufs",
+            "similarity": 0.81,
+        }
+    ]
+    assert db.select_data.call_args.kwargs["params"] == (
+        "5111553",
+        "142716",
+        "5111553",
+        "142716",
+    )
+
+
+def test_alt_rows_keep_characters_without_level(helpers_and_db):
+    helpers, db = helpers_and_db
+    snapshot = ProfileSnapshot([("1", "2", "Fresh", None, None)])
+    rows = helpers.alt_rows(
+        "5111553", "142716", [("1", "2", "5111553", "142716", 0.4)], snapshot
+    )
+    assert rows == [
+        {
+            "nick": "Fresh",
+            "lvl": None,
+            "guild": None,
+            "profile": helpers.construct_profile_url("1", "2"),
+            "similarity": 0.4,
+        }
+    ]
+
+
+def test_find_alts_unknown_nick(helpers_and_db):
+    helpers, db = helpers_and_db
+    helpers.snapshots.load()
+    db.select_data.reset_mock()
+    assert helpers.find_alts("nobody") == []
+    db.select_data.assert_not_called()
+
+
+def test_find_alts_async(mocker, helpers_and_db):
+    helpers, db = helpers_and_db
+    helpers.snapshots.load()
+    helpers.async_db = mocker.MagicMock()
+    helpers.async_db.select_data_async = mocker.AsyncMock(
+        return_value=[("973998", "116256", "5111553", "155755", 0.6)]
+    )
+    result = asyncio.run(helpers.find_alts_async("Brovvar"))
+    assert [row["nick"] for row in result] == ["Charmed"]
@@ -12,6 +12,7 @@ def test_navbar_links(mocker):
     Gui.navbar()
 
     ui_mock.row.assert_called_once()
-    assert ui_mock.link.call_count == 2
+    assert ui_mock.link.call_count == 3
     ui_mock.link.assert_any_call("Data", "/")
     ui_mock.link.assert_any_call("Activity", "/activity")
+    ui_mock.link.assert_any_call("Online", "/online")
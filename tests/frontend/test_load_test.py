@@ -0,0 +1,119 @@
+import asyncio
+import random
+from datetime import date, datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from frontend.load_test import LoadTest, ResourceSampler
+
+
+class FakeSampler:
+    async def run(self, stop_event):
+        await stop_event.wait()
+        return {"frontend": {"cpu_percent": 50.0, "rss_mb": 100.0, "rss_mb_max": 120.0}}
+
+
+@pytest.fixture
+def load_test():
+    data_helpers = MagicMock()
+    data_helpers.snapshot.table_rows = [{"nick": f"Nick{i}"} for i in range(100)]
+    data_helpers.fetch_page_async = AsyncMock(return_value=([], 0))
+    activity_helpers = MagicMock()
+    activity_helpers.get_activity_plot = AsyncMock(return_value=None)
+    activity_helpers.get_player_stats = AsyncMock(return_value=None)
+    activity_helpers.get_activity_heatmap = AsyncMock(return_value=(None, []))
+    return LoadTest(
+        users=(1, 4),
+        duration=0.2,
+        think_seconds=0.01,
+        start_date=date(2025, 1, 1),
+        days=30,
+        data_helpers=data_helpers,
+        activity_helpers=activity_helpers,
+        sampler=FakeSampler(),
+    )
+
+
+def test_nicks_follow_popularity(load_test):
+    rng = random.Random(1)
+    nicks = [load_test.pick_nick(rng) for _ in range(5000)]
+    top = sum(nick.lower() == "nick0" for nick in nicks)
+    tail = sum(nick.lower() == "nick99" for nick in nicks)
+    missing = sum(nick.startswith("missing") for nick in nicks)
+    assert top > 20 * tail
+    assert 0.01 < missing / len(nicks) < 0.06
+    assert any(nick == "nick0" for nick in nicks)
+
+
+def test_windows_start_in_range_on_quarter_hours(load_test):
+    rng = random.Random(1)
+    starts = [load_test.pick_start(rng) for _ in range(2000)]
+    assert min(starts) >= datetime(2025, 1, 1)
+    assert max(starts) < datetime(2025, 1, 31)
+    assert {start.minute for start in starts} <= {0, 15, 30, 45}
+    evening = sum(18 <= start.hour <= 22 for start in starts)
+    night = sum(2 <= start.hour <= 6 for start in starts)
+    assert evening > 5 * night
+    assert sum(start.day == 30 for start in starts) > sum(
+        start.day == 10 for start in starts
+    )
+
+
+def test_stage_reports_latency_throughput_and_resources(load_test):
+    async def slow_plot(**kwargs):
+        await asyncio.sleep(0.01)
+
+    load_test.activity_helpers.get_activity_plot = slow_plot
+    load_test.data_helpers.fetch_page_async.side_effect = RuntimeError("pool")
+
+    stage = asyncio.run(load_test.run_stage(4))
+
+    plot = stage["scenarios"]["activity_plot"]
+    assert stage["users"] == 4
+    assert plot["requests"] > 0 and plot["p50_ms"] >= 10
+    assert stage["scenarios"]["data_page"]["requests"] == 0
+    assert stage["errors"] == (
+        stage["scenarios"]["data_page"]["errors"]
+        + stage["scenarios"]["data_search"]["errors"]
+    )
+    assert stage["overloaded"]
+    assert stage["throughput"] == pytest.approx(
+        stage["requests"] / stage["seconds"], rel=0.1
+    )
+    assert stage["resources"]["frontend"]["rss_mb_max"] == 120.0
+
+
+def test_summarize_percentiles_and_report(load_test):
+    latencies = {"data_page": [i / 1000 for i in range(1, 101)], "heatmap": []}
+    fast = load_test.summarize(1, 10, latencies, {"data_page": 0, "heatmap": 0}, {})
+    assert (fast["p50_ms"], fast["p95_ms"], fast["p99_ms"]) == (50.5, 95.0, 99.0)
+    assert fast["throughput"] == 10.0
+    assert fast["scenarios"]["heatmap"]["p95_ms"] is None
+    assert not fast["overloaded"]
+    slow = load_test.summarize(8, 10, {"data_page": [2.0] * 10}, {"data_page": 0}, {})
+    assert slow["overloaded"]
+
+    report = load_test.report([fast, slow])
+    assert "overloaded" in report.splitlines()[2]
+    assert report.endswith("Highest load within p95 < 1000 ms: 1 users")
+
+
+def test_sampler_reads_own_process():
+    sampler = ResourceSampler(interval=0.05)
+    if sampler.read(sampler.groups()["frontend"][0]) is None:
+        pytest.skip("No /proc on this system")
+
+    async def busy():
+        stop_event = asyncio.Event()
+        sampling = asyncio.create_task(sampler.run(stop_event))
+        deadline = asyncio.get_running_loop().time() + 0.3
+        while asyncio.get_running_loop().time() < deadline:
+            sum(range(10000))
+            await asyncio.sleep(0)
+        stop_event.set()
+        return await sampling
+
+    resources = asyncio.run(busy())
+    assert resources["frontend"]["cpu_percent"] > 10
+    assert resources["frontend"]["rss_mb_max"] > 10
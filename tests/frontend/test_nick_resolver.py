@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from frontend.nick_resolver import NickResolver
+
+
+@pytest.fixture
+def resolver(mocker):
+    mock_db_cls = mocker.patch("frontend.nick_resolver.DbOperations", autospec=True)
+    mock_db_cls.return_value.connect_to_db.return_value = "mock_conn"
+    mocker.patch("frontend.nick_resolver.AsyncDbOperations", autospec=True)
+    snapshots = mocker.MagicMock()
+    snapshots.is_loaded = False
+    resolver = NickResolver(snapshots=snapshots, max_entries=2)
+    return resolver, mock_db_cls.return_value
+
+
+def test_resolve_queries_lower_nick_once(resolver):
+    resolver, db = resolver
+    db.select_data.return_value = [(5111553, 142716)]
+    assert resolver.resolve(" SoLd ") == (5111553, 142716)
+    assert resolver.resolve("sold") == (5111553, 142716)
+    db.select_data.assert_called_once_with(
+        db_connection="mock_conn",
+        table="profile_data",
+        columns="profile, char",
+        where_clause="lower(nick) = %s",
+        params=("sold",),
+        order_by="profile, char",
+        limit=1,
+    )
+
+
+def test_resolve_not_found_is_cached(resolver):
+    resolver, db = resolver
+    db.select_data.return_value = []
+    assert resolver.resolve("TEST") is None
+    assert resolver.resolve("test") is None
+    assert db.select_data.call_count == 1
+
+
+def test_cache_is_bounded(resolver):
+    resolver, db = resolver
+    db.select_data.return_value = [(1, 1)]
+    for nick in ("a", "b", "c", "a"):
+        resolver.resolve(nick)
+    assert db.select_data.call_count == 4
+
+
+def test_resolve_uses_loaded_snapshot(resolver):
+    resolver, db = resolver
+    resolver.snapshots.is_loaded = True
+    resolver.snapshots.snapshot.nick_index = {"sold": (5111553, 142716)}
+    assert resolver.resolve("SOLD") == (5111553, 142716)
+    assert asyncio.run(resolver.resolve_async("Sold")) == (5111553, 142716)
+    db.select_data.assert_not_called()
+
+
+def test_resolve_async_queries_pool(resolver):
+    resolver, db = resolver
+    resolver.async_db.select_data_async.return_value = [(973998, 116256)]
+    assert asyncio.run(resolver.resolve_async("Brovvar")) == (973998, 116256)
+    assert asyncio.run(resolver.resolve_async("brovvar")) == (973998, 116256)
+    resolver.async_db.select_data_async.assert_awaited_once()
+
+
+def test_resolve_many_one_query(resolver):
+    resolver, db = resolver
+    resolver.max_entries = 10
+    db.select_data.return_value = [
+        ("brovvar", 973998, 116256),
+        ("sold", 5111553, 142716),
+        ("sold", 5111553, 155755),
+    ]
+    resolved = resolver.resolve_many(["Sold", "Nobody", "Brovvar"])
+    assert resolved == {"Sold": (5111553, 142716), "Brovvar": (973998, 116256)}
+    assert list(resolved) == ["Sold", "Brovvar"]
+    assert db.select_data.call_args.kwargs["params"] == (["sold", "nobody", "brovvar"],)
+    assert resolver.resolve_many(["SOLD", "nobody"]) == {"SOLD": (5111553, 142716)}
+    assert db.select_data.call_count == 1
+
+
+def test_resolve_many_uses_loaded_snapshot(resolver):
+    resolver, db = resolver
+    resolver.snapshots.is_loaded = True
+    resolver.snapshots.snapshot.nick_index = {"sold": (5111553, 142716)}
+    resolved = asyncio.run(resolver.resolve_many_async(["Sold", "Nobody"]))
+    assert resolved == {"Sold": (5111553, 142716)}
+    resolver.async_db.select_data_async.assert_not_called()
@@ -0,0 +1,74 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from frontend.online_feed import OnlineFeed
+
+
+@pytest.fixture
+def feed(mocker):
+    mock_db_cls = mocker.patch("frontend.online_feed.DbOperations", autospec=True)
+    mock_db_cls.return_value.select_data.return_value = [
+        (1, 10, datetime(2025, 1, 1, 11, 0)),
+        (2, 20, datetime(2025, 1, 1, 11, 30)),
+    ]
+    return OnlineFeed()
+
+
+def test_load(feed):
+    assert feed.load("conn") == {"type": "snapshot", "total": 2}
+    assert set(feed.online) == {(1, 10), (2, 20)}
+    assert feed.db.select_data.call_args.kwargs["table"] == "online_players"
+
+
+def test_apply_delta(feed):
+    feed.load("conn")
+    change = feed.apply(
+        json.dumps(
+            {
+                "type": "delta",
+                "at": "2025-01-01T12:00:00",
+                "total": 2,
+                "joined": [[3, 30]],
+                "left": [[1, 10]],
+            }
+        )
+    )
+    assert change["joined"] == [(3, 30)]
+    assert change["left"] == [(1, 10)]
+    assert feed.online == {
+        (2, 20): datetime(2025, 1, 1, 11, 30),
+        (3, 30): datetime(2025, 1, 1, 12, 0),
+    }
+    assert feed.updated_at == datetime(2025, 1, 1, 12, 0)
+
+
+def test_apply_snapshot_reloads(feed):
+    change = feed.apply('{"type":"snapshot","at":"2025-01-01T12:00:00","total":2}')
+    assert change["type"] == "snapshot"
+    assert len(feed.online) == 2
+
+
+def test_subscribers_receive_changes(feed):
+    received = []
+    feed.subscribe(received.append)
+    feed._dispatch({"type": "snapshot", "total": 0})
+    feed.unsubscribe(received.append)
+    feed.unsubscribe(received.append)
+    feed._dispatch({"type": "snapshot", "total": 1})
+    assert received == [{"type": "snapshot", "total": 0}]
+
+
+def test_listen_retries_when_database_is_unavailable(feed):
+    attempts = []
+
+    def connect_to_db():
+        attempts.append(1)
+        if len(attempts) == 2:
+            feed._stop_event.set()
+        raise Exception("Database not available after retries!")
+
+    feed.db.connect_to_db.side_effect = connect_to_db
+    feed.listen(retry_delay=0)
+    assert len(attempts) == 2
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+
+from frontend.online_page import OnlinePage
+
+
+@pytest.fixture
+def online_page(mocker):
+    feed = mocker.MagicMock()
+    feed.online = {
+        (1, 10): datetime(2025, 1, 1, 11, 0),
+        (2, 20): datetime(2025, 1, 1, 11, 30),
+    }
+    feed.updated_at = datetime(2025, 1, 1, 12, 5)
+    snapshots = mocker.MagicMock()
+    snapshots.is_loaded = True
+    snapshots.snapshot.profile_index = {
+        1: [(1, 10, "Sold", "53", "Clan")],
+        2: [(2, 21, "Other", "80", "")],
+    }
+    return OnlinePage(feed=feed, snapshots=snapshots, max_logged=2)
+
+
+def test_online_rows(online_page):
+    assert online_page.online_rows() == [
+        {"id": "1_10", "nick": "Sold", "lvl": 53, "guild": "Clan", "since": "11:00"},
+        {"id": "2_20", "nick": "2/20", "lvl": 0, "guild": "", "since": "11:30"},
+    ]
+
+
+def test_count_text(online_page):
+    assert online_page.count_text() == "Online now: 2 (updated 12:05)"
+    online_page.feed.updated_at = None
+    assert online_page.count_text().startswith("Waiting")
+
+
+def test_describe(online_page):
+    change = {
+        "type": "delta",
+        "at": "2025-01-01T12:05:00",
+        "joined": [(1, 10)],
+        "left": [(2, 20)],
+    }
+    assert online_page.describe(change) == ["12:05 + Sold", "12:05 - 2/20"]
+    change["joined"] = [(1, 10), (3, 30)]
+    assert online_page.describe(change) == ["12:05 2 joined, 1 left"]
+    assert online_page.describe({"type": "snapshot", "total": 7}) == [
+        "Reloaded: 7 online"
+    ]
+
+
+def test_page_subscribes_to_feed(mocker, online_page):
+    for name in ("column", "label", "table", "log"):
+        mocker.patch(f"nicegui.ui.{name}", mocker.MagicMock())
+    context = mocker.patch("nicegui.ui.context")
+    mocker.patch.object(online_page, "navbar")
+    online_page.page()
+    online_page.feed.subscribe.assert_called_once()
+    context.client.on_disconnect.assert_called_once()
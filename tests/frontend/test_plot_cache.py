@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+from frontend.plot_cache import PlotCache
+
+PAST_END = datetime(2025, 1, 1, 13, 0)
+
+
+def make_key(profile="5111553", hour=12):
+    start = datetime(2025, 1, 1, hour, 0)
+    return PlotCache.make_key(profile, "155755", start, start + timedelta(hours=1), 1)
+
+
+def test_put_and_get():
+    cache = PlotCache(max_bytes=100)
+    cache.put(make_key(), b"png", PAST_END)
+    assert cache.get(make_key()) == b"png"
+    assert cache.get(make_key(profile="973998")) is None
+    assert cache.current_bytes == 3
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = PlotCache(max_bytes=10)
+    cache.put(make_key(hour=1), b"aaaa", PAST_END)
+    cache.put(make_key(hour=2), b"bbbb", PAST_END)
+    cache.get(make_key(hour=1))
+    cache.put(make_key(hour=3), b"cccc", PAST_END)
+    assert cache.get(make_key(hour=2)) is None
+    assert cache.get(make_key(hour=1)) == b"aaaa"
+    assert cache.get(make_key(hour=3)) == b"cccc"
+    assert cache.current_bytes == 8
+
+
+def test_value_larger_than_limit_not_cached():
+    cache = PlotCache(max_bytes=2)
+    cache.put(make_key(), b"png", PAST_END)
+    assert cache.get(make_key()) is None
+    assert cache.current_bytes == 0
+
+
+def test_live_window_expires(mocker):
+    cache = PlotCache(max_bytes=100, live_ttl=60)
+    monotonic = mocker.patch("frontend.plot_cache.time.monotonic", return_value=0)
+    cache.put(make_key(), b"png", datetime.now() + timedelta(minutes=30))
+    assert cache.get(make_key()) == b"png"
+    monotonic.return_value = 61
+    assert cache.get(make_key()) is None
+    assert cache.current_bytes == 0
+
+
+def test_past_window_does_not_expire(mocker):
+    cache = PlotCache(max_bytes=100, live_ttl=60)
+    monotonic = mocker.patch("frontend.plot_cache.time.monotonic", return_value=0)
+    cache.put(make_key(), b"png", PAST_END)
+    monotonic.return_value = 10**6
+    assert cache.get(make_key()) == b"png"
+
+
+def test_window_ended_within_save_interval_expires(mocker):
+    cache = PlotCache(max_bytes=100, live_ttl=60, save_interval=600)
+    monotonic = mocker.patch("frontend.plot_cache.time.monotonic", return_value=0)
+    cache.put(make_key(), b"png", datetime.now() - timedelta(minutes=3))
+    monotonic.return_value = 61
+    assert cache.get(make_key()) is None
+
+    cache.put(make_key(), b"png", datetime.now() - timedelta(minutes=11))
+    monotonic.return_value = 10**6
+    assert cache.get(make_key()) == b"png"
+
+
+def test_save_interval_from_environment(monkeypatch):
+    monkeypatch.setenv("SAVE_INTERVAL", "30")
+    assert PlotCache().save_interval == 30
@@ -0,0 +1,43 @@
+import threading
+
+from frontend.plot_renderer import PlotRenderer, ChartTemplate
+
+PNG_MAGIC = b"\x89PNG"
+
+
+def test_render_bar_chart_png_returns_png():
+    png = PlotRenderer.render_bar_chart_png(["12:00", "12:01"], [1, 0], "Title")
+    assert png.startswith(PNG_MAGIC)
+
+
+def test_render_heatmap_png_returns_png():
+    png = PlotRenderer.render_heatmap_png(
+        ["12:00", "12:01"], ["Sold", "Charmed"], [[1, 0], [0, 1]], "Title"
+    )
+    assert png.startswith(PNG_MAGIC)
+
+
+def test_get_figure_reused_per_template():
+    template = ChartTemplate(name="test_template", figsize=(4, 2))
+    fig1 = PlotRenderer.get_figure(template)
+    fig1.add_subplot()
+    fig2 = PlotRenderer.get_figure(template)
+    assert fig1 is fig2
+    assert fig2.axes == []
+
+
+def test_render_bar_chart_png_concurrent_threads():
+    results = []
+
+    def render():
+        results.append(
+            PlotRenderer.render_bar_chart_png(["12:00", "12:01"], [0, 1], "T")
+        )
+
+    threads = [threading.Thread(target=render) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 4
+    assert all(png.startswith(PNG_MAGIC) for png in results)
@@ -0,0 +1,170 @@
+import random
+
+import pytest
+
+from frontend.profile_snapshot import ProfileSnapshot, ProfileSnapshotService
+
+
+@pytest.fixture
+def rows():
+    return [
+        (5111553, 155755, "Charmed", 135, ""),
+        (5111553, 142716, "Sold", 53, ""),
+        (973998, 116256, "Brovvar", 64, ""),
+    ]
+
+
+@pytest.fixture
+def service(mocker, rows):
+    mock_db_cls = mocker.patch("frontend.profile_snapshot.DbOperations", autospec=True)
+    db = mock_db_cls.return_value
+    db.select_data.return_value = rows
+    return ProfileSnapshotService(db_name="mgspy_test"), db
+
+
+def test_snapshot_indexes(rows):
+    snapshot = ProfileSnapshot(rows)
+    assert snapshot.nick_index == {
+        "charmed": (5111553, 155755),
+        "sold": (5111553, 142716),
+        "brovvar": (973998, 116256),
+    }
+    assert len(snapshot.profile_index[5111553]) == 2
+    assert [row["lvl"] for row in snapshot.table_rows] == [135, 64, 53]
+
+
+def test_snapshot_page(rows):
+    snapshot = ProfileSnapshot(rows)
+    page, total = snapshot.page(1, 2, "lvl", descending=True)
+    assert total == 3
+    assert [row[2] for row in page] == ["Charmed", "Brovvar"]
+    page, _ = snapshot.page(2, 2, "lvl", descending=True)
+    assert [row[2] for row in page] == ["Sold"]
+    page, _ = snapshot.page(1, 2, "nick", descending=False)
+    assert [row[2] for row in page] == ["Brovvar", "Charmed"]
+    page, _ = snapshot.page(5, 2, "nick", descending=True)
+    assert page == []
+
+
+def test_replace_profiles_builds_new_snapshot(rows):
+    snapshot = ProfileSnapshot(rows)
+    updated = snapshot.replace_profiles(
+        ["5111553"], [(5111553, 155755, "Charmed", 136, "")]
+    )
+    assert updated.version == 1
+    assert len(updated.rows) == 2
+    assert "sold" not in updated.nick_index
+    assert len(snapshot.rows) == 3
+
+
+def random_profile_rows(rng, profile, chars):
+    return [
+        (
+            profile,
+            char,
+            rng.choice([f"Nick{profile}_{char}", "Shared", "SHARED", None]),
+            rng.choice([None, 1, 1, 50, rng.randint(1, 300)]),
+            rng.choice(["", None, "Clan", "clan", "Other"]),
+        )
+        for char in chars
+    ]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_replace_profiles_matches_full_rebuild(seed):
+    rng = random.Random(seed)
+    rows = []
+    for profile in range(1, 40):
+        rows += random_profile_rows(rng, profile, range(rng.randint(1, 4)))
+    rows += rng.sample(rows, 5)  # profile_data has no primary key
+    rng.shuffle(rows)
+    snapshot = ProfileSnapshot(rows)
+
+    changed = rng.sample(range(1, 45), 4)
+    new_rows = []
+    for profile in changed:
+        new_rows += random_profile_rows(rng, profile, range(rng.randint(0, 4)))
+    updated = snapshot.replace_profiles([str(p) for p in changed], new_rows)
+    expected = ProfileSnapshot(
+        [row for row in rows if row[0] not in changed] + new_rows
+    )
+
+    assert updated.version == 1
+    assert updated.nick_index == expected.nick_index
+    assert updated.profile_index == expected.profile_index
+    assert updated.clan_index == expected.clan_index
+    assert updated.sorted_nicks == expected.sorted_nicks
+    assert updated.table_rows == expected.table_rows
+    assert updated.orders == expected.orders
+    assert sorted(updated.rows, key=repr) == sorted(expected.rows, key=repr)
+    assert snapshot.table_rows == ProfileSnapshot(rows).table_rows
+    assert snapshot.profile_index == ProfileSnapshot(rows).profile_index
+
+
+def test_snapshot_loaded_once(service):
+    service, db = service
+    assert not service.is_loaded
+    first = service.snapshot
+    assert service.snapshot is first
+    assert service.is_loaded
+    db.select_data.assert_called_once()
+
+
+def test_refresh_incremental(service, rows):
+    service, db = service
+    service.load()
+    db.select_data.return_value = [(973998, 116256, "Brovvar", 65, "clan")]
+    snapshot = service.refresh(["973998"])
+    assert db.select_data.call_args.kwargs["params"] == ([973998],)
+    assert snapshot.version == 1
+    assert service.snapshot is snapshot
+    assert {row[3] for row in snapshot.rows} == {135, 53, 65}
+
+
+def test_refresh_without_profiles_reloads_everything(service):
+    service, db = service
+    service.load()
+    snapshot = service.refresh()
+    assert db.select_data.call_count == 2
+    assert "where_clause" not in db.select_data.call_args.kwargs
+    assert snapshot.version == 1
+
+
+def test_parse_notify_payload():
+    assert ProfileSnapshotService.parse_notify_payload("1,2") == ["1", "2"]
+    assert ProfileSnapshotService.parse_notify_payload("") is None
+
+
+def test_snapshot_nick_index_prefers_smallest_pair():
+    snapshot = ProfileSnapshot(
+        [(9, 2, "Sold", 10, ""), (5, 7, "SOLD", 20, ""), (5, 3, "sold", 30, "")]
+    )
+    assert snapshot.nick_index["sold"] == (5, 3)
+
+
+def test_snapshot_clan_index():
+    snapshot = ProfileSnapshot(
+        [(1, 1, "Low", 10, "Clan"), (2, 2, "High", 90, "clan"), (3, 3, "Solo", 50, "")]
+    )
+    assert [row[2] for row in snapshot.clan_index["clan"]] == ["High", "Low"]
+    assert list(snapshot.clan_index) == ["clan"]
+
+
+def test_snapshot_handles_null_level(rows):
+    snapshot = ProfileSnapshot(rows + [(1, 2, "Fresh", None, None)])
+    assert snapshot.table_rows[-1] == {"nick": "Fresh", "lvl": 0, "guild": None}
+
+
+def test_listen_retries_when_database_is_unavailable(service):
+    service, db = service
+    attempts = []
+
+    def connect_to_db():
+        attempts.append(1)
+        if len(attempts) == 2:
+            service._stop_event.set()
+        raise Exception("Database not available after retries!")
+
+    db.connect_to_db.side_effect = connect_to_db
+    service.listen(retry_delay=0)
+    assert len(attempts) == 2